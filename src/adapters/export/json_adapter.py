@@ -10,6 +10,7 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from ...infra.serialization import StreamingJsonWriter, write_json_atomic
 from ...ports.snapshot import (
     GraphSnapshotType,
     Snapshot,
@@ -46,12 +47,18 @@ class JsonSnapshotWriter(SnapshotWriter):
         output_path: Path,
     ) -> bool:
         try:
-            _ensure_dir(output_path.parent)
-            data = snapshot.to_dict()
-            output_path.write_text(
-                json.dumps(data, indent=self._indent, ensure_ascii=self._ensure_ascii),
-                encoding="utf-8",
-            )
+            with StreamingJsonWriter(output_path, indent=self._indent, ensure_ascii=self._ensure_ascii) as w:
+                w.begin_object()
+                w.value(snapshot.meta.to_dict(), key="meta")
+                w.begin_array("nodes")
+                for n in snapshot.nodes:
+                    w.value(n.to_dict())
+                w.end()
+                w.begin_array("edges")
+                for e in snapshot.edges:
+                    w.value(e.to_dict())
+                w.end()
+                w.end()
             return True
         except Exception as e:
             print(f"Failed to write snapshot to {output_path}: {e}")
@@ -185,11 +192,7 @@ class CompatJsonExporter:
     ) -> bool:
         """导出实体 JSON"""
         try:
-            _ensure_dir(output_path.parent)
-            output_path.write_text(
-                json.dumps(entities, ensure_ascii=False, indent=2),
-                encoding="utf-8",
-            )
+            write_json_atomic(output_path, entities)
             return True
         except Exception as e:
             print(f"Failed to export entities: {e}")
@@ -202,11 +205,7 @@ class CompatJsonExporter:
     ) -> bool:
         """导出事件 JSON"""
         try:
-            _ensure_dir(output_path.parent)
-            output_path.write_text(
-                json.dumps(events, ensure_ascii=False, indent=2),
-                encoding="utf-8",
-            )
+            write_json_atomic(output_path, events)
             return True
         except Exception as e:
             print(f"Failed to export events: {e}")
@@ -219,11 +218,7 @@ class CompatJsonExporter:
     ) -> bool:
         """导出知识图谱 JSON"""
         try:
-            _ensure_dir(output_path.parent)
-            output_path.write_text(
-                json.dumps(kg_data, ensure_ascii=False, indent=2),
-                encoding="utf-8",
-            )
+            write_json_atomic(output_path, kg_data)
             return True
         except Exception as e:
             print(f"Failed to export knowledge graph: {e}")
@@ -0,0 +1,165 @@
+"""
+适配器层 - OpenAI 兼容接口的原生 asyncio 传输
+
+DefaultLLMPool.call_async 原先把同步 call 丢进默认线程池：并发上限即线程数，
+每个在途请求（含 time.sleep 退避）都占住一个线程。这里直接用 aiohttp 请求
+POST {base_url}/chat/completions：
+
+- 每个 provider（base_url + api_key）共享一个 keep-alive 连接池（TCPConnector），
+  会话绑定事件循环，换循环（如再次 asyncio.run）时自动重建
+- 错误转换为 LLMError，details 带 status / retry_after / retryable，
+  消息保留状态码与 "timed out" / "Connection error" 字样，沿用池的熔断判定
+- 取消（CancelledError）原样抛出，连接随请求一起释放
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+
+from ...infra import LLMError
+from ...infra.adaptive_limiter import parse_retry_after
+
+# 可重试的 HTTP 状态码
+RETRYABLE_STATUS = frozenset({408, 409, 425, 429, 500, 502, 503, 504})
+
+
+@dataclass
+class ChatResult:
+    """一次 chat/completions 调用的结果"""
+    content: str
+    model: str
+    usage: Dict[str, int] = field(default_factory=dict)
+    latency_ms: float = 0.0
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None, base: float = 1.0, cap: float = 30.0) -> float:
+    """指数退避（带抖动）；服务端给出 Retry-After 时以其为准"""
+    if retry_after is not None:
+        return min(retry_after, cap)
+    return min(cap, base * (2 ** attempt)) * random.uniform(0.5, 1.0)
+
+
+class AsyncOpenAITransport:
+    """
+    OpenAI 兼容 chat/completions 的异步客户端。
+
+    Args:
+        base_url: 如 https://api.openai.com/v1
+        api_key: Bearer token
+        max_connections: 连接池上限（0 表示不限）
+        keepalive_timeout: 空闲连接保持秒数
+    """
+
+    def __init__(self, base_url: str, api_key: str, *, max_connections: int = 0, keepalive_timeout: float = 60.0) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.max_connections = max(0, int(max_connections))
+        self.keepalive_timeout = keepalive_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {"requests": 0, "errors": 0, "in_flight": 0, "peak_in_flight": 0}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
+            )
+            self._loop = loop
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed and self._loop is asyncio.get_running_loop():
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+    async def chat(
+        self,
+        model: str,
+        prompt: str,
+        *,
+        max_tokens: int = 1500,
+        timeout: float = 55.0,
+        temperature: Optional[float] = None,
+    ) -> ChatResult:
+        payload: Dict[str, Any] = {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "stream": False,
+        }
+        if temperature is not None:
+            payload["temperature"] = temperature
+
+        session = self._get_session()
+        self.stats["requests"] += 1
+        self.stats["in_flight"] += 1
+        self.stats["peak_in_flight"] = max(self.stats["peak_in_flight"], self.stats["in_flight"])
+        start = time.monotonic()
+        try:
+            async with session.post(
+                f"{self.base_url}/chat/completions",
+                json=payload,
+                timeout=aiohttp.ClientTimeout(total=timeout),
+            ) as resp:
+                if resp.status >= 400:
+                    text = await resp.text()
+                    raise LLMError(
+                        f"HTTP {resp.status}: {text[:200]}",
+                        model=model,
+                        status=resp.status,
+                        retry_after=parse_retry_after(resp.headers.get("Retry-After")),
+                        retryable=resp.status in RETRYABLE_STATUS,
+                    )
+                data = await resp.json(content_type=None)
+            choices = data.get("choices") or []
+            content = ((choices[0].get("message") or {}).get("content") or "") if choices else ""
+            usage = data.get("usage") or {}
+            return ChatResult(
+                content=content.strip(),
+                model=str(data.get("model") or model),
+                usage={
+                    "prompt_tokens": int(usage.get("prompt_tokens") or 0),
+                    "completion_tokens": int(usage.get("completion_tokens") or 0),
+                },
+                latency_ms=(time.monotonic() - start) * 1000,
+            )
+        except LLMError:
+            self.stats["errors"] += 1
+            raise
+        except asyncio.TimeoutError as e:
+            self.stats["errors"] += 1
+            raise LLMError(f"Request timed out after {timeout}s", model=model, retryable=True) from e
+        except aiohttp.ClientError as e:
+            self.stats["errors"] += 1
+            raise LLMError(f"Connection error: {e}", model=model, retryable=True) from e
+        finally:
+            self.stats["in_flight"] -= 1
+
+
+_transports: Dict[Tuple[str, str], AsyncOpenAITransport] = {}
+_transports_lock = threading.Lock()
+
+
+def get_async_transport(base_url: str, api_key: str) -> AsyncOpenAITransport:
+    """按 provider（base_url + api_key）共享的异步传输"""
+    key = (base_url.rstrip("/"), api_key)
+    with _transports_lock:
+        transport = _transports.get(key)
+        if transport is None:
+            transport = _transports[key] = AsyncOpenAITransport(*key)
+        return transport
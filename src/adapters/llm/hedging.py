@@ -0,0 +1,119 @@
+"""
+适配器层 - LLM 对冲请求（hedged requests）策略
+
+一批抽取的墙钟时间由最慢的几次 LLM 调用决定（常是接近 timeout_seconds 的超时）。
+对冲：主请求在该客户端延迟的 p95（可配置分位数）内未返回有效结果时，向另一个客户端发出重复请求，
+取先返回的有效响应。
+
+- 延迟阈值：RoutingPolicy 记录的该客户端最近成功延迟的分位数；样本不足时用 default_delay_s
+- 预算：每个请求积累 max_ratio 个对冲额度（上限 burst），发出一次对冲消耗 1，长期对冲率不超过 max_ratio
+- 指标：对冲次数、主/对冲胜出次数、预算拒绝次数、浪费的 token（落败请求的用量；被取消的异步请求按提示词估计）
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Optional
+
+
+class HedgePolicy:
+    """
+    对冲策略与指标（线程安全）
+
+    Args:
+        enabled: 是否启用对冲
+        quantile: 触发对冲的延迟分位数
+        min_delay_s: 对冲延迟下限
+        default_delay_s: 延迟样本不足时的对冲延迟
+        min_samples: 使用分位数所需的最少样本数
+        max_ratio: 对冲请求占总请求的比例上限
+        burst: 对冲额度上限
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        quantile: float = 0.95,
+        min_delay_s: float = 1.0,
+        default_delay_s: float = 10.0,
+        min_samples: int = 20,
+        max_ratio: float = 0.1,
+        burst: float = 5.0,
+    ) -> None:
+        self.enabled = bool(enabled)
+        self.quantile = min(0.999, max(0.5, float(quantile)))
+        self.min_delay_s = max(0.0, float(min_delay_s))
+        self.default_delay_s = max(self.min_delay_s, float(default_delay_s))
+        self.min_samples = max(1, int(min_samples))
+        self.max_ratio = max(0.0, float(max_ratio))
+        self.burst = max(1.0, float(burst))
+        self._credits = 1.0
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "hedges": 0,
+            "budget_denied": 0,
+            "primary_wins": 0,
+            "hedge_wins": 0,
+            "wasted_tokens": 0,
+        }
+
+    @classmethod
+    def from_config(cls) -> "HedgePolicy":
+        """
+        读取 agent1_config：llm_hedging_enabled（默认 false）、llm_hedge_quantile（0.95）、
+        llm_hedge_min_delay_s（1）、llm_hedge_default_delay_s（10）、llm_hedge_max_ratio（0.1）
+        """
+        try:
+            from ...infra.config import get_config_manager
+            cm = get_config_manager()
+
+            def value(key: str, default: Any) -> Any:
+                return cm.get_config_value(key, default, "agent1_config")
+
+            return cls(
+                enabled=bool(value("llm_hedging_enabled", False)),
+                quantile=float(value("llm_hedge_quantile", 0.95)),
+                min_delay_s=float(value("llm_hedge_min_delay_s", 1.0)),
+                default_delay_s=float(value("llm_hedge_default_delay_s", 10.0)),
+                max_ratio=float(value("llm_hedge_max_ratio", 0.1)),
+            )
+        except Exception:
+            return cls()
+
+    def delay_s(self, latency_quantile_ms: Optional[float]) -> float:
+        """主请求发出后多久触发对冲"""
+        if latency_quantile_ms is None:
+            return self.default_delay_s
+        return max(self.min_delay_s, latency_quantile_ms / 1000.0)
+
+    def begin(self) -> None:
+        """记录一次可对冲的请求，积累对冲额度"""
+        with self._lock:
+            self.stats["requests"] += 1
+            self._credits = min(self.burst, self._credits + self.max_ratio)
+
+    def try_hedge(self) -> bool:
+        """消耗一个对冲额度；额度不足时记为预算拒绝"""
+        with self._lock:
+            if self._credits >= 1.0:
+                self._credits -= 1.0
+                self.stats["hedges"] += 1
+                return True
+            self.stats["budget_denied"] += 1
+            return False
+
+    def record_win(self, hedge: bool) -> None:
+        with self._lock:
+            self.stats["hedge_wins" if hedge else "primary_wins"] += 1
+
+    def record_waste(self, tokens: int) -> None:
+        with self._lock:
+            self.stats["wasted_tokens"] += max(0, int(tokens))
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self.stats)
+        out["enabled"] = self.enabled
+        out["hedge_rate"] = round(out["hedges"] / out["requests"], 4) if out["requests"] else 0.0
+        out["hedge_win_rate"] = round(out["hedge_wins"] / out["hedges"], 4) if out["hedges"] else 0.0
+        return out
@@ -5,13 +5,14 @@
 """
 from __future__ import annotations
 
-import random
+import asyncio
 import json
 import os
 import time
 import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Callable, Optional, Dict, Any, List
 
 from ...ports.llm_client import (
     LLMClient, LLMClientPool, LLMProviderType,
@@ -21,6 +22,12 @@ from ...infra import (
     get_logger, TokenBucketRateLimiter, SimpleCircuitBreaker,
     LLMError, CircuitBreakerOpenError
 )
+from .async_transport import AsyncOpenAITransport, backoff_delay, get_async_transport
+from .hedging import HedgePolicy
+from .routing import RoutingPolicy
+from ...infra.async_utils import estimate_tokens
+from ...infra.adaptive_limiter import key_limiter, parse_retry_after, rate_limiter_mode, report_outcome
+from ...infra.shared_limiter import credential_bucket, get_shared_limiter
 
 
 class ClientEntry:
@@ -31,13 +38,26 @@ class ClientEntry:
         client: Any,
         model: str,
         provider_type: LLMProviderType,
-        service_key: str
+        service_key: str,
+        base_url: str = "",
+        api_key: str = ""
     ):
         self.name = name
         self.client = client
         self.model = model
         self.provider_type = provider_type
         self.service_key = service_key
+        # OpenAI 兼容端点信息，供原生异步传输使用；为空时 call_async 退回线程池
+        self.base_url = base_url
+        self.api_key = api_key
+        # 客户端级限速器（shared 模式下按 API key 跨进程共享的令牌桶）
+        self.limiter: Optional[Any] = None
+
+    @property
+    def async_transport(self) -> Optional[AsyncOpenAITransport]:
+        if not self.base_url:
+            return None
+        return get_async_transport(self.base_url, self.api_key)
 
 
 class DefaultLLMPool(LLMClientPool):
@@ -50,6 +70,9 @@ class DefaultLLMPool(LLMClientPool):
         self._disabled_file: Optional[Path] = None
         self._rate_limiter: Optional[RateLimiter] = None
         self._circuit_breakers: Dict[str, SimpleCircuitBreaker] = {}
+        self._routing = RoutingPolicy()
+        self._hedge = HedgePolicy()
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
         self._lock = threading.Lock()
 
         # 已移除JSON文件处理逻辑
@@ -126,6 +149,11 @@ class DefaultLLMPool(LLMClientPool):
 
                     model = config.get("model", "gpt-3.5-turbo")
                     enabled = config.get("enabled", True)
+                    # 可选的客户端级速率预算：rate_per_sec 或 rpm
+                    try:
+                        rate_per_sec = float(config.get("rate_per_sec") or 0) or float(config.get("rpm") or 0) / 60.0
+                    except (TypeError, ValueError):
+                        rate_per_sec = 0.0
                     
                     # 检查是否启用
                     if not enabled:
@@ -141,7 +169,7 @@ class DefaultLLMPool(LLMClientPool):
                             continue
                     
                     # 注册客户端
-                    if self.register_openai_client(name, api_key, base_url, model, provider_type=provider_type):
+                    if self.register_openai_client(name, api_key, base_url, model, provider_type=provider_type, rate_per_sec=rate_per_sec):
                         self.logger.info(f"[LLM] 成功注册客户端: {name} (provider: {provider_type.value}, model: {model}, base_url: {base_url})")
                     else:
                         self.logger.error(f"[LLM] 注册OpenAI客户端失败: {name}")
@@ -164,9 +192,10 @@ class DefaultLLMPool(LLMClientPool):
         api_key: str,
         base_url: str,
         model: str,
-        provider_type: LLMProviderType = LLMProviderType.OPENAI
+        provider_type: LLMProviderType = LLMProviderType.OPENAI,
+        rate_per_sec: float = 0.0
     ) -> bool:
-        """注册 OpenAI 兼容客户端"""
+        """注册 OpenAI 兼容客户端（rate_per_sec > 0 时作为该客户端的速率预算参与路由）"""
         try:
             from openai import OpenAI
             client = OpenAI(api_key=api_key, base_url=base_url)
@@ -176,10 +205,15 @@ class DefaultLLMPool(LLMClientPool):
                 client=client,
                 model=model,
                 provider_type=provider_type,
-                service_key=f"llm_{name.lower()}"
+                service_key=f"llm_{name.lower()}",
+                base_url=base_url,
+                api_key=api_key
             )
+            if rate_per_sec > 0 and rate_limiter_mode() == "shared":
+                entry.limiter = get_shared_limiter(credential_bucket("llm", api_key or base_url), rate_per_sec)
             self.clients.append(entry)
             self._circuit_breakers[name] = SimpleCircuitBreaker()
+            self._routing.register(name, rate_per_sec)
 
             self.logger.info(f"Registered OpenAI client: {name} (model: {model})")
             return True
@@ -218,7 +252,7 @@ class DefaultLLMPool(LLMClientPool):
             available = [e for e in available if e.provider_type == provider]
         if not available:
             return None
-        entry = random.choice(available)
+        entry = self._route(available, ())
         return self._wrap_client(entry)
 
     def list_available(self) -> List[LLMProviderType]:
@@ -233,11 +267,138 @@ class DefaultLLMPool(LLMClientPool):
         config: Optional[LLMCallConfig] = None,
         preferred_provider: Optional[LLMProviderType] = None,
     ) -> LLMResponse:
-        """异步调用 LLM"""
-        # 简化实现：在线程池中运行同步方法
-        import asyncio
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, lambda: self.call(prompt, config))
+        """
+        异步调用 LLM（自动选择客户端）
+
+        OpenAI 兼容客户端走原生 asyncio 传输（共享 keep-alive 连接池），重试退避用 asyncio.sleep，
+        不占用线程；取消会立即中断在途请求。没有端点信息的客户端退回线程池中的同步调用。
+        客户端选择与重试后备同 call（按预计完成时间路由）。
+        """
+        config = config or LLMCallConfig()
+        max_retries = config.retries or 2
+        tried: List[str] = []
+
+        for attempt in range(max_retries + 1):
+            available = self._get_available_clients()
+            if preferred_provider is not None:
+                available = [e for e in available if e.provider_type == preferred_provider] or available
+            if not available:
+                return LLMResponse(content="", error="No available LLM clients")
+
+            entry = self._route(available, tried)
+            if entry.async_transport is None:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(None, lambda: self.call(prompt, config))
+
+            retry_after = None
+            tried.append(entry.name)
+            try:
+                self.logger.debug(f"[LLM] Trying {entry.name} async (attempt {attempt + 1})")
+                return await self._call_entry_async(entry, prompt, config)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"[LLM] {entry.name} async call failed: {e}")
+                retry_after = self._retry_after(e)
+
+            if attempt < max_retries and self._should_back_off(available, tried):
+                await asyncio.sleep(backoff_delay(attempt, retry_after))
+
+        return LLMResponse(content="", error="All LLM clients failed")
+
+    async def _call_entry_async(self, entry: ClientEntry, prompt: str, config: LLMCallConfig) -> LLMResponse:
+        """经原生异步传输向单个客户端发起一次请求，记录路由统计与熔断；失败时抛出异常"""
+        budget_wait = self._routing.start(entry.name)
+        try:
+            if budget_wait > 0:
+                await asyncio.sleep(budget_wait)
+            if self._rate_limiter:
+                await self._rate_limiter.acquire_async()
+            per_key = entry.limiter or key_limiter("llm", entry.name)
+            if per_key is not None:
+                await per_key.acquire_async()
+            result = await entry.async_transport.chat(
+                config.model or entry.model,
+                prompt,
+                max_tokens=config.max_tokens or 1500,
+                timeout=config.timeout_seconds or 55,
+            )
+        except asyncio.CancelledError:
+            # 取消不计入客户端错误率
+            self._routing.finish(entry.name, None, ok=True)
+            raise
+        except Exception as e:
+            self._routing.finish(entry.name, None, ok=False, error=str(e))
+            self._handle_error(entry.name, e)
+            self._report_limits(entry, e)
+            raise
+        self._routing.finish(entry.name, result.latency_ms, ok=True)
+        report_outcome("llm", entry.name, ok=True)
+        breaker = self._circuit_breakers.get(entry.name)
+        if breaker:
+            breaker.record_success()
+        return LLMResponse(
+            content=result.content,
+            provider=entry.provider_type,
+            model=entry.model,
+            usage=result.usage,
+            latency_ms=result.latency_ms
+        )
+
+    async def call_hedged_async(
+        self,
+        prompt: str,
+        config: Optional[LLMCallConfig] = None,
+        validate: Optional[Callable[[str], bool]] = None,
+    ) -> LLMResponse:
+        """
+        对冲版 call_async：主请求超过该客户端延迟分位数仍未返回有效结果时，向另一个客户端发出重复请求，
+        取先返回的有效响应（validate 判定），落败请求被取消。未启用对冲或可用客户端不足两个时等同 call_async。
+        """
+        config = config or LLMCallConfig()
+        hedge = self._hedge
+        available = self._get_available_clients()
+        if not hedge.enabled or len(available) < 2:
+            return await self.call_async(prompt, config)
+        if any(e.async_transport is None for e in available):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, lambda: self.call_hedged(prompt, config, validate))
+
+        valid = validate or bool
+        hedge.begin()
+        primary = self._route(available, ())
+        delay = hedge.delay_s(self._routing.latency_quantile(primary.name, hedge.quantile, hedge.min_samples))
+        tasks: Dict[asyncio.Task, bool] = {asyncio.ensure_future(self._call_entry_async(primary, prompt, config)): False}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and hedge.try_hedge():
+                secondary = self._route(available, [primary.name])
+                self.logger.info(f"[LLM] Hedging {primary.name} after {delay:.1f}s with {secondary.name}")
+                tasks[asyncio.ensure_future(self._call_entry_async(secondary, prompt, config))] = True
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        self.logger.error(f"[LLM] Hedged request failed: {task.exception()}")
+                        continue
+                    response = task.result()
+                    if response.success and valid(response.content):
+                        if len(tasks) > 1:
+                            hedge.record_win(tasks[task])
+                        for loser in pending:
+                            # 被取消的请求已发出提示词，按估计的提示词 token 记为浪费
+                            loser.cancel()
+                            hedge.record_waste(estimate_tokens(prompt))
+                        return response
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        # 竞速中无有效响应：走常规重试
+        return await self.call_async(prompt, config)
 
     def _wrap_client(self, entry: ClientEntry) -> LLMClient:
         """包装客户端为 LLMClient 接口"""
@@ -253,9 +414,41 @@ class DefaultLLMPool(LLMClientPool):
         available = self._get_available_clients()
         if not available:
             return None
-        entry = random.choice(available)
+        entry = self._route(available, ())
         return self._wrap_client(entry)
 
+    def _route(self, available: List[ClientEntry], tried) -> ClientEntry:
+        """按预计完成时间选择客户端；tried 中的客户端作为最后的后备"""
+        by_name = {e.name: e for e in available}
+        return by_name[self._routing.choose(list(by_name), exclude=tried)]
+
+    @staticmethod
+    def _should_back_off(available: List[ClientEntry], tried: List[str]) -> bool:
+        """还有未尝试的可用客户端时立即切换，全部尝试过才退避"""
+        return all(e.name in tried for e in available)
+
+    def _report_limits(self, entry: ClientEntry, error: Exception) -> None:
+        """向限速器反馈失败（自适应：429 / 5xx / 超时触发降速；Retry-After 暂停放行）"""
+        status = error.details.get("status") if isinstance(error, LLMError) else getattr(error, "status_code", None)
+        timeout = isinstance(error, (asyncio.TimeoutError, TimeoutError)) or "timed out" in str(error).lower()
+        retry_after = self._retry_after(error)
+        if entry.limiter is not None:
+            entry.limiter.record_failure(status=status, retry_after=retry_after, timeout=timeout)
+        report_outcome("llm", entry.name, ok=False, status=status, retry_after=retry_after, timeout=timeout)
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """从 LLMError.details 或 OpenAI SDK 异常的响应头中取 Retry-After 秒数"""
+        if isinstance(error, LLMError):
+            return error.details.get("retry_after")
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        if headers is None:
+            return None
+        try:
+            return parse_retry_after(headers.get("retry-after"))
+        except Exception:
+            return None
+
     def _get_available_clients(self) -> List[ClientEntry]:
         """获取可用客户端列表"""
         now_ts = time.time()
@@ -287,61 +480,153 @@ class DefaultLLMPool(LLMClientPool):
         """调用 LLM（自动选择客户端）"""
         config = config or LLMCallConfig()
         max_retries = config.retries or 2
+        tried: List[str] = []
 
         for attempt in range(max_retries + 1):
             available = self._get_available_clients()
             if not available:
                 return LLMResponse(
                     content="",
-                    success=False,
                     error="No available LLM clients"
                 )
 
-            entry = random.choice(available)
+            # 按预计完成时间（EWMA 延迟 / 成功率 / 在途数 / 速率预算）选择，重试时优先换用未尝试的客户端
+            entry = self._route(available, tried)
+            tried.append(entry.name)
+            retry_after = None
             try:
                 self.logger.info(f"[LLM] Trying {entry.name} (attempt {attempt + 1})")
-
-                # 应用限速
-                if self._rate_limiter:
-                    self._rate_limiter.acquire()
-
-                # 调用 OpenAI 客户端
-                response = entry.client.chat.completions.create(
-                    model=config.model or entry.model,
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=config.max_tokens or 1500,
-                    timeout=config.timeout_seconds or 55,
-                    stream=False
-                )
-
-                content = response.choices[0].message.content.strip()
-
-                # 记录成功
-                breaker = self._circuit_breakers.get(entry.name)
-                if breaker:
-                    breaker.record_success()
-
-                return LLMResponse(
-                    content=content,
-                    provider=entry.provider_type,
-                    model=entry.model
-                )
-
+                return self._call_entry(entry, prompt, config)
             except Exception as e:
                 self.logger.error(f"[LLM] {entry.name} failed: {e}", exc_info=True)
+                retry_after = self._retry_after(e)
 
-                # 记录失败并应用熔断
-                self._handle_error(entry.name, e)
-
-                if attempt < max_retries:
-                    time.sleep(2 ** attempt)
+            # 还有未尝试的客户端时立即切换，不在调用线程上退避
+            if attempt < max_retries and self._should_back_off(available, tried):
+                time.sleep(backoff_delay(attempt, retry_after))
 
         return LLMResponse(
             content="",
-            success=False,
             error="All LLM clients failed"
         )
 
+    def _call_entry(self, entry: ClientEntry, prompt: str, config: LLMCallConfig) -> LLMResponse:
+        """向单个客户端发起一次请求，记录路由统计与熔断；失败时抛出异常"""
+        budget_wait = self._routing.start(entry.name)
+        try:
+            if budget_wait > 0:
+                time.sleep(budget_wait)
+
+            # 应用限速（全局 + 自适应 / 共享模式下按客户端）
+            if self._rate_limiter:
+                self._rate_limiter.acquire()
+            per_key = entry.limiter or key_limiter("llm", entry.name)
+            if per_key is not None:
+                per_key.acquire()
+
+            # 调用 OpenAI 客户端
+            start = time.monotonic()
+            response = entry.client.chat.completions.create(
+                model=config.model or entry.model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=config.max_tokens or 1500,
+                timeout=config.timeout_seconds or 55,
+                stream=False
+            )
+            content = response.choices[0].message.content.strip()
+            latency_ms = (time.monotonic() - start) * 1000
+        except Exception as e:
+            # 记录失败并应用熔断
+            self._routing.finish(entry.name, None, ok=False, error=str(e))
+            self._handle_error(entry.name, e)
+            self._report_limits(entry, e)
+            raise
+
+        # 记录成功
+        self._routing.finish(entry.name, latency_ms, ok=True)
+        report_outcome("llm", entry.name, ok=True)
+        breaker = self._circuit_breakers.get(entry.name)
+        if breaker:
+            breaker.record_success()
+
+        usage = getattr(response, "usage", None)
+        return LLMResponse(
+            content=content,
+            provider=entry.provider_type,
+            model=entry.model,
+            usage={
+                "prompt_tokens": int(getattr(usage, "prompt_tokens", 0) or 0),
+                "completion_tokens": int(getattr(usage, "completion_tokens", 0) or 0),
+            },
+            latency_ms=latency_ms
+        )
+
+    def call_hedged(
+        self,
+        prompt: str,
+        config: Optional[LLMCallConfig] = None,
+        validate: Optional[Callable[[str], bool]] = None,
+    ) -> LLMResponse:
+        """
+        对冲版 call：主请求超过该客户端延迟分位数（见 HedgePolicy）仍未返回时，在后台线程向另一个客户端
+        发出重复请求，取先返回的有效响应（validate 判定，默认非空即有效）。落败请求无法中途取消，
+        完成后其 token 用量计入浪费。未启用对冲或可用客户端不足两个时等同 call。
+        """
+        config = config or LLMCallConfig()
+        hedge = self._hedge
+        available = self._get_available_clients()
+        if not hedge.enabled or len(available) < 2:
+            return self.call(prompt, config)
+
+        valid = validate or bool
+        hedge.begin()
+        primary = self._route(available, ())
+        delay = hedge.delay_s(self._routing.latency_quantile(primary.name, hedge.quantile, hedge.min_samples))
+        executor = self._get_hedge_executor()
+        futures: Dict[Future, bool] = {executor.submit(self._call_entry, primary, prompt, config): False}
+        done, _ = wait(futures, timeout=delay)
+        if not done and hedge.try_hedge():
+            secondary = self._route(available, [primary.name])
+            self.logger.info(f"[LLM] Hedging {primary.name} after {delay:.1f}s with {secondary.name}")
+            futures[executor.submit(self._call_entry, secondary, prompt, config)] = True
+
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                if fut.exception() is not None:
+                    self.logger.error(f"[LLM] Hedged request failed: {fut.exception()}")
+                    continue
+                response = fut.result()
+                if response.success and valid(response.content):
+                    if len(futures) > 1:
+                        hedge.record_win(futures[fut])
+                    for loser in pending:
+                        loser.add_done_callback(self._record_hedge_waste)
+                    return response
+
+        # 竞速中无有效响应：走常规重试
+        return self.call(prompt, config)
+
+    def _record_hedge_waste(self, fut: Future) -> None:
+        if fut.cancelled() or fut.exception() is not None:
+            return
+        self._hedge.record_waste(sum(fut.result().usage.values()))
+
+    def _get_hedge_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(max_workers=64, thread_name_prefix="llm-hedge")
+            return self._hedge_executor
+
+    def set_hedge_policy(self, policy: HedgePolicy) -> None:
+        """设置对冲策略"""
+        self._hedge = policy
+
+    def hedge_stats(self) -> Dict[str, Any]:
+        """对冲指标：次数、胜出次数、预算拒绝次数、浪费的 token"""
+        return self._hedge.summary()
+
     def _handle_error(self, name: str, error: Exception):
         """处理错误，应用熔断策略"""
         breaker = self._circuit_breakers.get(name)
@@ -364,6 +649,7 @@ class DefaultLLMPool(LLMClientPool):
             self.clients = [e for e in self.clients if e.name != name]
             self._circuit_breakers.pop(name, None)
             self._disabled_until.pop(name, None)
+            self._routing.remove(name)
             self._save_disabled_state()
             return True
 
@@ -377,7 +663,8 @@ class DefaultLLMPool(LLMClientPool):
                 "model": entry.model,
                 "provider": entry.provider_type.name,
                 "circuit_state": breaker.state if breaker else "unknown",
-                "disabled_until": self._disabled_until.get(entry.name)
+                "disabled_until": self._disabled_until.get(entry.name),
+                "routing": self._routing.snapshot(entry.name)
             })
         return services
 
@@ -409,7 +696,6 @@ class PooledLLMClient(LLMClient):
         if self._circuit_breaker and not self._circuit_breaker.can_call():
             return LLMResponse(
                 content="",
-                success=False,
                 error="Circuit breaker is open"
             )
 
@@ -443,7 +729,6 @@ class PooledLLMClient(LLMClient):
 
             return LLMResponse(
                 content="",
-                success=False,
                 error=str(e)
             )
 
@@ -460,10 +745,40 @@ class PooledLLMClient(LLMClient):
         prompt: str,
         config: Optional[LLMCallConfig] = None,
     ) -> LLMResponse:
-        """异步调用 LLM"""
-        import asyncio
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, lambda: self.call(prompt, config))
+        """异步调用 LLM（原生 asyncio 传输，单次尝试，语义同 call）"""
+        config = config or LLMCallConfig()
+        transport = self._entry.async_transport
+        if transport is None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, lambda: self.call(prompt, config))
+
+        if self._circuit_breaker and not self._circuit_breaker.can_call():
+            return LLMResponse(content="", error="Circuit breaker is open")
+        if self._rate_limiter:
+            await self._rate_limiter.acquire_async()
+        try:
+            result = await transport.chat(
+                config.model or self._entry.model,
+                prompt,
+                max_tokens=config.max_tokens or 1500,
+                timeout=config.timeout_seconds or 55,
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._pool.logger.error(f"[LLM] Pooled client {self._entry.name} async call failed: {e}")
+            if self._circuit_breaker:
+                self._circuit_breaker.record_failure()
+            return LLMResponse(content="", error=str(e))
+        if self._circuit_breaker:
+            self._circuit_breaker.record_success()
+        return LLMResponse(
+            content=result.content,
+            provider=self._entry.provider_type,
+            model=self._entry.model,
+            usage=result.usage,
+            latency_ms=result.latency_ms
+        )
 
     def call_with_retry(
         self,
@@ -484,7 +799,7 @@ class PooledLLMClient(LLMClient):
                 on_retry(attempt, Exception(response.error or "Unknown error"))
             if attempt < max_retries:
                 time.sleep(2 ** attempt)
-        return LLMResponse(content="", success=False, error=last_error)
+        return LLMResponse(content="", error=last_error)
 
     def health_check(self) -> bool:
         """健康检查"""
@@ -510,6 +825,7 @@ def get_llm_pool() -> DefaultLLMPool:
         with _pool_lock:
             if _llm_pool is None:
                 _llm_pool = DefaultLLMPool()
+                _llm_pool.set_hedge_policy(HedgePolicy.from_config())
     return _llm_pool
 
 
@@ -0,0 +1,196 @@
+"""
+适配器层 - LLM 池的路由策略
+
+DefaultLLMPool 原先用 random.choice 在可用客户端中选择，本地 Ollama 与云端 API 的延迟、错误率可差一个数量级。
+这里为每个客户端维护：
+- EWMA 延迟（只统计成功请求）与 EWMA 成功率
+- 在途请求数
+- 剩余速率预算（按客户端配置的 rate_per_sec 计的令牌桶，可透支，透支部分折算为等待时间）
+
+路由按预计完成时间（expected completion time, ECT）最小选择：
+    ECT = (EWMA 延迟 × (1 + 在途数 × load_factor) + 预算等待) / 成功率
+成功率取倒数即按几何分布计入重试的期望开销。以 explore 概率按 1/ECT² 加权随机选择，
+使慢/失败过的客户端仍有机会被探测；重试时排除已尝试的客户端，按同样的权重选择后备。
+"""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence
+
+
+class ClientStats:
+    """单个客户端的路由统计"""
+
+    __slots__ = (
+        "ewma_latency_ms", "success_rate", "in_flight", "requests", "failures",
+        "rate_per_sec", "budget", "_budget_ts", "last_error", "samples",
+    )
+
+    def __init__(self, rate_per_sec: float = 0.0, now: float = 0.0) -> None:
+        self.ewma_latency_ms: Optional[float] = None
+        self.success_rate = 1.0
+        self.in_flight = 0
+        self.requests = 0
+        self.failures = 0
+        self.rate_per_sec = max(0.0, float(rate_per_sec or 0.0))
+        self.budget = max(1.0, self.rate_per_sec)
+        self._budget_ts = now
+        self.last_error: Optional[str] = None
+        # 最近成功请求的延迟样本（对冲按其分位数设定阈值）
+        self.samples: deque = deque(maxlen=200)
+
+    def refill(self, now: float) -> None:
+        if self.rate_per_sec <= 0:
+            return
+        burst = max(1.0, self.rate_per_sec)
+        self.budget = min(burst, self.budget + (now - self._budget_ts) * self.rate_per_sec)
+        self._budget_ts = now
+
+    def budget_wait_s(self) -> float:
+        """取一个令牌前需要等待的秒数（未配置速率时为 0）"""
+        if self.rate_per_sec <= 0 or self.budget >= 1.0:
+            return 0.0
+        return (1.0 - self.budget) / self.rate_per_sec
+
+
+class RoutingPolicy:
+    """
+    按预计完成时间路由的策略引擎（线程安全，同步与异步调用共用）
+
+    Args:
+        alpha: EWMA 平滑系数
+        load_factor: 每个在途请求使预计延迟增加的比例
+        explore: 按权重随机选择（而非取最小 ECT）的概率
+        default_latency_ms: 尚无样本的客户端的先验延迟
+        min_success_rate: 成功率下限，避免 ECT 发散
+        clock: 时钟（测试可注入）
+        rng: 随机数发生器（测试可注入）
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.2,
+        load_factor: float = 0.5,
+        explore: float = 0.05,
+        default_latency_ms: float = 1000.0,
+        min_success_rate: float = 0.05,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self.alpha = alpha
+        self.load_factor = load_factor
+        self.explore = explore
+        self.default_latency_ms = default_latency_ms
+        self.min_success_rate = min_success_rate
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._stats: Dict[str, ClientStats] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, rate_per_sec: float = 0.0) -> None:
+        with self._lock:
+            self._stats[name] = ClientStats(rate_per_sec, self._clock())
+
+    def remove(self, name: str) -> None:
+        with self._lock:
+            self._stats.pop(name, None)
+
+    def _get(self, name: str) -> ClientStats:
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = ClientStats(0.0, self._clock())
+        return stats
+
+    def _prior_latency_ms(self) -> float:
+        # 无样本的客户端按已观测客户端中最快的估计，保证新客户端会被尝试
+        observed = [s.ewma_latency_ms for s in self._stats.values() if s.ewma_latency_ms is not None]
+        return min(observed) if observed else self.default_latency_ms
+
+    def _ect_ms(self, stats: ClientStats, prior_ms: float, now: float) -> float:
+        stats.refill(now)
+        latency = stats.ewma_latency_ms if stats.ewma_latency_ms is not None else prior_ms
+        expected = latency * (1.0 + stats.in_flight * self.load_factor) + stats.budget_wait_s() * 1000.0
+        return expected / max(self.min_success_rate, stats.success_rate)
+
+    def expected_ms(self, names: Iterable[str]) -> Dict[str, float]:
+        """各客户端当前的预计完成时间（毫秒）"""
+        with self._lock:
+            now = self._clock()
+            prior = self._prior_latency_ms()
+            return {n: self._ect_ms(self._get(n), prior, now) for n in names}
+
+    def choose(self, names: Sequence[str], exclude: Iterable[str] = ()) -> Optional[str]:
+        """
+        从 names 中选择客户端；exclude 为本次调用已尝试过的客户端（全部尝试过时不再排除）。
+        """
+        if not names:
+            return None
+        excluded = set(exclude)
+        candidates = [n for n in names if n not in excluded] or list(names)
+        ect = self.expected_ms(candidates)
+        if len(candidates) > 1 and self._rng.random() < self.explore:
+            weights = [1.0 / max(ect[n], 1e-3) ** 2 for n in candidates]
+            return self._rng.choices(candidates, weights=weights, k=1)[0]
+        return min(candidates, key=lambda n: ect[n])
+
+    def start(self, name: str) -> float:
+        """
+        记录请求开始：在途数 +1，消耗一个速率令牌（可透支）。
+
+        Returns:
+            发送前应等待的秒数（透支的预算）
+        """
+        with self._lock:
+            stats = self._get(name)
+            stats.refill(self._clock())
+            wait = stats.budget_wait_s()
+            if stats.rate_per_sec > 0:
+                stats.budget -= 1.0
+            stats.in_flight += 1
+            stats.requests += 1
+            return wait
+
+    def finish(self, name: str, latency_ms: Optional[float], ok: bool, error: Optional[str] = None) -> None:
+        """记录请求结束；成功时以 latency_ms 更新 EWMA 延迟"""
+        with self._lock:
+            stats = self._get(name)
+            stats.in_flight = max(0, stats.in_flight - 1)
+            stats.success_rate += self.alpha * ((1.0 if ok else 0.0) - stats.success_rate)
+            if ok and latency_ms is not None:
+                stats.samples.append(float(latency_ms))
+                if stats.ewma_latency_ms is None:
+                    stats.ewma_latency_ms = float(latency_ms)
+                else:
+                    stats.ewma_latency_ms += self.alpha * (latency_ms - stats.ewma_latency_ms)
+            if not ok:
+                stats.failures += 1
+                stats.last_error = (error or "")[:200] or None
+
+    def latency_quantile(self, name: str, q: float, min_samples: int = 1) -> Optional[float]:
+        """最近成功延迟的 q 分位数（毫秒）；样本不足时返回 None"""
+        with self._lock:
+            samples = sorted(self._get(name).samples)
+        if len(samples) < max(1, min_samples):
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def snapshot(self, name: str) -> Dict[str, Any]:
+        """list_services 展示用的统计"""
+        with self._lock:
+            now = self._clock()
+            stats = self._get(name)
+            ect = self._ect_ms(stats, self._prior_latency_ms(), now)
+            return {
+                "ewma_latency_ms": round(stats.ewma_latency_ms, 1) if stats.ewma_latency_ms is not None else None,
+                "success_rate": round(stats.success_rate, 4),
+                "in_flight": stats.in_flight,
+                "requests": stats.requests,
+                "failures": stats.failures,
+                "rate_per_sec": stats.rate_per_sec or None,
+                "remaining_budget": round(stats.budget, 2) if stats.rate_per_sec > 0 else None,
+                "expected_ms": round(ect, 1),
+                "last_error": stats.last_error,
+            }
@@ -17,6 +17,8 @@ from ...ports.extraction import (
     NewsItem, FetchConfig, FetchResult
 )
 from ...infra import get_logger
+from ...infra.adaptive_limiter import configured_rate_limiter, parse_retry_after
+from ...infra.shared_limiter import credential_bucket
 
 # 导入GDELT适配器
 from .gdelt_adapter import GDELTAdapter
@@ -33,7 +35,8 @@ class GNewsAdapter(NewsSource):
         language: str = "zh",
         country: Optional[str] = None,
         name: str = "GNews",
-        timeout: int = 30
+        timeout: int = 30,
+        rate_limiter: Optional[Any] = None
     ):
         self._api_key = api_key
         self._language = language
@@ -42,6 +45,10 @@ class GNewsAdapter(NewsSource):
         self._timeout = timeout
         self._session = None
         self._logger = get_logger(__name__)
+        # 配额按 API key 计：adaptive / shared 模式下同一 key 的适配器（及 shared 模式下的其他进程）共用一个限速器
+        self._rate_limiter = rate_limiter if rate_limiter is not None else configured_rate_limiter(
+            credential_bucket("gnews", api_key or name), "gnews_rate_limit_per_sec", 1.0
+        )
 
     @property
     def source_type(self) -> NewsSourceType:
@@ -97,10 +104,18 @@ class GNewsAdapter(NewsSource):
             timeout = aiohttp.ClientTimeout(total=self._timeout)
             async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
                 url = f"{self.BASE_URL}top-headlines"
-                    
+                limiter = self._rate_limiter
+                if limiter is not None:
+                    await limiter.acquire_async()
+
                 async with session.get(url, params=params) as response:
                     if response.status != 200:
                         text = await response.text()
+                        if limiter is not None and hasattr(limiter, "record_failure"):
+                            limiter.record_failure(
+                                status=response.status,
+                                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                            )
                         return FetchResult(
                             items=[],
                             total_fetched=0,
@@ -110,6 +125,8 @@ class GNewsAdapter(NewsSource):
                         )
 
                     data = await response.json()
+                    if limiter is not None and hasattr(limiter, "record_success"):
+                        limiter.record_success()
                     articles = data.get("articles", [])
 
                     for article in articles[:config.max_items]:
@@ -33,6 +33,58 @@ def normalize_news_items(news_list: List[Dict[str, Any]], source_name: str) -> L
     return news_list
 
 
+def build_fetch_config(
+    query: Optional[str] = None,
+    category: Optional[str] = None,
+    limit: int = 10,
+    from_: Optional[str] = None,
+    to: Optional[str] = None,
+    extra: Optional[Dict[str, Any]] = None,
+) -> Any:
+    """由工具参数（关键词字符串、ISO 日期字符串）构建 FetchConfig"""
+    from ...ports.extraction import FetchConfig
+
+    keywords = query.split() if query else None
+    # 将字符串格式的日期转换为 datetime 对象
+    from_date = None
+    to_date = None
+    if from_:
+        try:
+            from_date = datetime.fromisoformat(from_.replace("Z", "+00:00"))
+        except Exception:
+            pass
+    if to:
+        try:
+            to_date = datetime.fromisoformat(to.replace("Z", "+00:00"))
+        except Exception:
+            pass
+
+    return FetchConfig(
+        max_items=limit,
+        keywords=keywords,
+        category=category,
+        language=None,  # 使用 collector 默认语言
+        from_date=from_date,
+        to_date=to_date,
+        extra=extra or {},
+    )
+
+
+def news_item_to_dict(item: Any) -> Dict[str, Any]:
+    """NewsItem 转为流水线使用的新闻字典"""
+    return {
+        "id": item.id,
+        "title": item.title,
+        "content": item.content,
+        "source": item.source_name,
+        "url": item.source_url,
+        "datetime": item.published_at.isoformat() if item.published_at else None,
+        "author": item.author,
+        "category": item.category,
+        "language": item.language,
+    }
+
+
 async def fetch_from_collector(
     collector: Any,
     source_name: str,
@@ -68,36 +120,10 @@ async def fetch_from_collector(
     Returns:
         新闻数据列表
     """
-    from ...ports.extraction import FetchConfig
-    
     logger.info(f"开始从数据源 {source_name} 获取数据")
     
     try:
-        # 构建 FetchConfig
-        keywords = query.split() if query else None
-        # 将字符串格式的日期转换为 datetime 对象
-        from_date = None
-        to_date = None
-        if from_:
-            try:
-                from_date = datetime.fromisoformat(from_.replace("Z", "+00:00"))
-            except Exception:
-                pass
-        if to:
-            try:
-                to_date = datetime.fromisoformat(to.replace("Z", "+00:00"))
-            except Exception:
-                pass
-                
-        config = FetchConfig(
-            max_items=limit,
-            keywords=keywords,
-            category=category,
-            language=None,  # 使用 collector 默认语言
-            from_date=from_date,
-            to_date=to_date,
-            extra=extra or {},
-        )
+        config = build_fetch_config(query=query, category=category, limit=limit, from_=from_, to=to, extra=extra)
         logger.info(f"构建 FetchConfig 完成: {config}")
         
         # 调用 collector.fetch() 方法
@@ -110,19 +136,7 @@ async def fetch_from_collector(
             return []
         
         # 将 NewsItem 转换为字典格式
-        news = []
-        for item in result.items:
-            news.append({
-                "id": item.id,
-                "title": item.title,
-                "content": item.content,
-                "source": item.source_name,
-                "url": item.source_url,
-                "datetime": item.published_at.isoformat() if item.published_at else None,
-                "author": item.author,
-                "category": item.category,
-                "language": item.language,
-            })
+        news = [news_item_to_dict(item) for item in result.items]
         
         # 标准化数据
         normalized_news = normalize_news_items(news, source_name)
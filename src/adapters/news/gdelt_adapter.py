@@ -8,9 +8,19 @@ from html.parser import HTMLParser
 from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from ...infra import get_logger
+from ...infra.adaptive_limiter import configured_rate_limiter, parse_retry_after
 from ...ports.extraction import FetchConfig, FetchResult, NewsItem, NewsSource, NewsSourceType
 
 
+class GDELTHTTPError(RuntimeError):
+    """GDELT API 非 200 响应（携带状态码与 Retry-After，供限速器调整速率）"""
+
+    def __init__(self, status: int, text: str, retry_after: Optional[float] = None) -> None:
+        super().__init__(f"GDELT API error: {status} - {text}")
+        self.status = status
+        self.retry_after = retry_after
+
+
 class _MainTextHTMLParser(HTMLParser):
     def __init__(self) -> None:
         super().__init__(convert_charrefs=False)
@@ -78,6 +88,7 @@ class GDELTAdapter(NewsSource):
         translation: bool = False,
         timeout: float = 30.0,
         language: str = "any",
+        rate_limiter: Optional[Any] = None,
     ):
         self._name = name
         self._version = int(version)
@@ -87,6 +98,10 @@ class GDELTAdapter(NewsSource):
         self._timeout = float(timeout)
         self._language = str(language or "any")
         self._logger = get_logger(__name__)
+        # 所有 GDELT 适配器共用同一上游：adaptive / shared 模式下共享 "gdelt" 作用域的限速器
+        self._rate_limiter = rate_limiter if rate_limiter is not None else configured_rate_limiter(
+            "gdelt", "gdelt_rate_limit_per_sec", 1.0
+        )
 
     @property
     def source_type(self) -> NewsSourceType:
@@ -1027,23 +1042,39 @@ class GDELTAdapter(NewsSource):
                 raw = await resp.read()
                 if resp.status != 200:
                     text = raw.decode("utf-8", "ignore")
-                    raise RuntimeError(f"GDELT API error: {resp.status} - {text}")
+                    raise GDELTHTTPError(resp.status, text, parse_retry_after(resp.headers.get("Retry-After")))
                 try:
                     return _json.loads(raw.decode("utf-8", "ignore") or "{}")
                 except Exception:
                     text = raw.decode("utf-8", "ignore")
                     raise RuntimeError(f"GDELT API invalid JSON: {text[:200]}")
 
+        limiter = self._rate_limiter
         for attempt in range(3):
+            retry_after: Optional[float] = None
             try:
+                if limiter is not None:
+                    await limiter.acquire_async()
                 if is_external_session:
-                    return await do_one(session)
-                async with self._new_json_session(timeout=timeout) as sess:
-                    return await do_one(sess)
+                    data = await do_one(session)
+                else:
+                    async with self._new_json_session(timeout=timeout) as sess:
+                        data = await do_one(sess)
+                if limiter is not None and hasattr(limiter, "record_success"):
+                    limiter.record_success()
+                return data
             except (asyncio.TimeoutError, aiohttp.ClientError, RuntimeError) as e:
                 last_err = e
+                if isinstance(e, GDELTHTTPError):
+                    retry_after = e.retry_after
+                if limiter is not None and hasattr(limiter, "record_failure"):
+                    limiter.record_failure(
+                        status=getattr(e, "status", None),
+                        retry_after=retry_after,
+                        timeout=isinstance(e, asyncio.TimeoutError),
+                    )
                 if attempt < 2:
-                    await asyncio.sleep(1.0 + attempt)
+                    await asyncio.sleep(retry_after if retry_after is not None else 1.0 + attempt)
                     continue
                 raise
         raise last_err if last_err else RuntimeError("GDELT fetch failed")
@@ -1094,32 +1125,19 @@ class GDELTAdapter(NewsSource):
         async with aiohttp.ClientSession(connector=connector, timeout=client_timeout, headers=headers) as sess:
             return await _do_one(sess)
 
-    async def _enrich_items_with_fulltext(
-        self,
-        items: List[NewsItem],
-        *,
-        timeout: float,
-        max_concurrency: int,
-        min_chars: int,
-        max_chars: int,
-        force: bool = False,
-    ) -> int:
+    def new_html_session(self, *, timeout: float, max_concurrency: int = 6):
+        """抓取文章页面用的 aiohttp 会话（连接数按 max_concurrency 限制）"""
         import aiohttp
 
-        max_concurrency_i = min(max(int(max_concurrency), 1), 1000)
-        min_chars = min(max(int(min_chars), 1), 5000)
-        max_chars = min(max(int(max_chars), 200), 20000)
-        html_timeout = min(float(timeout), 10.0)
-
         headers = {
             "User-Agent": "Mozilla/5.0 (compatible; NewsAgent/1.0; +https://example.local)",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
         }
         client_timeout = aiohttp.ClientTimeout(
-            total=html_timeout,
-            connect=min(5.0, max(1.0, html_timeout / 3)),
-            sock_connect=min(5.0, max(1.0, html_timeout / 3)),
-            sock_read=min(8.0, max(2.0, html_timeout / 2)),
+            total=timeout,
+            connect=min(5.0, max(1.0, timeout / 3)),
+            sock_connect=min(5.0, max(1.0, timeout / 3)),
+            sock_read=min(8.0, max(2.0, timeout / 2)),
         )
         try:
             from aiohttp.resolver import ThreadedResolver
@@ -1129,10 +1147,41 @@ class GDELTAdapter(NewsSource):
             resolver = None
         connector = aiohttp.TCPConnector(
             resolver=resolver,
-            limit=max_concurrency_i,
-            limit_per_host=min(max_concurrency_i, 100),
+            limit=max_concurrency,
+            limit_per_host=min(max_concurrency, 100),
         )
-        async with aiohttp.ClientSession(connector=connector, timeout=client_timeout, headers=headers) as http_session:
+        return aiohttp.ClientSession(connector=connector, timeout=client_timeout, headers=headers)
+
+    async def fetch_fulltext(self, url: str, *, timeout: float, max_chars: int = 2000, session: Any = None) -> str:
+        """抓取文章页面并抽取正文文本；非 http(s) 链接或抓取失败时返回空串"""
+        url = str(url or "").strip()
+        if not url.startswith(("http://", "https://")):
+            return ""
+        try:
+            try:
+                html_text = await self._fetch_html(url, timeout=timeout, session=session)
+            except TypeError:
+                html_text = await self._fetch_html(url, timeout=timeout)
+            return self._extract_text_from_html(html_text, max_chars=max_chars).strip()
+        except Exception:
+            return ""
+
+    async def _enrich_items_with_fulltext(
+        self,
+        items: List[NewsItem],
+        *,
+        timeout: float,
+        max_concurrency: int,
+        min_chars: int,
+        max_chars: int,
+        force: bool = False,
+    ) -> int:
+        max_concurrency_i = min(max(int(max_concurrency), 1), 1000)
+        min_chars = min(max(int(min_chars), 1), 5000)
+        max_chars = min(max(int(max_chars), 200), 20000)
+        html_timeout = min(float(timeout), 10.0)
+
+        async with self.new_html_session(timeout=html_timeout, max_concurrency=max_concurrency_i) as http_session:
             worker_count = min(max_concurrency_i, max(len(items), 1))
             queue: asyncio.Queue[Optional[NewsItem]] = asyncio.Queue()
             for it in items:
@@ -1142,24 +1191,15 @@ class GDELTAdapter(NewsSource):
 
             async def enrich_one(it: NewsItem) -> bool:
                 url = str(it.source_url or it.id or "").strip()
-                if not url or not url.startswith(("http://", "https://")):
-                    return False
                 cur = str(it.content or "").strip()
                 if (not force) and len(cur) >= min_chars and cur != (it.title or ""):
                     return False
-                try:
-                    try:
-                        html_text = await self._fetch_html(url, timeout=html_timeout, session=http_session)
-                    except TypeError:
-                        html_text = await self._fetch_html(url, timeout=html_timeout)
-                    text = self._extract_text_from_html(html_text, max_chars=max_chars).strip()
-                    if not text or len(text) < min_chars or len(text) <= len(cur):
-                        return False
-                    it.content = text
-                    it.metadata["gdelt_fulltext"] = True
-                    return True
-                except Exception:
+                text = await self.fetch_fulltext(url, timeout=html_timeout, max_chars=max_chars, session=http_session)
+                if not text or len(text) < min_chars or len(text) <= len(cur):
                     return False
+                it.content = text
+                it.metadata["gdelt_fulltext"] = True
+                return True
 
             async def worker() -> int:
                 n = 0
@@ -10,6 +10,7 @@ from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from ...infra.paths import tools as Tools
+from ...infra.serialization import write_json_atomic
 
 
 _tools = Tools()
@@ -243,6 +244,7 @@ class SQLiteStore:
                     );
 
                     CREATE INDEX IF NOT EXISTS idx_participants_time ON participants(time);
+                    CREATE INDEX IF NOT EXISTS idx_participants_entity_time ON participants(entity_id, time);
                     CREATE INDEX IF NOT EXISTS idx_relations_time ON relations(time);
                     CREATE INDEX IF NOT EXISTS idx_events_first_seen ON events(first_seen);
 
@@ -1438,7 +1440,8 @@ class SQLiteStore:
                     ON CONFLICT(input_hash) DO UPDATE SET
                         output_json=excluded.output_json,
                         model=excluded.model,
-                        prompt_version=excluded.prompt_version
+                        prompt_version=excluded.prompt_version,
+                        created_at=excluded.created_at
                     """,
                     (decision_type, input_hash, json.dumps(output, ensure_ascii=False), model, prompt_version, now),
                 )
@@ -1446,6 +1449,36 @@ class SQLiteStore:
             finally:
                 conn.close()
 
+    def get_merge_decision_by_hash(self, input_hash: str) -> Optional[Dict[str, Any]]:
+        """按 input_hash 读取决策；不存在返回 None"""
+        with self._lock:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    """
+                    SELECT type, input_hash, output_json, model, prompt_version, created_at
+                    FROM merge_decisions
+                    WHERE input_hash=?
+                    """,
+                    (input_hash,),
+                ).fetchone()
+            finally:
+                conn.close()
+        if row is None:
+            return None
+        try:
+            output = json.loads(row["output_json"] or "{}")
+        except Exception:
+            output = {}
+        return {
+            "type": str(row["type"] or ""),
+            "input_hash": str(row["input_hash"] or ""),
+            "output": output,
+            "model": str(row["model"] or ""),
+            "prompt_version": str(row["prompt_version"] or ""),
+            "created_at": str(row["created_at"] or ""),
+        }
+
     # -------------------------
     # UPSERT APIs
     # -------------------------
@@ -1901,6 +1934,49 @@ class SQLiteStore:
             finally:
                 conn.close()
 
+    def list_entity_terms(self) -> Dict[str, str]:
+        """实体词表：实体名 / original_forms / entity_aliases → 展示名（用于实体词表自动机）"""
+        with self._lock:
+            conn = self._connect()
+            try:
+                out: Dict[str, str] = {}
+                rows = conn.execute(
+                    """
+                    SELECT e.name AS internal_name, COALESCE(mn.main_name, e.name) AS main_name,
+                           e.original_forms_json AS original_forms_json
+                    FROM entities e
+                    LEFT JOIN entity_main_names mn ON mn.entity_id = e.entity_id
+                    """
+                ).fetchall()
+                for r in rows:
+                    main_name = str(r["main_name"] or r["internal_name"] or "")
+                    if not main_name:
+                        continue
+                    try:
+                        forms = json.loads(r["original_forms_json"] or "[]")
+                        if not isinstance(forms, list):
+                            forms = []
+                    except Exception:
+                        forms = []
+                    for term in [main_name, str(r["internal_name"] or ""), *forms]:
+                        if isinstance(term, str) and term.strip():
+                            out.setdefault(term.strip(), main_name)
+                alias_rows = conn.execute(
+                    """
+                    SELECT a.alias AS alias, COALESCE(mn.main_name, e.name) AS main_name
+                    FROM entity_aliases a
+                    JOIN entities e ON e.entity_id = a.entity_id
+                    LEFT JOIN entity_main_names mn ON mn.entity_id = e.entity_id
+                    """
+                ).fetchall()
+                for r in alias_rows:
+                    alias = str(r["alias"] or "").strip()
+                    if alias and r["main_name"]:
+                        out.setdefault(alias, str(r["main_name"]))
+                return out
+            finally:
+                conn.close()
+
     def get_entity_record_by_name(self, name: str) -> Optional[Dict[str, Any]]:
         n = (name or "").strip()
         if not n:
@@ -2217,10 +2293,8 @@ class SQLiteStore:
     def export_compat_json_files(self) -> None:
         entities = self.export_entities_json()
         abstract_map = self.export_abstract_map_json()
-        _tools.ENTITIES_FILE.parent.mkdir(parents=True, exist_ok=True)
-        _tools.ABSTRACT_MAP_FILE.parent.mkdir(parents=True, exist_ok=True)
-        _tools.ENTITIES_FILE.write_text(json.dumps(entities, ensure_ascii=False, indent=2), encoding="utf-8")
-        _tools.ABSTRACT_MAP_FILE.write_text(json.dumps(abstract_map, ensure_ascii=False, indent=2), encoding="utf-8")
+        write_json_atomic(_tools.ENTITIES_FILE, entities)
+        write_json_atomic(_tools.ABSTRACT_MAP_FILE, abstract_map)
 
     # -------------------------
     # Processed IDs APIs
@@ -14,6 +14,8 @@ __all__ = []
 _MODULES_TO_IMPORT = [
     'data_fetch',
     'extraction',
+    'stream_ingest',
+    'benchmarks',
     'graph_ops',
     'reporting'
 ]
@@ -0,0 +1,332 @@
+"""
+抽取相关的基准工具与模拟 LLM（仅用于基准与测试，生产流程不导入本模块）
+
+- MockExtractionPool：进程内模拟 LLM 池，按 token 线性计时
+- start_mock_llm_server：本地 OpenAI 兼容模拟服务
+- benchmark_batched_extraction / benchmark_prompt_compaction / benchmark_async_llm_transport
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ...infra.registry import register_tool
+from ...infra.async_utils import call_llm_with_retry, estimate_tokens, extraction_prompt_prefix
+from ...infra.extraction_cache import ExtractionCache
+from ...infra.prompt_budget import TokenCounter, build_extraction_prompt
+from ...infra.serialization import extract_json_from_llm_response
+from .extraction import _ENTITY_DEFINITIONS, llm_extract_events_batch
+
+
+class MockExtractionPool:
+    """
+    模拟 LLM 池（仅用于基准）：耗时 = 固定往返延迟 + 输入/输出 token 线性耗时，
+    按提示中的新闻 id 返回每篇一个事件，并累计估计的输入/输出 token 与模拟耗时（simulated_ms）。
+    提示以 cached_prefix 开头时，这部分输入 token 按服务端前缀缓存命中计时（耗时乘以 1 - cached_discount）。
+    """
+
+    _ID_RE = re.compile(r"^### 新闻 id=(\S+)$", re.M)
+
+    def __init__(
+        self,
+        latency_ms: float,
+        ms_per_1k_prompt_tokens: float,
+        ms_per_output_token: float,
+        cached_prefix: str = "",
+        cached_discount: float = 0.0,
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.ms_per_1k_prompt_tokens = ms_per_1k_prompt_tokens
+        self.ms_per_output_token = ms_per_output_token
+        self.cached_prefix = cached_prefix
+        self.cached_discount = cached_discount
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.output_tokens = 0
+        self.simulated_ms = 0.0
+        self._lock = threading.Lock()
+
+    def list_services(self) -> List[Dict[str, Any]]:
+        return [{"name": "mock", "model": "mock-extractor"}]
+
+    @staticmethod
+    def _event(tag: str) -> Dict[str, Any]:
+        return {
+            "abstract": f"模拟公司{tag}宣布季度业绩",
+            "event_types": ["公司公告"],
+            "entities": [f"模拟公司{tag}"],
+            "entities_original": [f"Mock Corp {tag}"],
+            "relations": [],
+            "event_summary": f"模拟公司{tag}发布季度业绩公告",
+        }
+
+    def call(self, prompt: str, config: Any = None) -> Any:
+        from ...ports.llm_client import LLMResponse
+        ids = self._ID_RE.findall(prompt)
+        if ids:
+            payload = {"articles": [{"id": i, "events": [self._event(i)]} for i in ids]}
+        else:
+            payload = {"events": [self._event("x")]}
+        content = json.dumps(payload, ensure_ascii=False)
+        p_tokens, o_tokens = estimate_tokens(prompt), estimate_tokens(content)
+        c_tokens = estimate_tokens(self.cached_prefix) if self.cached_prefix and prompt.startswith(self.cached_prefix) else 0
+        effective = p_tokens - c_tokens * self.cached_discount
+        delay_ms = self.latency_ms + effective * self.ms_per_1k_prompt_tokens / 1000 + o_tokens * self.ms_per_output_token
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += p_tokens
+            self.cached_tokens += c_tokens
+            self.output_tokens += o_tokens
+            self.simulated_ms += delay_ms
+        time.sleep(delay_ms / 1000)
+        return LLMResponse(content=content, model="mock-extractor")
+
+
+@register_tool(
+    name="benchmark_batched_extraction",
+    description="[Benchmark] 模拟 LLM 下对比逐篇与多篇合并抽取的吞吐（articles/sec）与每篇 token 数",
+    category="Benchmark"
+)
+def benchmark_batched_extraction(
+    n_articles: int = 48,
+    batch_sizes: Optional[List[int]] = None,
+    content_chars: int = 300,
+    latency_ms: float = 60.0,
+    ms_per_1k_prompt_tokens: float = 20.0,
+    ms_per_output_token: float = 0.5,
+    token_budget: int = 2400,
+) -> Dict[str, Any]:
+    """
+    用模拟 LLM（固定往返延迟 + 按 token 计时）对同一组短新闻分别以不同 batch_size 抽取。
+    模拟耗时只用于比较相对吞吐；每篇 token 数 = (输入 + 输出估计 token) / 篇数，体现共享指令前缀的摊薄。
+    """
+    batch_sizes = batch_sizes or [1, 4, 8]
+    filler = "美联储官员表示将继续关注通胀数据并评估政策路径。"
+    articles = [
+        {
+            "title": f"模拟公司{i} 发布季度业绩",
+            "content": (f"第{i}篇：" + filler * (content_chars // len(filler) + 1))[:content_chars],
+            "reported_at": "2025-01-01",
+        }
+        for i in range(int(n_articles))
+    ]
+    runs: Dict[str, Any] = {}
+    for size in batch_sizes:
+        pool = MockExtractionPool(latency_ms, ms_per_1k_prompt_tokens, ms_per_output_token)
+        stats: Dict[str, int] = {}
+        t0 = time.perf_counter()
+        results = llm_extract_events_batch(
+            articles,
+            pool,
+            batch_size=int(size),
+            token_budget=token_budget,
+            stats=stats,
+            cache=ExtractionCache(enabled=False),
+        )
+        elapsed = time.perf_counter() - t0
+        n = len(articles)
+        runs[str(size)] = {
+            "llm_calls": pool.calls,
+            "articles_with_events": sum(1 for r in results if r),
+            "elapsed_s": round(elapsed, 3),
+            "articles_per_sec": round(n / elapsed, 2) if elapsed > 0 else 0.0,
+            "prompt_tokens_per_article": round(pool.prompt_tokens / n, 1) if n else 0.0,
+            "output_tokens_per_article": round(pool.output_tokens / n, 1) if n else 0.0,
+            "tokens_per_article": round((pool.prompt_tokens + pool.output_tokens) / n, 1) if n else 0.0,
+            "splits": stats.get("splits", 0),
+        }
+    return {"status": "ok", "n_articles": len(articles), "runs": runs}
+
+
+@register_tool(
+    name="benchmark_prompt_compaction",
+    description="[Benchmark] 模拟 LLM 下对比 2000 字符硬截断与按 token 预算压缩正文的每篇 token 数与延迟",
+    category="Benchmark"
+)
+def benchmark_prompt_compaction(
+    n_articles: int = 24,
+    content_chars: int = 6000,
+    budget_tokens: int = 600,
+    latency_ms: float = 60.0,
+    ms_per_1k_prompt_tokens: float = 20.0,
+    ms_per_output_token: float = 0.5,
+    cached_discount: float = 0.9,
+) -> Dict[str, Any]:
+    """
+    同一组长新闻分别以两种方式构建单篇抽取提示并请求模拟 LLM：
+    - truncate：旧流程，正文截断到 2000 字符
+    - budget：正文按 budget_tokens 选句压缩
+    两种方式的提示都以相同的静态前缀开头，模拟 LLM 按 cached_discount 折算前缀耗时；
+    结果中 prefix_tokens 为可缓存的前缀 token 数，uncached_prompt_tokens_per_article 为每篇实际需要计算的输入；
+    latency_ms_per_article 是模拟 LLM 按 token 计算的每篇耗时（不受机器负载影响），elapsed_s 为实测墙钟时间。
+    """
+    counter = TokenCounter(use_tokenizer=False)
+    filler = [
+        "市场人士普遍认为短期波动仍将持续。",
+        "分析师提醒投资者关注后续宏观数据的变化。",
+        "业内对行业前景看法不一，部分机构维持观望。",
+        "此外，相关板块成交量较前一交易日有所放大。",
+    ]
+    articles = []
+    for i in range(int(n_articles)):
+        title = f"模拟公司{i} 发布季度业绩 营收同比增长{10 + i}%"
+        lead = f"模拟公司{i}周二公布季度业绩，营收同比增长{10 + i}%，净利润创历史新高。"
+        body = [lead]
+        k = 0
+        while sum(len(x) for x in body) < content_chars:
+            body.append(filler[k % len(filler)])
+            if k % 9 == 4:
+                body.append(f"模拟公司{i}管理层表示，下季度将继续扩大产能，预计资本开支增加{5 + k}亿元。")
+            k += 1
+        articles.append({"title": title, "content": "".join(body)[:content_chars], "reported_at": "2025-01-01"})
+
+    prefix = extraction_prompt_prefix(_ENTITY_DEFINITIONS)
+    runs: Dict[str, Any] = {}
+    for mode in ("truncate", "budget"):
+        pool = MockExtractionPool(
+            latency_ms, ms_per_1k_prompt_tokens, ms_per_output_token, cached_prefix=prefix, cached_discount=cached_discount
+        )
+        compacted = 0
+        found = 0
+        t0 = time.perf_counter()
+        for a in articles:
+            if mode == "truncate":
+                content = a["content"]
+                if len(content) > 2000:
+                    content = content[:2000] + "……【后文已截断】"
+                built = build_extraction_prompt(a["title"], content, _ENTITY_DEFINITIONS, a["reported_at"], counter=counter)
+            else:
+                built = build_extraction_prompt(
+                    a["title"], a["content"], _ENTITY_DEFINITIONS, a["reported_at"], budget_tokens=budget_tokens, counter=counter
+                )
+                compacted += int(built.compaction.compacted)
+            raw = call_llm_with_retry(pool, built.text, hedge=False)
+            if raw:
+                found += len(extract_json_from_llm_response(raw).get("events", []))
+        elapsed = time.perf_counter() - t0
+        n = len(articles)
+        runs[mode] = {
+            "llm_calls": pool.calls,
+            "events": found,
+            "compacted_articles": compacted,
+            "elapsed_s": round(elapsed, 3),
+            "latency_ms_per_article": round(pool.simulated_ms / n, 1) if n else 0.0,
+            "prompt_tokens_per_article": round(pool.prompt_tokens / n, 1) if n else 0.0,
+            "uncached_prompt_tokens_per_article": round((pool.prompt_tokens - pool.cached_tokens) / n, 1) if n else 0.0,
+        }
+    return {
+        "status": "ok",
+        "n_articles": len(articles),
+        "token_counter": counter.source,
+        "prefix_tokens": counter.count(prefix),
+        "runs": runs,
+    }
+
+
+async def start_mock_llm_server(latency_ms: float = 200.0, fail_first: int = 0, retry_after: float = 0.0) -> Tuple[Any, str, Dict[str, Any]]:
+    """
+    本地模拟 OpenAI 兼容 LLM 服务（仅用于基准与测试）：POST /v1/chat/completions 延迟 latency_ms 后返回固定事件。
+    前 fail_first 个请求返回 429（带 Retry-After: retry_after）。
+
+    Returns:
+        (runner, base_url, state)；state 记录 requests / in_flight / peak_in_flight，用完后 await runner.cleanup()
+    """
+    from aiohttp import web
+
+    state: Dict[str, Any] = {"requests": 0, "in_flight": 0, "peak_in_flight": 0}
+    content = json.dumps({"events": [MockExtractionPool._event("x")]}, ensure_ascii=False)
+
+    async def completions(request: "web.Request") -> "web.Response":
+        body = await request.json()
+        state["requests"] += 1
+        if state["requests"] <= fail_first:
+            return web.json_response({"error": {"message": "rate limited"}}, status=429, headers={"Retry-After": str(retry_after)})
+        state["in_flight"] += 1
+        state["peak_in_flight"] = max(state["peak_in_flight"], state["in_flight"])
+        try:
+            await asyncio.sleep(latency_ms / 1000)
+        finally:
+            state["in_flight"] -= 1
+        return web.json_response({
+            "id": f"mock-{state['requests']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock-llm"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": estimate_tokens(body["messages"][0]["content"]), "completion_tokens": estimate_tokens(content), "total_tokens": 0},
+        })
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", completions)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0, backlog=2048)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/v1", state
+
+
+@register_tool(
+    name="benchmark_async_llm_transport",
+    description="[Benchmark] 本地模拟 LLM 服务下对比线程池调用与原生异步传输的在途请求数与吞吐",
+    category="Benchmark"
+)
+async def benchmark_async_llm_transport(
+    n_requests: int = 512,
+    concurrency_levels: Optional[List[int]] = None,
+    latency_ms: float = 200.0,
+    modes: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    对同一个模拟服务分别以 executor（线程池中执行同步 call，即原 call_async 实现）与 native（原生异步传输）
+    在不同并发度下发起请求，报告吞吐与服务端观察到的峰值在途请求数。每个并发度至少发起该并发度个请求。
+    """
+    from ...adapters.llm.pool import DefaultLLMPool
+    from ...ports.llm_client import LLMCallConfig
+
+    concurrency_levels = concurrency_levels or [32, 256, 512]
+    modes = modes or ["executor", "native"]
+    runner, base_url, state = await start_mock_llm_server(latency_ms)
+    pool = DefaultLLMPool()
+    for service in pool.list_services():
+        pool.remove_service(service["name"])
+    pool.register_openai_client("mock", "mock-key", base_url, "mock-llm")
+    config = LLMCallConfig(max_tokens=200, timeout_seconds=60, retries=0)
+    loop = asyncio.get_running_loop()
+
+    async def call(mode: str):
+        if mode == "native":
+            return await pool.call_async("ping", config)
+        return await loop.run_in_executor(None, lambda: pool.call("ping", config))
+
+    runs: Dict[str, Any] = {}
+    try:
+        for mode in modes:
+            for level in concurrency_levels:
+                total = max(int(n_requests), int(level))
+                sem = asyncio.Semaphore(int(level))
+                state["peak_in_flight"] = 0
+
+                async def one():
+                    async with sem:
+                        return await call(mode)
+
+                t0 = time.perf_counter()
+                responses = await asyncio.gather(*(one() for _ in range(total)))
+                elapsed = time.perf_counter() - t0
+                runs[f"{mode}@{level}"] = {
+                    "requests": total,
+                    "ok": sum(1 for r in responses if r.success),
+                    "elapsed_s": round(elapsed, 3),
+                    "requests_per_sec": round(total / elapsed, 1) if elapsed > 0 else 0.0,
+                    "peak_in_flight": state["peak_in_flight"],
+                }
+    finally:
+        await pool.clients[0].async_transport.close()
+        await runner.cleanup()
+    return {"status": "ok", "latency_ms": latency_ms, "runs": runs}
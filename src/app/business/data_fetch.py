@@ -2,15 +2,16 @@ from typing import List, Dict, Any, Optional, Set
 import pandas as pd
 from ...infra.registry import register_tool
 from ...infra.paths import tools as Tools
-from ...core import ConfigManager, AsyncExecutor, RateLimiter, get_config_manager, get_llm_pool
+from ...core import ConfigManager, AsyncExecutor, get_config_manager, get_llm_pool
 from ...domain.data_operations import update_entities, update_abstract_map
 from ...adapters.news.fetch_utils import fetch_from_multiple_sources, normalize_news_items
-from .extraction import llm_extract_events, NewsDeduplicator, persist_expanded_news_to_tmp
+from .extraction import llm_extract_events, llm_extract_events_async, lookup_cached_extraction, NewsDeduplicator, persist_expanded_news_to_tmp
+from ...infra.extraction_cache import get_extraction_cache
+from ...infra.adaptive_limiter import create_rate_limiter
 from ...infra.file_utils import safe_unlink_multiple, safe_unlink
 from ...domain.data_operations import sanitize_datetime_fields, write_jsonl_file
 from pathlib import Path
 import json
-import asyncio
 import time
 from datetime import datetime, timedelta, timezone
 
@@ -267,6 +268,8 @@ async def benchmark_gdelt_extraction(
         dedup_news = dedup_news[: int(max_articles)]
 
     llm_pool = get_llm_pool()
+    extraction_cache = get_extraction_cache()
+    cache_before = extraction_cache.snapshot()
 
     extraction_t0 = time.monotonic()
     extracted_events_total = 0
@@ -350,6 +353,7 @@ async def benchmark_gdelt_extraction(
         "fetch_ms": fetch_ms,
         "extraction_ms": extraction_ms,
         "total_ms": total_ms,
+        "extraction_cache": extraction_cache.summary(since=cache_before),
         "sample_abstracts": sample_abstracts,
         "per_article": per_article,
     }
@@ -815,14 +819,14 @@ async def process_expanded_news(expanded_news: List[Dict], rate_limit: float = 1
     tools = Tools()
 
     # 初始化新闻去重器
-    deduplicator = NewsDeduplicator(threshold=tools.get_dedupe_threshold())
+    deduplicator = NewsDeduplicator.shared(tools.get_dedupe_threshold())
 
     # 创建去重集合（ID去重）
     seen_news = set()
 
     # 使用统一异步执行器和限速器
     async_executor = AsyncExecutor()
-    limiter = RateLimiter(rate_limit) if rate_limit > 0 else None
+    limiter = create_rate_limiter(rate_limit, "llm") if rate_limit > 0 else None
 
     async def handle_one(news: Dict) -> int:
         nonlocal processed_count
@@ -841,18 +845,18 @@ async def process_expanded_news(expanded_news: List[Dict], rate_limit: float = 1
                 return 0
 
             news_text = f"{title} {content}".strip()
-            if deduplicator.is_duplicate(news_text):
+            if deduplicator.is_duplicate(news_text, f"{source}:{news_id}" if news_id else ""):
                 return 0
 
-            # 应用限速
-            if limiter:
-                await limiter.acquire_async()
-
-            loop = asyncio.get_running_loop()
             # 这里应该使用LLM API池，不是新闻API池
-            from ..core import get_llm_pool
             api_pool = get_llm_pool()
-            extracted = await loop.run_in_executor(None, llm_extract_events, title, content, api_pool)
+            # 抽取缓存是同步 SQLite I/O，放到线程池中执行
+            cache_key, extracted = await async_executor.run_in_thread(lookup_cached_extraction, title, content, api_pool)
+            if extracted is None:
+                # 应用限速（命中抽取缓存时不占用配额）
+                if limiter:
+                    await limiter.acquire_async()
+                extracted = await llm_extract_events_async(title, content, api_pool, cache_key=cache_key)
 
             if extracted:
                 all_entities = []
@@ -872,12 +876,13 @@ async def process_expanded_news(expanded_news: List[Dict], rate_limit: float = 1
             tools.log(f"⚠️ 处理拓展新闻失败: {e}")
         return 0
 
-    tasks = [handle_one(news) for news in expanded_news]
+    tasks = [lambda n=news: handle_one(n) for news in expanded_news]
     # 使用AsyncExecutor进行并发执行
     results = await async_executor.run_concurrent_tasks(
         tasks=tasks,
         concurrency=max_workers
     )
+    deduplicator.flush()
     processed_count = sum(results)
 
     return processed_count
@@ -910,6 +915,8 @@ async def expand_news_by_recent_entities(
     Returns:
         处理结果统计
     """
+    tools = Tools()
+
     # 从数据库获取已处理的ID
     from src.adapters.sqlite.store import get_store
     processed_ids = get_store().get_processed_ids()
@@ -934,6 +941,7 @@ async def expand_news_by_recent_entities(
     if expanded_news:
         deduped_path = persist_expanded_news_to_tmp(expanded_news, processed_ids)
         processed_count = 0
+        cache_stats = None
         if deduped_path and deduped_path.exists():
             tools.log(f"📄 开始处理拓展的新闻 (deduped: {deduped_path.name}) ...")
             news_list = []
@@ -943,15 +951,21 @@ async def expand_news_by_recent_entities(
                         news_list.append(json.loads(line))
                     except Exception as e:
                         tools.log(f"⚠️ 跳过无效行: {e}")
+            extraction_cache = get_extraction_cache()
+            cache_before = extraction_cache.snapshot()
             processed_count = await process_expanded_news(news_list, rate_limit=rate_limit, max_workers=max_workers)
+            cache_stats = extraction_cache.summary(since=cache_before)
             # 清理 tmp 文件
             try:
                 raw_file = tools.RAW_NEWS_TMP_DIR / deduped_path.name.replace("_deduped", "")
                 file_paths = [raw_file, deduped_path]
-                safe_unlink_multiple(file_paths, "临时")
+                safe_unlink_multiple(file_paths, tools.log, "临时")
             except Exception as e:
                 tools.log(f"⚠️ 删除临时文件失败: {e}")
         tools.log(f"✅ 成功处理 {processed_count} 条拓展新闻")
-        return {"processed_count": processed_count, "expanded_news_count": len(expanded_news)}
+        result = {"processed_count": processed_count, "expanded_news_count": len(expanded_news)}
+        if cache_stats is not None:
+            result["extraction_cache"] = cache_stats
+        return result
 
     return {"processed_count": 0, "expanded_news_count": 0}
@@ -0,0 +1,107 @@
+"""
+LLM 合并判断的决策缓存。
+
+KnowledgeGraph 每次 refresh 都会把相同或重叠的实体组/事件批次送给 LLM，
+_valid_entity_group 也会对已判断过的实体组再次调用 LLMEntityMergeDecider。
+这里在调用前查询 SQLite 的 merge_decisions 表（按 input_hash 唯一）：
+
+- 键 = sha1(决策类型 + prompt 版本 + 排序后的成员 {名称: 记录指纹} + 附加上下文)
+  成员记录（原始表述、摘要、证据等）变化 → 指纹变化 → 键变化，旧决策自然失效
+- 超过 ttl_days 的决策视为过期，重新调用 LLM 并覆盖
+- 决策类型以 kg_ 前缀区分，不会被 apply_entity_merge_decisions 等审查流程当作审查结论执行
+"""
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Mapping, Optional
+
+from ...core import tools
+
+
+class MergeDecisionCache:
+    """merge_decisions 表之上的读穿缓存（线程安全的命中统计）"""
+
+    def __init__(
+        self,
+        store: Any = None,
+        *,
+        prompt_version: str,
+        model: str = "auto",
+        ttl_days: float = 30.0,
+        enabled: bool = True,
+    ) -> None:
+        self.prompt_version = prompt_version
+        self.model = model
+        self.ttl = timedelta(days=float(ttl_days)) if ttl_days and float(ttl_days) > 0 else None
+        self.enabled = bool(enabled)
+        self._store = store
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "writes": 0, "errors": 0}
+
+    def _get_store(self):
+        if self._store is None:
+            from ...adapters.sqlite.store import get_store
+            self._store = get_store()
+        return self._store
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            self.stats[field] += 1
+
+    def key(self, decision_type: str, members: Mapping[str, str], context: Any = None) -> str:
+        """members: {成员名称: 记录指纹}；顺序无关"""
+        payload = {
+            "type": decision_type,
+            "prompt_version": self.prompt_version,
+            "members": sorted(members.items()),
+            "context": context,
+        }
+        return self._get_store()._hash_payload(payload)
+
+    def get(self, decision_type: str, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        try:
+            row = self._get_store().get_merge_decision_by_hash(key)
+        except Exception as e:
+            self._count("errors")
+            tools.log(f"[决策缓存] ⚠️ 读取失败: {e}")
+            return None
+        if row is None or row.get("type") != decision_type or row.get("prompt_version") != self.prompt_version:
+            self._count("misses")
+            return None
+        if self.ttl is not None and self._is_expired(row.get("created_at", "")):
+            self._count("expired")
+            self._count("misses")
+            return None
+        self._count("hits")
+        return row.get("output") or {}
+
+    def put(self, decision_type: str, key: str, output: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        try:
+            self._get_store().upsert_merge_decision(
+                decision_type, key, output, model=self.model, prompt_version=self.prompt_version
+            )
+            self._count("writes")
+        except Exception as e:
+            self._count("errors")
+            tools.log(f"[决策缓存] ⚠️ 写入失败: {e}")
+
+    def _is_expired(self, created_at: str) -> bool:
+        try:
+            ts = datetime.fromisoformat(str(created_at).replace("Z", "+00:00"))
+        except ValueError:
+            return True
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) - ts > self.ttl
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self.stats)
+        lookups = out["hits"] + out["misses"]
+        out["hit_rate"] = round(out["hits"] / lookups, 4) if lookups else 0.0
+        return out
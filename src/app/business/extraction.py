@@ -1,12 +1,29 @@
 from typing import List, Dict, Any, Optional, Set, Tuple
+from ...infra import get_logger
 from ...infra.registry import register_tool
 from ...core import ConfigManager, RateLimiter, LLMAPIPool, AsyncExecutor, tools, get_config_manager, get_llm_pool
 from ...domain.data_operations import update_entities, update_abstract_map
 from ...infra.serialization import extract_json_from_llm_response
-from ...infra.async_utils import call_llm_with_retry, create_extraction_prompt
+from ...infra.async_utils import (
+    call_llm_with_retry,
+    call_llm_with_retry_async,
+    create_batch_extraction_prompt,
+    create_extraction_prompt,
+    estimate_tokens,
+)
+from ...infra.simhash import SimHashEngine, get_simhash_engine
+from ...infra.simhash_index import SimHashIndex, get_simhash_index
+from ...infra.dedup_keys import DedupKeyIndex, get_dedup_key_index
+from ...infra.extraction_cache import ExtractionCache, get_extraction_cache
+from ...infra.adaptive_limiter import create_rate_limiter
+from ...infra.checkpoint import CheckpointWriter, get_article_checkpoint
+from ...infra.prompt_budget import build_extraction_prompt, compact_content
+from .relevance import apply_relevance_filter, entity_hints, relevance_settings
 from ...infra.file_utils import ensure_dirs, safe_unlink, generate_timestamp
 from ...domain.data_operations import write_jsonl_file, sanitize_datetime_fields, create_temp_file_path
 import json
+import hashlib
+from functools import lru_cache
 from pathlib import Path
 import time
 import threading
@@ -16,30 +33,61 @@ from datetime import datetime as dt, timezone, timedelta
 from collections import defaultdict
 
 class NewsDeduplicator:
-    """新闻去重器，支持依赖注入"""
+    """
+    新闻去重器，支持依赖注入
+
+    近重复判断使用 SimHashIndex（多表鸽巢法）；默认索引只在内存中，
+    shared() 返回使用进程内共享、SQLite 持久化索引的去重器（跨批次/跨运行记忆）。
+    dedupe_file 的按 ID 去重使用 DedupKeyIndex 记录输出文件中已有的键，不再重读输出文件。
+    """
 
-    def __init__(self, threshold: int = 3):
+    FINGERPRINT_CHUNK = 1000  # dedupe_file 每块读取的行数
+
+    def __init__(
+        self,
+        threshold: int = 3,
+        index: Optional[SimHashIndex] = None,
+        engine: Optional[SimHashEngine] = None,
+        key_index: Optional[DedupKeyIndex] = None,
+    ):
         self.threshold = threshold
-        self.seen_hashes: Set[int] = set()
+        self.index = index if index is not None else SimHashIndex(threshold)
+        self.engine = engine if engine is not None else get_simhash_engine()
+        self.key_index = key_index if key_index is not None else DedupKeyIndex()
+
+    @classmethod
+    def shared(cls, threshold: int) -> "NewsDeduplicator":
+        """dedupe_file / deduplicate_news_batch / process_expanded_news 共用的持久化索引"""
+        return cls(threshold=threshold, index=get_simhash_index(threshold), key_index=get_dedup_key_index())
 
     @staticmethod
     def _news_key(news: Dict) -> str:
-        """构造用于去重的唯一键，包含 source 前缀，兼容多数据源。"""
-        return f"{news.get('source', 'unknown')}:{news.get('id')}"
+        """
+        构造用于去重的唯一键，包含 source 前缀，兼容多数据源。
+        没有 id 时返回空串：索引只对真实 id 放行“同一文档再次经过去重”，无 id 的新闻按内容去重。
+        """
+        news_id = news.get('id')
+        if news_id in (None, ""):
+            return ""
+        return f"{news.get('source', 'unknown')}:{news_id}"
+
+    def is_duplicate(self, text: str, key: str = "", fingerprint: Optional[int] = None) -> bool:
+        fp = fingerprint if fingerprint is not None else self.engine.fingerprint(text)
+        return self.index.check_and_add(fp, key)
 
-    def is_duplicate(self, text: str) -> bool:
-        h = tools.simhash(text)
-        for seen_h in self.seen_hashes:
-            if tools.hamming_distance(h, seen_h) <= self.threshold:
-                return True
-        self.seen_hashes.add(h)
-        return False
+    def fingerprints(self, texts: List[str]) -> List[int]:
+        """整批文本的 SimHash 指纹（批量计算，供逐条 is_duplicate 使用）"""
+        return self.engine.fingerprints(texts)
+
+    def flush(self) -> None:
+        """把本批新增指纹写入持久化索引"""
+        self.index.flush()
 
     def dedupe_file(self, input_path: Path, output_path: Path, processed_ids: Optional[Set[str]] = None):
         """
         对单个原始文件做去重：
         - 先用 processed_ids（全局已处理 ID，如 blockbeats:323066）过滤历史已处理新闻
-        - 再结合已有去重文件 & simhash 去掉本批内/跨批的重复内容
+        - 再结合已有去重文件（键索引）& simhash 去掉本批内/跨批的重复内容
         """
         tools.log(f"🔍 去重中: {input_path.name}")
 
@@ -48,60 +96,53 @@ class NewsDeduplicator:
         if processed_ids:
             tools.log(f"🔍 已有历史 processed_ids 数量: {len(processed_ids)}")
 
-        # 再加载已有去重结果文件中的 ID，实现跨批次的本地去重
-        if output_path.exists():
-            with open(output_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    try:
-                        item = json.loads(line)
-                        seen_ids.add(self._news_key(item))
-                    except Exception as e:
-                        tools.log(f"⚠️ 读取历史去重文件时跳过无效行: {e}")
+        # 已有去重结果文件中的 ID 由键索引提供（仅在文件被外部改动时读取其变化部分），实现跨批次的本地去重
+        scope = self.key_index.sync(output_path, self._news_key)
+        kept_keys: List[str] = []
 
         kept, skipped_id, skipped_sim = 0, 0, 0
         with open(input_path, "r", encoding="utf-8") as fin, \
              open(output_path, "a", encoding="utf-8") as fout:
-            for line in fin:
-                try:
-                    news = json.loads(line)
-                    key = self._news_key(news)
+            while True:
+                # 按块读取：整块文本一次性批量计算指纹，再逐条按原顺序判重
+                lines = [line for _, line in zip(range(self.FINGERPRINT_CHUNK), fin)]
+                if not lines:
+                    break
+                parsed = []
+                for line in lines:
+                    try:
+                        news = json.loads(line)
+                        raw_text = (news.get("title", "") + " " + news.get("content", "")).strip()
+                        parsed.append((line, self._news_key(news), raw_text))
+                    except Exception as e:
+                        tools.log(f"⚠️ 跳过无效行: {e}")
+                fps = self.fingerprints([raw_text for _, _, raw_text in parsed])
+                seen_ids.update(self.key_index.existing(scope, [key for _, key, _ in parsed if key]))
 
-                    # 1) 按全局 ID 去重（包括 processed_ids 和已有去重文件中的 ID）
-                    if key in seen_ids:
+                for (line, key, raw_text), fp in zip(parsed, fps):
+                    # 1) 按全局 ID 去重（包括 processed_ids 和已有去重文件中的 ID）；无 id 的新闻只按内容去重
+                    if key and key in seen_ids:
                         skipped_id += 1
                         continue
 
-                    # 2) 构造文本，按内容相似度去重
-                    raw_text = (news.get("title", "") + " " + news.get("content", "")).strip()
+                    # 2) 按内容相似度去重
                     if not raw_text:
                         continue
-                    if self.is_duplicate(raw_text):
+                    if self.is_duplicate(raw_text, key, fingerprint=fp):
                         skipped_sim += 1
                         continue
                     fout.write(line)
-                    seen_ids.add(key)
+                    if key:
+                        seen_ids.add(key)
+                        kept_keys.append(key)
                     kept += 1
-                except Exception as e:
-                    tools.log(f"⚠️ 跳过无效行: {e}")
+        # 先写文件再记索引：中途崩溃时下次 sync 会补读未记录的尾部
+        self.key_index.append(scope, output_path, kept_keys)
+        self.flush()
         tools.log(f"✅ 去重完成: 保留 {kept} 条, 按 ID 跳过 {skipped_id} 条, 按相似度跳过 {skipped_sim} 条")
 
 
-def llm_extract_events(
-    title: str,
-    content: str,
-    api_pool: LLMAPIPool,
-    max_retries: int = 2,
-    reported_at: Optional[str] = None
-) -> List[Dict]:
-    """使用LLM提取事件，支持依赖注入"""
-    tools.log(f"[LLM请求] 开始处理新闻: {title[:100]}...")
-    if api_pool is None:
-        tools.log("[LLM请求] ❌ API 池未初始化")
-        return []
-
-    # 使用工具函数创建提示
-    tools.log("[LLM请求] 构建提示词")
-    entity_definitions = """
+_ENTITY_DEFINITIONS = """
 必要条件：
 - 是构成该事件必要的实体，若该实体在事件中缺失则可能导致事件不完备的实体
 
@@ -125,18 +166,283 @@ def llm_extract_events(
 - 实体必须“原子化”：不要把多个实体粘连成一个实体名称（例如“美国总统特朗普”必须拆分为“美国总统”和“特朗普”，不要输出粘连形式）
 - 同一主体多种表述时：entities 用最规范且不歧义的主名称，entities_original 保留对应原文表述并逐一对齐"""
 
-    prompt = create_extraction_prompt(title, content, entity_definitions, reported_at=reported_at)
-    tools.log(f"[LLM请求] 提示词长度: {len(prompt)} 字符")
+# 抽取 prompt 的手工版本号；模板/实体定义的改动另由 extraction_prompt_version() 的摘要覆盖
+EXTRACTION_PROMPT_VERSION = "extract-v1"
 
-    # 使用统一的LLM调用函数
-    tools.log("[LLM请求] 调用LLM API")
-    raw_content = call_llm_with_retry(
-        llm_pool=api_pool,
-        prompt=prompt,
-        max_tokens=1500,
-        timeout=55,
-        retries=max_retries
+
+@lru_cache(maxsize=1)
+def extraction_prompt_version() -> str:
+    """抽取缓存使用的 prompt 版本：手工版本号 + 模板摘要（修改模板后旧缓存自动失效）"""
+    template = create_extraction_prompt("", "", _ENTITY_DEFINITIONS)
+    return f"{EXTRACTION_PROMPT_VERSION}:{hashlib.blake2b(template.encode('utf-8'), digest_size=4).hexdigest()}"
+
+
+def content_token_budget() -> int:
+    """agent1_config.extraction_content_token_budget：每篇正文进入提示的 token 上限，<=0 不压缩"""
+    try:
+        return int(get_config_manager().get_config_value("extraction_content_token_budget", 1200, "agent1_config") or 0)
+    except Exception:
+        return 1200
+
+
+def _pool_model_signature(api_pool: Any) -> str:
+    """LLM 池中配置的模型集合（池按可用性路由，任一模型都可能给出结果）"""
+    try:
+        models = sorted({str(s.get("model") or "") for s in api_pool.list_services()} - {""})
+    except Exception:
+        models = []
+    return ",".join(models) or "auto"
+
+
+def lookup_cached_extraction(
+    title: str,
+    content: str,
+    api_pool: Any,
+    reported_at: Optional[str] = None,
+    cache: Optional[ExtractionCache] = None,
+) -> Tuple[Optional[str], Optional[List[Dict]]]:
+    """
+    查询抽取缓存，返回 (cache_key, 命中的事件列表)。
+    未命中时把 cache_key 传给 llm_extract_events 以回写结果；缓存关闭时 cache_key 为 None。
+    调用方可据此在命中时跳过限速器。
+    """
+    cache = cache if cache is not None else get_extraction_cache()
+    if not cache.enabled:
+        return None, None
+    # 正文预算不同，送入 LLM 的正文可能不同
+    key = cache.key(
+        title,
+        content,
+        prompt_version=f"{extraction_prompt_version()}:b{max(0, content_token_budget())}",
+        model=_pool_model_signature(api_pool),
+        reported_at=reported_at,
+    )
+    return key, cache.get(key)
+
+
+def _clean_extracted_events(events: Any) -> List[Dict]:
+    """校验并规整 LLM 返回的事件列表（实体对齐、角色、类型、起始时间、关系三元组）"""
+    if not isinstance(events, list):
+        return []
+    result = []
+
+    for item in events:
+        abstract = item.get("abstract", "").strip()
+        # ----------------------------
+        # 1) entities / entities_original：对齐 & 容错
+        # ----------------------------
+        entities_raw = item.get("entities", []) or []
+        entities_original_raw = item.get("entities_original", []) or []
+        if isinstance(entities_raw, str):
+            entities_raw = [entities_raw]
+        if isinstance(entities_original_raw, str):
+            entities_original_raw = [entities_original_raw]
+
+        entities: List[str] = []
+        entities_original: List[str] = []
+        for i, ent in enumerate(entities_raw if isinstance(entities_raw, list) else []):
+            if not isinstance(ent, str):
+                continue
+            ent = ent.strip()
+            if not ent or not tools.is_valid_entity(ent):
+                continue
+
+            ent_original = ""
+            if isinstance(entities_original_raw, list) and i < len(entities_original_raw):
+                ent_original = entities_original_raw[i]
+            if not isinstance(ent_original, str):
+                ent_original = ""
+            ent_original = ent_original.strip()
+
+            # 原始表述缺失时回退到实体名（避免因 zip 截断/缺失导致实体整体被丢弃）
+            if not ent_original or not tools.is_valid_entity(ent_original):
+                ent_original = ent
+
+            entities.append(ent)
+            entities_original.append(ent_original)
+
+        # ----------------------------
+        # 2) entity_roles：实体语义角色（key 必须来自 entities）
+        # ----------------------------
+        roles_raw = item.get("entity_roles", {}) or {}
+        entity_roles: Dict[str, List[str]] = {}
+        if isinstance(roles_raw, dict):
+            allowed = set(entities)
+            for k, v in roles_raw.items():
+                if not isinstance(k, str):
+                    continue
+                ek = k.strip()
+                if ek not in allowed:
+                    continue
+                roles_list: List[str] = []
+                if isinstance(v, str):
+                    roles_list = [v]
+                elif isinstance(v, list):
+                    roles_list = [r for r in v if isinstance(r, str)]
+                cleaned_roles = []
+                seen = set()
+                for r in roles_list:
+                    rr = r.strip()
+                    if not rr:
+                        continue
+                    if rr not in seen:
+                        seen.add(rr)
+                        cleaned_roles.append(rr)
+                if cleaned_roles:
+                    entity_roles[ek] = cleaned_roles
+
+        # ----------------------------
+        # 3) event_types：事件类型标签
+        # ----------------------------
+        types_raw = item.get("event_types", []) or []
+        event_types: List[str] = []
+        if isinstance(types_raw, str):
+            types_raw = [types_raw]
+        if isinstance(types_raw, list):
+            seen_t = set()
+            for t in types_raw:
+                if not isinstance(t, str):
+                    continue
+                tt = t.strip()
+                if not tt:
+                    continue
+                if tt not in seen_t:
+                    seen_t.add(tt)
+                    event_types.append(tt)
+
+        # ----------------------------
+        # 4) event_start_time：事件起始时间（与 reported_at 区分）
+        # ----------------------------
+        event_start_time = item.get("event_start_time", "")
+        event_start_time_text = item.get("event_start_time_text", "")
+        event_start_time_precision = item.get("event_start_time_precision", "unknown")
+        if not isinstance(event_start_time, str):
+            event_start_time = ""
+        if not isinstance(event_start_time_text, str):
+            event_start_time_text = ""
+        if not isinstance(event_start_time_precision, str):
+            event_start_time_precision = "unknown"
+        event_start_time = event_start_time.strip()
+        event_start_time_text = event_start_time_text.strip()
+        event_start_time_precision = event_start_time_precision.strip() or "unknown"
+
+        # ----------------------------
+        # 5) relations：(实体, 关系, 实体) 三元组
+        # ----------------------------
+        relations_raw = item.get("relations", []) or []
+        relations: List[Dict[str, str]] = []
+        allowed_entities = set(entities)
+        seen_rel = set()
+
+        def _add_relation(s: str, p: str, o: str, ev: str = "", relation_kind: Any = ""):
+            ss = s.strip() if isinstance(s, str) else ""
+            pp = p.strip() if isinstance(p, str) else ""
+            oo = o.strip() if isinstance(o, str) else ""
+            ee = ev.strip() if isinstance(ev, str) else ""
+            if not ss or not pp or not oo:
+                return
+            if ss not in allowed_entities or oo not in allowed_entities:
+                return
+            if ss == oo:
+                return
+            rk_raw = relation_kind if isinstance(relation_kind, str) else str(relation_kind or "")
+            rk = rk_raw.strip().lower()
+            if rk not in {"state", "event"}:
+                rk = ""
+            key = (ss, pp, oo, rk)
+            if key in seen_rel:
+                return
+            seen_rel.add(key)
+            relations.append({
+                "subject": ss,
+                "predicate": pp,
+                "object": oo,
+                "relation_kind": rk,
+                "evidence": ee
+            })
+
+        if isinstance(relations_raw, dict):
+            relations_raw = [relations_raw]
+        if isinstance(relations_raw, list):
+            for rel in relations_raw:
+                # 支持 dict 形式：{"subject","predicate","object","evidence"}
+                if isinstance(rel, dict):
+                    _add_relation(
+                        rel.get("subject", ""),
+                        rel.get("predicate", ""),
+                        rel.get("object", ""),
+                        rel.get("evidence", "") or rel.get("text", ""),
+                        rel.get("relation_kind", "") or rel.get("kind", "") or rel.get("type", ""),
+                    )
+                    continue
+                # 兼容 tuple/list 形式：[s,p,o] 或 [s,p,o,evidence]
+                if isinstance(rel, (list, tuple)) and len(rel) >= 3:
+                    s, p, o = rel[0], rel[1], rel[2]
+                    ev = rel[3] if len(rel) >= 4 else ""
+                    _add_relation(s, p, o, ev, "")
+
+        summary = item.get("event_summary", "").strip()
+        if abstract and entities and summary:
+            result.append({
+                "abstract": abstract,
+                "entities": entities,
+                "entities_original": entities_original,
+                "entity_roles": entity_roles,
+                "event_types": event_types,
+                "event_start_time": event_start_time,
+                "event_start_time_text": event_start_time_text,
+                "event_start_time_precision": event_start_time_precision,
+                "relations": relations,
+                "event_summary": summary
+            })
+    return result
+
+
+def _prepare_extraction(
+    title: str,
+    content: str,
+    api_pool: LLMAPIPool,
+    reported_at: Optional[str],
+    cache_key: Optional[str],
+    entity_hints: Optional[List[str]] = None,
+) -> Tuple[Optional[str], Optional[List[Dict]], Optional[str]]:
+    """
+    llm_extract_events 的请求前半段（同步/异步共用）
+
+    Returns:
+        (cache_key, 缓存命中结果或 None, 提示词或 None)；提示词为 None 时无需请求 LLM
+    """
+    tools.log(f"[LLM请求] 开始处理新闻: {title[:100]}...")
+    if api_pool is None:
+        tools.log("[LLM请求] ❌ API 池未初始化")
+        return cache_key, [], None
+
+    if cache_key is None:
+        cache_key, cached = lookup_cached_extraction(title, content, api_pool, reported_at)
+        if cached is not None:
+            tools.log(f"[LLM请求] 命中抽取缓存，{len(cached)} 个事件")
+            return cache_key, cached, None
+
+    # 使用工具函数创建提示
+    tools.log("[LLM请求] 构建提示词")
+    entity_definitions = _ENTITY_DEFINITIONS
+
+    built = build_extraction_prompt(
+        title, content, entity_definitions, reported_at=reported_at, entity_hints=entity_hints, budget_tokens=content_token_budget()
     )
+    compaction = built.compaction
+    if compaction.compacted:
+        tools.log(
+            f"[LLM请求] 正文压缩: {compaction.original_tokens} → {compaction.content_tokens} tokens"
+            f"（保留 {compaction.sentences_kept}/{compaction.sentences_total} 句）"
+        )
+    prompt = built.text
+    tools.log(f"[LLM请求] 提示词长度: {len(prompt)} 字符")
+    return cache_key, None, prompt
+
+
+def _finish_extraction(raw_content: Optional[str], cache_key: Optional[str]) -> List[Dict]:
+    """llm_extract_events 的响应后半段：解析、清洗并回写缓存"""
     tools.log(f"[LLM请求] LLM返回内容长度: {len(raw_content) if raw_content else 0} 字符")
 
     if not raw_content:
@@ -149,184 +455,227 @@ def llm_extract_events(
         data = extract_json_from_llm_response(raw_content)
         events = data.get("events", [])
         tools.log(f"[LLM请求] 解析到 {len(events)} 个事件")
-        result = []
-
-        for item in events:
-            abstract = item.get("abstract", "").strip()
-            # ----------------------------
-            # 1) entities / entities_original：对齐 & 容错
-            # ----------------------------
-            entities_raw = item.get("entities", []) or []
-            entities_original_raw = item.get("entities_original", []) or []
-            if isinstance(entities_raw, str):
-                entities_raw = [entities_raw]
-            if isinstance(entities_original_raw, str):
-                entities_original_raw = [entities_original_raw]
-
-            entities: List[str] = []
-            entities_original: List[str] = []
-            for i, ent in enumerate(entities_raw if isinstance(entities_raw, list) else []):
-                if not isinstance(ent, str):
-                    continue
-                ent = ent.strip()
-                if not ent or not tools.is_valid_entity(ent):
-                    continue
-
-                ent_original = ""
-                if isinstance(entities_original_raw, list) and i < len(entities_original_raw):
-                    ent_original = entities_original_raw[i]
-                if not isinstance(ent_original, str):
-                    ent_original = ""
-                ent_original = ent_original.strip()
-
-                # 原始表述缺失时回退到实体名（避免因 zip 截断/缺失导致实体整体被丢弃）
-                if not ent_original or not tools.is_valid_entity(ent_original):
-                    ent_original = ent
-
-                entities.append(ent)
-                entities_original.append(ent_original)
-
-            # ----------------------------
-            # 2) entity_roles：实体语义角色（key 必须来自 entities）
-            # ----------------------------
-            roles_raw = item.get("entity_roles", {}) or {}
-            entity_roles: Dict[str, List[str]] = {}
-            if isinstance(roles_raw, dict):
-                allowed = set(entities)
-                for k, v in roles_raw.items():
-                    if not isinstance(k, str):
-                        continue
-                    ek = k.strip()
-                    if ek not in allowed:
-                        continue
-                    roles_list: List[str] = []
-                    if isinstance(v, str):
-                        roles_list = [v]
-                    elif isinstance(v, list):
-                        roles_list = [r for r in v if isinstance(r, str)]
-                    cleaned_roles = []
-                    seen = set()
-                    for r in roles_list:
-                        rr = r.strip()
-                        if not rr:
-                            continue
-                        if rr not in seen:
-                            seen.add(rr)
-                            cleaned_roles.append(rr)
-                    if cleaned_roles:
-                        entity_roles[ek] = cleaned_roles
-
-            # ----------------------------
-            # 3) event_types：事件类型标签
-            # ----------------------------
-            types_raw = item.get("event_types", []) or []
-            event_types: List[str] = []
-            if isinstance(types_raw, str):
-                types_raw = [types_raw]
-            if isinstance(types_raw, list):
-                seen_t = set()
-                for t in types_raw:
-                    if not isinstance(t, str):
-                        continue
-                    tt = t.strip()
-                    if not tt:
-                        continue
-                    if tt not in seen_t:
-                        seen_t.add(tt)
-                        event_types.append(tt)
-
-            # ----------------------------
-            # 4) event_start_time：事件起始时间（与 reported_at 区分）
-            # ----------------------------
-            event_start_time = item.get("event_start_time", "")
-            event_start_time_text = item.get("event_start_time_text", "")
-            event_start_time_precision = item.get("event_start_time_precision", "unknown")
-            if not isinstance(event_start_time, str):
-                event_start_time = ""
-            if not isinstance(event_start_time_text, str):
-                event_start_time_text = ""
-            if not isinstance(event_start_time_precision, str):
-                event_start_time_precision = "unknown"
-            event_start_time = event_start_time.strip()
-            event_start_time_text = event_start_time_text.strip()
-            event_start_time_precision = event_start_time_precision.strip() or "unknown"
-
-            # ----------------------------
-            # 5) relations：(实体, 关系, 实体) 三元组
-            # ----------------------------
-            relations_raw = item.get("relations", []) or []
-            relations: List[Dict[str, str]] = []
-            allowed_entities = set(entities)
-            seen_rel = set()
-
-            def _add_relation(s: str, p: str, o: str, ev: str = "", relation_kind: Any = ""):
-                ss = s.strip() if isinstance(s, str) else ""
-                pp = p.strip() if isinstance(p, str) else ""
-                oo = o.strip() if isinstance(o, str) else ""
-                ee = ev.strip() if isinstance(ev, str) else ""
-                if not ss or not pp or not oo:
-                    return
-                if ss not in allowed_entities or oo not in allowed_entities:
-                    return
-                if ss == oo:
-                    return
-                rk_raw = relation_kind if isinstance(relation_kind, str) else str(relation_kind or "")
-                rk = rk_raw.strip().lower()
-                if rk not in {"state", "event"}:
-                    rk = ""
-                key = (ss, pp, oo, rk)
-                if key in seen_rel:
-                    return
-                seen_rel.add(key)
-                relations.append({
-                    "subject": ss,
-                    "predicate": pp,
-                    "object": oo,
-                    "relation_kind": rk,
-                    "evidence": ee
-                })
-
-            if isinstance(relations_raw, dict):
-                relations_raw = [relations_raw]
-            if isinstance(relations_raw, list):
-                for rel in relations_raw:
-                    # 支持 dict 形式：{"subject","predicate","object","evidence"}
-                    if isinstance(rel, dict):
-                        _add_relation(
-                            rel.get("subject", ""),
-                            rel.get("predicate", ""),
-                            rel.get("object", ""),
-                            rel.get("evidence", "") or rel.get("text", ""),
-                            rel.get("relation_kind", "") or rel.get("kind", "") or rel.get("type", ""),
-                        )
-                        continue
-                    # 兼容 tuple/list 形式：[s,p,o] 或 [s,p,o,evidence]
-                    if isinstance(rel, (list, tuple)) and len(rel) >= 3:
-                        s, p, o = rel[0], rel[1], rel[2]
-                        ev = rel[3] if len(rel) >= 4 else ""
-                        _add_relation(s, p, o, ev, "")
-
-            summary = item.get("event_summary", "").strip()
-            if abstract and entities and summary:
-                result.append({
-                    "abstract": abstract,
-                    "entities": entities,
-                    "entities_original": entities_original,
-                    "entity_roles": entity_roles,
-                    "event_types": event_types,
-                    "event_start_time": event_start_time,
-                    "event_start_time_text": event_start_time_text,
-                    "event_start_time_precision": event_start_time_precision,
-                    "relations": relations,
-                    "event_summary": summary
-                })
+        result = _clean_extracted_events(events)
         tools.log(f"[LLM请求] 提取完成，共 {len(result)} 个有效事件")
+        # 只缓存有效结果：空结果保留下次重试的机会
+        if result and cache_key:
+            get_extraction_cache().put(cache_key, result)
         return result
     except Exception as e:
         tools.log(f"[LLM获取] ❌ LLM 返回内容解析失败: {e}")
         return []
 
 
+def llm_extract_events(
+    title: str,
+    content: str,
+    api_pool: LLMAPIPool,
+    max_retries: int = 2,
+    reported_at: Optional[str] = None,
+    cache_key: Optional[str] = None,
+    entity_hints: Optional[List[str]] = None,
+) -> List[Dict]:
+    """
+    使用LLM提取事件，支持依赖注入
+
+    先查抽取缓存（内容 + prompt 版本 + 模型），命中则不请求 LLM；
+    cache_key 由 lookup_cached_extraction 给出时表示调用方已查过缓存（未命中），这里只回写；
+    cache_key 为空串时不使用缓存。
+    entity_hints 为相关性预过滤命中的已知实体，只影响提示，不参与缓存键。
+    """
+    cache_key, cached, prompt = _prepare_extraction(title, content, api_pool, reported_at, cache_key, entity_hints)
+    if prompt is None:
+        return cached
+
+    # 使用统一的LLM调用函数
+    tools.log("[LLM请求] 调用LLM API")
+    raw_content = call_llm_with_retry(
+        llm_pool=api_pool,
+        prompt=prompt,
+        max_tokens=1500,
+        timeout=55,
+        retries=max_retries
+    )
+    return _finish_extraction(raw_content, cache_key)
+
+
+async def llm_extract_events_async(
+    title: str,
+    content: str,
+    api_pool: LLMAPIPool,
+    max_retries: int = 2,
+    reported_at: Optional[str] = None,
+    cache_key: Optional[str] = None,
+    entity_hints: Optional[List[str]] = None,
+) -> List[Dict]:
+    """llm_extract_events 的异步版本：LLM 请求直接 await 池的 call_async，不占用线程池"""
+    cache_key, cached, prompt = _prepare_extraction(title, content, api_pool, reported_at, cache_key, entity_hints)
+    if prompt is None:
+        return cached
+
+    tools.log("[LLM请求] 异步调用LLM API")
+    raw_content = await call_llm_with_retry_async(
+        llm_pool=api_pool,
+        prompt=prompt,
+        max_tokens=1500,
+        timeout=55,
+        retries=max_retries
+    )
+    return _finish_extraction(raw_content, cache_key)
+
+
+def _pack_extraction_batches(articles: List[Dict[str, Any]], batch_size: int, token_budget: int) -> List[List[Dict[str, Any]]]:
+    """按篇数上限与标题+正文的估计 token 预算顺序打包；单篇超出预算时独占一批"""
+    batches: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    current_tokens = 0
+    for article in articles:
+        tokens = estimate_tokens(article.get("title", "") or "") + estimate_tokens(article.get("content", "") or "")
+        if current and (len(current) >= batch_size or current_tokens + tokens > token_budget):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(article)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _parse_batch_response(raw_content: Optional[str], ids: Set[str]) -> Optional[Dict[str, Any]]:
+    """解析多篇抽取响应为 {id: events}；结构不符时返回 None"""
+    try:
+        data = extract_json_from_llm_response(raw_content or "")
+    except Exception:
+        return None
+    items = data.get("articles")
+    if not isinstance(items, list):
+        return None
+    out: Dict[str, Any] = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        aid = str(item.get("id", "")).strip()
+        if aid in ids and aid not in out:
+            out[aid] = item.get("events", [])
+    return out
+
+
+def llm_extract_events_batch(
+    articles: List[Dict[str, Any]],
+    api_pool: LLMAPIPool,
+    max_retries: int = 2,
+    batch_size: int = 8,
+    token_budget: int = 2400,
+    limiter: Optional[RateLimiter] = None,
+    stats: Optional[Dict[str, int]] = None,
+    cache: Optional[ExtractionCache] = None,
+) -> List[List[Dict]]:
+    """
+    多篇短新闻合并为一次 LLM 请求抽取事件（响应按新闻 id 分篇返回）
+
+    Args:
+        articles: [{"title", "content", "reported_at", "entity_hints"(可选)}]
+        api_pool: LLM API 池
+        max_retries: 单次请求的重试次数
+        batch_size: 每批最多篇数；<=1 时逐篇调用 llm_extract_events
+        token_budget: 每批标题+正文的估计 token 上限
+        limiter: 每次 LLM 请求前 acquire
+        stats: 可选计数字典，累加 llm_calls / batches / splits / cache_hits
+        cache: 抽取缓存，默认进程共享缓存
+
+    Returns:
+        与 articles 一一对应的事件列表
+
+    批次响应无法解析时对半拆分重试，响应中缺失的篇目单独重试；拆到单篇时退回单篇提示。
+    LLM 请求本身失败（无返回）时不拆分，该批结果为空，保留下次重试的机会。
+    """
+    counters = stats if stats is not None else {}
+    for name in ("llm_calls", "batches", "splits", "cache_hits"):
+        counters.setdefault(name, 0)
+    results: List[List[Dict]] = [[] for _ in articles]
+    if api_pool is None:
+        return results
+
+    cache = cache if cache is not None else get_extraction_cache()
+    content_budget = content_token_budget()
+    pending: List[Dict[str, Any]] = []
+    for i, article in enumerate(articles):
+        title = article.get("title", "") or ""
+        content = article.get("content", "") or ""
+        reported_at = article.get("reported_at")
+        cache_key, cached = lookup_cached_extraction(title, content, api_pool, reported_at, cache)
+        if cached is not None:
+            results[i] = cached
+            counters["cache_hits"] += 1
+            continue
+        hints = article.get("entity_hints") or []
+        pending.append({
+            "id": f"n{i + 1}",
+            "index": i,
+            "title": title,
+            "content": compact_content(title, content, content_budget, entity_hints=hints).content,
+            "reported_at": reported_at,
+            "entity_hints": hints,
+            "cache_key": cache_key or "",
+        })
+
+    def run(batch: List[Dict[str, Any]]) -> None:
+        if limiter:
+            limiter.acquire()
+        counters["llm_calls"] += 1
+        if len(batch) == 1:
+            a = batch[0]
+            events = llm_extract_events(
+                a["title"], a["content"], api_pool, max_retries, a["reported_at"], cache_key="", entity_hints=a["entity_hints"]
+            )
+            results[a["index"]] = events
+            if events and a["cache_key"]:
+                cache.put(a["cache_key"], events)
+            return
+
+        counters["batches"] += 1
+        tools.log(f"[LLM请求] 多篇抽取: {len(batch)} 篇")
+        raw_content = call_llm_with_retry(
+            llm_pool=api_pool,
+            prompt=create_batch_extraction_prompt(batch, _ENTITY_DEFINITIONS),
+            max_tokens=min(1500 * len(batch), 8000),
+            timeout=90,
+            retries=max_retries,
+        )
+        if not raw_content:
+            tools.log("[LLM请求] 多篇抽取返回空内容")
+            return
+        parsed = _parse_batch_response(raw_content, {a["id"] for a in batch})
+        missing: List[Dict[str, Any]] = []
+        for a in batch:
+            if parsed is None or a["id"] not in parsed:
+                missing.append(a)
+                continue
+            try:
+                events = _clean_extracted_events(parsed[a["id"]])
+            except Exception:
+                missing.append(a)
+                continue
+            results[a["index"]] = events
+            if events and a["cache_key"]:
+                cache.put(a["cache_key"], events)
+        if not missing:
+            return
+        counters["splits"] += 1
+        tools.log(f"[LLM请求] 多篇抽取解析失败 {len(missing)}/{len(batch)} 篇，拆分重试")
+        if len(missing) == len(batch):
+            mid = len(batch) // 2
+            run(batch[:mid])
+            run(batch[mid:])
+        else:
+            run(missing)
+
+    batches = [[a] for a in pending] if batch_size <= 1 else _pack_extraction_batches(pending, batch_size, token_budget)
+    for batch in batches:
+        run(batch)
+    return results
+
+
 @register_tool(
     name="extract_entities_events",
     description="使用 LLM 从新闻标题和内容中提取实体和事件",
@@ -351,13 +700,15 @@ def extract_entities_events(title: str, content: str) -> List[Dict[str, Any]]:
     description="对新闻列表进行批量去重 (基于 SimHash)",
     category="Data Processing"
 )
-def deduplicate_news_batch(news_list: List[Dict[str, Any]], threshold: int = 3) -> List[Dict[str, Any]]:
+def deduplicate_news_batch(news_list: List[Dict[str, Any]], threshold: int = 3, persistent: bool = True) -> List[Dict[str, Any]]:
     """
     批量去重
     
     Args:
         news_list: 新闻字典列表
         threshold: SimHash 汉明距离阈值
+        persistent: 使用共享的持久化 SimHash 索引（同时过滤保留窗口内历史批次的近重复）；
+            False 时只做本批内去重
         
     Returns:
         去重后的新闻列表
@@ -365,19 +716,22 @@ def deduplicate_news_batch(news_list: List[Dict[str, Any]], threshold: int = 3)
     if not news_list:
         return []
         
-    deduper = NewsDeduplicator(threshold=threshold)
+    deduper = NewsDeduplicator.shared(threshold) if persistent else NewsDeduplicator(threshold=threshold)
     unique_news = []
-    
-    for news in news_list:
-        # 构造指纹文本
-        text = (news.get("title", "") + " " + news.get("content", "")).strip()
+
+    # 构造指纹文本并整批计算指纹
+    texts = [(news.get("title", "") + " " + news.get("content", "")).strip() for news in news_list]
+    fps = deduper.fingerprints(texts)
+
+    for news, text, fp in zip(news_list, texts, fps):
         if not text: 
             continue
             
         # 检查重复
-        if not deduper.is_duplicate(text):
+        if not deduper.is_duplicate(text, NewsDeduplicator._news_key(news), fingerprint=fp):
             unique_news.append(news)
-            
+
+    deduper.flush()
     return unique_news
 
 def get_unprocessed_news_files() -> List[Path]:
@@ -398,7 +752,7 @@ def get_unprocessed_news_files() -> List[Path]:
     for raw_file in sorted(raw_dir.glob("*.jsonl")):
         deduped_file = dedup_dir / f"{raw_file.stem}_deduped.jsonl"
         if not deduped_file.exists():
-            deduper = NewsDeduplicator(threshold=tools.get_dedupe_threshold())
+            deduper = NewsDeduplicator.shared(tools.get_dedupe_threshold())
             deduper.dedupe_file(raw_file, deduped_file, processed_ids)
         unprocessed.append(deduped_file)
     return unprocessed
@@ -409,18 +763,22 @@ def get_unprocessed_news_files() -> List[Path]:
     description="[工作流] 处理新闻管道：从tmp文件读取、提取实体事件、更新图谱",
     category="Workflow"
 )
-async def process_news_pipeline(max_workers: int = 3, rate_limit_per_sec: float = 1.0) -> Dict[str, Any]:
+async def process_news_pipeline(max_workers: int = 3, rate_limit_per_sec: float = 1.0, resume: bool = True) -> Dict[str, Any]:
     """
     主处理流程：并发实体提取
 
+    每篇文章抽取完成即写入检查点（组提交），每个文件处理完后才应用到主存储、记录 processed_ids、
+    删除 tmp 文件并清理检查点；中途崩溃后重启会复用检查点中的结果，不再重复请求 LLM。
+
     Args:
         max_workers: 最大并发数
         rate_limit_per_sec: 每秒速率限制
+        resume: 复用上次未完成运行的检查点；False 时丢弃检查点重新抽取
 
     Returns:
         处理统计信息
     """
-    tools.log(f"🚀 启动新闻处理管道 | workers={max_workers}, rate={rate_limit_per_sec}/s")
+    tools.log(f"🚀 启动新闻处理管道 | workers={max_workers}, rate={rate_limit_per_sec}/s, resume={resume}")
     files = get_unprocessed_news_files()
     if not files:
         tools.log("📭 无可处理新闻文件")
@@ -430,11 +788,14 @@ async def process_news_pipeline(max_workers: int = 3, rate_limit_per_sec: float
     from src.adapters.sqlite.store import get_store
     processed_ids = get_store().get_processed_ids()
 
-    limiter = RateLimiter(rate_limit_per_sec)
+    limiter = create_rate_limiter(rate_limit_per_sec, "llm")
     async_executor = AsyncExecutor()
-    logger = tools.get_logger(__name__)
+    logger = get_logger(__name__)
     api_pool = get_llm_pool()
+    checkpoint = get_article_checkpoint()
+    relevance = relevance_settings()
     total_processed = 0
+    total_resumed = 0
 
     def build_published_at(ts: Optional[str]) -> Optional[str]:
         if not ts:
@@ -444,26 +805,77 @@ async def process_news_pipeline(max_workers: int = 3, rate_limit_per_sec: float
         except Exception:
             return None
 
-    async def extract_task_async(global_id: str, title: str, content: str, source: str, published_at: Optional[str]) -> Tuple[str, str, Optional[str], List[Dict]]:
+    extraction_cache = get_extraction_cache()
+    cache_before = extraction_cache.snapshot()
+
+    async def extract_task_async(
+        writer: CheckpointWriter, article: Dict[str, Any], title: str, content: str, hints: List[str]
+    ) -> Dict[str, Any]:
+        global_id, published_at = article["global_id"], article["published_at"]
         try:
-            await limiter.acquire_async()
-            loop = asyncio.get_running_loop()
-            extracted = await loop.run_in_executor(
-                None,
-                lambda: llm_extract_events(title, content, api_pool, reported_at=published_at)
+            cache_key, extracted = await async_executor.run_in_thread(
+                lookup_cached_extraction, title, content, api_pool, published_at, extraction_cache
             )
-            return global_id, source, published_at, extracted
+            if extracted is None:
+                # 命中缓存不占用 LLM 限速配额
+                await limiter.acquire_async()
+                # 原生异步 LLM 请求：在途请求数不受线程池大小限制
+                extracted = await llm_extract_events_async(
+                    title, content, api_pool, reported_at=published_at, cache_key=cache_key, entity_hints=hints
+                )
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.error(f"任务 {global_id} 提取失败: {e}")
-            return global_id, source, published_at, []
+            extracted = []
+        result = dict(article, extracted=extracted or [])
+        # 空结果不写检查点：与不标记 processed_ids 一致，下次运行重试
+        if result["extracted"]:
+            try:
+                await writer.record(global_id, result)
+            except Exception as e:
+                logger.warning(f"⚠️ 新闻 {global_id} 写入检查点失败: {e}")
+        return result
+
+    def apply_results(results: List[Dict[str, Any]]) -> List[Tuple[str, str, str]]:
+        applied = []
+        for result in results:
+            try:
+                global_id, source, published_at, extracted = (
+                    result["global_id"], result["source"], result["published_at"], result["extracted"]
+                )
+                if not extracted:
+                    logger.debug(f"⏳ 新闻 {global_id}：LLM 未返回有效事件，保留重试机会")
+                    continue
+
+                all_entities = []
+                all_entities_original = []
+                for ev in extracted:
+                    all_entities.extend(ev["entities"])
+                    all_entities_original.extend(ev["entities_original"])
+
+                if all_entities and len(all_entities) == len(all_entities_original):
+                    update_entities(all_entities, all_entities_original, source, published_at)
+                    update_abstract_map(extracted, source, published_at)
+                    applied.append((global_id, source, result["raw_id"]))
+                else:
+                    logger.debug(f"🔍 新闻 {global_id}：LLM 返回事件但无有效实体，暂不标记")
+            except Exception as e:
+                logger.error(f"⚠️ 处理提取结果失败: {e}")
+        return applied
 
-    # 收集所有需要记录的已处理ID，稍后批量插入数据库
-    processed_ids_to_add = []
     for file_path in files:
         logger.info(f"📄 处理文件: {file_path.name}")
+        run_key = file_path.name
+        if not resume:
+            checkpoint.clear(run_key)
+        completed = checkpoint.load(run_key)
 
-        # 收集需要处理的新闻任务
+        # 收集需要处理的新闻任务；检查点中已完成的文章直接复用结果
         news_tasks = []
+        candidates: List[Dict[str, Any]] = []
+        resumed = []
+        writer = CheckpointWriter(checkpoint, run_key)
         with open(file_path, "r", encoding="utf-8") as f:
                 for line in f:
                     try:
@@ -478,85 +890,189 @@ async def process_news_pipeline(max_workers: int = 3, rate_limit_per_sec: float
                         global_id = f"{source}:{raw_id}"
                         if global_id in processed_ids:
                             continue
+                        if global_id in completed:
+                            resumed.append(completed.pop(global_id))
+                            continue
 
                         title = news.get("title", "")
                         content = news.get("content", "")
-                        MAX_CONTENT_CHARS = 2000
-                        if isinstance(content, str) and len(content) > MAX_CONTENT_CHARS:
-                            content = content[:MAX_CONTENT_CHARS] + "……【后文已截断】"
-
-                        published_at = build_published_at(news.get("timestamp"))
 
-                        # 创建异步任务
-                        news_tasks.append(
-                            lambda gid=global_id, t=title, c=content, s=source, p=published_at: extract_task_async(gid, t, c, s, p)
-                        )
+                        candidates.append({
+                            "title": title,
+                            "content": content,
+                            "article": {
+                                "global_id": global_id,
+                                "source": source,
+                                "raw_id": raw_id,
+                                "published_at": build_published_at(news.get("timestamp")),
+                            },
+                        })
                     except Exception as e:
                         logger.error(f"⚠️ 解析新闻行失败: {e}")
 
+        # 相关性预过滤：跳过/后置不含已知实体的新闻，命中的实体作为提示
+        candidates, relevance_stats = await async_executor.run_in_thread(apply_relevance_filter, candidates, relevance)
+        if relevance_stats["scored"]:
+            logger.info(f"🔤 相关性预过滤: {relevance_stats}")
+        for cand in candidates:
+            # 创建异步任务
+            news_tasks.append(
+                lambda a=cand["article"], t=cand["title"], c=cand["content"], h=entity_hints(cand):
+                    extract_task_async(writer, a, t, c, h)
+            )
+
+        results = list(resumed)
+        if resumed:
+            total_resumed += len(resumed)
+            logger.info(f"♻️ 从检查点恢复 {len(resumed)} 篇已抽取的新闻")
         if news_tasks:
             logger.info(f"🔄 开始并发处理 {len(news_tasks)} 个新闻提取任务")
             # 使用AsyncExecutor统一管理并发执行
-            results = await async_executor.run_concurrent_tasks(
-                tasks=news_tasks,
-                concurrency=max_workers
-            )
-
-            for result in results:
-                    try:
-                        global_id, source, published_at, extracted = result
-                        if not extracted:
-                            logger.debug(f"⏳ 新闻 {global_id}：LLM 未返回有效事件，保留重试机会")
-                            continue
-
-                        all_entities = []
-                        all_entities_original = []
-                        for ev in extracted:
-                            all_entities.extend(ev["entities"])
-                            all_entities_original.extend(ev["entities_original"])
-
-                        if all_entities and len(all_entities) == len(all_entities_original):
-                            update_entities(all_entities, all_entities_original, source, published_at)
-                            update_abstract_map(extracted, source, published_at)
-                            total_processed += 1
-                            # 收集需要记录的ID
-                            processed_ids_to_add.append((global_id, source, raw_id))
-                            processed_ids.add(global_id)
-                        else:
-                            logger.debug(f"🔍 新闻 {global_id}：LLM 返回事件但无有效实体，暂不标记")
-                    except Exception as e:
-                        logger.error(f"⚠️ 处理提取结果失败: {e}")
-
             try:
-                # 处理 tmp 目录下的 raw/deduped 文件
-                raw_dir = tools.RAW_NEWS_TMP_DIR
-                raw_file_name = file_path.stem.replace("_deduped", "") + ".jsonl"
-                raw_file_path = raw_dir / raw_file_name
-
-                # 使用统一的删除函数
-                safe_unlink(raw_file_path, "原始新闻")
-                safe_unlink(file_path, "去重新闻")
+                results.extend(await async_executor.run_concurrent_tasks(
+                    tasks=news_tasks,
+                    concurrency=max_workers
+                ))
+            finally:
+                await writer.close()
+
+        applied = await async_executor.run_in_thread(apply_results, results)
+        total_processed += len(applied)
+        if applied:
+            # 每个文件完成后立即记录，已应用的文章不会因后续文件失败而重做
+            try:
+                count = get_store().add_processed_ids(applied)
+                tools.log(f"✅ 记录 {count} 个已处理ID到数据库")
+                processed_ids.update(gid for gid, _, _ in applied)
             except Exception as e:
-                tools.log(f"⚠️ 删除文件失败: {e}")
+                tools.log(f"⚠️ 记录已处理ID到数据库失败: {e}")
 
-    # 批量插入已处理的ID到数据库
-    if processed_ids_to_add:
         try:
-            from src.adapters.sqlite.store import get_store
-            count = get_store().add_processed_ids(processed_ids_to_add)
-            tools.log(f"✅ 批量记录 {count} 个已处理ID到数据库")
+            # 处理 tmp 目录下的 raw/deduped 文件
+            raw_dir = tools.RAW_NEWS_TMP_DIR
+            raw_file_name = file_path.stem.replace("_deduped", "") + ".jsonl"
+            raw_file_path = raw_dir / raw_file_name
+
+            # 使用统一的删除函数
+            safe_unlink(raw_file_path, tools.log, "原始新闻")
+            safe_unlink(file_path, tools.log, "去重新闻")
         except Exception as e:
-            tools.log(f"⚠️ 记录已处理ID到数据库失败: {e}")
-    
-    tools.log(f"✅ 完成！共处理 {total_processed} 条含有效实体的新闻")
+            tools.log(f"⚠️ 删除文件失败: {e}")
+        checkpoint.clear(run_key)
+
+    cache_stats = extraction_cache.summary(since=cache_before)
+    tools.log(f"📦 抽取缓存: 命中 {cache_stats['hits']} / 未命中 {cache_stats['misses']}")
+    tools.log(f"✅ 完成！共处理 {total_processed} 条含有效实体的新闻（检查点恢复 {total_resumed} 条）")
     # SQLite 为主存储：批量处理结束后统一导出兼容 JSON（避免每条新闻都写一次大文件）
     if total_processed > 0:
         try:
-            from src.adapters.sqlite.store import get_store
             get_store().export_compat_json_files()
         except Exception as e:
             tools.log(f"⚠️ 导出兼容JSON失败（不影响主存储SQLite）: {e}")
-    return {"processed_count": total_processed, "files_processed": len(files)}
+    return {
+        "processed_count": total_processed,
+        "resumed_count": total_resumed,
+        "files_processed": len(files),
+        "extraction_cache": cache_stats,
+    }
+
+
+def _batch_extraction_settings(config_manager: Any) -> Tuple[int, int]:
+    """agent1_config.extraction_batch_size / extraction_batch_token_budget；读取失败时逐篇抽取"""
+    try:
+        batch_size = int(config_manager.get_config_value("extraction_batch_size", 1, "agent1_config") or 1)
+        token_budget = int(config_manager.get_config_value("extraction_batch_token_budget", 2400, "agent1_config") or 2400)
+    except Exception:
+        return 1, 2400
+    return max(1, batch_size), max(1, token_budget)
+
+
+def _news_fields(news: Dict[str, Any]) -> Tuple[str, str, str, Optional[str], Optional[str]]:
+    """新闻字典中抽取所需的字段：(title, content, source, timestamp, processed_id)"""
+    title = news.get("title", "")
+    content = news.get("content", "")
+    source = news.get("source", "unknown")
+    timestamp = news.get("datetime") or news.get("formatted_time")
+    news_id = str(news.get("id", "")).strip()
+    processed_id = f"{source}:{news_id}" if news_id and source else None
+    return title, content, source, timestamp, processed_id
+
+
+def _attach_news_meta(news: Dict[str, Any], extracted: List[Dict[str, Any]], source: str, timestamp: Optional[str]) -> List[Dict[str, Any]]:
+    """为抽取出的事件附加来源、发布时间与新闻 ID"""
+    events_out = []
+    for ev in extracted:
+        ev["source"] = source
+        ev["published_at"] = timestamp
+        ev["news_id"] = news.get("id")
+        events_out.append(ev)
+    return events_out
+
+
+def store_extracted_events(all_events: List[Dict[str, Any]], log_tag: str = "batch_process_news") -> None:
+    """按来源分组把事件及其实体写入 SQLite（失败只记录日志）"""
+    if not all_events:
+        return
+    tools.log(f"[{log_tag}] 开始写入 {len(all_events)} 个事件到SQLite")
+    try:
+        # 按来源分组事件，批量写入
+        events_by_source: Dict[str, List[Dict[str, Any]]] = {}
+        for ev in all_events:
+            events_by_source.setdefault(ev.get("source", "unknown"), []).append(ev)
+
+        # 逐个来源写入
+        for source, events in events_by_source.items():
+            # 收集所有实体
+            all_entities = []
+            all_entities_original = []
+            for ev in events:
+                all_entities.extend(ev.get("entities", []))
+                all_entities_original.extend(ev.get("entities_original", []))
+
+            # 写入实体
+            if all_entities and len(all_entities) == len(all_entities_original):
+                published_at = events[0].get("published_at") if events else None
+                update_entities(all_entities, all_entities_original, source, published_at)
+                tools.log(f"[{log_tag}] 已写入 {len(all_entities)} 个实体 (来源: {source})")
+
+            # 写入事件
+            update_abstract_map(events, source, events[0].get("published_at") if events else None)
+            tools.log(f"[{log_tag}] 已写入 {len(events)} 个事件 (来源: {source})")
+    except Exception as e:
+        tools.log(f"[{log_tag}] 写入SQLite失败: {e}")
+
+
+def record_processed_ids(processed_ids: List[str], log_tag: str = "batch_process_news") -> int:
+    """把 "source:news_id" 形式的已处理 ID 记录到数据库，避免重复处理；返回写入条数"""
+    if not processed_ids:
+        return 0
+    tools.log(f"[{log_tag}] 记录 {len(processed_ids)} 个已处理的ID")
+    try:
+        # 从 processed_ids 中提取 source 和 news_id
+        ids_to_add = []
+        for pid in processed_ids:
+            parts = pid.split(':', 1)
+            if len(parts) == 2:
+                source, news_id = parts
+                ids_to_add.append((pid, source, news_id))
+
+        from src.adapters.sqlite.store import get_store
+        count = get_store().add_processed_ids(ids_to_add)
+        tools.log(f"[{log_tag}] 成功记录 {count} 个已处理ID到数据库")
+        return count
+    except Exception as e:
+        tools.log(f"[{log_tag}] 记录已处理ID到数据库时出错: {e}")
+        return 0
+
+
+def export_compat_json(log_tag: str = "batch_process_news") -> None:
+    """导出SQLite数据到JSON文件（兼容旧逻辑）"""
+    try:
+        from src.adapters.sqlite.store import get_store
+        get_store().export_compat_json_files()
+        tools.log(f"[{log_tag}] ✅ 已导出SQLite数据到JSON文件")
+    except Exception as e:
+        tools.log(f"[{log_tag}] ⚠️ 导出JSON文件失败（不影响SQLite主存储）: {e}")
 
 
 @register_tool(
@@ -568,8 +1084,9 @@ async def batch_process_news(news_list: List[Dict[str, Any]], limit: int = -1) -
     """
     批量处理新闻：
     1. 去重
-    2. 提取实体和事件
-    3. 附加元数据 (source, published_at)
+    2. 相关性预过滤（agent1_config.relevance_filter_mode，默认不启用）
+    3. 提取实体和事件
+    4. 附加元数据 (source, published_at)
 
     Args:
         news_list: 新闻列表
@@ -581,9 +1098,16 @@ async def batch_process_news(news_list: List[Dict[str, Any]], limit: int = -1) -
     from ...infra.paths import tools as Tools
     tools = Tools()
     tools.log(f"[batch_process_news] 开始处理，新闻数量: {len(news_list)}, limit: {limit}")
+    # 同步的抽取/SQLite 步骤都放到线程池执行，事件循环保持响应（Pipeline 钩子、日志流）
+    async_executor = AsyncExecutor()
+
     # 1. 去重
-    unique_news = deduplicate_news_batch(news_list)
+    unique_news = await async_executor.run_in_thread(deduplicate_news_batch, news_list)
     tools.log(f"[batch_process_news] 去重后新闻数量: {len(unique_news)}")
+    # 2. 相关性预过滤（relevance_filter_mode）：跳过/后置不含已知实体的新闻，并附加实体提示
+    unique_news, relevance_stats = await async_executor.run_in_thread(apply_relevance_filter, unique_news)
+    if relevance_stats["scored"]:
+        tools.log(f"[batch_process_news] 相关性预过滤: {relevance_stats}")
     if limit > 0:
         unique_news = unique_news[:limit]
         tools.log(f"[batch_process_news] 应用limit后新闻数量: {len(unique_news)}")
@@ -593,34 +1117,51 @@ async def batch_process_news(news_list: List[Dict[str, Any]], limit: int = -1) -
     max_workers = config_manager.get_concurrency_limit("agent1_config")
     rate_limit = config_manager.get_rate_limit("agent1_config")
 
-    # 使用统一限速器
-    limiter = RateLimiter(rate_limit)
+    # 使用统一限速器（rate_limiter_mode=adaptive 时按上游 429/5xx/超时自适应）
+    limiter = create_rate_limiter(rate_limit, "llm")
 
     # 复用一个 API pool，避免每条新闻都初始化 LLMAPIPool 触发“迁移/加载服务”刷屏
     api_pool = get_llm_pool()
+    extraction_cache = get_extraction_cache()
+    cache_before = extraction_cache.snapshot()
+
+    # 多篇合并抽取（extraction_batch_size > 1 时启用）
+    batch_size, token_budget = _batch_extraction_settings(config_manager)
 
     def process_one(news: Dict[str, Any]) -> (List[Dict[str, Any]], Optional[str]):
         events_out = []
         processed_id = None
         try:
-            title = news.get("title", "")
-            content = news.get("content", "")
-            source = news.get("source", "unknown")
-            timestamp = news.get("datetime") or news.get("formatted_time")
-            news_id = str(news.get("id", "")).strip()
-            if news_id and source:
-                processed_id = f"{source}:{news_id}"
-            limiter.acquire()
-            extracted = llm_extract_events(title, content, api_pool, reported_at=timestamp)
-            for ev in extracted:
-                ev["source"] = source
-                ev["published_at"] = timestamp
-                ev["news_id"] = news.get("id")
-                events_out.append(ev)
+            title, content, source, timestamp, processed_id = _news_fields(news)
+            cache_key, extracted = lookup_cached_extraction(title, content, api_pool, timestamp, extraction_cache)
+            if extracted is None:
+                limiter.acquire()
+                extracted = llm_extract_events(
+                    title, content, api_pool, reported_at=timestamp, cache_key=cache_key, entity_hints=entity_hints(news)
+                )
+            events_out = _attach_news_meta(news, extracted, source, timestamp)
         except Exception as e:
             print(f"Extraction failed for news {news.get('id', '')}: {e}")
         return events_out, processed_id
 
+    def process_group(group: List[Dict[str, Any]]) -> Tuple[List[Tuple[List[Dict[str, Any]], Optional[str]]], Dict[str, int]]:
+        group_stats: Dict[str, int] = {}
+        fields = [_news_fields(n) for n in group]
+        try:
+            extracted_list = llm_extract_events_batch(
+                [{"title": f[0], "content": f[1], "reported_at": f[3], "entity_hints": entity_hints(n)} for n, f in zip(group, fields)],
+                api_pool,
+                batch_size=batch_size,
+                token_budget=token_budget,
+                limiter=limiter,
+                stats=group_stats,
+            )
+        except Exception as e:
+            tools.log(f"[batch_process_news] ❌ 多篇抽取失败（{len(group)} 篇）: {e}")
+            extracted_list = [[] for _ in group]
+        pairs = [(_attach_news_meta(n, ex, f[2], f[3]), f[4]) for n, ex, f in zip(group, extracted_list, fields)]
+        return pairs, group_stats
+
     all_events: List[Dict[str, Any]] = []
     processed_ids: List[str] = []
     if not unique_news:
@@ -629,20 +1170,32 @@ async def batch_process_news(news_list: List[Dict[str, Any]], limit: int = -1) -
     else:
         tools.log(f"[batch_process_news] 准备处理 {len(unique_news)} 条唯一新闻")
 
-    if max_workers <= 1:
+    if batch_size > 1:
+        groups = _pack_extraction_batches(unique_news, batch_size, token_budget)
+        tools.log(f"[batch_process_news] 多篇合并抽取: {len(unique_news)} 条新闻打包为 {len(groups)} 批 (batch_size={batch_size})")
+        group_results = await async_executor.run_threaded_tasks_async(tasks=groups, func=process_group, max_workers=max_workers)
+        batch_stats: Dict[str, int] = defaultdict(int)
+        for pairs, group_stats in group_results:
+            for k, v in group_stats.items():
+                batch_stats[k] += v
+            for evs, pid in pairs:
+                all_events.extend(evs or [])
+                if pid:
+                    processed_ids.append(pid)
+        tools.log(f"[batch_process_news] 多篇抽取统计: {dict(batch_stats)}")
+    elif max_workers <= 1:
         tools.log(f"[batch_process_news] 开始串行处理 {len(unique_news)} 条新闻")
         for i, n in enumerate(unique_news):
             tools.log(f"[batch_process_news] 处理第 {i+1} 条新闻: {n.get('title', '')[:50]}...")
-            evs, pid = process_one(n)
+            evs, pid = await async_executor.run_in_thread(process_one, n)
             tools.log(f"[batch_process_news] 第 {i+1} 条新闻提取到 {len(evs)} 个事件")
             all_events.extend(evs)
             if pid:
                 processed_ids.append(pid)
     else:
-        # 使用AsyncExecutor统一管理线程并发
+        # 使用AsyncExecutor统一管理线程并发（await 线程池结果，不阻塞事件循环）
         tools.log(f"[batch_process_news] 开始并发处理 {len(unique_news)} 条新闻，最大并发数: {max_workers}")
-        async_executor = AsyncExecutor()
-        task_results = async_executor.run_threaded_tasks(
+        task_results = await async_executor.run_threaded_tasks_async(
             tasks=unique_news,
             func=process_one,
             max_workers=max_workers
@@ -654,67 +1207,17 @@ async def batch_process_news(news_list: List[Dict[str, Any]], limit: int = -1) -
             if pid:
                 processed_ids.append(pid)
 
-    # 写入SQLite数据库（实体和事件）
-    if all_events:
-        tools.log(f"[batch_process_news] 开始写入 {len(all_events)} 个事件到SQLite")
-        try:
-            # 按来源分组事件，批量写入
-            events_by_source = {}
-            for ev in all_events:
-                source = ev.get("source", "unknown")
-                if source not in events_by_source:
-                    events_by_source[source] = []
-                events_by_source[source].append(ev)
-            
-            # 逐个来源写入
-            for source, events in events_by_source.items():
-                # 收集所有实体
-                all_entities = []
-                all_entities_original = []
-                for ev in events:
-                    all_entities.extend(ev.get("entities", []))
-                    all_entities_original.extend(ev.get("entities_original", []))
-                
-                # 写入实体
-                if all_entities and len(all_entities) == len(all_entities_original):
-                    published_at = events[0].get("published_at") if events else None
-                    update_entities(all_entities, all_entities_original, source, published_at)
-                    tools.log(f"[batch_process_news] 已写入 {len(all_entities)} 个实体 (来源: {source})")
-                
-                # 写入事件
-                update_abstract_map(events, source, events[0].get("published_at") if events else None)
-                tools.log(f"[batch_process_news] 已写入 {len(events)} 个事件 (来源: {source})")
-        except Exception as e:
-            tools.log(f"[batch_process_news] 写入SQLite失败: {e}")
+    cache_stats = extraction_cache.summary(since=cache_before)
+    tools.log(f"[batch_process_news] 抽取缓存: 命中 {cache_stats['hits']} / 未命中 {cache_stats['misses']}")
 
-    # 记录 processed_ids 到数据库，避免重复处理
+    # 写入SQLite数据库（实体和事件），记录 processed_ids 避免重复处理，并导出兼容 JSON
+    await async_executor.run_in_thread(store_extracted_events, all_events, "batch_process_news")
     if processed_ids:
-        tools.log(f"[batch_process_news] 记录 {len(processed_ids)} 个已处理的ID")
-        try:
-            # 从 processed_ids 中提取 source 和 news_id
-            ids_to_add = []
-            for pid in processed_ids:
-                parts = pid.split(':', 1)
-                if len(parts) == 2:
-                    source, news_id = parts
-                    ids_to_add.append((pid, source, news_id))
-            
-            from src.adapters.sqlite.store import get_store
-            count = get_store().add_processed_ids(ids_to_add)
-            tools.log(f"[batch_process_news] 成功记录 {count} 个已处理ID到数据库")
-        except Exception as e:
-            tools.log(f"[batch_process_news] 记录已处理ID到数据库时出错: {e}")
+        await async_executor.run_in_thread(record_processed_ids, processed_ids, "batch_process_news")
     else:
         tools.log("[batch_process_news] 没有需要记录的已处理ID")
-
-    # 导出SQLite数据到JSON文件（兼容旧逻辑）
     if all_events:
-        try:
-            from src.adapters.sqlite.store import get_store
-            get_store().export_compat_json_files()
-            tools.log(f"[batch_process_news] ✅ 已导出SQLite数据到JSON文件")
-        except Exception as e:
-            tools.log(f"[batch_process_news] ⚠️ 导出JSON文件失败（不影响SQLite主存储）: {e}")
+        await async_executor.run_in_thread(export_compat_json, "batch_process_news")
 
     tools.log(f"[batch_process_news] 处理完成，总共提取到 {len(all_events)} 个事件")
     return all_events
@@ -774,6 +1277,6 @@ def persist_expanded_news_to_tmp(expanded_news: List[Dict], processed_ids: Set[s
     write_jsonl_file(raw_path, sanitized_news, ensure_ascii=False)
 
     # 去重处理
-    deduper = NewsDeduplicator(threshold=tools.get_dedupe_threshold())
+    deduper = NewsDeduplicator.shared(tools.get_dedupe_threshold())
     deduper.dedupe_file(raw_path, deduped_path, processed_ids)
     return deduped_path
@@ -2,18 +2,28 @@ from typing import List, Dict, Any, Optional, Set, Tuple
 from ...infra.registry import register_tool
 from ...core import DataNormalizer, StandardEventPipeline, ConfigManager, LLMAPIPool, RateLimiter, AsyncExecutor, tools, get_config_manager, get_llm_pool
 from ...domain.data_operations import update_entities, update_abstract_map
-from ...infra.serialization import extract_json_from_llm_response
+from ...domain.blocking import BlockingCandidateGenerator, bucket_events_sweep
+from ...domain.rules import CandidateReason, EntityMergeCandidatePair
+from ...domain.event_index import EntityEventIndex, mentioned_entities
+from ..compact_graph import CompactEdgeList
+from .decision_cache import MergeDecisionCache
+from ...infra.serialization import extract_json_from_llm_response, StreamingJsonWriter, write_json_atomic
 from ...infra.async_utils import call_llm_with_retry, create_deduplication_prompt, create_event_deduplication_prompt
 from ...infra.file_utils import ensure_dir
+from ...infra.vector_index import flush_entity_vector_index, merge_in_entity_vector_index
 from ...domain.data_operations import write_json_file, read_json_file
 from pathlib import Path
 import json
+import hashlib
 from datetime import datetime, timedelta, timezone
 import time
 import threading
 from difflib import SequenceMatcher
 from collections import defaultdict
 
+# 压缩/合并判断 prompt 的版本；修改 prompt 后递增，使决策缓存中的旧结论失效
+KG_PROMPT_VERSION = "kg-compress-v1"
+
 @register_tool(
     name="update_graph_data",
     description="将提取的事件数据写入知识图谱文件 (Entities & Events)",
@@ -65,9 +75,13 @@ def update_graph_data(events_list: List[Dict[str, Any]], default_source: str = "
     description="重建并压缩知识图谱 (触发 Agent3 逻辑)",
     category="Knowledge Graph"
 )
-def refresh_knowledge_graph() -> Dict[str, str]:
+def refresh_knowledge_graph(incremental: Optional[bool] = None) -> Dict[str, Any]:
     """
     刷新知识图谱：构建、压缩、更新
+
+    Args:
+        incremental: 增量模式，只把上次刷新水位线之后新增/变更的实体与事件作为合并候选；
+            None 时读取 agent3 配置 incremental_refresh
     """
     try:
         # 优先应用已确认的实体合并决策（避免每次 refresh 都让 LLM 重新“漂移”）
@@ -83,8 +97,11 @@ def refresh_knowledge_graph() -> Dict[str, str]:
         except Exception:
             pass
         kg = KnowledgeGraph()
-        kg.refresh_graph()
-        return {"status": "refreshed"}
+        if incremental is None:
+            kg._ensure_settings_loaded()
+            incremental = bool(kg.settings.get("incremental_refresh", False))
+        stats = kg.refresh_graph(incremental=bool(incremental))
+        return {"status": "refreshed", **(stats or {})}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
@@ -450,6 +467,43 @@ async def append_only_update_graph_tool(
     )
 
 
+@register_tool(
+    name="benchmark_knowledge_graph_edges",
+    description="对比 list[dict] 与紧凑列式边存储的构建耗时与内存占用（基于当前 SQLite 图谱）",
+    category="Knowledge Graph"
+)
+def benchmark_knowledge_graph_edges() -> Dict[str, Any]:
+    """
+    加载当前图谱后，分别以 list[dict] 与 CompactEdgeList 重建边，记录耗时与 tracemalloc 峰值。
+    """
+    import tracemalloc
+
+    kg = KnowledgeGraph()
+    if not kg.load_data():
+        return {"status": "error", "message": "load_data failed"}
+    result: Dict[str, Any] = {
+        "status": "ok",
+        "entities": len(kg.graph["entities"]),
+        "events": len(kg.graph["events"]),
+    }
+    for mode, compact in (("dict", False), ("compact", True)):
+        kg.settings["compact_edges"] = compact
+        kg.graph["edges"] = []
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        kg._build_edges()
+        build_ms = (time.perf_counter() - t0) * 1000
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result[mode] = {
+            "edges": len(kg.graph["edges"]),
+            "build_ms": round(build_ms, 1),
+            "retained_mb": round(current / 1e6, 2),
+            "peak_mb": round(peak / 1e6, 2),
+        }
+    return result
+
+
 @register_tool(
     name="append_tmp_extracted_events",
     description="从 data/tmp/extracted_events_*.jsonl 读取事件并追加到图谱（不改旧记录）",
@@ -515,6 +569,7 @@ class KnowledgeGraph:
         self.abstract_tmp_file = tools.ABSTRACT_TMP_FILE
         self.kg_file = tools.KNOWLEDGE_GRAPH_FILE
         self.merge_rules_file = tools.CONFIG_DIR / "entity_merge_rules.json" # 规则文件路径
+        self.refresh_watermark_file = tools.DATA_DIR / "kg_refresh_watermark.json"  # 增量刷新水位线
         self.merge_rules = {} # 内存中的规则缓存
         self.settings = {}  # 延迟加载配置
         self.graph = {
@@ -524,6 +579,10 @@ class KnowledgeGraph:
         }
         self.llm_pool = None  # 延迟初始化
         self._tmp_loaded = []  # 记录已加载的tmp文件，刷新完成后清理
+        self._entity_events: Optional[EntityEventIndex] = None  # 实体 -> 事件倒排索引
+        self._refresh_scope: Optional[Dict[str, Set[str]]] = None  # 增量刷新时的变更集合，None 表示全量
+        self._decision_cache: Optional[MergeDecisionCache] = None  # LLM 合并判断缓存（延迟创建）
+        self._vector_index_dirty = False  # 实体向量索引有未落盘的合并（_save_data 时落盘）
         self._load_merge_rules() # 初始化时加载规则
     def _init_llm_pool(self):
         """初始化LLM API池"""
@@ -573,6 +632,7 @@ class KnowledgeGraph:
             # 额外加载 tmp 新增数据（未合并的新增实体/事件）
             self._load_tmp_entities()
             self._load_tmp_events()
+            self._entity_events = EntityEventIndex.build(self.graph["events"])
 
             self._build_edges()
             tools.log(f"[知识图谱] 数据加载成功: {len(self.graph['entities'])} 实体, {len(self.graph['events'])} 事件")
@@ -583,7 +643,9 @@ class KnowledgeGraph:
 
     def _build_edges(self):
         """构建实体和事件之间的边（所有元组/边强制带时间 time）"""
-        self.graph['edges'] = []
+        self._ensure_settings_loaded()
+        # 默认使用列式紧凑存储（对外仍是 dict 列表视图），compact_edges=false 时退回 list[dict]
+        self.graph['edges'] = CompactEdgeList() if self.settings.get("compact_edges", True) else []
         for abstract, event in self.graph['events'].items():
             # 统一事件节点ID：EVT:<abstract>（兼容现有可视化与过滤逻辑）
             evt_node = f"EVT:{abstract}"
@@ -1013,6 +1075,10 @@ class KnowledgeGraph:
                 "rate_limit_per_sec": config_manager.get_config_value("rate_limit_per_sec", 1.0, "agent3_config"),
                 "entity_evidence_per_entity": config_manager.get_config_value("entity_evidence_per_entity", 2, "agent3_config"),
                 "entity_evidence_max_chars": config_manager.get_config_value("entity_evidence_max_chars", 400, "agent3_config"),
+                "compact_edges": config_manager.get_config_value("compact_edges", True, "agent3_config"),
+                "incremental_refresh": config_manager.get_config_value("incremental_refresh", False, "agent3_config"),
+                "merge_decision_cache_enabled": config_manager.get_config_value("merge_decision_cache_enabled", True, "agent3_config"),
+                "merge_decision_cache_ttl_days": config_manager.get_config_value("merge_decision_cache_ttl_days", 30, "agent3_config"),
             }
             return settings
         except Exception as e:
@@ -1033,6 +1099,10 @@ class KnowledgeGraph:
                 "rate_limit_per_sec": 1.0,
                 "entity_evidence_per_entity": 2,
                 "entity_evidence_max_chars": 400,
+                "compact_edges": True,
+                "incremental_refresh": False,
+                "merge_decision_cache_enabled": True,
+                "merge_decision_cache_ttl_days": 30,
             }
     def _string_similarity(self, a: str, b: str) -> float:
         """
@@ -1045,11 +1115,37 @@ class KnowledgeGraph:
         4. 语义相似度（如果可用）——支持跨语言匹配
         5. 中英文混合实体特殊处理
         """
+        score, cross_script = self._lexical_similarity(a, b)
+        if not cross_script:
+            return score
+        semantic = self._semantic_pair_scores([(a, b)])
+        return self._blend_cross_script(score, None if semantic is None else float(semantic[0]))
+
+    def _batch_string_similarity(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """
+        批量版 _string_similarity：结果逐对一致，但中英文混合对的语义分数
+        通过相似度引擎一次性批量编码 + 向量化计算，而不是每对调用一次模型。
+        """
+        lexical = [self._lexical_similarity(a, b) for a, b in pairs]
+        cross_idx = [i for i, (_, cross) in enumerate(lexical) if cross]
+        semantic = self._semantic_pair_scores([pairs[i] for i in cross_idx]) if cross_idx else None
+        scores = [score for score, _ in lexical]
+        for pos, i in enumerate(cross_idx):
+            scores[i] = self._blend_cross_script(
+                lexical[i][0], None if semantic is None else float(semantic[pos])
+            )
+        return scores
+
+    def _lexical_similarity(self, a: str, b: str) -> Tuple[float, bool]:
+        """
+        字符串部分的相似度，返回 (score, 是否为中英文混合对)；
+        混合对的 score 为 Jaro-Winkler 原始分，需再与语义分数融合。
+        """
         import re
         
         # 快速路径：完全相同
         if a == b:
-            return 1.0
+            return 1.0, False
         
         # 归一化：去除空格、标点、转小写
         def normalize(s: str) -> str:
@@ -1062,7 +1158,7 @@ class KnowledgeGraph:
         
         # 归一化后相同
         if a_norm and b_norm and a_norm == b_norm:
-            return 0.98
+            return 0.98, False
         
         # 尝试导入Jaro-Winkler（更适合实体名称）
         try:
@@ -1072,29 +1168,28 @@ class KnowledgeGraph:
             # 降级到SequenceMatcher
             jw_score = SequenceMatcher(None, a.lower(), b.lower()).ratio()
         
-        # 中英文混合实体：尝试语义匹配，否则大幅降权
-        a_is_chinese = self._is_chinese(a)
-        b_is_chinese = self._is_chinese(b)
-        
-        if a_is_chinese != b_is_chinese:
-            # 一个中文一个英文：尝试语义匹配
-            try:
-                from ...infra.semantic_matcher import get_semantic_matcher
-                semantic_matcher = get_semantic_matcher()
-                if semantic_matcher.is_available():
-                    semantic_score = semantic_matcher.similarity(a, b)
-                    if semantic_score is not None:
-                        # 语义相似度优先，但要与字符串相似度加权平均
-                        # 语义相似度70%权重 + 字符串相似度30%权重
-                        return semantic_score * 0.7 + jw_score * 0.3
-            except Exception as e:
-                # 语义匹配失败，降级到字符串匹配
-                pass
-            
-            # 如果语义匹配不可用，降权70%
-            return jw_score * 0.3
-        
-        return jw_score
+        return jw_score, self._is_chinese(a) != self._is_chinese(b)
+
+    def _semantic_pair_scores(self, pairs: List[Tuple[str, str]]):
+        """语义相似度（批量、带缓存）；模型不可用或出错时返回 None"""
+        try:
+            from ...infra.semantic_matcher import get_similarity_engine
+            engine = get_similarity_engine()
+            if engine.is_available():
+                return engine.pair_scores(pairs)
+        except Exception:
+            # 语义匹配失败，降级到字符串匹配
+            pass
+        return None
+
+    @staticmethod
+    def _blend_cross_script(jw_score: float, semantic_score: Optional[float]) -> float:
+        # 一个中文一个英文：语义相似度优先，但要与字符串相似度加权平均
+        # 语义相似度70%权重 + 字符串相似度30%权重
+        if semantic_score is not None:
+            return semantic_score * 0.7 + jw_score * 0.3
+        # 如果语义匹配不可用，降权70%
+        return jw_score * 0.3
 
     def _is_chinese(self, text: str) -> bool:
         return any('\u4e00' <= ch <= '\u9fff' for ch in text)
@@ -1125,6 +1220,13 @@ class KnowledgeGraph:
         
         # 使用LLM决策器进行判断
         if self.llm_pool:
+            cache = self._get_decision_cache()
+            cache_key = cache.key(
+                "kg_entity_validate", {e: self._entity_fingerprint(e) for e in group}, evidence_map
+            )
+            cached = cache.get("kg_entity_validate", cache_key)
+            if cached is not None and "can_merge" in cached:
+                return bool(cached["can_merge"])
             try:
                 from ...adapters.extraction import LLMEntityMergeDecider
                 decider = LLMEntityMergeDecider(self.llm_pool)
@@ -1133,6 +1235,9 @@ class KnowledgeGraph:
                 # 如果有合并组，说明可以合并
                 # 如果没有合并组，说明不应该合并
                 can_merge = len(decision.merge_groups) > 0
+                # 调用/解析失败时决策器返回空结果，不写缓存
+                if decision.entity_analyses or decision.merge_groups:
+                    cache.put("kg_entity_validate", cache_key, {"can_merge": can_merge})
                 
                 if not can_merge:
                     tools.log(f"[知识图谱] ⚠️ LLM决策器阻止合并: {group}")
@@ -1175,14 +1280,30 @@ class KnowledgeGraph:
         per_entity = int(self.settings.get("entity_evidence_per_entity", 2))
         max_chars = int(self.settings.get("entity_evidence_max_chars", 400))
         evidence: Dict[str, List[str]] = {e: [] for e in entities_batch}
-        for abstract, event in self.graph['events'].items():
-            ents = event.get('entities', [])
-            summary = self._trim_text(event.get('event_summary', "") or abstract, max_chars)
-            for e in ents:
-                if e in evidence and len(evidence[e]) < per_entity:
-                    evidence[e].append(f"{abstract} | {', '.join(ents)} | {summary}")
+        index = self._event_index()
+        events = self.graph['events']
+        for e in evidence:
+            for abstract in index.events_for(e):
+                if len(evidence[e]) >= per_entity:
+                    break
+                event = events.get(abstract)
+                if event is None:
+                    continue
+                ents = event.get('entities', [])
+                hits = ents.count(e) if isinstance(ents, list) else 0
+                if not hits:
+                    continue
+                summary = self._trim_text(event.get('event_summary', "") or abstract, max_chars)
+                line = f"{abstract} | {', '.join(ents)} | {summary}"
+                evidence[e].extend([line] * min(hits, per_entity - len(evidence[e])))
         return evidence
 
+    def _event_index(self) -> EntityEventIndex:
+        """实体 -> 事件倒排索引（load_data 时构建；事件集合被外部替换时自动重建）"""
+        if self._entity_events is None or len(self._entity_events) != len(self.graph['events']):
+            self._entity_events = EntityEventIndex.build(self.graph['events'])
+        return self._entity_events
+
     def _trim_text(self, text: str, max_chars: int) -> str:
         """控制文本长度，避免prompt过长"""
         if not text or max_chars <= 0:
@@ -1208,81 +1329,59 @@ class KnowledgeGraph:
         self,
         window_days: int,
         min_entity_overlap: int,
-        max_bucket_size: int
+        max_bucket_size: int,
+        keys: Optional[Set[str]] = None
     ) -> List[Dict[str, Any]]:
         """
         按时间窗口与实体交集分桶事件，减少跨期/跨主体混杂。
+
+        扫描线实现：每个事件只检查与其共享实体、且仍在时间窗内的开放桶（见 bucket_events_sweep）。
+        keys 若提供，只对这些事件分桶（增量刷新）。
         """
-        events_items = list(self.graph["events"].items())
-        window_sec = window_days * 86400
-
-        # 预排序，时间缺失放末尾
-        def _sort_key(item):
-            ts = self._parse_time(item[1].get("first_seen", ""))
-            return ts if ts > 0 else float("inf")
-
-        events_items.sort(key=_sort_key)
-
-        buckets: List[Dict[str, Any]] = []
-        for abstract, event in events_items:
-            entities = set(event.get("entities", []))
-            ts = self._parse_time(event.get("first_seen", ""))
-            placed = False
-            for bucket in buckets:
-                if len(bucket["keys"]) >= max_bucket_size:
-                    continue
-                # 时间窗口判定
-                if bucket["min_time"] and ts and ts < bucket["min_time"] - window_sec:
-                    continue
-                if bucket["max_time"] and ts and ts > bucket["max_time"] + window_sec:
-                    continue
-                # 实体交集判定
-                if min_entity_overlap > 0:
-                    if not entities or len(bucket["entities"].intersection(entities)) < min_entity_overlap:
-                        continue
-                # 命中，加入桶
-                bucket["keys"].append(abstract)
-                bucket["entities"].update(entities)
-                if ts:
-                    bucket["min_time"] = min(bucket["min_time"] or ts, ts)
-                    bucket["max_time"] = max(bucket["max_time"] or ts, ts)
-                placed = True
-                break
-            if not placed:
-                buckets.append({
-                    "keys": [abstract],
-                    "entities": set(entities),
-                    "min_time": ts if ts else None,
-                    "max_time": ts if ts else None
-                })
+        buckets = bucket_events_sweep(
+            (
+                (abstract, self._parse_time(event.get("first_seen", "")), event.get("entities", []))
+                for abstract, event in self.graph["events"].items()
+                if keys is None or abstract in keys
+            ),
+            window_sec=window_days * 86400,
+            min_entity_overlap=min_entity_overlap,
+            max_bucket_size=max_bucket_size,
+        )
         tools.log(f"[知识图谱] 事件分桶完成，共 {len(buckets)} 个桶")
         return buckets
 
-    def _precluster_entities_by_string(self, entities: List[str], threshold: float, limit: int) -> List[List[str]]:
+    def _precluster_entities_by_string(
+        self,
+        entities: List[str],
+        threshold: float,
+        limit: int,
+        focus: Optional[Set[str]] = None
+    ) -> List[List[str]]:
         """
         基于字符串相似度的轻量预聚类，避免LLM过量输入。
         
         ⚠️ 重要：预聚类仅做粗筛，高相似度（>=threshold）的才进入候选组
         所有候选组必须经过LLM二次验证才能真正合并
+
+        候选对由 BlockingCandidateGenerator 分块生成（精确键/前缀/MinHash-LSH），
+        只对同块实体计算相似度；limit 为单个分块的成员上限（过大的分块视为泛化键跳过）。
+        focus 若提供（增量刷新），只保留至少一端属于 focus 的候选对。
         """
-        if len(entities) == 0 or len(entities) > limit:
+        if len(entities) == 0:
             return []
-        res = []
-        used = set()
-        for i, ent in enumerate(entities):
-            if ent in used:
-                continue
-            group = [ent]
-            used.add(ent)
-            for other in entities[i+1:]:
-                if other in used:
-                    continue
-                # 字符串相似度检查
-                if self._string_similarity(ent, other) >= threshold:
-                    group.append(other)
-                    used.add(other)
-            if len(group) > 1:
-                res.append(group)
+        records = {
+            ent: (self.graph['entities'].get(ent) or {}).get('original_forms') or []
+            for ent in entities
+        }
+        generator = BlockingCandidateGenerator(
+            max_block_size=max(2, int(limit)),
+            scorer=self._string_similarity,
+        )
+        pairs = generator.generate_pairs(
+            records, min_similarity=threshold, batch_scorer=self._batch_string_similarity, focus=focus
+        )
+        res = generator.group_pairs(list(entities), pairs)
         if res:
             tools.log(f"[知识图谱] 本地实体预聚类发现 {len(res)} 组可能重复（需LLM二次验证）")
         return res
@@ -1307,22 +1406,15 @@ class KnowledgeGraph:
             return (k + " " + summary).lower()
 
         texts = {k: norm_text(k) for k in keys}
-        res = []
-        used = set()
-        for i, key in enumerate(keys):
-            if key in used:
-                continue
-            base = texts.get(key, "")
-            group = [key]
-            used.add(key)
-            for other in keys[i+1:]:
-                if other in used:
-                    continue
-                if self._string_similarity(base, texts.get(other, "")) >= threshold:
-                    group.append(other)
-                    used.add(other)
-            if len(group) > 1:
-                res.append(group)
+        # 同桶两两打分一次性批量完成，再按原有的贪心顺序成组
+        index_pairs = [(i, j) for i in range(len(keys)) for j in range(i + 1, len(keys))]
+        scores = self._batch_string_similarity([(texts[keys[i]], texts[keys[j]]) for i, j in index_pairs])
+        pairs = [
+            EntityMergeCandidatePair(keys[i], keys[j], score, CandidateReason.NAME_SIMILARITY)
+            for (i, j), score in zip(index_pairs, scores)
+            if score >= threshold
+        ]
+        res = BlockingCandidateGenerator.group_pairs(list(keys), pairs)
         if res:
             tools.log(f"[知识图谱] 本地事件预聚类发现 {len(res)} 组可能重复")
         return res
@@ -1353,8 +1445,12 @@ class KnowledgeGraph:
             if primary not in self.graph['entities'] and duplicate in self.graph['entities']:
                 self.graph['entities'][primary] = self.graph['entities'][duplicate]
                 del self.graph['entities'][duplicate]
-                # 更新事件引用
-                for abstract, event in self.graph['events'].items():
+                # 更新事件引用（只遍历提及 duplicate 的事件）
+                index = self._event_index()
+                for abstract in index.events_for(duplicate):
+                    event = self.graph['events'].get(abstract)
+                    if event is None:
+                        continue
                     entities = event.get('entities', [])
                     if duplicate in entities:
                         event['entities'] = [primary if e == duplicate else e for e in entities]
@@ -1397,6 +1493,8 @@ class KnowledgeGraph:
                             new_rels.append(rel)
                         if changed:
                             event["relations"] = new_rels
+                index.merge_entity(duplicate, primary)
+                self._merge_in_vector_index(duplicate, primary)
                 tools.log(f"[知识图谱][规则] 重命名实体: {duplicate} -> {primary}")
                 updated = True
             elif primary in self.graph['entities'] and duplicate in self.graph['entities']:
@@ -1449,11 +1547,18 @@ class KnowledgeGraph:
         if not entities_list:
             return all_duplicate_entities
 
+        # 增量刷新：只为变更实体找候选（对全量实体的分块索引查询）
+        focus = None if self._refresh_scope is None else self._refresh_scope["entities"]
+        if focus is not None and not focus:
+            tools.log("[知识图谱] 增量刷新：无变更实体，跳过实体压缩")
+            return all_duplicate_entities
+
         # 预聚类：找出高度相似的实体组
         precluster_entities = self._precluster_entities_by_string(
             entities_list,
             threshold=float(self.settings.get("entity_precluster_similarity", 0.93)),
-            limit=int(self.settings.get("entity_precluster_limit", 500))
+            limit=int(self.settings.get("entity_precluster_limit", 500)),
+            focus=focus
         )
         
         # ⚠️ 重要修改：只处理预聚类的组，不再对所有实体做批处理
@@ -1479,12 +1584,26 @@ class KnowledgeGraph:
         entity_workers = int(self.settings.get("entity_max_workers", 3))
         all_results = []
         new_rules_count = 0
+        cache = self._get_decision_cache()
 
         def _run_entity_batch(idx: int, batch: List[str]) -> List[List[str]]:
+            batch = sorted(batch)
+            cache_key = cache.key(
+                "kg_entity_compress",
+                {e: self._entity_fingerprint(e) for e in batch},
+                self._collect_entity_evidence(batch),
+            )
+            cached = cache.get("kg_entity_compress", cache_key)
+            if cached is not None:
+                return cached.get("groups", [])
             tools.log(f"[知识图谱] 处理实体批次 {idx+1}/{len(entity_batches)} (大小: {len(batch)})")
             prompt = self._prepare_entity_compression_prompt_strict(batch)
             response = self._call_llm_limited(prompt, timeout=90, limiter=limiter)
-            return self._parse_entity_response(response) if response else []
+            groups = self._parse_groups_strict(response, "duplicate_entities") if response else None
+            if groups is None:
+                return []
+            cache.put("kg_entity_compress", cache_key, {"groups": groups})
+            return groups
 
         # 使用AsyncExecutor统一管理线程并发
         async_executor = AsyncExecutor()
@@ -1525,7 +1644,18 @@ class KnowledgeGraph:
         bucket_days = int(self.settings.get("event_bucket_days", 7))
         bucket_overlap = int(self.settings.get("event_bucket_entity_overlap", 1))
         bucket_max_size = int(self.settings.get("event_bucket_max_size", 40))
-        buckets = self._bucket_events_by_time_and_entity(bucket_days, bucket_overlap, bucket_max_size)
+        keys = None
+        changed = None if self._refresh_scope is None else self._refresh_scope["events"]
+        if changed is not None:
+            if not changed:
+                tools.log("[知识图谱] 增量刷新：无变更事件，跳过事件压缩")
+                return all_duplicate_events
+            keys = self._incremental_event_keys(changed, bucket_overlap)
+        buckets = self._bucket_events_by_time_and_entity(bucket_days, bucket_overlap, bucket_max_size, keys=keys)
+        if changed is not None:
+            # 只保留含变更事件的桶：旧事件之间上次刷新已判断过
+            buckets = [b for b in buckets if len(b["keys"]) > 1 and any(k in changed for k in b["keys"])]
+            tools.log(f"[知识图谱] 增量刷新：{len(changed)} 个变更事件，候选 {len(keys)} 个，涉及 {len(buckets)} 个桶")
 
         if buckets:
             event_results = self._process_event_buckets(buckets, limiter)
@@ -1542,6 +1672,7 @@ class KnowledgeGraph:
         evt_similarity = float(self.settings.get("event_precluster_similarity", 0.82))
         evt_limit = int(self.settings.get("event_precluster_limit", 300))
         max_summary_chars = int(self.settings.get("max_summary_chars", 360))
+        cache = self._get_decision_cache()
 
         def _run_event_bucket(idx: int, bucket: Dict[str, Any]) -> List[List[str]]:
             bucket_keys = bucket.get("keys", [])
@@ -1563,6 +1694,13 @@ class KnowledgeGraph:
             total_batches = (len(bucket_keys) - 1) // BATCH_SIZE_EVT + 1
             for i in range(0, len(bucket_keys), BATCH_SIZE_EVT):
                 batch_keys = bucket_keys[i:i+BATCH_SIZE_EVT]
+                cache_key = cache.key(
+                    "kg_event_compress", {k: self._event_fingerprint(k) for k in batch_keys}, max_summary_chars
+                )
+                cached = cache.get("kg_event_compress", cache_key)
+                if cached is not None:
+                    local_dupes.extend(cached.get("groups", []))
+                    continue
                 batch_events = {
                     k: {
                         **bucket_events.get(k, {}),
@@ -1578,8 +1716,9 @@ class KnowledgeGraph:
                 )
                 prompt = self._prepare_event_compression_prompt(batch_events)
                 response = self._call_llm_limited(prompt, timeout=120, limiter=limiter)
-                if response:
-                    batch_dupes = self._parse_event_response(response)
+                batch_dupes = self._parse_groups_strict(response, "duplicate_events") if response else None
+                if batch_dupes is not None:
+                    cache.put("kg_event_compress", cache_key, {"groups": batch_dupes})
                     local_dupes.extend(batch_dupes)
             return local_dupes
 
@@ -1732,13 +1871,26 @@ class KnowledgeGraph:
         except Exception:
             return []
 
-    def _parse_event_response(self, raw_content: str) -> List[List[str]]:
+    def _parse_groups_strict(self, raw_content: str, field: str) -> Optional[List[List[str]]]:
+        """解析成功返回分组（可为空列表）；格式不符返回 None，调用方据此决定是否写入决策缓存"""
         try:
             data = self._extract_json(raw_content)
-            res = data.get("duplicate_events", [])
-            return res if isinstance(res, list) else []
         except Exception:
-            return []
+            return None
+        if not isinstance(data, dict) or not isinstance(data.get(field), list):
+            return None
+        return data[field]
+
+    def _get_decision_cache(self) -> MergeDecisionCache:
+        """LLM 合并判断缓存（merge_decisions 表），键含 prompt 版本与成员记录指纹"""
+        if self._decision_cache is None:
+            self._ensure_settings_loaded()
+            self._decision_cache = MergeDecisionCache(
+                prompt_version=KG_PROMPT_VERSION,
+                ttl_days=float(self.settings.get("merge_decision_cache_ttl_days", 30)),
+                enabled=bool(self.settings.get("merge_decision_cache_enabled", True)),
+            )
+        return self._decision_cache
 
     def _extract_json(self, text: str) -> Dict:
         """使用统一的JSON提取函数"""
@@ -1782,6 +1934,12 @@ class KnowledgeGraph:
         else:
             tools.log("[知识图谱] 无重复项需要更新")
 
+    def _merge_in_vector_index(self, duplicate: str, primary: str) -> None:
+        """实体向量索引（开启时）中把 duplicate 的名称向量改挂到 primary，避免已合并实体继续作为近邻返回"""
+        from ...adapters.sqlite.store import canonical_entity_id
+        if merge_in_entity_vector_index(canonical_entity_id(duplicate), canonical_entity_id(primary), flush=False):
+            self._vector_index_dirty = True
+
     def _merge_entities(self, primary: str, duplicate: str):
         """合并重复实体"""
         if primary not in self.graph['entities'] or duplicate not in self.graph['entities']:
@@ -1831,9 +1989,14 @@ class KnowledgeGraph:
 
         # 删除重复实体
         del self.graph['entities'][duplicate]
+        self._merge_in_vector_index(duplicate, primary)
 
-        # 更新事件中的实体引用
-        for abstract, event in self.graph['events'].items():
+        # 更新事件中的实体引用（只遍历提及 duplicate 的事件）
+        index = self._event_index()
+        for abstract in index.events_for(duplicate):
+            event = self.graph['events'].get(abstract)
+            if event is None:
+                continue
             entities = event.get('entities', [])
             if duplicate in entities:
                 # 替换为primary，并去重
@@ -1887,6 +2050,7 @@ class KnowledgeGraph:
                 if changed:
                     event["relations"] = new_rels
 
+        index.merge_entity(duplicate, primary)
         tools.log(f"[知识图谱] 合并实体: {duplicate} -> {primary}")
 
     def _merge_events(self, primary: str, duplicate: str):
@@ -2042,6 +2206,9 @@ class KnowledgeGraph:
 
         # 删除重复事件
         del self.graph['events'][duplicate]
+        if self._entity_events is not None:
+            self._entity_events.remove_event(duplicate)
+            self._entity_events.add_event(primary, primary_event)
 
         tools.log(f"[知识图谱] 合并事件: {duplicate} -> {primary}")
 
@@ -2049,30 +2216,34 @@ class KnowledgeGraph:
         """保存更新后的数据到文件"""
         try:
             # 保存实体
-            write_json_file(self.entities_file, self.graph['entities'], ensure_ascii=False, indent=2)
-
-            # 保存事件（abstract_map格式）
-            abstract_map = {}
-            for abstract, event in self.graph['events'].items():
-                abstract_map[abstract] = {
-                    "event_id": event.get("event_id", ""),
-                    "entities": event.get('entities', []),
-                    "event_summary": event.get('event_summary', ''),
-                    "event_types": event.get("event_types", []),
-                    "entity_roles": event.get("entity_roles", {}),
-                    "relations": event.get("relations", []),
-                    "event_start_time": event.get("event_start_time", ""),
-                    "event_start_time_text": event.get("event_start_time_text", ""),
-                    "event_start_time_precision": event.get("event_start_time_precision", "unknown"),
-                    "reported_at": event.get("reported_at", ""),
-                    "sources": event.get('sources', []),
-                    "first_seen": event.get('first_seen', '')
-                }
+            write_json_atomic(self.entities_file, self.graph['entities'])
 
-            write_json_file(self.abstract_map_file, abstract_map, ensure_ascii=False, indent=2)
+            # 保存事件（abstract_map格式）：逐条写出，不在内存中拼出完整映射
+            with StreamingJsonWriter(self.abstract_map_file) as w:
+                w.begin_object()
+                for abstract, event in self.graph['events'].items():
+                    w.value({
+                        "event_id": event.get("event_id", ""),
+                        "entities": event.get('entities', []),
+                        "event_summary": event.get('event_summary', ''),
+                        "event_types": event.get("event_types", []),
+                        "entity_roles": event.get("entity_roles", {}),
+                        "relations": event.get("relations", []),
+                        "event_start_time": event.get("event_start_time", ""),
+                        "event_start_time_text": event.get("event_start_time_text", ""),
+                        "event_start_time_precision": event.get("event_start_time_precision", "unknown"),
+                        "reported_at": event.get("reported_at", ""),
+                        "sources": event.get('sources', []),
+                        "first_seen": event.get('first_seen', '')
+                    }, key=abstract)
+                w.end()
 
             # 保存知识图谱状态（可选）
-            write_json_file(self.kg_file, self.graph, ensure_ascii=False, indent=2)
+            write_json_atomic(self.kg_file, self.graph)
+
+            if self._vector_index_dirty:
+                flush_entity_vector_index()
+                self._vector_index_dirty = False
 
             tools.log("[知识图谱] 数据保存完成")
         except Exception as e:
@@ -2206,6 +2377,8 @@ class KnowledgeGraph:
                     "sources": [src] if src else [],
                     "first_seen": published_at
                 }
+                if self._entity_events is not None:
+                    self._entity_events.add_event(abstract, self.graph["events"][abstract])
                 added_events += 1
 
         # 重建边并保存（只在有新增时）
@@ -2218,22 +2391,129 @@ class KnowledgeGraph:
 
         return {"added_entities": added_entities, "added_events": added_events}
 
-    def refresh_graph(self):
-        """刷新知识图谱：构建、压缩、更新"""
+    # -------------------------
+    # 增量刷新（水位线）
+    # -------------------------
+    @staticmethod
+    def _fingerprint(*parts: Any) -> str:
+        raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=8).hexdigest()
+
+    def _entity_fingerprint(self, name: str) -> str:
+        """实体中参与去重判断的字段指纹（名称、原始表述）"""
+        rec = self.graph["entities"].get(name) or {}
+        forms = rec.get("original_forms", []) or []
+        return self._fingerprint(name, sorted(f for f in forms if isinstance(f, str)))
+
+    def _event_fingerprint(self, abstract: str) -> str:
+        """事件中参与去重判断的字段指纹（摘要、实体、描述、时间）"""
+        ev = self.graph["events"].get(abstract) or {}
+        return self._fingerprint(
+            abstract,
+            sorted(e for e in ev.get("entities", []) or [] if isinstance(e, str)),
+            ev.get("event_summary", ""),
+            ev.get("first_seen", ""),
+        )
+
+    def _graph_fingerprints(self) -> Dict[str, Dict[str, str]]:
+        return {
+            "entities": {name: self._entity_fingerprint(name) for name in self.graph["entities"]},
+            "events": {abstract: self._event_fingerprint(abstract) for abstract in self.graph["events"]},
+        }
+
+    def _load_refresh_watermark(self) -> Optional[Dict[str, Any]]:
+        try:
+            data = read_json_file(self.refresh_watermark_file)
+        except (OSError, ValueError) as e:
+            tools.log(f"[知识图谱] ⚠️ 读取刷新水位线失败，按全量刷新: {e}")
+            return None
+        if not isinstance(data, dict) or not isinstance(data.get("entities"), dict) or not isinstance(data.get("events"), dict):
+            return None
+        return data
+
+    def _save_refresh_watermark(self, fingerprints: Dict[str, Dict[str, str]]) -> None:
+        try:
+            write_json_atomic(self.refresh_watermark_file, {
+                "refreshed_at": datetime.now(timezone.utc).isoformat(),
+                "entities": fingerprints["entities"],
+                "events": fingerprints["events"],
+            })
+        except Exception as e:
+            tools.log(f"[知识图谱] ⚠️ 保存刷新水位线失败: {e}")
+
+    def _changed_since(self, watermark: Dict[str, Any], fingerprints: Dict[str, Dict[str, str]]) -> Dict[str, Set[str]]:
+        """与水位线指纹比较，得到新增或内容变化的实体/事件"""
+        return {
+            kind: {k for k, fp in fingerprints[kind].items() if watermark[kind].get(k) != fp}
+            for kind in ("entities", "events")
+        }
+
+    def _incremental_event_keys(self, changed: Set[str], min_entity_overlap: int) -> Set[str]:
+        """
+        变更事件 + 通过实体倒排索引找到的、与之共享实体的已有事件。
+        分桶要求实体交集时，不共享实体的事件不可能与变更事件同桶，无需参与。
+        """
+        if min_entity_overlap <= 0:
+            return set(self.graph["events"].keys())
+        index = self._event_index()
+        keys = set(changed)
+        for abstract in changed:
+            event = self.graph["events"].get(abstract)
+            if event is None:
+                continue
+            for ent in mentioned_entities(event):
+                keys.update(index.events_for(ent))
+        return {k for k in keys if k in self.graph["events"]}
+
+    def refresh_graph(self, incremental: bool = False) -> Dict[str, Any]:
+        """
+        刷新知识图谱：构建、压缩、更新
+
+        incremental=True 时读取上次刷新的水位线（各记录的内容指纹），只把新增/变更的实体与事件
+        作为合并候选；没有水位线时退化为全量刷新。LLM 可用并完成压缩后才推进水位线。
+        """
         tools.log("[知识图谱] 开始刷新知识图谱")
+        stats: Dict[str, Any] = {"mode": "full"}
 
         # 构建图
         if not self.build_graph():
             tools.log("[知识图谱] ❌ 构建图失败")
-            return
+            return stats
+
+        fingerprints = self._graph_fingerprints()
+        watermark = self._load_refresh_watermark() if incremental else None
+        if watermark is not None:
+            self._refresh_scope = self._changed_since(watermark, fingerprints)
+            stats.update({
+                "mode": "incremental",
+                "since": watermark.get("refreshed_at", ""),
+                "changed_entities": len(self._refresh_scope["entities"]),
+                "changed_events": len(self._refresh_scope["events"]),
+            })
+            tools.log(
+                f"[知识图谱] 增量刷新：自 {stats['since']} 起变更实体 {stats['changed_entities']}，变更事件 {stats['changed_events']}"
+            )
 
-        # 压缩：使用LLM检测重复
-        duplicates = self.compress_with_llm()
+        try:
+            # 压缩：使用LLM检测重复
+            duplicates = self.compress_with_llm()
+        finally:
+            self._refresh_scope = None
 
         # 更新实体和事件
         self.update_entities_and_events(duplicates)
+        stats["duplicate_entity_groups"] = len(duplicates.get("duplicate_entities", []))
+        stats["duplicate_event_groups"] = len(duplicates.get("duplicate_events", []))
+        if self._decision_cache is not None:
+            stats["decision_cache"] = self._decision_cache.summary()
+            tools.log(f"[知识图谱] 决策缓存: {stats['decision_cache']}")
+
+        # 水位线记录本次已考虑过的记录状态；被合并改动的记录下次会以“变更”身份再检查一次
+        if self.llm_pool is not None:
+            self._save_refresh_watermark(fingerprints)
 
         tools.log("[知识图谱] 知识图谱刷新完成")
         # 清理已加载的临时文件
         self._cleanup_tmp_files()
+        return stats
 
@@ -0,0 +1,146 @@
+"""
+LLM 抽取前的相关性预过滤
+
+用实体库（实体名、original_forms、entity_aliases）、合并规则（_load_entity_equivs）与配置的关键词
+构建 infra.gazetteer 的 Aho-Corasick 自动机，对每篇新闻线性扫描打分：
+- score：命中的不同已知实体数，标题中出现的计 2
+- 命中的实体作为提示附加到抽取 prompt（news["relevance"]["entities"]）
+
+agent1_config.relevance_filter_mode：
+- none：不打分（默认）
+- hint：只附加实体提示
+- deprioritize：低于 relevance_min_score 的新闻排到最后（limit 截断时优先舍弃）
+- skip：低于 relevance_min_score 的新闻本轮不做抽取、直接丢弃（process_news_pipeline 处理完即删除临时文件，不会保留）。
+  被跳过的新闻不记入 processed_ids，之后重新抓取到同一新闻时按届时的词表重新判断
+
+实体库为空时不过滤任何新闻。词表每 relevance_refresh_s 秒从数据库重新读取，自动机只增量编译变化的词。
+"""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from ...core import get_config_manager, tools
+from ...infra.gazetteer import EntityGazetteer
+
+RELEVANCE_MODES = ("none", "hint", "deprioritize", "skip")
+
+
+@dataclass
+class RelevanceSettings:
+    mode: str = "none"
+    min_score: float = 1.0
+    max_hints: int = 20
+    refresh_s: float = 300.0
+    keywords: List[str] = field(default_factory=list)
+
+
+def relevance_settings(config_manager: Any = None) -> RelevanceSettings:
+    """读取 agent1_config.relevance_*；读取失败或取值非法时不启用"""
+    try:
+        cm = config_manager or get_config_manager()
+        mode = str(cm.get_config_value("relevance_filter_mode", "none", "agent1_config") or "none").strip().lower()
+        keywords = cm.get_config_value("relevance_keywords", [], "agent1_config") or []
+        return RelevanceSettings(
+            mode=mode if mode in RELEVANCE_MODES else "none",
+            min_score=float(cm.get_config_value("relevance_min_score", 1.0, "agent1_config")),
+            max_hints=int(cm.get_config_value("relevance_max_hints", 20, "agent1_config")),
+            refresh_s=float(cm.get_config_value("relevance_refresh_s", 300, "agent1_config")),
+            keywords=[str(k) for k in keywords if str(k).strip()] if isinstance(keywords, list) else [],
+        )
+    except Exception:
+        return RelevanceSettings()
+
+
+def gazetteer_terms(keywords: Optional[List[str]] = None) -> Dict[str, str]:
+    """词 → 规范实体名：数据库实体与别名，合并规则/兼容 JSON 中的同义词，以及配置的关键词"""
+    terms: Dict[str, str] = {}
+    try:
+        from src.adapters.sqlite.store import get_store
+        terms.update(get_store().list_entity_terms())
+    except Exception as e:
+        tools.log(f"⚠️ 读取实体词表失败: {e}")
+
+    # 延迟导入：data_fetch 依赖本包的 extraction
+    from .data_fetch import _load_entity_equivs
+    for key, forms in _load_entity_equivs().items():
+        canonical = terms.get(key) or next((terms[f] for f in sorted(forms) if f in terms), key)
+        for form in (key, *forms):
+            terms.setdefault(form, canonical)
+
+    for kw in keywords or []:
+        terms.setdefault(kw.strip(), kw.strip())
+    return terms
+
+
+_gazetteer: Optional[EntityGazetteer] = None
+_refreshed_at = 0.0
+_gazetteer_lock = threading.Lock()
+
+
+def get_entity_gazetteer(refresh_s: float = 300.0, keywords: Optional[List[str]] = None, force: bool = False) -> EntityGazetteer:
+    """进程内共享的实体词表；距上次读取超过 refresh_s 秒（或 force）时重新读取并增量更新"""
+    global _gazetteer, _refreshed_at
+    with _gazetteer_lock:
+        now = time.monotonic()
+        if _gazetteer is None or force or now - _refreshed_at >= refresh_s:
+            terms = gazetteer_terms(keywords)
+            if _gazetteer is None:
+                _gazetteer = EntityGazetteer(terms)
+            else:
+                changed = _gazetteer.update(terms)
+                if changed["added"] or changed["removed"]:
+                    tools.log(f"🔤 实体词表更新: +{changed['added']} / -{changed['removed']}，共 {len(_gazetteer)} 个词")
+            _refreshed_at = now
+        return _gazetteer
+
+
+def score_news(news: Dict[str, Any], gazetteer: EntityGazetteer, max_hints: int = 20) -> Dict[str, Any]:
+    """对一篇新闻打分，结果写入 news["relevance"] 并返回"""
+    match = gazetteer.match(str(news.get("title") or ""), str(news.get("content") or ""))
+    relevance = {"score": match.score, "entities": match.top_entities(max_hints)}
+    news["relevance"] = relevance
+    return relevance
+
+
+def entity_hints(news: Dict[str, Any]) -> List[str]:
+    """预过滤附加的实体提示（未打分时为空）"""
+    relevance = news.get("relevance")
+    return list(relevance.get("entities") or []) if isinstance(relevance, dict) else []
+
+
+def apply_relevance_filter(
+    news_list: List[Dict[str, Any]],
+    settings: Optional[RelevanceSettings] = None,
+    gazetteer: Optional[EntityGazetteer] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    按 settings.mode 打分并过滤/重排新闻。
+
+    Returns:
+        (保留的新闻, 统计 {"mode", "scored", "below_threshold", "skipped"})
+    """
+    settings = settings or relevance_settings()
+    stats: Dict[str, Any] = {"mode": settings.mode, "scored": 0, "below_threshold": 0, "skipped": 0}
+    if settings.mode == "none" or not news_list:
+        return news_list, stats
+    if gazetteer is None:
+        gazetteer = get_entity_gazetteer(settings.refresh_s, settings.keywords)
+    if not len(gazetteer):
+        return news_list, stats
+
+    relevant: List[Dict[str, Any]] = []
+    below: List[Dict[str, Any]] = []
+    for news in news_list:
+        score = score_news(news, gazetteer, settings.max_hints)["score"]
+        (relevant if score >= settings.min_score else below).append(news)
+    stats["scored"] = len(news_list)
+    stats["below_threshold"] = len(below)
+    if settings.mode == "skip":
+        stats["skipped"] = len(below)
+        return relevant, stats
+    if settings.mode == "deprioritize":
+        return relevant + below, stats
+    return news_list, stats
@@ -8,8 +8,11 @@ from datetime import datetime, timezone
 from ...infra.registry import register_tool
 from ...adapters.sqlite.store import get_store, canonical_entity_id
 from ...infra.serialization import extract_json_from_llm_response
-from ...infra.async_utils import call_llm_with_retry, RateLimiter
+from ...infra.async_utils import call_llm_with_retry
+from ...infra.adaptive_limiter import create_rate_limiter
 from ...adapters.llm import LLMAPIPool
+from ...domain.blocking import BlockingCandidateGenerator
+from ...infra.vector_index import get_entity_vector_index, is_entity_vector_index_enabled, merge_in_entity_vector_index
 
 
 PROMPT_VERSION = "review-v1"
@@ -100,63 +103,14 @@ def enqueue_entity_merge_candidates(
     store = get_store()
     # 读取实体列表（name + original_forms）
     entities = store.export_entities_json()
-    names = list(entities.keys())
-
-    pairs: List[Tuple[str, str, float, str]] = []  # a,b,score,reason
-
-    # 1) 强候选：通过 original_forms 映射（跨语言/别名）
-    form_index: Dict[str, List[str]] = {}
-    for name, rec in entities.items():
-        forms = rec.get("original_forms") or []
-        for f in ([name] + list(forms)):
-            if not isinstance(f, str) or not f.strip():
-                continue
-            key = _norm_name(f)
-            if not key:
-                continue
-            form_index.setdefault(key, []).append(name)
-
-    for key, group in form_index.items():
-        if len(pairs) >= max_pairs:
-            break
-        uniq = []
-        for g in group:
-            if g not in uniq:
-                uniq.append(g)
-        if len(uniq) < 2:
-            continue
-        # 同一 key 下的实体都视为候选（score=1.0）
-        for i in range(len(uniq)):
-            for j in range(i + 1, len(uniq)):
-                a, b = uniq[i], uniq[j]
-                pairs.append((a, b, 1.0, "original_forms_match"))
-                if len(pairs) >= max_pairs:
-                    break
-            if len(pairs) >= max_pairs:
-                break
-
-    # 2) 次候选：名称相似（归一化后高相似）+ 分桶减少计算
-    if len(pairs) < max_pairs:
-        buckets: Dict[str, List[str]] = {}
-        for n in names:
-            key = _norm_name(n)[:6]
-            buckets.setdefault(key, []).append(n)
-
-        for _, group in buckets.items():
-            if len(pairs) >= max_pairs:
-                break
-            if len(group) < 2:
-                continue
-            for i in range(len(group)):
-                for j in range(i + 1, len(group)):
-                    a, b = group[i], group[j]
-                    sim = _name_sim(a, b)
-                    if sim >= float(min_similarity):
-                        pairs.append((a, b, sim, "name_similarity"))
-                    if len(pairs) >= max_pairs:
-                        break
-                if len(pairs) >= max_pairs:
-                    break
+
+    # 分块生成候选：original_forms 精确键（跨语言/别名，score=1.0）+ 前缀/MinHash 分块内的名称相似
+    generator = BlockingCandidateGenerator(scorer=_name_sim)
+    records = {name: (rec.get("original_forms") or []) for name, rec in entities.items()}
+    pairs: List[Tuple[str, str, float, str]] = [  # a,b,score,reason
+        (p.entity_a, p.entity_b, p.similarity, p.reason.value)
+        for p in generator.generate_pairs(records, min_similarity=float(min_similarity), max_pairs=int(max_pairs))
+    ]
 
     enqueued = 0
     seen_pair = set()
@@ -247,7 +201,7 @@ def run_review_worker(
     rate_limit_per_sec: float = 0.5,
 ) -> Dict[str, Any]:
     store = get_store()
-    limiter = RateLimiter(rate_per_sec=rate_limit_per_sec) if rate_limit_per_sec and rate_limit_per_sec > 0 else None
+    limiter = create_rate_limiter(rate_limit_per_sec, "llm") if rate_limit_per_sec and rate_limit_per_sec > 0 else None
     llm_pool = get_llm_pool()
 
     done = 0
@@ -381,6 +335,7 @@ def apply_entity_merge_decisions(max_actions: int = 50) -> Dict[str, Any]:
         )
         if res.get("status") == "merged":
             applied += 1
+            merge_in_entity_vector_index(canonical_entity_id(from_name), canonical_entity_id(to_name))
         else:
             skipped += 1
 
@@ -390,6 +345,23 @@ def apply_entity_merge_decisions(max_actions: int = 50) -> Dict[str, Any]:
     return {"status": "ok", "applied": applied, "skipped": skipped}
 
 
+@register_tool(
+    name="nearest_entities",
+    description="语义近邻实体查询（实体名称/别名向量索引），用于合并审查与别名解析",
+    category="Review",
+)
+def nearest_entities(name: str, k: int = 10, min_score: float = 0.0) -> Dict[str, Any]:
+    index = get_entity_vector_index()
+    if not index.is_available():
+        return {"status": "unavailable", "results": []}
+    # 未开启增量维护（或首次使用）时先与实体库对账；对账只编码新增/变化的名称
+    if len(index) == 0 or not is_entity_vector_index_enabled():
+        index.sync(get_store().export_entities_json())
+    name = (name or "").strip()
+    results = index.nearest_entities(name, int(k), min_score=float(min_score), exclude={canonical_entity_id(name)})
+    return {"status": "ok", "query": name, "results": results}
+
+
 @register_tool(
     name="apply_event_merge_or_evolve_decisions",
     description="应用事件审查决策：merge 执行事件合并；evolve 写入 event_edges（所有边有 time）",
@@ -0,0 +1,193 @@
+"""
+流式新闻处理：抓取 → 全文补全 → SimHash 去重 →（相关性预过滤）→ LLM 抽取 → 分批写入
+
+fetch_news_stream + batch_process_news 是整表流转：全部抓完才去重，全部抽完才写库，
+内存随批量增长，最慢的一篇决定何时有结果落库。这里把各数据源的 fetch_stream 逐条接入
+infra.stream_pipeline 的有界队列，各阶段独立并发，写库按小批进行，并返回每个阶段的吞吐指标。
+"""
+from __future__ import annotations
+
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from ...infra import get_logger
+from ...infra.registry import register_tool
+from ...core import AsyncExecutor, NewsAPIManager, get_config_manager, get_llm_pool, tools
+from ...infra.adaptive_limiter import create_rate_limiter
+from ...infra.extraction_cache import get_extraction_cache
+from ...infra.stream_pipeline import Stage, StreamPipeline, merge_async_iterables
+from ...adapters.news.fetch_utils import build_fetch_config, news_item_to_dict, normalize_news_items
+from ...adapters.news.gdelt_adapter import GDELTAdapter
+from .extraction import (
+    NewsDeduplicator,
+    _attach_news_meta,
+    _news_fields,
+    export_compat_json,
+    llm_extract_events_async,
+    lookup_cached_extraction,
+    record_processed_ids,
+    store_extracted_events,
+)
+from .relevance import entity_hints, get_entity_gazetteer, relevance_settings, score_news
+
+LOG_TAG = "stream_process_news"
+logger = get_logger(__name__)
+
+
+async def _source_stream(collector: Any, source_name: str, config: Any) -> AsyncIterator[Dict[str, Any]]:
+    """单个数据源的 fetch_stream，转为新闻字典；出错只结束该源"""
+    try:
+        async for item in collector.fetch_stream(config):
+            yield normalize_news_items([news_item_to_dict(item)], source_name)[0]
+    except Exception as e:
+        tools.log(f"[{LOG_TAG}] 数据源 {source_name} 抓取失败: {e}")
+
+
+@register_tool(
+    name="stream_process_news",
+    description="[工作流] 流式处理新闻：抓取 → 全文补全 → 去重 → 抽取 → 分批写入（有界队列背压，输出各阶段吞吐）",
+    category="Workflow"
+)
+async def stream_process_news(
+    limit: int = 50,
+    sources: Optional[List[str]] = None,
+    query: Optional[str] = None,
+    category: Optional[str] = None,
+    from_: Optional[str] = None,
+    to: Optional[str] = None,
+    fulltext: bool = False,
+    fulltext_min_chars: int = 200,
+    queue_size: int = 64,
+    enrich_concurrency: int = 8,
+    extract_concurrency: Optional[int] = None,
+    store_batch_size: int = 20,
+    store_batch_timeout_s: float = 5.0,
+    persistent_dedup: bool = True,
+) -> Dict[str, Any]:
+    """
+    流式抓取并处理新闻。
+
+    Args:
+        limit: 每个源获取的最大条数（GDELT 源为 9 倍，与 fetch_news_stream 一致）
+        sources: 指定源列表，默认为所有可用源
+        fulltext: 是否抓取原文补全过短的正文
+        fulltext_min_chars: 正文短于该长度时才补全
+        queue_size: 各阶段输入队列容量（背压阈值）
+        enrich_concurrency: 全文补全并发数
+        extract_concurrency: 抽取并发数，默认读 agent1_config 并发上限
+        store_batch_size: 每批写库的新闻条数
+        store_batch_timeout_s: 攒批最长等待秒数
+        persistent_dedup: 使用持久化 SimHash 索引（跨批次去重）
+
+    Returns:
+        {"news": 写入的新闻数, "events": 写入的事件数, "stages": 各阶段指标}
+    """
+    config_manager = get_config_manager()
+    extract_concurrency = int(extract_concurrency or config_manager.get_concurrency_limit("agent1_config"))
+    limiter = create_rate_limiter(config_manager.get_rate_limit("agent1_config"), "llm")
+
+    news_manager = NewsAPIManager.get_instance()
+    available = news_manager.list_available_sources()
+    target_sources = [s for s in sources if s in available] if sources else available
+    tools.log(f"[{LOG_TAG}] 开始执行，数据源: {target_sources}, limit: {limit}, fulltext: {fulltext}")
+    if not target_sources:
+        tools.log(f"[{LOG_TAG}] 没有可用的数据源")
+        return {"news": 0, "events": 0, "stages": {}}
+
+    streams = []
+    for name in target_sources:
+        collector = news_manager.get_collector(name)
+        if collector is None:
+            continue
+        source_limit = int(limit) * 9 if str(name).strip().lower().startswith("gdelt") else int(limit)
+        fetch_config = build_fetch_config(query=query, category=category, limit=source_limit, from_=from_, to=to)
+        streams.append(_source_stream(collector, name, fetch_config))
+
+    api_pool = get_llm_pool()
+    extraction_cache = get_extraction_cache()
+    cache_before = extraction_cache.snapshot()
+    threshold = tools.get_dedupe_threshold()
+    deduper = NewsDeduplicator.shared(threshold) if persistent_dedup else NewsDeduplicator(threshold=threshold)
+    html_helper = GDELTAdapter() if fulltext else None
+    totals = {"news": 0, "events": 0}
+    # 去重索引、抽取缓存与写库都是同步 SQLite I/O，放到线程池中执行，不阻塞各阶段共享的事件循环
+    async_executor = AsyncExecutor()
+
+    async def enrich(news: Dict[str, Any]) -> Dict[str, Any]:
+        content = str(news.get("content") or "").strip()
+        if html_helper is None or len(content) >= fulltext_min_chars:
+            return news
+        text = await html_helper.fetch_fulltext(news.get("url") or news.get("id"), timeout=10.0, session=http_session)
+        if len(text) > len(content):
+            news["content"] = text
+        return news
+
+    async def dedup(news: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        text = (news.get("title", "") + " " + news.get("content", "")).strip()
+        if not text or await async_executor.run_in_thread(deduper.is_duplicate, text, NewsDeduplicator._news_key(news)):
+            return None
+        return news
+
+    async def relevance(news: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        # 流式处理无法整体重排：deprioritize 与 hint 一样只附加实体提示，skip 时丢弃低分新闻
+        score = score_news(news, gazetteer, relevance_config.max_hints)["score"]
+        if relevance_config.mode == "skip" and score < relevance_config.min_score:
+            return None
+        return news
+
+    async def extract(news: Dict[str, Any]) -> Dict[str, Any]:
+        title, content, source, timestamp, processed_id = _news_fields(news)
+        cache_key, extracted = await async_executor.run_in_thread(
+            lookup_cached_extraction, title, content, api_pool, timestamp, extraction_cache
+        )
+        if extracted is None:
+            await limiter.acquire_async()
+            extracted = await llm_extract_events_async(
+                title, content, api_pool, reported_at=timestamp, cache_key=cache_key, entity_hints=entity_hints(news)
+            )
+        return {"events": _attach_news_meta(news, extracted or [], source, timestamp), "processed_id": processed_id}
+
+    def write_batch(batch: List[Dict[str, Any]]) -> None:
+        events = [ev for r in batch for ev in r["events"]]
+        store_extracted_events(events, LOG_TAG)
+        record_processed_ids([r["processed_id"] for r in batch if r["processed_id"]], LOG_TAG)
+        totals["news"] += len(batch)
+        totals["events"] += len(events)
+
+    async def store(batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        await async_executor.run_in_thread(write_batch, batch)
+        return batch
+
+    stages = [
+        Stage("enrich", enrich, concurrency=enrich_concurrency, queue_size=queue_size),
+        Stage("dedup", dedup, concurrency=1, queue_size=queue_size),
+        Stage("extract", extract, concurrency=extract_concurrency, queue_size=queue_size),
+        Stage("store", store, concurrency=1, queue_size=queue_size,
+              batch_size=max(1, store_batch_size), batch_timeout_s=store_batch_timeout_s),
+    ]
+    relevance_config = relevance_settings(config_manager)
+    gazetteer = None
+    if relevance_config.mode != "none":
+        gazetteer = get_entity_gazetteer(relevance_config.refresh_s, relevance_config.keywords)
+        if len(gazetteer):
+            stages.insert(2, Stage("relevance", relevance, concurrency=1, queue_size=queue_size))
+
+    pipeline = StreamPipeline(
+        stages,
+        source_name="fetch",
+        logger=logger,
+    )
+
+    http_session = html_helper.new_html_session(timeout=10.0, max_concurrency=enrich_concurrency) if html_helper else None
+    try:
+        stages = await pipeline.run(merge_async_iterables(streams, queue_size=queue_size))
+    finally:
+        deduper.flush()
+        if http_session is not None:
+            await http_session.close()
+
+    if totals["events"]:
+        export_compat_json(LOG_TAG)
+    cache_stats = extraction_cache.summary(since=cache_before)
+    tools.log(f"[{LOG_TAG}] 完成：写入 {totals['news']} 条新闻 / {totals['events']} 个事件，"
+              f"抽取缓存命中 {cache_stats['hits']}，阶段指标: {stages}")
+    return {"news": totals["news"], "events": totals["events"], "stages": stages}
@@ -0,0 +1,300 @@
+"""
+KnowledgeGraph 边集合的紧凑内存表示。
+
+`KnowledgeGraph.graph['edges']` 原为 list[dict]，每条边一个 dict，时间/节点字符串大量重复。
+CompactEdgeList 把边拆成定长类型列：
+- 节点 ID 与常用字符串（时间、谓词、演化类型、事件摘要）驻留（interning）为整数
+- src/dst/type/time/label/event/aux/confidence 存在 array 列中，按需转成 NumPy
+- roles/evidence 等变长字段以紧凑 JSON 字节存放，访问时才解码
+- 按 src/dst 的 CSR 邻接在首次查询时构建，追加后失效重建
+
+对外仍表现为"dict 列表"（MutableSequence），现有遍历/追加/序列化代码无需修改；
+形状不符合已知三类边的 dict 原样保存在旁路表中，保证无损往返。
+"""
+from __future__ import annotations
+
+import json
+from array import array
+from collections.abc import MutableSequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+EDGE_INVOLVED = 0
+EDGE_RELATION = 1
+EDGE_EVENT = 2
+EDGE_GENERIC = 3
+EDGE_TYPE_NAMES = ("involved_in", "relation", "event_edge")
+
+_INVOLVED_KEYS = ("from", "to", "type", "roles", "time")
+_RELATION_KEYS = ("from", "to", "type", "predicate", "event", "time")
+_EVENT_KEYS = ("from", "to", "type", "edge_type", "time", "reported_at", "confidence", "evidence")
+
+
+class StringPool:
+    """字符串驻留池：str <-> int"""
+
+    __slots__ = ("_ids", "_strings")
+
+    def __init__(self) -> None:
+        self._ids: Dict[str, int] = {}
+        self._strings: List[str] = []
+
+    def intern(self, s: str) -> int:
+        idx = self._ids.get(s)
+        if idx is None:
+            idx = len(self._strings)
+            self._ids[s] = idx
+            self._strings.append(s)
+        return idx
+
+    def lookup(self, s: str) -> int:
+        return self._ids.get(s, -1)
+
+    def __getitem__(self, idx: int) -> str:
+        return self._strings[idx]
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+
+def _is_str_list(v: Any) -> bool:
+    return isinstance(v, list) and all(isinstance(x, str) for x in v)
+
+
+class CompactEdgeList(MutableSequence):
+    """
+    列式存储的边列表，行为与 list[dict] 一致（索引/遍历返回新解码的 dict）。
+
+    注意：解码得到的 dict 是新对象，修改它不会写回；需要修改时请对下标赋值。
+    """
+
+    def __init__(self, edges: Optional[Iterable[Dict[str, Any]]] = None) -> None:
+        self.nodes = StringPool()
+        self.strings = StringPool()
+        self._src = array("i")
+        self._dst = array("i")
+        self._type = array("b")
+        self._time = array("i")
+        self._label = array("i")   # relation: predicate / event_edge: edge_type
+        self._event = array("i")   # relation: event 摘要
+        self._aux = array("i")     # event_edge: reported_at
+        self._conf = array("d")
+        self._payload_off = array("q", [0])
+        self._payload = bytearray()
+        self._objects: Dict[int, Dict[str, Any]] = {}  # 非标准形状的边原样保存
+        self._csr: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        if edges:
+            self.extend(edges)
+
+    # -------------------------
+    # 编码 / 解码
+    # -------------------------
+    def _classify(self, edge: Dict[str, Any]) -> int:
+        keys = tuple(edge.keys())
+        if not isinstance(edge.get("from"), str) or not isinstance(edge.get("to"), str):
+            return EDGE_GENERIC
+        if not isinstance(edge.get("time"), str):
+            return EDGE_GENERIC
+        etype = edge.get("type")
+        if etype == "involved_in" and keys == _INVOLVED_KEYS and _is_str_list(edge["roles"]):
+            return EDGE_INVOLVED
+        if etype == "relation" and keys == _RELATION_KEYS:
+            if isinstance(edge["predicate"], str) and isinstance(edge["event"], str):
+                return EDGE_RELATION
+        if etype == "event_edge" and keys == _EVENT_KEYS:
+            if (
+                isinstance(edge["edge_type"], str)
+                and isinstance(edge["reported_at"], str)
+                and type(edge["confidence"]) is float
+                and _is_str_list(edge["evidence"])
+            ):
+                return EDGE_EVENT
+        return EDGE_GENERIC
+
+    def _encode(self, edge: Dict[str, Any]) -> Tuple[int, int, int, int, int, int, int, float, bytes]:
+        """编码为列值；EDGE_GENERIC 只编码节点，dict 本身由调用方放入旁路表"""
+        kind = self._classify(edge)
+        label = event = aux = -1
+        conf = 0.0
+        payload = b""
+        if kind == EDGE_GENERIC:
+            src = self.nodes.intern(edge["from"]) if isinstance(edge.get("from"), str) else -1
+            dst = self.nodes.intern(edge["to"]) if isinstance(edge.get("to"), str) else -1
+            return src, dst, kind, -1, -1, -1, -1, 0.0, b""
+        src = self.nodes.intern(edge["from"])
+        dst = self.nodes.intern(edge["to"])
+        time_id = self.strings.intern(edge["time"])
+        if kind == EDGE_INVOLVED:
+            if edge["roles"]:
+                payload = json.dumps(edge["roles"], ensure_ascii=False).encode("utf-8")
+        elif kind == EDGE_RELATION:
+            label = self.strings.intern(edge["predicate"])
+            event = self.strings.intern(edge["event"])
+        else:
+            label = self.strings.intern(edge["edge_type"])
+            aux = self.strings.intern(edge["reported_at"])
+            conf = float(edge["confidence"])
+            if edge["evidence"]:
+                payload = json.dumps(edge["evidence"], ensure_ascii=False).encode("utf-8")
+        return src, dst, kind, time_id, label, event, aux, conf, payload
+
+    def _payload_at(self, i: int) -> bytes:
+        return bytes(self._payload[self._payload_off[i]:self._payload_off[i + 1]])
+
+    def _decode(self, i: int) -> Dict[str, Any]:
+        kind = self._type[i]
+        if kind == EDGE_GENERIC:
+            return self._objects[i]
+        src = self.nodes[self._src[i]]
+        dst = self.nodes[self._dst[i]]
+        t = self.strings[self._time[i]]
+        if kind == EDGE_INVOLVED:
+            raw = self._payload_at(i)
+            return {"from": src, "to": dst, "type": "involved_in", "roles": json.loads(raw) if raw else [], "time": t}
+        if kind == EDGE_RELATION:
+            return {
+                "from": src,
+                "to": dst,
+                "type": "relation",
+                "predicate": self.strings[self._label[i]],
+                "event": self.strings[self._event[i]],
+                "time": t,
+            }
+        raw = self._payload_at(i)
+        return {
+            "from": src,
+            "to": dst,
+            "type": "event_edge",
+            "edge_type": self.strings[self._label[i]],
+            "time": t,
+            "reported_at": self.strings[self._aux[i]],
+            "confidence": self._conf[i],
+            "evidence": json.loads(raw) if raw else [],
+        }
+
+    # -------------------------
+    # MutableSequence 接口
+    # -------------------------
+    def __len__(self) -> int:
+        return len(self._type)
+
+    def _index(self, i: int) -> int:
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("edge index out of range")
+        return i
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._decode(j) for j in range(*i.indices(len(self)))]
+        return self._decode(self._index(i))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)):
+            yield self._decode(i)
+
+    def append(self, edge: Dict[str, Any]) -> None:
+        src, dst, kind, time_id, label, event, aux, conf, payload = self._encode(edge)
+        self._src.append(src)
+        self._dst.append(dst)
+        self._type.append(kind)
+        self._time.append(time_id)
+        self._label.append(label)
+        self._event.append(event)
+        self._aux.append(aux)
+        self._conf.append(conf)
+        self._payload.extend(payload)
+        self._payload_off.append(len(self._payload))
+        if kind == EDGE_GENERIC:
+            self._objects[len(self._type) - 1] = edge
+        self._csr.clear()
+
+    def _rebuild(self, edges: List[Dict[str, Any]]) -> None:
+        fresh = CompactEdgeList(edges)
+        self.__dict__.update(fresh.__dict__)
+
+    def __setitem__(self, i, edge) -> None:
+        items = list(self)
+        items[i] = edge
+        self._rebuild(items)
+
+    def __delitem__(self, i) -> None:
+        items = list(self)
+        del items[i]
+        self._rebuild(items)
+
+    def insert(self, i: int, edge: Dict[str, Any]) -> None:
+        if i >= len(self):
+            self.append(edge)
+            return
+        items = list(self)
+        items.insert(i, edge)
+        self._rebuild(items)
+
+    def clear(self) -> None:
+        self._rebuild([])
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, CompactEdgeList)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"CompactEdgeList(edges={len(self)}, nodes={len(self.nodes)}, strings={len(self.strings)})"
+
+    # -------------------------
+    # 列与邻接
+    # -------------------------
+    def column(self, name: str) -> np.ndarray:
+        """某一列的 NumPy 副本（不持有底层 array 的缓冲区，不影响后续追加）"""
+        col = {
+            "src": self._src, "dst": self._dst, "type": self._type, "time": self._time,
+            "label": self._label, "event": self._event, "aux": self._aux, "confidence": self._conf,
+        }[name]
+        dtype = {"b": np.int8, "i": np.int32, "d": np.float64}[col.typecode]
+        return np.frombuffer(col, dtype=dtype).copy() if len(col) else np.zeros(0, dtype=dtype)
+
+    def csr(self, direction: str = "out") -> Tuple[np.ndarray, np.ndarray]:
+        """
+        CSR 邻接：返回 (indptr, edge_ids)；节点 k 的出边（direction="out"）或入边（"in"）为
+        edge_ids[indptr[k]:indptr[k+1]]，边按原顺序排列。
+        """
+        cached = self._csr.get(direction)
+        if cached is not None:
+            return cached
+        keys = self.column("src" if direction == "out" else "dst").astype(np.int64)
+        valid = keys >= 0
+        order = np.argsort(keys[valid], kind="stable")
+        edge_ids = np.flatnonzero(valid)[order].astype(np.int32)
+        counts = np.bincount(keys[valid], minlength=len(self.nodes))
+        indptr = np.zeros(len(self.nodes) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        self._csr[direction] = (indptr, edge_ids)
+        return indptr, edge_ids
+
+    def edge_ids(self, node: str, direction: str = "out") -> np.ndarray:
+        idx = self.nodes.lookup(node)
+        if idx < 0:
+            return np.zeros(0, dtype=np.int32)
+        indptr, ids = self.csr(direction)
+        if idx + 1 >= len(indptr):
+            return np.zeros(0, dtype=np.int32)
+        return ids[indptr[idx]:indptr[idx + 1]]
+
+    def edges_of(self, node: str, direction: str = "out") -> List[Dict[str, Any]]:
+        return [self._decode(int(i)) for i in self.edge_ids(node, direction)]
+
+    def degree(self, node: str, direction: str = "out") -> int:
+        return int(len(self.edge_ids(node, direction)))
+
+    def nbytes(self) -> int:
+        """列、负载与驻留字符串的近似内存占用（字节）"""
+        cols = (self._src, self._dst, self._type, self._time, self._label, self._event, self._aux, self._conf, self._payload_off)
+        size = sum(c.itemsize * len(c) for c in cols) + len(self._payload)
+        for pool in (self.nodes, self.strings):
+            size += sum(len(s.encode("utf-8")) + 49 for s in pool._strings)
+        size += sum(a.nbytes + b.nbytes for a, b in self._csr.values())
+        return size
@@ -0,0 +1,341 @@
+"""
+EE_EVO 时间轴帧索引（Frame Index）。
+
+快照生成时一次性计算：
+- 按时间分桶的帧序列（frames）
+- 每帧的 enter/exit 增量（deltas）
+- 周期关键帧（keyframes，保存该帧的完整激活集合）
+- 关系/实体的固定布局坐标（positions）
+
+渲染端定位到任意帧时，只需从最近的关键帧回放少量增量，
+无需每次重新扫描 relation_state 区间、重建帧与增量。
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+FRAME_INDEX_SCHEMA = "evo_frame_index_v1"
+DEFAULT_MAX_FRAMES = 500
+DEFAULT_KEYFRAME_INTERVAL = 32
+
+# 分桶粒度阶梯（秒）：0 表示直接使用 valid_from 关键点
+_BUCKET_LADDER_SECONDS: Tuple[int, ...] = (0, 3600, 86400, 7 * 86400, 30 * 86400, 365 * 86400)
+_EPOCH = datetime(1970, 1, 1)
+
+Interval = Tuple[datetime, Optional[datetime]]
+
+
+def to_utc_naive(dt: Optional[datetime]) -> Optional[datetime]:
+    if dt is None:
+        return None
+    if dt.tzinfo:
+        return dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def parse_ts(val: Any) -> Optional[datetime]:
+    """解析 ISO 时间戳；naive 时间按 UTC 处理，返回 tz-aware UTC。"""
+    s = str(val or "").strip()
+    if not s:
+        return None
+    try:
+        dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
+    except Exception:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def collect_relation_state_intervals(nodes: Iterable[Dict[str, Any]]) -> Dict[str, Interval]:
+    """从快照节点中提取 relation_state 的 [start, end] 区间（end 为空表示仍然有效）。"""
+    out: Dict[str, Interval] = {}
+    for n in nodes:
+        if not isinstance(n, dict) or str(n.get("type") or "").strip() != "relation_state":
+            continue
+        nid = str(n.get("id") or "").strip()
+        if not nid:
+            continue
+        start_dt = parse_ts(n.get("interval_start") or n.get("valid_from") or n.get("time"))
+        if start_dt is None:
+            continue
+        end_raw = str(n.get("interval_end") or n.get("valid_to") or "").strip()
+        end_dt = parse_ts(end_raw) if end_raw else None
+        if end_dt is not None and end_dt < start_dt:
+            end_dt = None
+        out[nid] = (start_dt, end_dt)
+    return out
+
+
+def _ceil_to_bucket(dt: datetime, bucket_seconds: int) -> datetime:
+    if bucket_seconds <= 0:
+        return dt
+    naive = to_utc_naive(dt) or dt
+    sec = (naive - _EPOCH).total_seconds()
+    ceiled = math.ceil(sec / bucket_seconds) * bucket_seconds
+    return (_EPOCH + timedelta(seconds=ceiled)).replace(tzinfo=timezone.utc)
+
+
+def bucket_frames(rel_intervals: Dict[str, Interval], *, max_frames: int = DEFAULT_MAX_FRAMES) -> Tuple[List[datetime], int]:
+    """
+    生成分桶帧：每帧为某个分桶的上边界，保证桶内新建立的关系在该帧可见。
+
+    从最细粒度开始尝试，选择帧数不超过 max_frames 的最小粒度；
+    粒度为 0 时帧序列即去重后的 valid_from 关键点。
+    """
+    starts = sorted({itv[0] for itv in rel_intervals.values() if itv and itv[0]})
+    if not starts:
+        return [], 0
+    max_frames = max(1, int(max_frames))
+    for bucket_seconds in _BUCKET_LADDER_SECONDS:
+        frames = sorted({_ceil_to_bucket(dt, bucket_seconds) for dt in starts})
+        if len(frames) <= max_frames:
+            return frames, bucket_seconds
+    # 超出最粗粒度仍过多时均匀抽样，保留最后一帧
+    step = max(1, int(math.ceil(len(frames) / float(max_frames))))
+    sampled = frames[::step]
+    if sampled[-1] != frames[-1]:
+        sampled[-1] = frames[-1]
+    return sampled, _BUCKET_LADDER_SECONDS[-1]
+
+
+def build_deltas(frames: List[datetime], rel_intervals: Dict[str, Interval]) -> List[Dict[str, List[str]]]:
+    """
+    计算每帧的 enter/exit 增量（帧需按时间升序）。
+
+    - enter: start 落在 (frame[i-1], frame[i]]，或第 0 帧时已处于有效期内
+    - exit:  end 之后的第一帧
+    同一帧内先应用 enter 再应用 exit。
+    """
+    frames_utc = [dt for dt in (to_utc_naive(f) for f in frames) if dt is not None]
+    if not frames_utc:
+        return []
+
+    enter_at: List[List[str]] = [[] for _ in frames_utc]
+    exit_at: List[List[str]] = [[] for _ in frames_utc]
+    f0 = frames_utc[0]
+
+    for rid, (start_dt, end_dt) in rel_intervals.items():
+        sdt = to_utc_naive(start_dt)
+        if sdt is None:
+            continue
+        edt = to_utc_naive(end_dt)
+        if edt is not None and edt < f0:
+            continue
+        enter_idx = bisect_left(frames_utc, sdt)
+        if enter_idx >= len(frames_utc):
+            continue
+        enter_at[enter_idx].append(str(rid))
+        if edt is None:
+            continue
+        exit_idx = bisect_right(frames_utc, edt)
+        if exit_idx < len(frames_utc):
+            exit_at[exit_idx].append(str(rid))
+
+    out: List[Dict[str, List[str]]] = []
+    for i in range(len(frames_utc)):
+        d: Dict[str, List[str]] = {}
+        if enter_at[i]:
+            d["enter"] = sorted(set(enter_at[i]))
+        if exit_at[i]:
+            d["exit"] = sorted(set(exit_at[i]))
+        out.append(d)
+    return out
+
+
+def relation_pairs(edges: Iterable[Dict[str, Any]], rel_ids: Set[str], entity_ids: Set[str]) -> Dict[str, Tuple[str, str]]:
+    """从 rel_in/rel_out 边还原 relation_state -> (subject, object)。"""
+    pairs: Dict[str, Tuple[str, str]] = {}
+    for e in edges:
+        if not isinstance(e, dict):
+            continue
+        u = str(e.get("from") or "").strip()
+        v = str(e.get("to") or "").strip()
+        if not u or not v:
+            continue
+        if u in rel_ids and v in entity_ids:
+            s, _ = pairs.get(u, ("", ""))
+            pairs[u] = (s, v)
+        if v in rel_ids and u in entity_ids:
+            _, o = pairs.get(v, ("", ""))
+            pairs[v] = (u, o)
+    return {rid: (s, o) for rid, (s, o) in pairs.items() if s and o}
+
+
+def compute_positions(entity_ids: List[str], rel_pairs: Dict[str, Tuple[str, str]]) -> Dict[str, Tuple[float, float]]:
+    """实体环形布局，关系节点放在主客体连线中点的法线方向上。"""
+    pos: Dict[str, Tuple[float, float]] = {}
+    ents = sorted([str(x) for x in entity_ids if str(x).strip()])
+    n = len(ents) if ents else 1
+    radius = min(720.0, 260.0 + 6.0 * float(n))
+
+    for i, eid in enumerate(ents):
+        angle = 2.0 * math.pi * (float(i) / float(n))
+        pos[eid] = (radius * math.cos(angle), radius * math.sin(angle))
+
+    rel_ids_by_pair: Dict[Tuple[str, str], List[str]] = defaultdict(list)
+    for rel_id, (s, o) in rel_pairs.items():
+        if str(rel_id).strip() and str(s).strip() and str(o).strip():
+            rel_ids_by_pair[(s, o)].append(rel_id)
+
+    for (s, o), rel_ids in rel_ids_by_pair.items():
+        sp = pos.get(s)
+        op = pos.get(o)
+        rel_ids_sorted = sorted(rel_ids)
+        if sp is None or op is None:
+            for rel_id in rel_ids_sorted:
+                h = int(hashlib.md5(str(rel_id).encode()).hexdigest()[:8], 16)
+                angle = 2.0 * math.pi * ((h % 3600) / 3600.0)
+                rr = min(220.0, radius * 0.45)
+                pos[rel_id] = (rr * math.cos(angle), rr * math.sin(angle))
+            continue
+
+        sx, sy = sp
+        ox, oy = op
+        mx, my = (sx + ox) / 2.0, (sy + oy) / 2.0
+        dx, dy = (ox - sx), (oy - sy)
+        norm = math.hypot(dx, dy) or 1.0
+        px, py = (-dy / norm), (dx / norm)
+
+        hpair = int(hashlib.md5(f"{s}|{o}".encode()).hexdigest()[:8], 16)
+        sign = -1.0 if (hpair % 2) == 0 else 1.0
+        base_off = sign * 26.0
+        step = 18.0
+        center = (float(len(rel_ids_sorted)) - 1.0) / 2.0
+        for i, rel_id in enumerate(rel_ids_sorted):
+            off = base_off + (float(i) - center) * step
+            pos[rel_id] = (mx + px * off, my + py * off)
+    return pos
+
+
+@dataclass
+class EvoFrameIndex:
+    """EE_EVO 帧索引：增量 + 周期关键帧，支持 O(delta) 定位任意帧。"""
+
+    frames: List[str] = field(default_factory=list)
+    deltas: List[Dict[str, List[str]]] = field(default_factory=list)
+    keyframes: Dict[int, List[str]] = field(default_factory=dict)
+    keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL
+    bucket_seconds: int = 0
+    positions: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+    relation_count: int = 0
+
+    @classmethod
+    def build(
+        cls,
+        nodes: List[Dict[str, Any]],
+        edges: List[Dict[str, Any]],
+        *,
+        max_frames: int = DEFAULT_MAX_FRAMES,
+        keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL,
+    ) -> "EvoFrameIndex":
+        rel_intervals = collect_relation_state_intervals(nodes)
+        frames, bucket_seconds = bucket_frames(rel_intervals, max_frames=max_frames)
+        deltas = build_deltas(frames, rel_intervals)
+        keyframe_interval = max(1, int(keyframe_interval))
+
+        keyframes: Dict[int, List[str]] = {}
+        active: Set[str] = set()
+        for i, d in enumerate(deltas):
+            active.update(d.get("enter") or [])
+            active.difference_update(d.get("exit") or [])
+            if i % keyframe_interval == 0:
+                keyframes[i] = sorted(active)
+
+        entity_ids = {
+            str(n.get("id")) for n in nodes if isinstance(n, dict) and str(n.get("type") or "") == "entity" and str(n.get("id") or "").strip()
+        }
+        pairs = relation_pairs(edges, set(rel_intervals.keys()), entity_ids)
+
+        return cls(
+            frames=[dt.astimezone(timezone.utc).isoformat() for dt in frames],
+            deltas=deltas,
+            keyframes=keyframes,
+            keyframe_interval=keyframe_interval,
+            bucket_seconds=int(bucket_seconds),
+            positions=compute_positions(sorted(entity_ids), pairs),
+            relation_count=len(rel_intervals),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "schema": FRAME_INDEX_SCHEMA,
+            "bucket_seconds": int(self.bucket_seconds),
+            "keyframe_interval": int(self.keyframe_interval),
+            "relation_count": int(self.relation_count),
+            "frames": list(self.frames),
+            "deltas": list(self.deltas),
+            "keyframes": {str(k): v for k, v in self.keyframes.items()},
+            "positions": {k: [round(float(x), 3), round(float(y), 3)] for k, (x, y) in self.positions.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Any) -> Optional["EvoFrameIndex"]:
+        """从快照中的 frame_index 还原；格式不符时返回 None（调用方回退到实时计算）。"""
+        if not isinstance(data, dict) or data.get("schema") != FRAME_INDEX_SCHEMA:
+            return None
+        frames = data.get("frames")
+        deltas = data.get("deltas")
+        if not isinstance(frames, list) or not isinstance(deltas, list) or len(frames) != len(deltas) or not frames:
+            return None
+        keyframes: Dict[int, List[str]] = {}
+        for k, v in (data.get("keyframes") or {}).items():
+            try:
+                keyframes[int(k)] = [str(x) for x in (v or [])]
+            except (TypeError, ValueError):
+                continue
+        if 0 not in keyframes:
+            return None
+        positions: Dict[str, Tuple[float, float]] = {}
+        for k, v in (data.get("positions") or {}).items():
+            if isinstance(v, (list, tuple)) and len(v) == 2:
+                positions[str(k)] = (float(v[0]), float(v[1]))
+        return cls(
+            frames=[str(x) for x in frames],
+            deltas=[d if isinstance(d, dict) else {} for d in deltas],
+            keyframes=keyframes,
+            keyframe_interval=max(1, int(data.get("keyframe_interval") or DEFAULT_KEYFRAME_INTERVAL)),
+            bucket_seconds=int(data.get("bucket_seconds") or 0),
+            positions=positions,
+            relation_count=int(data.get("relation_count") or 0),
+        )
+
+    def frame_datetimes(self) -> List[datetime]:
+        out: List[datetime] = []
+        for s in self.frames:
+            dt = parse_ts(s)
+            if dt is not None:
+                out.append(dt)
+        return out
+
+    def active_at(self, idx: int, *, cumulative: bool = False) -> Set[str]:
+        """
+        返回第 idx 帧的激活关系集合。
+
+        当前激活：最近关键帧 + 回放其后的增量（最多 keyframe_interval 帧）；
+        累积模式：第 0..idx 帧所有 enter 的并集。
+        """
+        if not self.deltas:
+            return set()
+        idx = max(0, min(int(idx), len(self.deltas) - 1))
+        if cumulative:
+            out: Set[str] = set()
+            for d in self.deltas[: idx + 1]:
+                out.update(d.get("enter") or [])
+            return out
+
+        k = (idx // self.keyframe_interval) * self.keyframe_interval
+        while k > 0 and k not in self.keyframes:
+            k -= self.keyframe_interval
+        active = set(self.keyframes.get(k) or [])
+        for d in self.deltas[k + 1 : idx + 1]:
+            active.update(d.get("enter") or [])
+            active.difference_update(d.get("exit") or [])
+        return active
@@ -7,6 +7,8 @@ from typing import Any, Dict, List, Optional, Tuple
 import os
 
 from ..infra.paths import tools as Tools
+from ..infra.serialization import write_json_atomic
+from .evo_frame_index import EvoFrameIndex
 from ..ports.kg_read_store import KGReadStore
 from ..ports.snapshot import SnapshotParams
 from ..adapters.sqlite.kg_read_store import SQLiteKGReadStore
@@ -566,7 +568,16 @@ class SnapshotService:
             if len(edges) >= int(params.max_edges):
                 break
 
-        return self._wrap_snapshot("EE_EVO", list(nodes.values()), edges[: params.max_edges], params)
+        snap = self._wrap_snapshot("EE_EVO", list(nodes.values()), edges[: params.max_edges], params)
+        frame_index = EvoFrameIndex.build(
+            snap["nodes"],
+            snap["edges"],
+            max_frames=int(params.evo_max_frames),
+            keyframe_interval=int(params.evo_keyframe_interval),
+        )
+        snap["meta"]["frame_count"] = len(frame_index.frames)
+        snap["frame_index"] = frame_index.to_dict()
+        return snap
 
     def build_event_evo(self, rows_entities: List[Dict[str, Any]], rows_events: List[Dict[str, Any]], rows_edges: List[Dict[str, Any]], rows_parts: List[Dict[str, Any]], params: SnapshotParams) -> Dict[str, Any]:
         entid_to_name, _ = self._load_entity_map_from_rows(rows_entities)
@@ -668,7 +679,7 @@ class SnapshotService:
         paths = {}
         for name, obj in [("GE", ge), ("GET", get), ("EE", ee), ("EE_EVO", ee_evo), ("EVENT_EVO", event_evo)]:
             p = self.out_dir / f"{name}.json"
-            p.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
+            write_json_atomic(p, obj)
             paths[name] = str(p)
 
         return {"status": "ok", "paths": paths}
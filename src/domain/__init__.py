@@ -4,6 +4,8 @@
 包含：
 - models: 核心领域模型（EntityMention/EventMention/EntityCanonical/EventCanonical/RelationTriple/EventEdge等）
 - rules: 业务规则接口（CandidateGenerator/Adjudicator/Applier/MentionResolver）
+- blocking: 分块候选生成（BlockingCandidateGenerator）
+- event_index: 实体 → 事件倒排索引（EntityEventIndex）
 
 原则：
 - 纯业务规则，不做 IO
@@ -80,6 +82,18 @@ from .rules import (
     validate_time_constraint,
 )
 
+from .blocking import (
+    BlockingCandidateGenerator,
+    bucket_events_sweep,
+    char_ngrams,
+    transliteration_key,
+)
+
+from .event_index import (
+    EntityEventIndex,
+    mentioned_entities,
+)
+
 __all__ = [
     # Models
     "SourceRef",
@@ -119,6 +133,14 @@ __all__ = [
     "merge_entity_sources",
     "merge_original_forms",
     "validate_time_constraint",
+    # Blocking
+    "BlockingCandidateGenerator",
+    "bucket_events_sweep",
+    "char_ngrams",
+    "transliteration_key",
+    # Event Index
+    "EntityEventIndex",
+    "mentioned_entities",
     # Data Pipeline
     "DataNormalizer",
     "DataPipeline",
@@ -0,0 +1,433 @@
+"""
+基于分块（Blocking）的候选生成器：CandidateGenerator 的近线性实现。
+
+两两比较所有实体是 O(n²)，在真实库上不可行。这里只为"可能相同"的实体生成候选对：
+- 精确键分块：归一化名称 / original_forms / 拼音（可选依赖 pypinyin）相同
+- 前缀分块：归一化名称前缀相同（Jaro-Winkler 等前缀敏感的相似度主要落在这里）
+- MinHash-LSH 分块：字符 n-gram 的 MinHash 签名按 band 分桶，Jaccard 相近的名称落入同桶
+
+只有落入同一分块的实体才会进入相似度打分；过大的分块（高频前缀/片段）直接跳过，
+保证候选规模与分块大小而不是实体总数的平方相关。
+"""
+from __future__ import annotations
+
+import zlib
+from datetime import timedelta
+from typing import AbstractSet, Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .models import EntityCanonical, EventCanonical
+from .rules import (
+    CandidateGenerator,
+    CandidateReason,
+    EntityMergeCandidatePair,
+    EventMergeCandidatePair,
+    compute_name_similarity,
+    normalize_entity_name,
+)
+
+try:
+    from pypinyin import lazy_pinyin
+    HAS_PYPINYIN = True
+except ImportError:
+    lazy_pinyin = None
+    HAS_PYPINYIN = False
+
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+
+
+def _has_cjk(text: str) -> bool:
+    return any('\u4e00' <= ch <= '\u9fff' for ch in text)
+
+
+def char_ngrams(text: str, n: int) -> Set[str]:
+    """带首尾标记的字符 n-gram；过短的字符串整体作为一个 shingle。"""
+    if not text:
+        return set()
+    padded = f"^{text}$"
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+def transliteration_key(name: str) -> str:
+    """中文名称的拼音键（未安装 pypinyin 时返回空字符串）。"""
+    if not HAS_PYPINYIN or not _has_cjk(name):
+        return ""
+    return normalize_entity_name("".join(lazy_pinyin(name)))
+
+
+class BlockingCandidateGenerator(CandidateGenerator):
+    """
+    分块候选生成器。
+
+    Args:
+        num_perm: MinHash 签名长度
+        bands: LSH band 数（num_perm 需能整除；band 越多召回越高、候选越多）
+        ngram_size: 拉丁字符 n-gram 长度
+        cjk_ngram_size: 含中日韩字符时的 n-gram 长度
+        prefix_len: 前缀分块长度（0 关闭）
+        max_block_size: 单个分块的成员上限，超过视为过于泛化而跳过
+        use_transliteration: 是否为中文名称生成拼音键
+        scorer: 候选对打分函数，默认 compute_name_similarity
+    """
+
+    def __init__(
+        self,
+        *,
+        num_perm: int = 32,
+        bands: int = 8,
+        ngram_size: int = 3,
+        cjk_ngram_size: int = 2,
+        prefix_len: int = 6,
+        max_block_size: int = 200,
+        use_transliteration: bool = True,
+        scorer: Optional[Callable[[str, str], float]] = None,
+        seed: int = 1,
+    ):
+        if num_perm % bands != 0:
+            raise ValueError(f"num_perm({num_perm}) 必须能被 bands({bands}) 整除")
+        self.num_perm = int(num_perm)
+        self.bands = int(bands)
+        self.rows = self.num_perm // self.bands
+        self.ngram_size = int(ngram_size)
+        self.cjk_ngram_size = int(cjk_ngram_size)
+        self.prefix_len = int(prefix_len)
+        self.max_block_size = int(max_block_size)
+        self.use_transliteration = bool(use_transliteration)
+        self.scorer = scorer or compute_name_similarity
+        rng = np.random.RandomState(seed)
+        self._perm_a = rng.randint(1, 2 ** 31 - 1, size=self.num_perm).astype(np.uint64)
+        self._perm_b = rng.randint(0, 2 ** 31 - 1, size=self.num_perm).astype(np.uint64)
+
+    # -------------------------
+    # 分块键
+    # -------------------------
+    def exact_keys(self, name: str, forms: Iterable[str] = ()) -> Set[str]:
+        """名称、原始形式与拼音的归一化精确键。"""
+        keys: Set[str] = set()
+        for text in [name, *forms]:
+            if not isinstance(text, str) or not text.strip():
+                continue
+            key = normalize_entity_name(text)
+            if key:
+                keys.add(key)
+            if self.use_transliteration:
+                py = transliteration_key(text)
+                if py:
+                    keys.add(py)
+        return keys
+
+    def minhash(self, text: str) -> Optional[np.ndarray]:
+        norm = normalize_entity_name(text)
+        n = self.cjk_ngram_size if _has_cjk(norm) else self.ngram_size
+        shingles = char_ngrams(norm, n)
+        if not shingles:
+            return None
+        h = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+        phv = (self._perm_a[:, None] * h[None, :] + self._perm_b[:, None]) % _MERSENNE_PRIME
+        return phv.min(axis=1)
+
+    def _blocks(self, records: Mapping[str, Iterable[str]]) -> Tuple[List[str], Dict[Tuple[Any, ...], List[int]]]:
+        names = list(records.keys())
+        blocks: Dict[Tuple[Any, ...], List[int]] = {}
+        for idx, name in enumerate(names):
+            for key in self.exact_keys(name, records.get(name) or ()):
+                blocks.setdefault(("exact", key), []).append(idx)
+            norm = normalize_entity_name(name)
+            if self.prefix_len > 0 and len(norm) >= self.prefix_len:
+                blocks.setdefault(("prefix", norm[: self.prefix_len]), []).append(idx)
+            sig = self.minhash(name)
+            if sig is None:
+                continue
+            for band in range(self.bands):
+                chunk = sig[band * self.rows:(band + 1) * self.rows].tobytes()
+                blocks.setdefault(("lsh", band, chunk), []).append(idx)
+        return names, blocks
+
+    def candidate_index_pairs(
+        self,
+        records: Mapping[str, Iterable[str]],
+        focus: Optional[AbstractSet[str]] = None,
+    ) -> Tuple[List[str], Dict[Tuple[int, int], bool]]:
+        """
+        返回 (names, {(i, j): exact})，i < j；exact 表示两者共享精确键。
+
+        focus 若提供，只保留至少一端在 focus 中的候选对（增量场景：新记录对全量分块索引查询）。
+        """
+        names, blocks = self._blocks(records)
+        focused = None if focus is None else {i for i, n in enumerate(names) if n in focus}
+        pairs: Dict[Tuple[int, int], bool] = {}
+        for key, members in blocks.items():
+            uniq = sorted(set(members))
+            if len(uniq) < 2 or len(uniq) > self.max_block_size:
+                continue
+            exact = key[0] == "exact"
+            for x in range(len(uniq)):
+                x_in = focused is None or uniq[x] in focused
+                for y in range(x + 1, len(uniq)):
+                    if not x_in and uniq[y] not in focused:
+                        continue
+                    k = (uniq[x], uniq[y])
+                    pairs[k] = exact or pairs.get(k, False)
+        return names, pairs
+
+    # -------------------------
+    # 候选对
+    # -------------------------
+    def generate_pairs(
+        self,
+        records: Mapping[str, Iterable[str]],
+        *,
+        min_similarity: float,
+        max_pairs: Optional[int] = None,
+        scorer: Optional[Callable[[str, str], float]] = None,
+        batch_scorer: Optional[Callable[[List[Tuple[str, str]]], Sequence[float]]] = None,
+        focus: Optional[AbstractSet[str]] = None,
+    ) -> List[EntityMergeCandidatePair]:
+        """
+        对 {name: original_forms} 生成候选对，按相似度降序。
+
+        共享精确键的实体对直接以 1.0 入选（理由 original_forms_match），
+        其余候选对需相似度 >= min_similarity。
+        batch_scorer 若提供，则一次性对全部非精确候选对打分（优先于 scorer）。
+        focus 见 candidate_index_pairs。
+        """
+        score_fn = scorer or self.scorer
+        names, pairs = self.candidate_index_pairs(records, focus)
+        out: List[EntityMergeCandidatePair] = []
+        to_score: List[Tuple[str, str]] = []
+        for (i, j), exact in sorted(pairs.items()):
+            a, b = names[i], names[j]
+            if exact:
+                out.append(EntityMergeCandidatePair(a, b, 1.0, CandidateReason.ORIGINAL_FORMS_MATCH))
+            else:
+                to_score.append((a, b))
+        if batch_scorer is not None:
+            scores = [float(x) for x in batch_scorer(to_score)] if to_score else []
+        else:
+            scores = [float(score_fn(a, b)) for a, b in to_score]
+        for (a, b), sim in zip(to_score, scores):
+            if sim >= float(min_similarity):
+                out.append(EntityMergeCandidatePair(a, b, sim, CandidateReason.NAME_SIMILARITY))
+        out.sort(key=lambda p: p.similarity, reverse=True)
+        if max_pairs is not None:
+            out = out[: int(max_pairs)]
+        return out
+
+    @staticmethod
+    def group_pairs(names: List[str], pairs: Iterable[EntityMergeCandidatePair]) -> List[List[str]]:
+        """
+        星型聚类：按 names 顺序，每个未分组实体与其尚未分组的候选邻居成组（不做传递闭包）。
+        """
+        adj: Dict[str, Set[str]] = {}
+        for p in pairs:
+            adj.setdefault(p.entity_a, set()).add(p.entity_b)
+            adj.setdefault(p.entity_b, set()).add(p.entity_a)
+        order = {n: i for i, n in enumerate(names)}
+        used: Set[str] = set()
+        groups: List[List[str]] = []
+        for name in names:
+            if name in used or name not in adj:
+                continue
+            group = [name]
+            used.add(name)
+            for other in sorted(adj[name], key=lambda x: order.get(x, len(order))):
+                if other not in used and order.get(other, -1) > order[name]:
+                    group.append(other)
+                    used.add(other)
+            if len(group) > 1:
+                groups.append(group)
+        return groups
+
+    # -------------------------
+    # CandidateGenerator 接口
+    # -------------------------
+    def generate_entity_merge_candidates(
+        self,
+        entities: List[EntityCanonical],
+        min_similarity: float = 0.92,
+        max_pairs: int = 200,
+    ) -> List[EntityMergeCandidatePair]:
+        records = {e.name: list(e.original_forms or []) + list(e.aliases or []) for e in entities if e.name}
+        return self.generate_pairs(records, min_similarity=min_similarity, max_pairs=max_pairs)
+
+    def generate_event_merge_candidates(
+        self,
+        events: List[EventCanonical],
+        shared_entity_min: int = 2,
+        days_window: int = 14,
+        max_pairs: int = 200,
+    ) -> List[EventMergeCandidatePair]:
+        """以实体为分块键：只有共享实体的事件才会配对，过热实体（分块过大）跳过。"""
+        ent_blocks: Dict[str, List[int]] = {}
+        for idx, ev in enumerate(events):
+            for ent in set(ev.entities or []):
+                ent_blocks.setdefault(ent, []).append(idx)
+
+        shared: Dict[Tuple[int, int], int] = {}
+        for members in ent_blocks.values():
+            if len(members) < 2 or len(members) > self.max_block_size:
+                continue
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    k = (members[x], members[y]) if members[x] < members[y] else (members[y], members[x])
+                    shared[k] = shared.get(k, 0) + 1
+
+        window = timedelta(days=int(days_window)) if days_window and days_window > 0 else None
+        out: List[EventMergeCandidatePair] = []
+        for (i, j), cnt in shared.items():
+            if cnt < int(shared_entity_min):
+                continue
+            a, b = events[i], events[j]
+            hours: Optional[float] = None
+            if a.time and b.time:
+                delta = abs(a.time - b.time)
+                if window is not None and delta > window:
+                    continue
+                hours = delta.total_seconds() / 3600.0
+            out.append(
+                EventMergeCandidatePair(
+                    event_a_id=a.event_id,
+                    event_a_abstract=a.abstract,
+                    event_b_id=b.event_id,
+                    event_b_abstract=b.abstract,
+                    shared_entities=cnt,
+                    temporal_distance_hours=hours,
+                    reason=CandidateReason.SHARED_ENTITIES,
+                )
+            )
+        out.sort(key=lambda p: (-p.shared_entities, p.temporal_distance_hours if p.temporal_distance_hours is not None else float("inf")))
+        return out[: int(max_pairs)]
+
+
+# -------------------------
+# 事件分桶（扫描线）
+# -------------------------
+def bucket_events_sweep(
+    events: Iterable[Tuple[str, float, Iterable[str]]],
+    *,
+    window_sec: float,
+    min_entity_overlap: int,
+    max_bucket_size: int,
+) -> List[Dict[str, Any]]:
+    """
+    按时间窗口与实体交集分桶事件（扫描线 + 实体→开放桶倒排索引）。
+
+    events 为 (key, ts, entities)，ts<=0 表示时间缺失。语义与逐桶线性扫描一致：
+    事件按时间升序（缺失时间放末尾）依次放入"第一个"满足条件的桶——
+    未满 max_bucket_size、时间落在桶的 [min_time - window, max_time + window] 内、
+    且与桶实体交集 >= min_entity_overlap；否则新建桶。
+
+    有时间的事件按时间单调到达，桶一旦过期（max_time + window < ts）或装满便永久不可用，
+    因此只需在倒排索引中保留开放桶；每个事件只触达与其共享实体的开放桶。
+    时间缺失的事件不受时间窗约束，到达时对全部未满的桶重建一次索引。
+    """
+    import heapq
+
+    ordered = sorted(
+        ((key, float(ts or 0), set(ents or ())) for key, ts, ents in events),
+        key=lambda x: x[1] if x[1] > 0 else float("inf"),
+    )
+    max_size = int(max_bucket_size)
+    overlap = int(min_entity_overlap)
+
+    buckets: List[Dict[str, Any]] = []
+    closed: List[bool] = []              # 已满或已过期（不再出现在索引中）
+    ent_index: Dict[str, Set[int]] = {}  # 实体 -> 开放桶
+    open_heap: List[int] = []            # overlap<=0 时按创建顺序取第一个开放桶
+    expiry: List[Tuple[float, int]] = [] # (max_time + window, bucket)，惰性删除
+    timed_phase = True
+
+    def fits(bucket: Dict[str, Any], ts: float) -> bool:
+        if bucket["min_time"] and ts and ts < bucket["min_time"] - window_sec:
+            return False
+        if bucket["max_time"] and ts and ts > bucket["max_time"] + window_sec:
+            return False
+        return True
+
+    def close(bid: int) -> None:
+        if closed[bid]:
+            return
+        closed[bid] = True
+        for ent in buckets[bid]["entities"]:
+            members = ent_index.get(ent)
+            if members is not None:
+                members.discard(bid)
+                if not members:
+                    del ent_index[ent]
+
+    def register(bid: int, new_entities: Iterable[str]) -> None:
+        for ent in new_entities:
+            ent_index.setdefault(ent, set()).add(bid)
+
+    def reopen_all() -> None:
+        # 进入时间缺失阶段：过期桶重新可用（时间窗不再生效），只排除已满的桶
+        ent_index.clear()
+        open_heap.clear()
+        for bid, bucket in enumerate(buckets):
+            full = len(bucket["keys"]) >= max_size
+            closed[bid] = full
+            if not full:
+                register(bid, bucket["entities"])
+                open_heap.append(bid)
+        heapq.heapify(open_heap)
+
+    for key, ts, entities in ordered:
+        if timed_phase and ts <= 0:
+            timed_phase = False
+            reopen_all()
+
+        if timed_phase:
+            while expiry and expiry[0][0] < ts:
+                deadline, bid = heapq.heappop(expiry)
+                bucket = buckets[bid]
+                if not closed[bid] and bucket["max_time"] is not None and bucket["max_time"] + window_sec == deadline:
+                    close(bid)
+
+        target: Optional[int] = None
+        if overlap > 0:
+            if entities:
+                counts: Dict[int, int] = {}
+                for ent in entities:
+                    for bid in ent_index.get(ent, ()):
+                        counts[bid] = counts.get(bid, 0) + 1
+                for bid in sorted(b for b, c in counts.items() if c >= overlap):
+                    if not closed[bid] and fits(buckets[bid], ts):
+                        target = bid
+                        break
+        else:
+            while open_heap and closed[open_heap[0]]:
+                heapq.heappop(open_heap)
+            if timed_phase or not ts:
+                # 开放桶都在时间窗内（或事件无时间、不受时间窗约束）：取最早创建的开放桶
+                target = open_heap[0] if open_heap else None
+            else:
+                for bid in sorted(open_heap):
+                    if not closed[bid] and fits(buckets[bid], ts):
+                        target = bid
+                        break
+
+        if target is None:
+            target = len(buckets)
+            buckets.append({"keys": [], "entities": set(), "min_time": ts if ts else None, "max_time": ts if ts else None})
+            closed.append(False)
+            heapq.heappush(open_heap, target)
+
+        bucket = buckets[target]
+        bucket["keys"].append(key)
+        new_entities = entities - bucket["entities"]
+        bucket["entities"].update(entities)
+        if ts:
+            bucket["min_time"] = min(bucket["min_time"] or ts, ts)
+            bucket["max_time"] = max(bucket["max_time"] or ts, ts)
+        if len(bucket["keys"]) >= max_size:
+            close(target)
+            continue
+        register(target, new_entities)
+        if timed_phase and bucket["max_time"] is not None:
+            heapq.heappush(expiry, (bucket["max_time"] + window_sec, target))
+
+    return buckets
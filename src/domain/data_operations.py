@@ -272,8 +272,29 @@ def update_entities(entities: List[str], entities_original: List[str], source: s
         except Exception as e:
             _tools.log(f"SQLite实体写入失败: {e}")
 
+    if wrote_any:
+        _update_entity_vector_index(entities, entities_original)
+
     return wrote_any
 
+
+def _update_entity_vector_index(entities: List[str], entities_original: List[str]) -> None:
+    """增量更新实体向量索引（配置 entity_vector_index_enabled 开启时）"""
+    try:
+        from src.infra.vector_index import get_entity_vector_index, is_entity_vector_index_enabled
+        if not is_entity_vector_index_enabled():
+            return
+        from src.adapters.sqlite.store import canonical_entity_id
+
+        index = get_entity_vector_index()
+        for name, orig in zip(entities, entities_original):
+            n = (name or "").strip()
+            if n:
+                index.upsert_entity(canonical_entity_id(n), n, [orig], flush=False)
+        index.index.flush()
+    except Exception as e:
+        _tools.log(f"实体向量索引更新失败: {e}")
+
 def update_abstract_map(extracted_list: List[Dict[str, Any]], source: str, published_at: Optional[str] = None) -> bool:
     """
     更新事件映射，支持增量更新和数据合并
@@ -0,0 +1,105 @@
+"""
+实体 → 事件倒排索引。
+
+KnowledgeGraph 的内存图以 abstract 为键保存事件；证据收集、实体合并等操作原本需要扫描全部事件。
+这里按事件插入顺序为每个实体维护提及它的事件列表（entities / entity_roles / relations 主客体），
+查询只触达相关事件，且返回顺序与遍历 events 字典的顺序一致。
+
+索引允许"宽松"：被删除的事件惰性剔除；调用方读取事件时仍应以事件内容为准。
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from typing import Any, Dict, List, Mapping, Set
+
+
+def mentioned_entities(event: Mapping[str, Any]) -> Set[str]:
+    """事件中提及的实体：entities + entity_roles 的键 + relations 的主客体"""
+    out: Set[str] = set()
+    for ent in event.get("entities", []) or []:
+        if isinstance(ent, str) and ent:
+            out.add(ent)
+    roles = event.get("entity_roles", {})
+    if isinstance(roles, dict):
+        out.update(k for k in roles.keys() if isinstance(k, str) and k)
+    rels = event.get("relations", [])
+    if isinstance(rels, list):
+        for rel in rels:
+            if not isinstance(rel, dict):
+                continue
+            for field in ("subject", "object"):
+                v = rel.get(field, "")
+                if isinstance(v, str) and v.strip():
+                    out.add(v.strip())
+    return out
+
+
+class EntityEventIndex:
+    """
+    实体 → 事件列表（按事件插入顺序）。
+
+    - add_event: 新增或更新事件（已存在的事件保持原有顺序位置，只补充新提及的实体）
+    - remove_event: 删除事件（倒排表中惰性剔除）
+    - merge_entity: 实体合并后把 duplicate 的事件并入 primary
+    - events_for: 提及某实体的事件 abstract 列表
+    """
+
+    def __init__(self) -> None:
+        self._seq: Dict[str, int] = {}
+        self._by_seq: Dict[int, str] = {}
+        self._postings: Dict[str, List[int]] = {}
+        self._next = 0
+
+    @classmethod
+    def build(cls, events: Mapping[str, Mapping[str, Any]]) -> "EntityEventIndex":
+        index = cls()
+        for abstract, event in events.items():
+            seq = index._assign(abstract)
+            for ent in mentioned_entities(event):
+                index._postings.setdefault(ent, []).append(seq)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._seq)
+
+    def __contains__(self, abstract: object) -> bool:
+        return abstract in self._seq
+
+    def _assign(self, abstract: str) -> int:
+        seq = self._next
+        self._next += 1
+        self._seq[abstract] = seq
+        self._by_seq[seq] = abstract
+        return seq
+
+    def add_event(self, abstract: str, event: Mapping[str, Any]) -> None:
+        seq = self._seq.get(abstract)
+        if seq is None:
+            seq = self._assign(abstract)
+        for ent in mentioned_entities(event):
+            postings = self._postings.setdefault(ent, [])
+            pos = bisect_left(postings, seq)
+            if pos == len(postings) or postings[pos] != seq:
+                insort(postings, seq)
+
+    def remove_event(self, abstract: str) -> None:
+        seq = self._seq.pop(abstract, None)
+        if seq is not None:
+            self._by_seq.pop(seq, None)
+
+    def merge_entity(self, duplicate: str, primary: str) -> None:
+        if duplicate == primary:
+            return
+        dup = self._postings.pop(duplicate, None)
+        if not dup:
+            return
+        self._postings[primary] = sorted(set(self._postings.get(primary, [])).union(dup))
+
+    def events_for(self, entity: str) -> List[str]:
+        postings = self._postings.get(entity)
+        if not postings:
+            return []
+        live = [s for s in postings if s in self._by_seq]
+        if len(live) != len(postings):
+            self._postings[entity] = live
+        return [self._by_seq[s] for s in live]
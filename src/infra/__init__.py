@@ -96,6 +96,9 @@ from .serialization import (
     extract_json_from_llm_response,
     safe_json_loads,
     format_json_for_llm,
+    StreamingJsonWriter,
+    write_json_atomic,
+    write_jsonl_atomic,
 )
 
 # File Utils
@@ -174,6 +177,9 @@ __all__ = [
     "Serializer",
     "extract_json_from_llm_response",
     "safe_json_loads",
+    "StreamingJsonWriter",
+    "write_json_atomic",
+    "write_jsonl_atomic",
     "format_json_for_llm",
     # File Utils
     "ensure_dir",
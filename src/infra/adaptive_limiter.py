@@ -0,0 +1,301 @@
+"""
+自适应（AIMD）限速器
+
+RateLimiter 以 agent1_config 中固定的 rate_per_sec 放行请求：设低了浪费吞吐，设高了触发成片的 429。
+AdaptiveRateLimiter 在令牌桶之上按上游反馈调整速率：
+- 成功：加性增加，每个成功请求 rate += additive_step / max(1, rate)，即满负荷下每秒约增加 additive_step
+- 429 / 5xx / 超时：乘性减少 rate *= decrease_factor；cooldown_s 内只减一次，避免同一波错误把速率压到底
+- Retry-After：在给定秒数内暂停放行（acquire 等待到期）
+
+与 RateLimiter / TokenBucketRateLimiter 接口一致（acquire / acquire_async / try_acquire /
+get_rate_per_sec / set_rate_per_sec），可直接替换。
+按作用域（scope，如 "llm"、"gdelt"）共享：get_adaptive_limiter(scope) 是 provider 级限速器，
+child(key) 是其下按 key（LLM 客户端、API key）的限速器；key 上的 429 只影响该 key，5xx 与超时同时向上反馈到 provider。
+create_rate_limiter 按 rate_limiter_mode 返回限速器：fixed 为进程内 RateLimiter，adaptive 为作用域共享的自适应限速器，
+shared 为跨进程共享的 SQLite 令牌桶（见 shared_limiter）。
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+# 视为拥塞信号的 HTTP 状态码（429 之外的 5xx 由 is_congestion 判断）
+THROTTLE_STATUS = 429
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After 头（秒数形式）；无法解析时返回 None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def is_congestion(status: Optional[int] = None, timeout: bool = False) -> bool:
+    """429、5xx 与超时视为拥塞；其余错误（如 400/401）不调整速率"""
+    return bool(timeout) or status == THROTTLE_STATUS or (status is not None and 500 <= int(status) < 600)
+
+
+class AdaptiveRateLimiter:
+    """
+    AIMD 令牌桶限速器（线程安全，同步与异步共用）
+
+    Args:
+        rate_per_sec: 初始速率
+        min_rate: 速率下限（默认初始速率的 5%）
+        max_rate: 速率上限（默认初始速率的 4 倍）
+        additive_step: 加性增加步长（满负荷下每秒增加的 req/s，默认初始速率的 5%）
+        decrease_factor: 乘性减少系数
+        cooldown_s: 两次乘性减少的最小间隔
+        name: 名称（日志与统计用）
+        parent: provider 级限速器；5xx / 超时同时反馈给它
+        clock: 时钟（测试可注入）
+    """
+
+    def __init__(
+        self,
+        rate_per_sec: float,
+        *,
+        min_rate: Optional[float] = None,
+        max_rate: Optional[float] = None,
+        additive_step: Optional[float] = None,
+        decrease_factor: float = 0.5,
+        cooldown_s: float = 1.0,
+        name: str = "",
+        parent: Optional["AdaptiveRateLimiter"] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if rate_per_sec <= 0:
+            raise ValueError("rate_per_sec must be positive")
+        self.name = name
+        self.parent = parent
+        self.min_rate = float(min_rate) if min_rate else max(0.01, rate_per_sec * 0.05)
+        self.max_rate = float(max_rate) if max_rate else rate_per_sec * 4
+        self.additive_step = float(additive_step) if additive_step else max(0.01, rate_per_sec * 0.05)
+        self.decrease_factor = min(0.95, max(0.05, float(decrease_factor)))
+        self.cooldown_s = max(0.0, float(cooldown_s))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._rate = min(self.max_rate, max(self.min_rate, float(rate_per_sec)))
+        self._tokens = 1.0
+        self._last = clock()
+        self._blocked_until = 0.0
+        self._last_decrease = float("-inf")
+        self._children: Dict[str, AdaptiveRateLimiter] = {}
+        self.stats = {"acquired": 0, "successes": 0, "congestion": 0, "decreases": 0, "retry_after_waits": 0}
+
+    # ------------------------------------------------------------------ 令牌桶
+
+    def _refill(self, now: float) -> None:
+        burst = max(1.0, self._rate)
+        self._tokens = min(burst, self._tokens + (now - self._last) * self._rate)
+        self._last = now
+
+    def _reserve(self) -> float:
+        """尝试取一个令牌；返回需要等待的秒数（0 表示已取得）"""
+        with self._lock:
+            now = self._clock()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            self._refill(now)
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                self.stats["acquired"] += 1
+                return 0.0
+            return (1.0 - self._tokens) / self._rate
+
+    def acquire(self) -> None:
+        """同步获取令牌（阻塞）"""
+        while True:
+            wait = self._reserve()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """异步获取令牌"""
+        while True:
+            wait = self._reserve()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def try_acquire(self) -> bool:
+        """尝试获取令牌（非阻塞）"""
+        return self._reserve() <= 0
+
+    def get_rate_per_sec(self) -> float:
+        """获取当前速率"""
+        return self._rate
+
+    def set_rate_per_sec(self, rate_per_sec: float) -> None:
+        """设置当前速率（限制在 [min_rate, max_rate] 内）"""
+        with self._lock:
+            self._refill(self._clock())
+            self._rate = min(self.max_rate, max(self.min_rate, float(rate_per_sec)))
+
+    # 兼容 RateLimiter 的属性访问
+    @property
+    def rate_per_sec(self) -> float:
+        return self._rate
+
+    # ------------------------------------------------------------------ 反馈
+
+    def record_success(self) -> None:
+        """成功响应：加性增加"""
+        with self._lock:
+            self.stats["successes"] += 1
+            self._rate = min(self.max_rate, self._rate + self.additive_step / max(1.0, self._rate))
+
+    def record_failure(self, status: Optional[int] = None, retry_after: Optional[float] = None, timeout: bool = False) -> bool:
+        """
+        失败响应：拥塞信号（429 / 5xx / 超时）时乘性减少，并按 Retry-After 暂停放行。
+        5xx 与超时同时反馈给 parent。
+
+        Returns:
+            是否视为拥塞
+        """
+        if not is_congestion(status, timeout) and retry_after is None:
+            return False
+        with self._lock:
+            now = self._clock()
+            self.stats["congestion"] += 1
+            if now - self._last_decrease >= self.cooldown_s:
+                self._rate = max(self.min_rate, self._rate * self.decrease_factor)
+                self._last_decrease = now
+                self.stats["decreases"] += 1
+                # 降速后丢弃积攒的突发额度
+                self._tokens = min(self._tokens, 1.0)
+            if retry_after is not None and retry_after > 0:
+                self._blocked_until = max(self._blocked_until, now + float(retry_after))
+                self.stats["retry_after_waits"] += 1
+        if self.parent is not None and status != THROTTLE_STATUS and is_congestion(status, timeout):
+            self.parent.record_failure(status=status, timeout=timeout)
+        return True
+
+    def child(self, key: str) -> "AdaptiveRateLimiter":
+        """按 key 的下级限速器（共享同样的 AIMD 参数与初始速率）"""
+        with self._lock:
+            limiter = self._children.get(key)
+            if limiter is None:
+                limiter = self._children[key] = AdaptiveRateLimiter(
+                    self._rate,
+                    min_rate=self.min_rate,
+                    max_rate=self.max_rate,
+                    additive_step=self.additive_step,
+                    decrease_factor=self.decrease_factor,
+                    cooldown_s=self.cooldown_s,
+                    name=f"{self.name}:{key}",
+                    parent=self,
+                    clock=self._clock,
+                )
+            return limiter
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self.stats)
+            out["rate_per_sec"] = round(self._rate, 3)
+            out["blocked_for_s"] = round(max(0.0, self._blocked_until - self._clock()), 3)
+            children = list(self._children.items())
+        if children:
+            out["keys"] = {k: v.snapshot() for k, v in children}
+        return out
+
+
+_limiters: Dict[str, AdaptiveRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_adaptive_limiter(scope: str, rate_per_sec: Optional[float] = None) -> AdaptiveRateLimiter:
+    """
+    作用域内共享的 provider 级自适应限速器；首次创建时使用 rate_per_sec（默认 1.0），
+    之后的调用沿用已学习到的速率。
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(scope)
+        if limiter is None:
+            limiter = _limiters[scope] = AdaptiveRateLimiter(float(rate_per_sec or 1.0), name=scope)
+        return limiter
+
+
+RATE_LIMITER_MODES = ("fixed", "adaptive", "shared")
+
+
+def rate_limiter_mode() -> str:
+    """agent1_config.rate_limiter_mode：fixed（默认）| adaptive | shared"""
+    try:
+        from .config import get_config_manager
+        mode = get_config_manager().get_config_value("rate_limiter_mode", "fixed", "agent1_config")
+    except Exception:
+        return "fixed"
+    mode = str(mode or "").strip().lower()
+    return mode if mode in RATE_LIMITER_MODES else "fixed"
+
+
+def adaptive_limits_enabled() -> bool:
+    """agent1_config.rate_limiter_mode 为 adaptive 时启用"""
+    return rate_limiter_mode() == "adaptive"
+
+
+def create_rate_limiter(rate_per_sec: float, scope: str = "llm") -> Any:
+    """按配置返回固定速率的 RateLimiter、作用域共享的 AdaptiveRateLimiter 或跨进程的 SharedRateLimiter"""
+    mode = rate_limiter_mode()
+    if mode == "adaptive":
+        return get_adaptive_limiter(scope, rate_per_sec)
+    if mode == "shared":
+        from .shared_limiter import get_shared_limiter
+        return get_shared_limiter(scope, rate_per_sec)
+    from .async_utils import RateLimiter
+    return RateLimiter(rate_per_sec)
+
+
+def configured_rate_limiter(scope: str, rate_key: str, default_rate: float) -> Optional[Any]:
+    """
+    adaptive / shared 模式下返回作用域共享的限速器（初始速率读 agent1_config.<rate_key>），
+    fixed 模式下返回 None（保持调用方原有的不限速行为）
+    """
+    mode = rate_limiter_mode()
+    if mode == "fixed":
+        return None
+    try:
+        from .config import get_config_manager
+        rate = float(get_config_manager().get_config_value(rate_key, default_rate, "agent1_config"))
+    except Exception:
+        rate = default_rate
+    rate = rate if rate > 0 else default_rate
+    if mode == "shared":
+        from .shared_limiter import get_shared_limiter
+        return get_shared_limiter(scope, rate)
+    return get_adaptive_limiter(scope, rate)
+
+
+def key_limiter(scope: str, key: str) -> Optional[AdaptiveRateLimiter]:
+    """作用域已有自适应限速器时返回 key 级限速器，否则 None"""
+    limiter = _limiters.get(scope)
+    return limiter.child(key) if limiter is not None else None
+
+
+def report_outcome(
+    scope: str,
+    key: Optional[str] = None,
+    *,
+    ok: bool,
+    status: Optional[int] = None,
+    retry_after: Optional[float] = None,
+    timeout: bool = False,
+) -> None:
+    """向作用域（及其 key）的自适应限速器反馈一次请求结果；作用域未启用时忽略"""
+    limiter = _limiters.get(scope)
+    if limiter is None:
+        return
+    target = limiter.child(key) if key else limiter
+    if ok:
+        target.record_success()
+        if key:
+            limiter.record_success()
+    else:
+        target.record_failure(status=status, retry_after=retry_after, timeout=timeout)
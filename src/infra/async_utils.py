@@ -6,10 +6,12 @@
 """
 
 import asyncio
+import functools
+import textwrap
 import threading
 import time
 import logging
-from typing import List, Any, Optional, Callable, Awaitable, TypeVar, TYPE_CHECKING
+from typing import Dict, List, Any, Optional, Callable, Awaitable, TypeVar, TYPE_CHECKING, AsyncIterator, Iterable, Tuple
 
 if TYPE_CHECKING:
     from typing import TypeVar as TTypeVar
@@ -25,6 +27,50 @@ class AsyncExecutor:
         self.max_concurrent = max_concurrent
         self.logger: logging.Logger = logger or logging.getLogger(__name__)
 
+    async def as_completed(
+        self,
+        items: Iterable[Any],
+        func: Callable[[Any], Awaitable[Any]],
+        concurrency: int = 6,
+    ) -> AsyncIterator[Tuple[int, Any]]:
+        """
+        有界窗口的流式 as_completed：按需从 items 取任务，同时在途的协程不超过 concurrency 个，
+        每完成一个就产出 (下标, 结果)。内存占用与在途数而非任务总数成正比；items 可以是生成器。
+
+        任一任务抛出异常时向调用方抛出，并取消其余在途任务；调用方提前结束迭代时同样取消。
+        """
+        window = max(1, int(concurrency))
+        source = enumerate(items)
+        pending: Dict["asyncio.Future[Any]", int] = {}
+
+        def fill() -> None:
+            while len(pending) < window:
+                try:
+                    index, item = next(source)
+                except StopIteration:
+                    return
+                pending[asyncio.ensure_future(func(item))] = index
+
+        try:
+            fill()
+            while pending:
+                done, _ = await asyncio.wait(list(pending), return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=pending.__getitem__):
+                    yield pending[task], task.result()
+                    del pending[task]
+                fill()
+        finally:
+            # 取消在途任务；已完成但未取走的任务在 gather 中取出异常，避免 "exception was never retrieved"
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def run_in_thread(self, func: Callable[..., T], *args: Any, executor: Optional[Any] = None, **kwargs: Any) -> T:
+        """在线程池中执行同步函数并等待结果，不阻塞事件循环"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
     async def run_concurrent_tasks(
         self,
         tasks: List[Callable[[], Awaitable[Any]]],
@@ -32,29 +78,30 @@ class AsyncExecutor:
         semaphore: Optional[asyncio.Semaphore] = None
     ) -> List[Any]:
         """
-        并发执行异步任务
+        并发执行异步任务（按 concurrency 有界窗口创建协程，不预先创建全部协程）
 
         Args:
             tasks: 异步任务函数列表，每个函数应是 () -> Awaitable[Any]
             concurrency: 最大并发数
-            semaphore: 可选的信号量，如果不提供则自动创建
+            semaphore: 可选的信号量（与其他调用共享的并发上限）
 
         Returns:
-            任务结果列表
+            任务结果列表（与 tasks 顺序一致）
         """
-        if not semaphore:
-            semaphore = asyncio.Semaphore(concurrency)
-
         async def run_task(task_func):
-            async with semaphore:
-                try:
+            try:
+                if semaphore is None:
                     return await task_func()
-                except Exception as e:
-                    self.logger.error(f"Task execution failed: {e}")
-                    raise
+                async with semaphore:
+                    return await task_func()
+            except Exception as e:
+                self.logger.error(f"Task execution failed: {e}")
+                raise
 
+        results: List[Any] = [None] * len(tasks)
         try:
-            results = await asyncio.gather(*[run_task(task) for task in tasks])
+            async for index, result in self.as_completed(tasks, run_task, concurrency=concurrency):
+                results[index] = result
             self.logger.debug(f"Successfully executed {len(tasks)} concurrent tasks")
             return results
         except Exception as e:
@@ -119,6 +166,45 @@ class AsyncExecutor:
         return results
 
 
+    async def run_threaded_tasks_async(
+        self,
+        tasks: Iterable[Any],
+        func: Callable,
+        max_workers: int = 4
+    ) -> List[Any]:
+        """
+        run_threaded_tasks 的非阻塞版本：任务在线程池中执行，事件循环只 await 结果；
+        同时提交的任务不超过 max_workers 个。
+
+        Args:
+            tasks: 任务参数（可迭代，可以是生成器）
+            func: 处理函数
+            max_workers: 最大工作线程数
+
+        Returns:
+            任务结果列表（与 tasks 顺序一致）
+        """
+        import concurrent.futures
+
+        results: Dict[int, Any] = {}
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, int(max_workers)))
+        try:
+            async for index, result in self.as_completed(
+                tasks, lambda task: self.run_in_thread(func, task, executor=executor), concurrency=max_workers
+            ):
+                results[index] = result
+        except BaseException as e:
+            # 不在事件循环里等待仍在运行的线程：丢弃排队任务，运行中的在后台结束
+            executor.shutdown(wait=False, cancel_futures=True)
+            if isinstance(e, Exception):
+                self.logger.error(f"Threaded task failed: {e}")
+            raise
+        executor.shutdown(wait=False)
+
+        self.logger.debug(f"Successfully executed {len(results)} threaded tasks")
+        return [results[i] for i in range(len(results))]
+
+
 class RateLimiter:
     """令牌桶限速器"""
 
@@ -202,13 +288,37 @@ class RateLimiter:
             self.max_tokens = rate_per_sec * 2
 
 
+def is_json_response(text: str) -> bool:
+    """LLM 响应中能否解析出 JSON 对象（对冲请求的默认有效性判定）"""
+    from .serialization import extract_json_from_llm_response
+    try:
+        extract_json_from_llm_response(text)
+        return True
+    except Exception:
+        return False
+
+
+def _observe_usage(prompt: str, response: Any) -> None:
+    """用响应 usage 中的 prompt_tokens 校准 token 估计（见 prompt_budget）"""
+    usage = getattr(response, "usage", None)
+    if not usage:
+        return
+    try:
+        from .prompt_budget import observe_prompt_usage
+        observe_prompt_usage(prompt, usage)
+    except Exception:
+        pass
+
+
 def call_llm_with_retry(
     llm_pool,  # LLMAPIPool
     prompt: str,
     max_tokens: int = 4000,
     timeout: int = 60,
     retries: int = 2,
-    limiter: Optional[RateLimiter] = None
+    limiter: Optional[RateLimiter] = None,
+    hedge: bool = True,
+    validate: Optional[Callable[[str], bool]] = None
 ) -> Optional[str]:
     """
     统一的LLM调用，带重试和限流
@@ -220,6 +330,8 @@ def call_llm_with_retry(
         timeout: 超时时间（秒）
         retries: 重试次数
         limiter: 速率限制器
+        hedge: 池启用对冲（llm_hedging_enabled）时是否允许对冲本次请求
+        validate: 对冲竞速中判定响应有效的函数，默认要求可解析出 JSON
 
     Returns:
         LLM响应文本，失败时返回None
@@ -238,7 +350,12 @@ def call_llm_with_retry(
             timeout_seconds=timeout,
             retries=retries
         )
-        response = llm_pool.call(prompt=prompt, config=config)
+        if hedge and hasattr(llm_pool, "call_hedged"):
+            response = llm_pool.call_hedged(prompt=prompt, config=config, validate=validate or is_json_response)
+        else:
+            response = llm_pool.call(prompt=prompt, config=config)
+        if response.success:
+            _observe_usage(prompt, response)
         return response.content if response.success else None
     except Exception as e:
         import logging
@@ -246,26 +363,55 @@ def call_llm_with_retry(
         return None
 
 
-def create_extraction_prompt(
-    title: str,
-    content: str,
-    entity_definitions: str,
-    reported_at: Optional[str] = None
-) -> str:
+async def call_llm_with_retry_async(
+    llm_pool,
+    prompt: str,
+    max_tokens: int = 4000,
+    timeout: int = 60,
+    retries: int = 2,
+    limiter: Optional[RateLimiter] = None,
+    hedge: bool = True,
+    validate: Optional[Callable[[str], bool]] = None
+) -> Optional[str]:
     """
-    创建实体提取提示
+    call_llm_with_retry 的异步版本
 
-    Args:
-        title: 新闻标题
-        content: 新闻内容
-        entity_definitions: 实体定义文本
-        reported_at: 报导时间/发布时间（若可用，用于将"昨天/周三"等相对时间换算为更精确的事件起始时间）
-
-    Returns:
-        完整的提示文本
+    LLM 池提供 call_async 时直接 await（原生异步传输，不占线程）；否则在线程池中执行同步 call。
+    对冲参数同 call_llm_with_retry。取消会向上传播，其余异常记录后返回 None。
     """
-    reported_at_line = f"报导时间（reported_at）：{reported_at}" if reported_at else "报导时间（reported_at）：（未知）"
+    if llm_pool is None:
+        return None
+
+    if limiter:
+        await limiter.acquire_async()
 
+    try:
+        from ..ports.llm_client import LLMCallConfig
+        config = LLMCallConfig(
+            max_tokens=max_tokens,
+            timeout_seconds=timeout,
+            retries=retries
+        )
+        if hedge and hasattr(llm_pool, "call_hedged_async"):
+            response = await llm_pool.call_hedged_async(prompt, config, validate or is_json_response)
+        elif hasattr(llm_pool, "call_async"):
+            response = await llm_pool.call_async(prompt, config)
+        else:
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(None, lambda: llm_pool.call(prompt=prompt, config=config))
+        if response.success:
+            _observe_usage(prompt, response)
+        return response.content if response.success else None
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        import logging
+        logging.exception(f"[LLM] 异步调用失败: {e}")
+        return None
+
+
+def _extraction_instructions(entity_definitions: str) -> str:
+    """抽取提示的角色、实体定义与实体输出约束（单篇与多篇抽取共用）"""
     return f"""你是一名专业的金融与法律信息结构化专家。请从以下新闻中提取所有**真实存在的、具有法律人格或行政职能的实体**，并结构化为事件。
 
 【实体定义】
@@ -277,11 +423,11 @@ def create_extraction_prompt(
 3. 若同一主体出现多种表述，entities 用你认为最规范、最不易歧义的主名称；entities_original 用对应的原文表述逐一对齐。
 4. 不要输出泛称、代词、集合性称呼、匿名指代（如“消息人士”“监管机构”“某公司”）。
 
-【时间基准】
-{reported_at_line}
-说明：若新闻中出现"昨日/周三/本月/上周"等相对时间，请尽可能结合 reported_at 换算为更精确的事件起始时间（event_start_time）。无法换算则保留原文片段并标注精度。
+"""
+
 
-【任务要求】
+# 任务要求与摘要规则（单篇与多篇抽取共用）
+_EXTRACTION_TASK_RULES = """【任务要求】
 1. 判断新闻是否包含一个或多个独立事件，若包含多个事件，则需要将每个事件分开提取。
 2. 对每个事件，输出：
    - 一个简洁、客观、无情绪的中文摘要（作为事件唯一标识）
@@ -293,11 +439,11 @@ def create_extraction_prompt(
    - 所有符合上述定义的实体（全称优先，避免缩写；若修饰词使其特化职能，则保留修饰词作为实体名）
    - 所有符合上述定义的实体的原始语言表述
    - 实体在事件中的语义角色 entity_roles：一个 JSON 对象，key 必须严格来自 entities 列表中的实体字符串，value 为该实体在本事件中的角色列表（中文短语，允许多角色）。示例：
-     {{
+     {
        "英国安全大臣": ["发言方","政府回应方"],
        "军情五处": ["情报警告方"],
        "中国": ["被指控方"]
-     }}
+     }
    - 实体关系三元组 relations：列表形式的 (实体, 关系, 实体)。要求：
      * subject/object 必须严格来自 entities 列表（不要造新实体名）
      * predicate 用中文动词短语或关系短语，方向明确（例如"公开指责""警告""制裁""批准""起诉""收购""合作""调查""宣布""否认""回应"）
@@ -329,11 +475,10 @@ abstract 用作事件的“主事件名/唯一标识”，需满足：
 - ❌ “市场出现波动”
 - ❌ “最新进展：相关人士回应”
 
-【输出格式】
-严格返回 JSON，不要任何额外文本：
-{{
-  "events": [
-    {{
+"""
+
+# 单个事件的输出结构（缩进与单篇输出格式中的位置一致）
+_EXTRACTION_EVENT_SCHEMA = """    {
       "abstract": "事件摘要",
       "event_types": ["类型1", "类型2"],
       "event_start_time": "2025-12-18T12:34:56+08:00",
@@ -341,18 +486,131 @@ abstract 用作事件的“主事件名/唯一标识”，需满足：
       "event_start_time_precision": "exact",
       "entities": ["实体1", "实体2"],
       "entities_original": ["原始表述1", "原始表述2"],
-      "entity_roles": {{"实体1": ["角色1"], "实体2": ["角色2"]}},
+      "entity_roles": {"实体1": ["角色1"], "实体2": ["角色2"]},
       "relations": [
-        {{"subject": "实体1", "predicate": "关系", "object": "实体2", "relation_kind": "state", "evidence": "原文支撑片段"}}
+        {"subject": "实体1", "predicate": "关系", "object": "实体2", "relation_kind": "state", "evidence": "原文支撑片段"}
       ],
       "event_summary": "事件描述"
-    }}
-  ]
-}}
+    }"""
+
+
+def _entity_hints_block(entity_hints: Optional[List[str]]) -> str:
+    if not entity_hints:
+        return ""
+    return (
+        "【已知实体提示】\n"
+        "以下实体已在实体库中，且其名称或别名出现在本文中。若本文事件涉及它们，entities 请使用这里的规范名称；"
+        "提示不完整，也不代表本文一定涉及，不要因此虚构新闻中没有的实体：\n"
+        + "、".join(entity_hints)
+        + "\n\n"
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def extraction_prompt_prefix(entity_definitions: str) -> str:
+    """
+    单篇抽取提示的静态前缀（角色、实体定义、任务规则、输出格式）
+
+    不含任何与单篇新闻相关的内容，逐字节稳定：OpenAI/DeepSeek 等服务商的自动前缀缓存可跨请求复用。
+    """
+    return (
+        _extraction_instructions(entity_definitions)
+        + """【时间基准】
+新闻前给出报导时间（reported_at）。若新闻中出现"昨日/周三/本月/上周"等相对时间，请尽可能结合 reported_at 换算为更精确的事件起始时间（event_start_time）。无法换算则保留原文片段并标注精度。
 
-【新闻】
+"""
+        + _EXTRACTION_TASK_RULES
+        + "【输出格式】\n严格返回 JSON，不要任何额外文本：\n{\n  \"events\": [\n"
+        + _EXTRACTION_EVENT_SCHEMA
+        + "\n  ]\n}\n\n"
+    )
+
+
+def extraction_prompt_suffix(
+    title: str,
+    content: str,
+    reported_at: Optional[str] = None,
+    entity_hints: Optional[List[str]] = None,
+) -> str:
+    """单篇抽取提示中随新闻变化的后缀（实体提示、报导时间、标题与正文）"""
+    reported_at_line = f"报导时间（reported_at）：{reported_at}" if reported_at else "报导时间（reported_at）：（未知）"
+    return (
+        _entity_hints_block(entity_hints)
+        + f"""【新闻】
+{reported_at_line}
 标题：{title}
 正文：{content}"""
+    )
+
+
+def create_extraction_prompt(
+    title: str,
+    content: str,
+    entity_definitions: str,
+    reported_at: Optional[str] = None,
+    entity_hints: Optional[List[str]] = None,
+) -> str:
+    """
+    创建实体提取提示：extraction_prompt_prefix + extraction_prompt_suffix
+
+    Args:
+        title: 新闻标题
+        content: 新闻内容
+        entity_definitions: 实体定义文本
+        reported_at: 报导时间/发布时间（若可用，用于将"昨天/周三"等相对时间换算为更精确的事件起始时间）
+        entity_hints: 相关性预过滤命中的已知实体（规范名称），附加为提示
+
+    Returns:
+        完整的提示文本
+    """
+    return extraction_prompt_prefix(entity_definitions) + extraction_prompt_suffix(title, content, reported_at, entity_hints)
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略 token 估计（用于打包预算）：CJK 字符约 1 token/字，其余约 4 字符/token"""
+    if not text:
+        return 0
+    cjk = sum(1 for ch in text if "\u3000" <= ch <= "\u9fff" or "\uac00" <= ch <= "\ud7af" or "\uff00" <= ch <= "\uffef")
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def create_batch_extraction_prompt(articles: List[Dict[str, Any]], entity_definitions: str) -> str:
+    """
+    创建多篇新闻合并抽取的提示
+
+    Args:
+        articles: [{"id", "title", "content", "reported_at", "entity_hints"(可选)}]，id 在本批内唯一
+        entity_definitions: 实体定义文本
+
+    Returns:
+        完整的提示文本；响应按 {"articles": [{"id", "events"}]} 分篇返回
+    """
+    blocks = []
+    for a in articles:
+        reported_at = a.get("reported_at") or "（未知）"
+        hints = f"已知实体提示：{'、'.join(a['entity_hints'])}\n" if a.get("entity_hints") else ""
+        blocks.append(
+            f"### 新闻 id={a['id']}\n报导时间（reported_at）：{reported_at}\n{hints}"
+            f"标题：{a.get('title', '')}\n正文：{a.get('content', '')}"
+        )
+    return (
+        _extraction_instructions(entity_definitions)
+        + """【多篇新闻】
+下面有多篇相互独立的新闻，每篇以“### 新闻 id=...”开头。请逐篇独立抽取：事件、实体与关系只能来自该篇新闻本身，不要跨篇合并。
+
+【时间基准】
+每篇新闻单独给出报导时间（reported_at）。若新闻中出现"昨日/周三/本月/上周"等相对时间，请结合该篇的 reported_at 换算为更精确的事件起始时间（event_start_time）。无法换算则保留原文片段并标注精度。
+
+"""
+        + ("部分新闻附有“已知实体提示”：这些实体已在实体库中且出现在该篇中，涉及时 entities 请使用提示中的规范名称，不要因此虚构实体。\n\n"
+           if any(a.get("entity_hints") for a in articles) else "")
+        + _EXTRACTION_TASK_RULES
+        + "【输出格式】\n严格返回 JSON，不要任何额外文本。articles 中每篇新闻恰好出现一次，id 原样照抄；没有事件的新闻 events 为空列表：\n"
+        + "{\n  \"articles\": [\n    {\n      \"id\": \"新闻 id\",\n      \"events\": [\n"
+        + textwrap.indent(_EXTRACTION_EVENT_SCHEMA, "    ")
+        + "\n      ]\n    }\n  ]\n}\n\n【新闻列表】\n"
+        + "\n\n".join(blocks)
+    )
 
 
 def create_deduplication_prompt(entities_batch: list, evidence_map: dict) -> str:
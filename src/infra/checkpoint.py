@@ -0,0 +1,180 @@
+"""
+文章级处理检查点
+
+process_news_pipeline 原先只在全部文件处理完后一次性写入 processed_ids，中途崩溃会丢失全部进度，
+重启后每篇文章都要重新请求 LLM。这里把每篇文章的抽取结果在完成时写入 SQLite 检查点
+（默认 data/cache/checkpoints.sqlite）：
+- ArticleCheckpoint：按 run_key（如待处理文件名）保存 article_id → 结果，支持加载、批量写入与清理
+- CheckpointWriter：异步组提交。record() 把结果放入缓冲区，由单个写入任务在线程池中一次事务写入
+  当前缓冲的全部结果；record() 在所属批次提交后才返回，因此“已完成”的文章一定已落盘，
+  并发抽取时多篇文章共用一次提交
+
+重启时按 run_key 加载已完成的文章并跳过其 LLM 调用。结果应用到主存储、记录 processed_ids 后再 clear()。
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class ArticleCheckpoint:
+    """
+    文章检查点存储。
+
+    Args:
+        db_path: SQLite 文件；None 时仅内存
+        now: 时钟（测试可注入）
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, *, now: Callable[[], float] = time.time) -> None:
+        self.db_path = Path(db_path) if db_path else None
+        self._now = now
+        self._lock = threading.RLock()
+        self.stats = {"writes": 0, "commits": 0, "loaded": 0}
+        if self.db_path is not None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path) if self.db_path else ":memory:", check_same_thread=False)
+        with self._lock:
+            if self.db_path is not None:
+                self._conn.execute("PRAGMA journal_mode=WAL;")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS article_checkpoints (
+                    run_key TEXT NOT NULL,
+                    article_id TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (run_key, article_id)
+                ) WITHOUT ROWID
+                """
+            )
+            self._conn.commit()
+
+    def save_many(self, run_key: str, items: Iterable[Tuple[str, Any]]) -> int:
+        """在一个事务中写入 (article_id, result)；返回写入条数"""
+        ts = self._now()
+        rows = [(run_key, str(aid), json.dumps(result, ensure_ascii=False), ts) for aid, result in items]
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO article_checkpoints(run_key, article_id, result, updated_at) VALUES(?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            self.stats["writes"] += len(rows)
+            self.stats["commits"] += 1
+        return len(rows)
+
+    def load(self, run_key: str) -> Dict[str, Any]:
+        """run_key 下已完成的文章：article_id → result"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT article_id, result FROM article_checkpoints WHERE run_key=?", (run_key,)
+            ).fetchall()
+        out = {}
+        for aid, value in rows:
+            try:
+                out[aid] = json.loads(value)
+            except Exception:
+                continue
+        self.stats["loaded"] += len(out)
+        return out
+
+    def clear(self, run_key: str) -> int:
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM article_checkpoints WHERE run_key=?", (run_key,))
+            self._conn.commit()
+            return int(cur.rowcount or 0)
+
+    def run_keys(self) -> List[str]:
+        with self._lock:
+            return [r[0] for r in self._conn.execute("SELECT DISTINCT run_key FROM article_checkpoints")]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CheckpointWriter:
+    """
+    单个 run_key 的异步组提交写入器。
+
+    Args:
+        checkpoint: 检查点存储
+        run_key: 本次运行的键
+        max_batch: 单次提交的最大条数
+    """
+
+    def __init__(self, checkpoint: ArticleCheckpoint, run_key: str, max_batch: int = 200) -> None:
+        self.checkpoint = checkpoint
+        self.run_key = run_key
+        self.max_batch = max(1, int(max_batch))
+        self._pending: List[Tuple[str, Any, asyncio.Future]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    def _ensure_task(self) -> None:
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+
+    async def record(self, article_id: str, result: Any) -> None:
+        """缓冲一条结果，在所属批次提交后返回（提交失败时抛出异常）"""
+        if self._closed:
+            raise RuntimeError("CheckpointWriter is closed")
+        self._ensure_task()
+        fut = asyncio.get_running_loop().create_future()
+        self._pending.append((article_id, result, fut))
+        self._wakeup.set()
+        await asyncio.shield(fut)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._pending:
+                batch, self._pending = self._pending[: self.max_batch], self._pending[self.max_batch:]
+                items = [(aid, result) for aid, result, _ in batch]
+                try:
+                    await loop.run_in_executor(None, self.checkpoint.save_many, self.run_key, items)
+                except Exception as e:
+                    for _, _, fut in batch:
+                        if not fut.done():
+                            fut.set_exception(e)
+                    continue
+                for _, _, fut in batch:
+                    if not fut.done():
+                        fut.set_result(None)
+            if self._closed:
+                return
+
+    async def close(self) -> None:
+        """提交剩余缓冲并结束写入任务"""
+        self._closed = True
+        if self._task is None:
+            return
+        self._wakeup.set()
+        await self._task
+        self._task = None
+
+
+_checkpoint: Optional[ArticleCheckpoint] = None
+_checkpoint_lock = threading.Lock()
+
+
+def get_article_checkpoint() -> ArticleCheckpoint:
+    """进程内共享的文章检查点（data/cache/checkpoints.sqlite）"""
+    global _checkpoint
+    with _checkpoint_lock:
+        if _checkpoint is None:
+            from .paths import ProjectPaths
+            _checkpoint = ArticleCheckpoint(ProjectPaths.DATA_DIR / "cache" / "checkpoints.sqlite")
+        return _checkpoint
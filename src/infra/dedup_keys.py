@@ -0,0 +1,198 @@
+"""
+去重输出文件的持久化键索引。
+
+原 NewsDeduplicator.dedupe_file 每次运行都把已有的 *_deduped.jsonl 整个读一遍、逐行 JSON 解析来重建
+seen_ids，成本随历史批次线性增长。这里把每个输出文件已写入的文档键（source:id）记在 SQLite 里，
+并记录索引对应的文件“水位”（字节长度 + 文件头摘要）：
+- 文件长度与水位一致：直接使用索引，不读文件
+- 文件变长（被其他进程追加、或上次写文件后未来得及写索引）：只解析新增的尾部
+- 文件变短 / 文件头变化（被替换）：丢弃该文件的键重新建立
+- 文件已删除：丢弃该文件的键
+因此 dedupe_file 的开销只取决于新批次的大小。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+_HEAD_BYTES = 4096
+_IN_CHUNK = 500  # 单条 IN (...) 查询的参数个数
+
+
+def _head_digest(path: Path, length: int) -> str:
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(length), digest_size=8).hexdigest()
+
+
+class DedupKeyIndex:
+    """
+    按输出文件划分的文档键索引。
+
+    Args:
+        db_path: SQLite 文件；None 时仅内存（进程内有效）
+    """
+
+    def __init__(self, db_path: Optional[Path] = None) -> None:
+        self.db_path = Path(db_path) if db_path else None
+        if self.db_path is not None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path) if self.db_path else ":memory:", check_same_thread=False)
+        self._lock = threading.RLock()
+        self.stats = {"tail_lines": 0, "rebuilds": 0}
+        with self._lock:
+            if self.db_path is not None:
+                self._conn.execute("PRAGMA journal_mode=WAL;")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS dedup_keys (
+                    scope TEXT NOT NULL,
+                    doc_key TEXT NOT NULL,
+                    PRIMARY KEY (scope, doc_key)
+                ) WITHOUT ROWID
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS dedup_key_files (
+                    scope TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    head_len INTEGER NOT NULL,
+                    head_digest TEXT NOT NULL
+                )
+                """
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def scope_of(path: Path) -> str:
+        return str(Path(path).resolve())
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # -------------------------
+    # 水位
+    # -------------------------
+    def _watermark(self, scope: str) -> Optional[Tuple[int, int, str]]:
+        row = self._conn.execute(
+            "SELECT size, head_len, head_digest FROM dedup_key_files WHERE scope=?", (scope,)
+        ).fetchone()
+        return (int(row[0]), int(row[1]), str(row[2])) if row else None
+
+    def _drop(self, scope: str) -> None:
+        self._conn.execute("DELETE FROM dedup_keys WHERE scope=?", (scope,))
+        self._conn.execute("DELETE FROM dedup_key_files WHERE scope=?", (scope,))
+
+    def _set_watermark(self, scope: str, path: Path, size: int) -> None:
+        head_len = min(size, _HEAD_BYTES)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO dedup_key_files(scope, size, head_len, head_digest) VALUES(?, ?, ?, ?)",
+            (scope, size, head_len, _head_digest(path, head_len)),
+        )
+
+    def sync(self, path: Path, key_fn: Callable[[Dict], str]) -> str:
+        """
+        使索引与输出文件一致，返回该文件的 scope。
+        只有文件在索引之外发生变化时才读取文件（尾部或整体）。
+        """
+        path = Path(path)
+        scope = self.scope_of(path)
+        with self._lock:
+            if not path.exists():
+                self._drop(scope)
+                self._conn.commit()
+                return scope
+            size = path.stat().st_size
+            mark = self._watermark(scope)
+            start = 0
+            if mark is not None:
+                old_size, head_len, digest = mark
+                if size >= old_size and _head_digest(path, head_len) == digest:
+                    start = old_size
+                else:
+                    self.stats["rebuilds"] += 1
+                    self._drop(scope)
+            if start < size:
+                keys = []
+                with open(path, "rb") as f:
+                    f.seek(start)
+                    for line in f:
+                        try:
+                            keys.append(key_fn(json.loads(line)))
+                        except Exception:
+                            continue
+                self.stats["tail_lines"] += len(keys)
+                self._insert(scope, keys)
+            if mark is None or start != size:
+                self._set_watermark(scope, path, size)
+            self._conn.commit()
+            return scope
+
+    # -------------------------
+    # 键
+    # -------------------------
+    def _insert(self, scope: str, keys: Iterable[str]) -> None:
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO dedup_keys(scope, doc_key) VALUES(?, ?)",
+            ((scope, k) for k in keys if k),
+        )
+
+    def existing(self, scope: str, keys: Iterable[str]) -> Set[str]:
+        """返回 keys 中已记录在该 scope 下的键"""
+        keys = list(dict.fromkeys(keys))
+        found: Set[str] = set()
+        with self._lock:
+            for i in range(0, len(keys), _IN_CHUNK):
+                part = keys[i:i + _IN_CHUNK]
+                marks = ",".join("?" * len(part))
+                found.update(
+                    row[0]
+                    for row in self._conn.execute(
+                        f"SELECT doc_key FROM dedup_keys WHERE scope=? AND doc_key IN ({marks})",
+                        (scope, *part),
+                    )
+                )
+        return found
+
+    def append(self, scope: str, path: Path, keys: Iterable[str]) -> None:
+        """输出文件追加写完后调用：记录新键并把水位推进到当前文件长度"""
+        path = Path(path)
+        with self._lock:
+            self._insert(scope, keys)
+            if path.exists():
+                self._set_watermark(scope, path, path.stat().st_size)
+            self._conn.commit()
+
+    def prune_missing(self) -> int:
+        """清理输出文件已被删除的 scope（tmp 文件处理完即删除）"""
+        with self._lock:
+            scopes = [row[0] for row in self._conn.execute("SELECT scope FROM dedup_key_files")]
+            gone = [s for s in scopes if not Path(s).exists()]
+            for scope in gone:
+                self._drop(scope)
+            self._conn.commit()
+            return len(gone)
+
+    def count(self, scope: str) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(1) FROM dedup_keys WHERE scope=?", (scope,)).fetchone()[0])
+
+
+_index: Optional[DedupKeyIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_dedup_key_index() -> DedupKeyIndex:
+    """进程内共享的持久化键索引（data/cache/dedup_keys.sqlite），打开时清理已删除文件的记录"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            from .paths import ProjectPaths
+            _index = DedupKeyIndex(ProjectPaths.DATA_DIR / "cache" / "dedup_keys.sqlite")
+            _index.prune_missing()
+        return _index
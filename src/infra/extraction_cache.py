@@ -0,0 +1,203 @@
+"""
+LLM 事件抽取结果缓存（内容寻址）。
+
+同一篇文章常以多个来源（GNews 变体、GDELT 转载）或在重跑时再次出现，llm_extract_events 每次都会重新请求 LLM。
+这里按 (规范化后的标题+正文, prompt 版本, 模型, 报导日期) 的摘要缓存抽取结果：
+- 规范化：NFKC + 空白折叠，不改变大小写（大小写会影响实体名称输出）
+- 报导日期只取日期部分：prompt 用它换算“昨天/周三”等相对时间，同日转载仍可命中
+- 存储于 SQLite（默认 data/cache/extraction_cache.sqlite），按最近访问时间 LRU 淘汰，
+  条数与总字节数任一超限时淘汰到上限的 90%
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+_WS_RE = re.compile(r"\s+")
+_STAT_FIELDS = ("hits", "misses", "writes", "evictions", "errors")
+
+
+def normalize_text(text: str) -> str:
+    return _WS_RE.sub(" ", unicodedata.normalize("NFKC", text or "")).strip()
+
+
+class ExtractionCache:
+    """
+    抽取结果的 SQLite 缓存。
+
+    Args:
+        db_path: SQLite 文件；None 时仅内存
+        max_entries: 条数上限
+        max_bytes: 结果 JSON 总字节数上限
+        enabled: False 时 get 恒为 None、put 不写
+        now: 时钟（测试可注入）
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        *,
+        max_entries: int = 50_000,
+        max_bytes: int = 256 * 1024 * 1024,
+        enabled: bool = True,
+        now: Callable[[], float] = time.time,
+    ) -> None:
+        self.db_path = Path(db_path) if db_path else None
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self.enabled = bool(enabled)
+        self._now = now
+        self._lock = threading.RLock()
+        self.stats = {k: 0 for k in _STAT_FIELDS}
+        if self.db_path is not None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path) if self.db_path else ":memory:", check_same_thread=False)
+        with self._lock:
+            if self.db_path is not None:
+                self._conn.execute("PRAGMA journal_mode=WAL;")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS extraction_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_extraction_cache_access ON extraction_cache(last_access)")
+            self._conn.commit()
+            row = self._conn.execute("SELECT COUNT(1), COALESCE(SUM(size), 0) FROM extraction_cache").fetchone()
+            self._entries, self._bytes = int(row[0]), int(row[1])
+
+    @staticmethod
+    def key(title: str, content: str, *, prompt_version: str, model: str, reported_at: Optional[str] = None) -> str:
+        payload = "\x1f".join([
+            prompt_version,
+            model,
+            str(reported_at or "")[:10],
+            normalize_text(title),
+            normalize_text(content),
+        ])
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            self.stats[field] += 1
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        if not self.enabled:
+            return None
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT value FROM extraction_cache WHERE cache_key=?", (key,)).fetchone()
+                if row is None:
+                    self.stats["misses"] += 1
+                    return None
+                self._conn.execute("UPDATE extraction_cache SET last_access=? WHERE cache_key=?", (self._now(), key))
+                self._conn.commit()
+                self.stats["hits"] += 1
+            return json.loads(row[0])
+        except Exception:
+            self._count("errors")
+            return None
+
+    def put(self, key: str, events: List[Dict[str, Any]]) -> None:
+        if not self.enabled:
+            return
+        try:
+            value = json.dumps(events, ensure_ascii=False)
+            size = len(value.encode("utf-8"))
+            ts = self._now()
+            with self._lock:
+                old = self._conn.execute("SELECT size FROM extraction_cache WHERE cache_key=?", (key,)).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO extraction_cache(cache_key, value, size, created_at, last_access) VALUES(?, ?, ?, ?, ?)",
+                    (key, value, size, ts, ts),
+                )
+                if old is None:
+                    self._entries += 1
+                else:
+                    self._bytes -= int(old[0])
+                self._bytes += size
+                self.stats["writes"] += 1
+                if self._entries > self.max_entries or self._bytes > self.max_bytes:
+                    self._evict()
+                self._conn.commit()
+        except Exception:
+            self._count("errors")
+
+    def _evict(self) -> None:
+        """按 last_access 从旧到新淘汰，直到条数与字节数都回到上限的 90%"""
+        target_entries = int(self.max_entries * 0.9)
+        target_bytes = int(self.max_bytes * 0.9)
+        doomed = []
+        entries, total = self._entries, self._bytes
+        for key, size in self._conn.execute("SELECT cache_key, size FROM extraction_cache ORDER BY last_access ASC"):
+            if entries <= target_entries and total <= target_bytes:
+                break
+            doomed.append((key,))
+            entries -= 1
+            total -= int(size)
+        self._conn.executemany("DELETE FROM extraction_cache WHERE cache_key=?", doomed)
+        self._entries, self._bytes = entries, total
+        self.stats["evictions"] += len(doomed)
+
+    def __len__(self) -> int:
+        return self._entries
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
+
+    def summary(self, since: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """命中统计；since 为先前的 snapshot() 时返回这段时间内的增量"""
+        now = self.snapshot()
+        out: Dict[str, Any] = {k: now[k] - (since or {}).get(k, 0) for k in _STAT_FIELDS}
+        lookups = out["hits"] + out["misses"]
+        out["hit_rate"] = round(out["hits"] / lookups, 4) if lookups else 0.0
+        return out
+
+
+_cache: Optional[ExtractionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_extraction_cache() -> ExtractionCache:
+    """
+    进程内共享的抽取缓存，读取 agent1_config：
+    - extraction_cache_enabled（默认 true）
+    - extraction_cache_max_entries（默认 50000）
+    - extraction_cache_max_mb（默认 256）
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            from .paths import ProjectPaths
+            try:
+                from .config import get_config_manager
+                cm = get_config_manager()
+                enabled = bool(cm.get_config_value("extraction_cache_enabled", True, "agent1_config"))
+                max_entries = int(cm.get_config_value("extraction_cache_max_entries", 50_000, "agent1_config"))
+                max_mb = float(cm.get_config_value("extraction_cache_max_mb", 256, "agent1_config"))
+            except Exception:
+                enabled, max_entries, max_mb = True, 50_000, 256.0
+            _cache = ExtractionCache(
+                ProjectPaths.DATA_DIR / "cache" / "extraction_cache.sqlite",
+                max_entries=max_entries,
+                max_bytes=int(max_mb * 1024 * 1024),
+                enabled=enabled,
+            )
+        return _cache
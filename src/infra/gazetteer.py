@@ -0,0 +1,205 @@
+"""
+实体词表自动机（Aho-Corasick）
+
+抓取到的新闻很多与已跟踪的实体/关键词无关，却同样要付出一次 LLM 抽取。这里把实体名、original_forms、
+别名与合并规则编译为 Aho-Corasick 自动机，对每篇新闻做一次线性扫描：
+- 文本按 NFKC + casefold 规范化；以 ASCII 字母数字开头/结尾的词要求词边界（避免 "AI" 命中 "said"）
+- 命中的词映射回规范实体名，供相关性打分与 LLM 提示中的实体提示
+
+增量更新：实体变化时不重建整个自动机。新增/改名的词编译进一个小的增量自动机，删除或改映射的旧词记为
+墓碑在匹配时跳过；增量与墓碑之和超过基础词表的 rebuild_ratio 时才合并重建。
+"""
+from __future__ import annotations
+
+import threading
+import unicodedata
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+MIN_TERM_CHARS = 2
+
+
+def normalize_term(text: str) -> str:
+    return unicodedata.normalize("NFKC", text or "").casefold().strip()
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isascii() and ch.isalnum()
+
+
+class AhoCorasick:
+    """
+    多模式串匹配自动机（构建后只读）。
+
+    Args:
+        patterns: 已规范化的模式串
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        for p in patterns:
+            if p:
+                self._insert(p)
+        self._link()
+
+    def _insert(self, pattern: str) -> None:
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(len(self.patterns))
+        self.patterns.append(pattern)
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                # 输出链合并到节点上，匹配时无需沿 fail 链回溯
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """产出 (结束位置, 模式下标)；text 需已规范化"""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for idx in out[node]:
+                yield i, idx
+
+
+def _bounded_hits(automaton: AhoCorasick, text: str, skip: Set[str]) -> Iterator[str]:
+    for end, idx in automaton.iter_matches(text):
+        term = automaton.patterns[idx]
+        if term in skip:
+            continue
+        start = end - len(term) + 1
+        if _is_word_char(term[0]) and start > 0 and _is_word_char(text[start - 1]):
+            continue
+        if _is_word_char(term[-1]) and end + 1 < len(text) and _is_word_char(text[end + 1]):
+            continue
+        yield term
+
+
+@dataclass
+class GazetteerMatch:
+    """一篇新闻的命中结果：实体 → 命中次数，标题中出现的实体单独记录"""
+
+    entities: Dict[str, int] = field(default_factory=dict)
+    in_title: Set[str] = field(default_factory=set)
+
+    @property
+    def score(self) -> float:
+        """命中的不同实体数，标题中出现的实体计 2"""
+        return float(sum(2 if e in self.in_title else 1 for e in self.entities))
+
+    def top_entities(self, limit: int) -> List[str]:
+        ranked = sorted(self.entities, key=lambda e: (e not in self.in_title, -self.entities[e], e))
+        return ranked[: max(0, limit)]
+
+
+class EntityGazetteer:
+    """
+    词 → 规范实体名 的匹配器，支持增量更新。
+
+    Args:
+        terms: 初始词表（原文 → 规范实体名）
+        rebuild_ratio: 增量 + 墓碑超过基础词表该比例时整体重建
+        rebuild_min: 触发整体重建的最少变更数
+    """
+
+    def __init__(self, terms: Optional[Mapping[str, str]] = None, *, rebuild_ratio: float = 0.2, rebuild_min: int = 256) -> None:
+        self.rebuild_ratio = float(rebuild_ratio)
+        self.rebuild_min = max(1, int(rebuild_min))
+        self._lock = threading.RLock()
+        self._terms: Dict[str, str] = {}
+        self._base_terms: Dict[str, str] = {}
+        self._base = AhoCorasick([])
+        self._delta_terms: Dict[str, str] = {}
+        self._delta = AhoCorasick([])
+        self._tombstones: Set[str] = set()
+        self.stats = {"full_builds": 0, "delta_builds": 0, "added": 0, "removed": 0}
+        self.update(terms or {})
+
+    @staticmethod
+    def _normalize_map(terms: Mapping[str, str]) -> Dict[str, str]:
+        out: Dict[str, str] = {}
+        for term, entity in terms.items():
+            norm = normalize_term(term)
+            if len(norm) < MIN_TERM_CHARS or norm.isdigit() or not entity:
+                continue
+            out.setdefault(norm, str(entity))
+        return out
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def update(self, terms: Mapping[str, str]) -> Dict[str, int]:
+        """以 terms 为新的完整词表；只编译变化的部分。返回 {"added", "removed"}"""
+        new_terms = self._normalize_map(terms)
+        with self._lock:
+            added = {t: e for t, e in new_terms.items() if self._terms.get(t) != e}
+            removed = [t for t in self._terms if t not in new_terms]
+            if not added and not removed:
+                return {"added": 0, "removed": 0}
+            self._terms = new_terms
+            self.stats["added"] += len(added)
+            self.stats["removed"] += len(removed)
+
+            delta = {t: e for t, e in new_terms.items() if self._base_terms.get(t) != e}
+            tombstones = {t for t in self._base_terms if self._base_terms[t] != new_terms.get(t)}
+            if not self._base_terms or len(delta) + len(tombstones) > max(self.rebuild_min, self.rebuild_ratio * len(self._base_terms)):
+                self._base_terms = dict(new_terms)
+                self._base = AhoCorasick(self._base_terms)
+                self._delta_terms, self._delta, self._tombstones = {}, AhoCorasick([]), set()
+                self.stats["full_builds"] += 1
+            else:
+                if delta.keys() != self._delta_terms.keys():
+                    self._delta = AhoCorasick(delta)
+                    self.stats["delta_builds"] += 1
+                self._delta_terms, self._tombstones = delta, tombstones
+            return {"added": len(added), "removed": len(removed)}
+
+    def _hits(self, text: str) -> Iterator[str]:
+        with self._lock:
+            base, delta, skip = self._base, self._delta, self._tombstones
+        yield from _bounded_hits(base, text, skip)
+        if len(delta):
+            yield from _bounded_hits(delta, text, set())
+
+    def match(self, title: str, content: str = "") -> GazetteerMatch:
+        """扫描标题与正文（各一次线性扫描）"""
+        result = GazetteerMatch()
+        terms = self._terms
+        for part, is_title in ((title, True), (content, False)):
+            if not part:
+                continue
+            for term in self._hits(normalize_term(part)):
+                entity = terms.get(term)
+                if entity is None:
+                    continue
+                result.entities[entity] = result.entities.get(entity, 0) + 1
+                if is_title:
+                    result.in_title.add(entity)
+        return result
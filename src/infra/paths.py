@@ -7,9 +7,7 @@
 
 import os
 import sys
-import re
 import threading
-import hashlib
 from typing import Set
 from datetime import datetime
 from pathlib import Path
@@ -130,23 +128,11 @@ class ProjectPaths(SingletonBase):
         return True
 
     def simhash(self, text: str, bits=64) -> int:
-        """计算文本的 SimHash"""
-        text = re.sub(r'\s+', ' ', text.lower())
-        tokens = text.split()
-        v = [0] * bits
-        for token in tokens:
-            h = int(hashlib.md5(token.encode()).hexdigest(), 16)
-            for i in range(bits):
-                bit = (h >> i) & 1
-                if bit:
-                    v[i] += 1
-                else:
-                    v[i] -= 1
-        hash_val = 0
-        for i in range(bits):
-            if v[i] > 0:
-                hash_val |= (1 << i)
-        return hash_val
+        """计算文本的 SimHash（64 位走批量指纹引擎，见 infra/simhash.py）"""
+        from .simhash import get_simhash_engine, simhash_reference
+        if bits == 64:
+            return get_simhash_engine().fingerprint(text)
+        return simhash_reference(text, bits)
 
     def hamming_distance(self, h1: int, h2: int) -> int:
         """计算汉明距离"""
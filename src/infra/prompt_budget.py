@@ -0,0 +1,237 @@
+"""
+按 token 预算构建抽取提示
+
+原流程把正文硬截断到 2000 字符（process_news_pipeline），batch_process_news 则不截断；每次请求都把很长的
+实体定义块与新闻拼成一个字符串，且报导时间夹在中间，服务商的前缀缓存只能命中到那一行之前。这里：
+- TokenCounter：安装了 tiktoken 时用分词器计数；否则用 estimate_tokens，并按 LLM 响应 usage 中的
+  prompt_tokens 持续校准比例（call_llm_with_retry 在拿到 usage 时调用 observe_prompt_usage）。
+  校准比例只用于报告（count）；压缩决策用不随校准漂移的 stable_count，同一篇新闻在同一预算下
+  总是压缩成相同的正文，抽取缓存键（正文 + 预算）因此与实际发送的提示一一对应
+- 提示拆为静态前缀（extraction_prompt_prefix，逐字节稳定，可被前缀缓存复用）与每篇新闻的后缀
+- compact_content：正文超出每篇预算时，按句打分（导语位置、与标题的词重合、实体提示、数字/日期）
+  并按“得分 / sqrt(token)”贪心选句，再按原文顺序拼接，省略处用“……”标出
+"""
+from __future__ import annotations
+
+import math
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .async_utils import estimate_tokens, extraction_prompt_prefix, extraction_prompt_suffix
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# 句末：中文标点直接断句；英文 .!? 后须跟空白（避免切开 3.5% 与 U.S.A 中间）
+_SENTENCE_RE = re.compile(r"(?:[^。！？!?；;\n.]|\.(?!\s))+(?:[。！？!?；;]+[”」』）)]*|[.!?]+(?=\s|$)|\n|$)")
+_LATIN_WORD_RE = re.compile(r"[a-z0-9][a-z0-9\-']+")
+_CJK_RE = re.compile(r"[一-鿿]+")
+_DIGIT_RE = re.compile(r"\d")
+OMISSION_MARK = "……"
+
+
+class TokenCounter:
+    """
+    token 计数器。
+
+    Args:
+        encoding: tiktoken 编码名
+        use_tokenizer: False 时即使安装了 tiktoken 也使用校准估计
+        alpha: 校准比例的指数滑动平均系数
+    """
+
+    def __init__(self, encoding: str = "cl100k_base", use_tokenizer: bool = True, alpha: float = 0.1) -> None:
+        self._encoder = None
+        if use_tokenizer and tiktoken is not None:
+            try:
+                self._encoder = tiktoken.get_encoding(encoding)
+            except Exception:
+                self._encoder = None
+        self.alpha = float(alpha)
+        self.scale = 1.0
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    @property
+    def source(self) -> str:
+        return "tiktoken" if self._encoder is not None else "estimate"
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._encoder is not None:
+            return len(self._encoder.encode(text, disallowed_special=()))
+        return max(1, int(round(estimate_tokens(text) * self.scale)))
+
+    def stable_count(self, text: str) -> int:
+        """不受校准影响的计数（分词器计数或未校准的估计），用于压缩决策"""
+        if not text:
+            return 0
+        if self._encoder is not None:
+            return len(self._encoder.encode(text, disallowed_special=()))
+        return max(1, estimate_tokens(text))
+
+    def observe(self, text: str, actual_tokens: int) -> None:
+        """用服务端返回的实际 prompt token 数校准估计比例（使用分词器时忽略）"""
+        if self._encoder is not None or not actual_tokens or actual_tokens <= 0:
+            return
+        estimated = estimate_tokens(text)
+        if estimated <= 0:
+            return
+        ratio = min(4.0, max(0.25, actual_tokens / estimated))
+        with self._lock:
+            self.scale = ratio if self.samples == 0 else (1 - self.alpha) * self.scale + self.alpha * ratio
+            self.samples += 1
+
+
+_counter: Optional[TokenCounter] = None
+_counter_lock = threading.Lock()
+
+
+def get_token_counter() -> TokenCounter:
+    """进程内共享的 token 计数器"""
+    global _counter
+    with _counter_lock:
+        if _counter is None:
+            _counter = TokenCounter()
+        return _counter
+
+
+def observe_prompt_usage(prompt: str, usage: Optional[Dict[str, Any]]) -> None:
+    """LLM 响应带 usage.prompt_tokens 时校准共享计数器"""
+    try:
+        actual = int((usage or {}).get("prompt_tokens") or 0)
+    except Exception:
+        return
+    if actual > 0:
+        get_token_counter().observe(prompt, actual)
+
+
+def split_sentences(text: str) -> List[Tuple[int, int]]:
+    """按句切分，返回各句在原文中的 (start, end)（不含纯空白句）"""
+    spans = []
+    for m in _SENTENCE_RE.finditer(text or ""):
+        if m.group().strip():
+            spans.append((m.start(), m.end()))
+    return spans
+
+
+def _terms(text: str) -> Set[str]:
+    """打分用的词项：拉丁词 + 中文二元组"""
+    lowered = text.lower()
+    terms = set(_LATIN_WORD_RE.findall(lowered))
+    for run in _CJK_RE.findall(lowered):
+        terms.update(run[i:i + 2] for i in range(max(1, len(run) - 1)))
+    return terms
+
+
+@dataclass
+class CompactionResult:
+    content: str
+    original_tokens: int
+    content_tokens: int
+    sentences_total: int = 0
+    sentences_kept: int = 0
+
+    @property
+    def compacted(self) -> bool:
+        return self.content_tokens < self.original_tokens
+
+
+def compact_content(
+    title: str,
+    content: str,
+    budget_tokens: int,
+    counter: Optional[TokenCounter] = None,
+    entity_hints: Optional[List[str]] = None,
+) -> CompactionResult:
+    """
+    正文在预算内时原样返回；否则选取信息量最高的句子，使正文不超过 budget_tokens。
+    token 数按 counter.stable_count 计算（不随校准变化），结果只取决于输入与预算。
+
+    句子得分：首句 +3、次句 +1；与标题词项的重合比例 ×3；每个出现的实体提示 +1.5（至多 3 个）；含数字 +0.5。
+    """
+    counter = counter or get_token_counter()
+    content = content or ""
+    original = counter.stable_count(content)
+    if budget_tokens <= 0 or original <= budget_tokens:
+        return CompactionResult(content, original, original)
+
+    spans = split_sentences(content)
+    title_terms = _terms(title or "")
+    hints = [h.lower() for h in (entity_hints or []) if h]
+    candidates = []
+    for i, (start, end) in enumerate(spans):
+        sentence = content[start:end]
+        tokens = counter.stable_count(sentence)
+        lowered = sentence.lower()
+        score = 3.0 if i == 0 else 1.0 if i == 1 else 0.0
+        if title_terms:
+            score += 3.0 * len(_terms(sentence) & title_terms) / len(title_terms)
+        score += 1.5 * min(3, sum(1 for h in hints if h in lowered))
+        if _DIGIT_RE.search(sentence):
+            score += 0.5
+        candidates.append((score / math.sqrt(max(1, tokens)), i, tokens))
+
+    mark_tokens = counter.stable_count(OMISSION_MARK)
+    chosen: List[int] = []
+    used = 0
+    for _, i, tokens in sorted(candidates, key=lambda c: (-c[0], c[1])):
+        # 预留一个省略号的开销
+        if used + tokens + mark_tokens <= budget_tokens:
+            chosen.append(i)
+            used += tokens + mark_tokens
+
+    if not chosen:
+        # 单句即超出预算：保留首句的前缀
+        head = content[spans[0][0]:spans[0][1]] if spans else content
+        cut = max(1, int(len(head) * budget_tokens / max(1, counter.stable_count(head))))
+        text = head[:cut].rstrip() + OMISSION_MARK
+        return CompactionResult(text, original, counter.stable_count(text), len(spans), 0)
+
+    parts: List[str] = []
+    prev_end = 0
+    for i in sorted(chosen):
+        start, end = spans[i]
+        if content[prev_end:start].strip():
+            parts.append(OMISSION_MARK)
+        parts.append(content[start:end].strip())
+        prev_end = end
+    if content[prev_end:].strip():
+        parts.append(OMISSION_MARK)
+    text = "".join(parts)
+    return CompactionResult(text, original, counter.stable_count(text), len(spans), len(chosen))
+
+
+@dataclass
+class ExtractionPrompt:
+    """抽取提示：prefix 为可缓存的静态部分，suffix 为每篇新闻的部分"""
+
+    prefix: str
+    suffix: str
+    compaction: CompactionResult
+
+    @property
+    def text(self) -> str:
+        return self.prefix + self.suffix
+
+
+def build_extraction_prompt(
+    title: str,
+    content: str,
+    entity_definitions: str,
+    reported_at: Optional[str] = None,
+    entity_hints: Optional[List[str]] = None,
+    budget_tokens: int = 0,
+    counter: Optional[TokenCounter] = None,
+) -> ExtractionPrompt:
+    """按每篇正文 token 预算构建单篇抽取提示（budget_tokens <= 0 时不压缩正文）"""
+    counter = counter or get_token_counter()
+    compaction = compact_content(title, content, budget_tokens, counter, entity_hints)
+    prefix = extraction_prompt_prefix(entity_definitions)
+    suffix = extraction_prompt_suffix(title, compaction.content, reported_at, entity_hints)
+    return ExtractionPrompt(prefix=prefix, suffix=suffix, compaction=compaction)
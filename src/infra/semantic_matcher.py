@@ -1,18 +1,25 @@
 """
 基础设施层 - 语义实体匹配器
 
-使用 sentence-transformers 进行跨语言实体语义匹配
+使用 sentence-transformers 进行跨语言实体语义匹配；
+EmbeddingSimilarityEngine 在其上提供批量编码、向量缓存（内存 LRU + 按模型区分的磁盘缓存）与向量化打分。
 """
 
 from __future__ import annotations
 
+import hashlib
 import logging
-from typing import List, Optional, Dict, Tuple
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional, Dict, Sequence, Tuple
 import numpy as np
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MODEL_NAME = 'paraphrase-multilingual-MiniLM-L12-v2'
+
 
 class SemanticEntityMatcher:
     """
@@ -51,7 +58,7 @@ class SemanticEntityMatcher:
             # paraphrase-multilingual-MiniLM-L12-v2: 约420MB
             # - 支持50+种语言（包括中英文）
             # - 性能优秀，速度较快
-            model_name = 'paraphrase-multilingual-MiniLM-L12-v2'
+            model_name = DEFAULT_MODEL_NAME
             
             logger.info(f"[SemanticMatcher] 正在加载语义模型: {model_name}")
             
@@ -131,8 +138,8 @@ class SemanticEntityMatcher:
             return None
         
         # 计算余弦相似度
-        from sklearn.metrics.pairwise import cosine_similarity
-        sim = cosine_similarity([embeddings[0]], [embeddings[1]])[0][0]
+        vecs = _l2_normalize(np.asarray(embeddings, dtype=np.float32))
+        sim = float(vecs[0] @ vecs[1])
         
         # 转换到 0-1 范围（余弦相似度范围是 -1 到 1）
         return (sim + 1) / 2
@@ -152,8 +159,8 @@ class SemanticEntityMatcher:
         if embeddings is None:
             return None
         
-        from sklearn.metrics.pairwise import cosine_similarity
-        sim_matrix = cosine_similarity(embeddings)
+        vecs = _l2_normalize(np.asarray(embeddings, dtype=np.float32))
+        sim_matrix = vecs @ vecs.T
         
         # 转换到 0-1 范围
         return (sim_matrix + 1) / 2
@@ -178,14 +185,12 @@ class SemanticEntityMatcher:
         if not candidate_entities:
             return []
         
-        all_entities = [query_entity] + candidate_entities
-        sim_matrix = self.batch_similarity_matrix(all_entities)
-        
-        if sim_matrix is None:
+        # 只计算查询与候选之间的一行相似度（不构造 n×n 矩阵）
+        embeddings = self.encode([query_entity] + candidate_entities)
+        if embeddings is None:
             return []
-        
-        # 第一行是查询实体与所有候选实体的相似度
-        query_scores = sim_matrix[0, 1:]
+        vecs = _l2_normalize(np.asarray(embeddings, dtype=np.float32))
+        query_scores = (vecs[1:] @ vecs[0] + 1) / 2
         
         # 筛选并排序
         results = [
@@ -198,8 +203,221 @@ class SemanticEntityMatcher:
         return results
 
 
+def _l2_normalize(vecs: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vecs / norms
+
+
+class EmbeddingSimilarityEngine:
+    """
+    批量 + 缓存的语义相似度引擎
+
+    - 每个不同文本只编码一次（未命中的文本按 batch_size 批量送入模型）
+    - 归一化向量保存在内存 LRU；可选 SQLite 磁盘缓存，按模型名区分，换模型不会串用旧向量
+    - 相似度通过矩阵乘法向量化计算，输出与 SemanticEntityMatcher 一致的 0-1 分数
+
+    Args:
+        encoder: List[str] -> 向量矩阵；默认使用 SemanticEntityMatcher.encode
+        model_name: 缓存键中的模型名
+        cache_path: 磁盘缓存 SQLite 文件（None 表示仅内存缓存）
+        max_memory_items: 内存 LRU 容量
+        batch_size: 单次编码的文本数
+    """
+
+    def __init__(
+        self,
+        encoder: Optional[Callable[[List[str]], Optional[np.ndarray]]] = None,
+        *,
+        model_name: str = DEFAULT_MODEL_NAME,
+        cache_path: Optional[Path] = None,
+        max_memory_items: int = 50000,
+        batch_size: int = 64,
+    ):
+        self._encoder = encoder
+        self.model_name = model_name
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.max_memory_items = max(1, int(max_memory_items))
+        self.batch_size = max(1, int(batch_size))
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._available: Optional[bool] = None
+        self.stats: Dict[str, int] = {"memory_hits": 0, "disk_hits": 0, "encoded": 0, "encode_batches": 0}
+        self._conn: Optional[sqlite3.Connection] = None
+        if self.cache_path:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.cache_path), timeout=30, check_same_thread=False)
+            with self._lock:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings ("
+                    "model TEXT NOT NULL, text_hash TEXT NOT NULL, dim INTEGER NOT NULL, vec BLOB NOT NULL, "
+                    "PRIMARY KEY (model, text_hash))"
+                )
+                self._conn.commit()
+
+    def close(self) -> None:
+        """关闭磁盘缓存连接（内存 LRU 仍可用，之后未命中的文本不再读写磁盘）"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def __enter__(self) -> "EmbeddingSimilarityEngine":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+    @staticmethod
+    def _text_hash(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def _encode(self, texts: List[str]) -> Optional[np.ndarray]:
+        if self._encoder is not None:
+            return self._encoder(texts)
+        return get_semantic_matcher().encode(texts)
+
+    def is_available(self) -> bool:
+        """编码器是否可用（结果会被记住，避免每次比较都尝试加载模型）"""
+        if self._available is None:
+            if self._encoder is not None:
+                self._available = True
+            else:
+                self._available = get_semantic_matcher().is_available()
+        return bool(self._available)
+
+    # -------------------------
+    # 缓存
+    # -------------------------
+    def _lru_get(self, text: str) -> Optional[np.ndarray]:
+        vec = self._lru.get(text)
+        if vec is not None:
+            self._lru.move_to_end(text)
+        return vec
+
+    def _lru_put(self, text: str, vec: np.ndarray) -> None:
+        self._lru[text] = vec
+        self._lru.move_to_end(text)
+        while len(self._lru) > self.max_memory_items:
+            self._lru.popitem(last=False)
+
+    def _disk_get(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        if self._conn is None or not texts:
+            return {}
+        by_hash = {self._text_hash(t): t for t in texts}
+        found: Dict[str, np.ndarray] = {}
+        hashes = list(by_hash.keys())
+        for i in range(0, len(hashes), 500):
+            chunk = hashes[i:i + 500]
+            marks = ",".join("?" for _ in chunk)
+            rows = self._conn.execute(
+                f"SELECT text_hash, dim, vec FROM embeddings WHERE model=? AND text_hash IN ({marks})",
+                [self.model_name, *chunk],
+            ).fetchall()
+            for h, dim, blob in rows:
+                vec = np.frombuffer(blob, dtype=np.float32)
+                if vec.shape[0] == int(dim):
+                    found[by_hash[h]] = vec
+        return found
+
+    def _disk_put(self, items: Dict[str, np.ndarray]) -> None:
+        if self._conn is None or not items:
+            return
+        rows = [
+            (self.model_name, self._text_hash(t), int(v.shape[0]), np.ascontiguousarray(v, dtype=np.float32).tobytes())
+            for t, v in items.items()
+        ]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, dim, vec) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    # -------------------------
+    # 编码与打分
+    # -------------------------
+    def embed(self, texts: Sequence[str]) -> Optional[np.ndarray]:
+        """
+        返回 texts 对应的 L2 归一化向量矩阵（float32）；编码器不可用时返回 None。
+        """
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        if not self.is_available():
+            return None
+        with self._lock:
+            vectors: Dict[str, np.ndarray] = {}
+            missing: List[str] = []
+            for t in dict.fromkeys(texts):
+                vec = self._lru_get(t)
+                if vec is not None:
+                    vectors[t] = vec
+                    self.stats["memory_hits"] += 1
+                else:
+                    missing.append(t)
+            if missing:
+                from_disk = self._disk_get(missing)
+                self.stats["disk_hits"] += len(from_disk)
+                for t, vec in from_disk.items():
+                    vectors[t] = vec
+                    self._lru_put(t, vec)
+                missing = [t for t in missing if t not in from_disk]
+            if missing:
+                encoded: Dict[str, np.ndarray] = {}
+                for i in range(0, len(missing), self.batch_size):
+                    batch = missing[i:i + self.batch_size]
+                    emb = self._encode(batch)
+                    if emb is None:
+                        return None
+                    emb = _l2_normalize(np.asarray(emb, dtype=np.float32).reshape(len(batch), -1))
+                    self.stats["encode_batches"] += 1
+                    for t, vec in zip(batch, emb):
+                        encoded[t] = vec
+                self.stats["encoded"] += len(encoded)
+                self._disk_put(encoded)
+                for t, vec in encoded.items():
+                    vectors[t] = vec
+                    self._lru_put(t, vec)
+            return np.stack([vectors[t] for t in texts])
+
+    def prefetch(self, texts: Iterable[str]) -> None:
+        """预热缓存：一次性批量编码后续会比较的所有文本"""
+        self.embed(list(dict.fromkeys(texts)))
+
+    def similarity(self, text1: str, text2: str) -> Optional[float]:
+        scores = self.pair_scores([(text1, text2)])
+        return None if scores is None else float(scores[0])
+
+    def pair_scores(self, pairs: Sequence[Tuple[str, str]]) -> Optional[np.ndarray]:
+        """逐对相似度 (0-1)，shape: (len(pairs),)"""
+        if not pairs:
+            return np.zeros(0, dtype=np.float32)
+        uniq = list(dict.fromkeys([p[0] for p in pairs] + [p[1] for p in pairs]))
+        vecs = self.embed(uniq)
+        if vecs is None:
+            return None
+        pos = {t: i for i, t in enumerate(uniq)}
+        left = vecs[[pos[a] for a, _ in pairs]]
+        right = vecs[[pos[b] for _, b in pairs]]
+        return (np.einsum("ij,ij->i", left, right) + 1) / 2
+
+    def similarity_matrix(self, left: Sequence[str], right: Optional[Sequence[str]] = None) -> Optional[np.ndarray]:
+        """相似度矩阵 (0-1)，shape: (len(left), len(right or left))"""
+        lv = self.embed(left)
+        if lv is None:
+            return None
+        rv = lv if right is None else self.embed(right)
+        if rv is None:
+            return None
+        return (lv @ rv.T + 1) / 2
+
+
 # 全局单例
 _semantic_matcher: Optional[SemanticEntityMatcher] = None
+_similarity_engine: Optional[EmbeddingSimilarityEngine] = None
+_similarity_engine_lock = threading.Lock()
 
 
 def get_semantic_matcher() -> SemanticEntityMatcher:
@@ -208,3 +426,15 @@ def get_semantic_matcher() -> SemanticEntityMatcher:
     if _semantic_matcher is None:
         _semantic_matcher = SemanticEntityMatcher()
     return _semantic_matcher
+
+
+def get_similarity_engine() -> EmbeddingSimilarityEngine:
+    """获取默认语义相似度引擎（磁盘缓存位于 data/cache/embeddings.sqlite）"""
+    global _similarity_engine
+    with _similarity_engine_lock:
+        if _similarity_engine is None:
+            from .paths import ProjectPaths
+            _similarity_engine = EmbeddingSimilarityEngine(
+                cache_path=ProjectPaths.DATA_DIR / "cache" / "embeddings.sqlite",
+            )
+        return _similarity_engine
@@ -1,12 +1,23 @@
 """
 基础设施层 - 序列化模块
 
-提供安全的JSON序列化功能。
+提供安全的JSON序列化功能，以及流式 JSON/JSONL 原子写入。
 """
 
 import json
+import os
+import tempfile
 from datetime import datetime, date
-from typing import Any, Dict
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    orjson = None
+    HAS_ORJSON = False
 
 
 class Serializer:
@@ -218,3 +229,244 @@ def format_json_for_llm(data: Any, indent: int = 2) -> str:
     格式化数据为LLM友好的JSON字符串
     """
     return json.dumps(data, ensure_ascii=False, indent=indent)
+
+
+# =============================================================================
+# 流式 JSON 写入
+# =============================================================================
+
+class StreamingJsonWriter:
+    """
+    流式 JSON 写入器。
+
+    逐个元素序列化并写入同目录下的临时文件，退出上下文时原子替换目标文件；
+    内存占用只取决于单个元素的大小，而不是整个文档。
+    indent=2 时输出与 json.dumps(..., indent=2) 逐字节一致；可用时优先使用 orjson 编码单个元素，
+    含 NaN/Infinity 或需科学计数法的浮点数的元素改用标准库编码（orjson 会把 NaN 写成 null、把 1e+16 写成 1e16）。
+
+    用法：
+        with StreamingJsonWriter(path) as w:
+            w.begin_object()
+            w.value(meta, key="meta")
+            w.begin_array("nodes")
+            for n in nodes:
+                w.value(n)
+            w.end()
+            w.end()
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        *,
+        indent: Optional[int] = 2,
+        ensure_ascii: bool = False,
+        default: Optional[Callable[[Any], Any]] = None,
+        use_orjson: bool = True,
+    ):
+        self.path = Path(path)
+        self.indent = indent
+        self.ensure_ascii = ensure_ascii
+        self.default = default
+        # orjson 不转义非 ASCII，且只支持 2 空格缩进或紧凑输出
+        self._use_orjson = bool(use_orjson and HAS_ORJSON and not ensure_ascii)
+        self._stack: List[List[Any]] = []  # [kind("{"/"["), 已写元素数]
+        self._fh = None
+        self._tmp: Optional[Path] = None
+        self._has_root = False
+
+    def __enter__(self) -> "StreamingJsonWriter":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(self.path.parent), prefix=f".{self.path.name}.", suffix=".tmp")
+        self._tmp = Path(tmp)
+        self._fh = os.fdopen(fd, "w", encoding="utf-8")
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        fh, tmp = self._fh, self._tmp
+        self._fh = None
+        committed = False
+        try:
+            if exc_type is None:
+                if self._stack:
+                    raise ValueError(f"JSON 容器未关闭: {len(self._stack)} 层")
+                fh.flush()
+                os.fsync(fh.fileno())
+                fh.close()
+                os.replace(tmp, self.path)
+                committed = True
+        finally:
+            if not committed:
+                try:
+                    fh.close()
+                except Exception:
+                    pass
+                try:
+                    tmp.unlink()
+                except Exception:
+                    pass
+        return False
+
+    # -------------------------
+    # 编码
+    # -------------------------
+    def encode(self, obj: Any, *, compact: bool = False) -> str:
+        """
+        序列化单个元素（顶层缩进），orjson 不支持的对象回退到标准库。
+
+        compact=True 时输出单行（JSONL），允许 orjson 的紧凑格式。
+        """
+        if self._use_orjson and (compact or self.indent == 2) and _orjson_floats_match(obj):
+            option = orjson.OPT_NON_STR_KEYS
+            if not compact:
+                option |= orjson.OPT_INDENT_2
+            try:
+                return orjson.dumps(obj, default=self.default, option=option).decode("utf-8")
+            except TypeError:
+                pass
+        return json.dumps(obj, ensure_ascii=self.ensure_ascii, indent=None if compact else self.indent, default=self.default)
+
+    def _encode_key(self, key: Any) -> str:
+        if not isinstance(key, str):
+            key = json.dumps(key) if key is None or isinstance(key, (bool, int, float)) else str(key)
+        return json.dumps(key, ensure_ascii=self.ensure_ascii)
+
+    def _newline(self, depth: int) -> str:
+        return "\n" + " " * (self.indent * depth) if self.indent is not None else ""
+
+    def _slot(self, key: Any) -> None:
+        if self._fh is None:
+            raise RuntimeError("StreamingJsonWriter 需在 with 语句中使用")
+        if not self._stack:
+            if self._has_root:
+                raise ValueError("JSON 文档只能有一个根元素")
+            self._has_root = True
+            return
+        frame = self._stack[-1]
+        if frame[0] == "{" and key is None:
+            raise ValueError("对象成员必须提供 key")
+        if frame[0] == "[" and key is not None:
+            raise ValueError("数组元素不能提供 key")
+        if frame[1]:
+            self._fh.write("," if self.indent is not None else ", ")
+        self._fh.write(self._newline(len(self._stack)))
+        frame[1] += 1
+        if key is not None:
+            self._fh.write(self._encode_key(key) + ": ")
+
+    # -------------------------
+    # 写入
+    # -------------------------
+    def begin_object(self, key: Any = None) -> None:
+        self._slot(key)
+        self._fh.write("{")
+        self._stack.append(["{", 0])
+
+    def begin_array(self, key: Any = None) -> None:
+        self._slot(key)
+        self._fh.write("[")
+        self._stack.append(["[", 0])
+
+    def end(self) -> None:
+        kind, count = self._stack.pop()
+        if count:
+            self._fh.write(self._newline(len(self._stack)))
+        self._fh.write("}" if kind == "{" else "]")
+
+    def value(self, obj: Any, key: Any = None) -> None:
+        self._slot(key)
+        text = self.encode(obj)
+        if self.indent and self._stack:
+            text = text.replace("\n", self._newline(len(self._stack)))
+        self._fh.write(text)
+
+    def line(self, obj: Any) -> None:
+        """写入一行 JSONL（不参与容器结构，与 begin_*/value 互斥）。"""
+        if self._fh is None:
+            raise RuntimeError("StreamingJsonWriter 需在 with 语句中使用")
+        self._fh.write(self.encode(obj, compact=True) + "\n")
+
+    def stream(self, obj: Any, key: Any = None, *, depth: int = 2) -> None:
+        """按容器层级流式写入：depth 层以内的 dict/list 逐成员写出，更深层整体序列化。"""
+        if depth > 0 and isinstance(obj, dict) and obj:
+            self.begin_object(key)
+            for k, v in obj.items():
+                self.stream(v, k, depth=depth - 1)
+            self.end()
+        elif depth > 0 and _is_sequence(obj) and len(obj):
+            self.begin_array(key)
+            for v in obj:
+                self.stream(v, depth=depth - 1)
+            self.end()
+        else:
+            if _is_sequence(obj) and not isinstance(obj, (list, tuple)):
+                obj = list(obj)
+            self.value(obj, key)
+
+
+def _orjson_floats_match(obj: Any) -> bool:
+    """
+    obj 中的浮点数经 orjson 编码是否与 json.dumps 相同。
+
+    两者只在非有限值（orjson 输出 null）与 repr 使用科学计数法的区间（|x| < 1e-4 或 >= 1e16）上不同。
+    """
+    stack = [obj]
+    while stack:
+        cur = stack.pop()
+        if isinstance(cur, float):
+            if cur != cur or cur in (float("inf"), float("-inf")) or (cur != 0.0 and not 1e-4 <= abs(cur) < 1e16):
+                return False
+        elif isinstance(cur, dict):
+            stack.extend(cur.keys())
+            stack.extend(cur.values())
+        elif isinstance(cur, (list, tuple)):
+            stack.extend(cur)
+    return True
+
+
+def _is_sequence(obj: Any) -> bool:
+    """list/tuple 以及列表视图类容器（如紧凑边存储），不含 str/bytes"""
+    return isinstance(obj, (list, tuple)) or (
+        isinstance(obj, Sequence) and not isinstance(obj, (str, bytes, bytearray))
+    )
+
+
+def write_json_atomic(
+    path: Union[str, Path],
+    data: Any,
+    *,
+    indent: Optional[int] = 2,
+    ensure_ascii: bool = False,
+    default: Optional[Callable[[Any], Any]] = None,
+    depth: int = 2,
+) -> Path:
+    """
+    流式写入 JSON 文件（临时文件 + 原子重命名），输出与 json.dumps 逐字节一致（含 NaN 与科学计数法浮点数）。
+
+    Returns:
+        目标文件路径
+    """
+    with StreamingJsonWriter(path, indent=indent, ensure_ascii=ensure_ascii, default=default) as w:
+        w.stream(data, depth=depth)
+    return Path(path)
+
+
+def write_jsonl_atomic(
+    path: Union[str, Path],
+    rows: Iterable[Any],
+    *,
+    ensure_ascii: bool = False,
+    default: Optional[Callable[[Any], Any]] = None,
+) -> int:
+    """
+    流式写入 JSONL 文件（临时文件 + 原子重命名）。
+
+    Returns:
+        写入的行数
+    """
+    count = 0
+    with StreamingJsonWriter(path, indent=None, ensure_ascii=ensure_ascii, default=default) as w:
+        for row in rows:
+            w.line(row)
+            count += 1
+    return count
@@ -0,0 +1,267 @@
+"""
+跨进程共享限速器（SQLite 令牌桶）
+
+Streamlit UI、定时流水线与审查 worker 是同一主机上的不同进程，各自的 RateLimiter 只约束本进程，
+合起来会超出上游配额并触发 DefaultLLMPool 的熔断。SharedRateLimiter 把令牌桶状态
+（rate、burst、tokens、updated_at、blocked_until）放在同一个 SQLite 文件
+（默认 data/cache/rate_limits.sqlite）中，所有进程按桶名共享：
+- 预留：BEGIN IMMEDIATE 事务内补充并扣减令牌，进程间由 SQLite 写锁串行化（acquire_async 在线程池中执行预留）
+- 批量：一次预留 batch_size 个令牌（默认约 100ms 的配额）在本进程内消费，降低每个请求的 SQLite 往返；
+  本地租约超过 lease_s 未用完即作废（只会少用配额，不会超额）
+- Retry-After：record_failure 写入共享的 blocked_until，所有进程在到期前暂停放行
+  （其他进程已持有的本地租约仍可用完，至多 lease_s）
+
+与 RateLimiter / AdaptiveRateLimiter 接口一致，由 rate_limiter_mode: shared 选用（见 adaptive_limiter.create_rate_limiter）。
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+
+class SharedRateLimiter:
+    """
+    SQLite 持久化的令牌桶（进程间共享，进程内线程安全）
+
+    Args:
+        name: 桶名（同名的限速器共享配额）
+        rate_per_sec: 速率；以最后一次创建/设置的值为准
+        db_path: SQLite 文件
+        burst: 桶容量（默认 max(1, rate_per_sec)）
+        batch_size: 每次预留的令牌数（默认 rate_per_sec 的 10%，至少 1、至多 burst）
+        lease_s: 本地预留令牌的有效期
+        clock: 墙钟（跨进程共享，需用 time.time 一类的绝对时间；测试可注入）
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate_per_sec: float,
+        *,
+        db_path: Path,
+        burst: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        lease_s: float = 1.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if rate_per_sec <= 0:
+            raise ValueError("rate_per_sec must be positive")
+        self.name = name
+        self.db_path = Path(db_path)
+        self.lease_s = max(0.0, float(lease_s))
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._rate = float(rate_per_sec)
+        self._burst = float(burst) if burst else max(1.0, self._rate)
+        self._batch = int(batch_size) if batch_size else int(self._rate * 0.1)
+        self._batch = max(1, min(self._batch, int(self._burst)))
+        self._local = 0
+        self._lease_until = 0.0
+        self.stats = {"acquired": 0, "reservations": 0, "reserved": 0, "waits": 0, "expired": 0, "retry_after_waits": 0}
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), timeout=10.0, isolation_level=None, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL;")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS rate_buckets (
+                    name TEXT PRIMARY KEY,
+                    rate REAL NOT NULL,
+                    burst REAL NOT NULL,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    blocked_until REAL NOT NULL DEFAULT 0
+                )
+                """
+            )
+            self._conn.execute(
+                "INSERT OR IGNORE INTO rate_buckets(name, rate, burst, tokens, updated_at) VALUES(?, ?, ?, ?, ?)",
+                (name, self._rate, self._burst, self._burst, self._clock()),
+            )
+            self._write_rate()
+
+    def _write_rate(self) -> None:
+        self._conn.execute("UPDATE rate_buckets SET rate=?, burst=? WHERE name=?", (self._rate, self._burst, self.name))
+
+    # ------------------------------------------------------------------ 令牌桶
+
+    def _reserve_shared(self, now: float) -> float:
+        """从共享桶中预留一批令牌到本地；返回需要等待的秒数（0 表示已预留）"""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            rate, burst, tokens, updated_at, blocked_until = self._conn.execute(
+                "SELECT rate, burst, tokens, updated_at, blocked_until FROM rate_buckets WHERE name=?", (self.name,)
+            ).fetchone()
+            if now < blocked_until:
+                self._conn.execute("COMMIT")
+                self.stats["waits"] += 1
+                return blocked_until - now
+            tokens = min(burst, tokens + max(0.0, now - updated_at) * rate)
+            granted = min(self._batch, int(math.floor(tokens)))
+            self._conn.execute(
+                "UPDATE rate_buckets SET tokens=?, updated_at=? WHERE name=?", (tokens - granted, now, self.name)
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        if granted <= 0:
+            self.stats["waits"] += 1
+            return (1.0 - tokens) / rate
+        self.stats["reservations"] += 1
+        self.stats["reserved"] += granted
+        self._local = granted
+        self._lease_until = now + self.lease_s
+        return 0.0
+
+    def _reserve(self) -> float:
+        """取一个令牌：优先消费本地租约，不足时向共享桶预留；返回需要等待的秒数"""
+        with self._lock:
+            now = self._clock()
+            if self._local and now > self._lease_until:
+                self.stats["expired"] += self._local
+                self._local = 0
+            if not self._local:
+                wait = self._reserve_shared(now)
+                if wait > 0:
+                    return wait
+            self._local -= 1
+            self.stats["acquired"] += 1
+            return 0.0
+
+    def acquire(self) -> None:
+        """同步获取令牌（阻塞）"""
+        while True:
+            wait = self._reserve()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def _take_local(self) -> bool:
+        """不碰 SQLite、不等锁地消费一个本地租约令牌；无可用令牌（或锁被占用）时返回 False"""
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            if self._local and self._clock() <= self._lease_until:
+                self._local -= 1
+                self.stats["acquired"] += 1
+                return True
+            return False
+        finally:
+            self._lock.release()
+
+    async def acquire_async(self) -> None:
+        """
+        异步获取令牌
+
+        本地租约内的令牌直接在事件循环中消费；向共享桶预留时 BEGIN IMMEDIATE 可能因其他进程持有写锁
+        等待至多 busy timeout（10s），因此放到线程池执行，事件循环只在需要等待配额时 await asyncio.sleep。
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            if self._take_local():
+                return
+            wait = await loop.run_in_executor(None, self._reserve)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def try_acquire(self) -> bool:
+        """尝试获取令牌（非阻塞）"""
+        return self._reserve() <= 0
+
+    def get_rate_per_sec(self) -> float:
+        """获取当前速率"""
+        return self._rate
+
+    def set_rate_per_sec(self, rate_per_sec: float) -> None:
+        """设置速率（对所有共享该桶的进程生效）"""
+        if rate_per_sec <= 0:
+            raise ValueError("rate_per_sec must be positive")
+        with self._lock:
+            self._rate = float(rate_per_sec)
+            self._write_rate()
+
+    # 兼容 RateLimiter 的属性访问
+    @property
+    def rate_per_sec(self) -> float:
+        return self._rate
+
+    # ------------------------------------------------------------------ 反馈
+
+    def record_success(self) -> None:
+        """共享桶不调整速率"""
+
+    def record_failure(self, status: Optional[int] = None, retry_after: Optional[float] = None, timeout: bool = False) -> bool:
+        """按 Retry-After 暂停所有进程的放行，并作废本地租约；返回是否设置了暂停"""
+        if retry_after is None or retry_after <= 0:
+            return False
+        with self._lock:
+            until = self._clock() + float(retry_after)
+            self._conn.execute(
+                "UPDATE rate_buckets SET blocked_until=MAX(blocked_until, ?) WHERE name=?", (until, self.name)
+            )
+            self._local = 0
+            self.stats["retry_after_waits"] += 1
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = dict(self.stats)
+            row = self._conn.execute(
+                "SELECT tokens, updated_at, blocked_until FROM rate_buckets WHERE name=?", (self.name,)
+            ).fetchone()
+            now = self._clock()
+        out["rate_per_sec"] = self._rate
+        out["batch_size"] = self._batch
+        out["local_tokens"] = self._local
+        if row is not None:
+            out["shared_tokens"] = round(min(self._burst, row[0] + max(0.0, now - row[1]) * self._rate), 3)
+            out["blocked_for_s"] = round(max(0.0, row[2] - now), 3)
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_limiters: Dict[str, SharedRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def shared_limiter_db_path() -> Path:
+    """共享桶文件：agent1_config.shared_rate_limiter_db，默认 data/cache/rate_limits.sqlite"""
+    from .paths import ProjectPaths
+    try:
+        from .config import get_config_manager
+        configured = get_config_manager().get_config_value("shared_rate_limiter_db", None, "agent1_config")
+    except Exception:
+        configured = None
+    if configured:
+        path = Path(str(configured))
+        return path if path.is_absolute() else ProjectPaths.ROOT_DIR / path
+    return ProjectPaths.DATA_DIR / "cache" / "rate_limits.sqlite"
+
+
+def get_shared_limiter(name: str, rate_per_sec: Optional[float] = None) -> SharedRateLimiter:
+    """进程内按桶名复用的跨进程限速器；首次创建时使用 rate_per_sec（默认 1.0）"""
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = _limiters[name] = SharedRateLimiter(
+                name, float(rate_per_sec or 1.0), db_path=shared_limiter_db_path()
+            )
+        return limiter
+
+
+def credential_bucket(scope: str, credential: str) -> str:
+    """按凭据（API key）划分的桶名；只保存摘要，不把 key 写入文件"""
+    digest = hashlib.sha256(credential.encode("utf-8")).hexdigest()[:16]
+    return f"{scope}:{digest}"
@@ -0,0 +1,182 @@
+"""
+批量 SimHash 指纹。
+
+原 ProjectPaths.simhash 对每个 token 做一次 MD5 十六进制摘要，再用 64 次 Python 循环累加位计数。
+SimHashEngine 的做法：
+- token 哈希有界缓存（新闻中的高频词大量重复）
+- 一批文档的全部 token 哈希拼成一个 uint64 数组，np.unpackbits 展开为 (tokens, 64) 的位矩阵，
+  按文档分段求和后取符号，一次得到整批指纹
+- hash="md5"（默认）与原实现逐位一致：原实现只用到 MD5 整数的低 64 位，即摘要后 8 字节；
+  hash="blake2b" 使用 8 字节 blake2b，更快，但指纹与旧数据不兼容
+- cjk_ngram>0 时对连续中日韩字符做字符 n-gram 切分（空白切分对中文几乎整句成词）
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+_WS_RE = re.compile(r"\s+")
+_CJK_RUN_RE = re.compile(r"([\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]+)")
+
+# 单次展开的 token 数上限（位矩阵约 64 字节/token）
+_CHUNK_TOKENS = 262_144
+
+
+def _md5_low64(token: str) -> int:
+    return int.from_bytes(hashlib.md5(token.encode()).digest()[8:], "big")
+
+
+def _blake2b64(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "big")
+
+
+_HASHES = {"md5": _md5_low64, "blake2b": _blake2b64}
+
+
+def tokenize(text: str, cjk_ngram: int = 0) -> List[str]:
+    """小写 + 空白切分；cjk_ngram>0 时连续 CJK 片段再切成字符 n-gram"""
+    tokens = _WS_RE.sub(" ", text.lower()).split()
+    if cjk_ngram <= 0:
+        return tokens
+    out: List[str] = []
+    for tok in tokens:
+        for part in _CJK_RUN_RE.split(tok):
+            if not part:
+                continue
+            if _CJK_RUN_RE.fullmatch(part) and len(part) > cjk_ngram:
+                out.extend(part[i:i + cjk_ngram] for i in range(len(part) - cjk_ngram + 1))
+            else:
+                out.append(part)
+    return out
+
+
+class SimHashEngine:
+    """
+    64 位 SimHash 指纹引擎。
+
+    Args:
+        hash: "md5"（与旧指纹逐位兼容）或 "blake2b"
+        cjk_ngram: CJK 字符 n-gram 长度，0 表示仅空白切分（与旧实现一致）
+        cache_size: token 哈希缓存条数上限（满后整体清空）
+    """
+
+    def __init__(self, hash: str = "md5", cjk_ngram: int = 0, cache_size: int = 500_000) -> None:
+        if hash not in _HASHES:
+            raise ValueError(f"unknown simhash hash: {hash}")
+        self.hash = hash
+        self.cjk_ngram = max(0, int(cjk_ngram))
+        self.cache_size = max(1, int(cache_size))
+        self._hash_fn = _HASHES[hash]
+        self._cache: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def signature(self) -> str:
+        """指纹算法标识；不同 signature 的指纹不可互相比较"""
+        return self.hash if not self.cjk_ngram else f"{self.hash}-cjk{self.cjk_ngram}"
+
+    @property
+    def bit_compatible(self) -> bool:
+        return self.signature == "md5"
+
+    def _token_hashes(self, tokens: Sequence[str]) -> List[int]:
+        cache = self._cache
+        out = []
+        missing = {}
+        for tok in tokens:
+            h = cache.get(tok)
+            if h is None:
+                h = missing.get(tok)
+                if h is None:
+                    h = missing[tok] = self._hash_fn(tok)
+            out.append(h)
+        if missing:
+            with self._lock:
+                if len(cache) + len(missing) > self.cache_size:
+                    cache.clear()
+                cache.update(missing)
+        return out
+
+    def fingerprint(self, text: str) -> int:
+        return self.fingerprints([text])[0]
+
+    def fingerprints(self, texts: Iterable[str]) -> List[int]:
+        """整批文档的指纹（顺序与输入一致）；无 token 的文档指纹为 0"""
+        token_lists = [tokenize(t or "", self.cjk_ngram) for t in texts]
+        result = [0] * len(token_lists)
+        start = 0
+        while start < len(token_lists):
+            # 按 token 总量分块，控制位矩阵内存
+            end, total = start, 0
+            while end < len(token_lists) and (end == start or total + len(token_lists[end]) <= _CHUNK_TOKENS):
+                total += len(token_lists[end])
+                end += 1
+            self._fingerprint_chunk(token_lists, start, end, result)
+            start = end
+        return result
+
+    def _fingerprint_chunk(self, token_lists: List[List[str]], start: int, end: int, result: List[int]) -> None:
+        docs = [i for i in range(start, end) if token_lists[i]]
+        if not docs:
+            return
+        counts = np.fromiter((len(token_lists[i]) for i in docs), dtype=np.int64, count=len(docs))
+        hashes = np.fromiter(
+            (h for i in docs for h in self._token_hashes(token_lists[i])),
+            dtype=np.uint64,
+            count=int(counts.sum()),
+        )
+        # 小端字节序展开后第 i 列即原实现的 (h >> i) & 1
+        bits = np.unpackbits(hashes.astype("<u8").view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+        offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        ones = np.add.reduceat(bits.astype(np.int32), offsets, axis=0)
+        # 原实现：每位 +1/-1 累加后 > 0 置位，即 2*ones - n > 0
+        positive = (2 * ones) > counts[:, None]
+        packed = np.packbits(positive, axis=1, bitorder="little").view("<u8").ravel()
+        for i, fp in zip(docs, packed.tolist()):
+            result[i] = int(fp)
+
+
+def simhash_reference(text: str, bits: int = 64) -> int:
+    """逐 token、逐位循环的参考实现（原 ProjectPaths.simhash），用于校验与非 64 位场景"""
+    tokens = _WS_RE.sub(" ", text.lower()).split()
+    v = [0] * bits
+    for token in tokens:
+        h = int(hashlib.md5(token.encode()).hexdigest(), 16)
+        for i in range(bits):
+            if (h >> i) & 1:
+                v[i] += 1
+            else:
+                v[i] -= 1
+    hash_val = 0
+    for i in range(bits):
+        if v[i] > 0:
+            hash_val |= (1 << i)
+    return hash_val
+
+
+_engine: Optional[SimHashEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_simhash_engine() -> SimHashEngine:
+    """
+    默认指纹引擎，读取 agent1_config：
+    - simhash_hash: md5（默认，兼容已存指纹）/ blake2b
+    - simhash_cjk_ngram: 0（默认）/ 2 等
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            try:
+                from .config import get_config_manager
+                cm = get_config_manager()
+                hash_name = str(cm.get_config_value("simhash_hash", "md5", "agent1_config") or "md5")
+                cjk_ngram = int(cm.get_config_value("simhash_cjk_ngram", 0, "agent1_config") or 0)
+            except Exception:
+                hash_name, cjk_ngram = "md5", 0
+            _engine = SimHashEngine(hash_name, cjk_ngram)
+        return _engine
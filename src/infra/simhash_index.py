@@ -0,0 +1,268 @@
+"""
+SimHash 近重复索引（多表 / 鸽巢法）。
+
+原 NewsDeduplicator 把新指纹与已见过的全部指纹逐一比较汉明距离，批内 O(n²)，且进程结束即遗忘。
+这里把 64 位指纹切成 k+1 段（k 为汉明距离阈值），每段一张查找表：
+两指纹距离 <= k 时，k 个不同位最多落在 k 段里，至少有一段完全相同，
+因此只需比较与查询指纹某一段相同的候选，查询为亚线性。
+
+每个指纹记录首次写入它的文档键（source:id）：同一文档再次经过另一道去重（如 dedupe_file 之后
+的 process_expanded_news）时命中的是自己，不视为重复。
+
+指纹持久化在 SQLite（默认 data/cache/simhash_index.sqlite），打开时只加载保留窗口内的记录，
+过期记录在打开/刷写时清理（滚动窗口）。新增指纹先缓冲，flush() 或缓冲满时批量写入。
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+_MASK64 = (1 << 64) - 1
+
+
+def _to_signed(fp: int) -> int:
+    """SQLite INTEGER 为有符号 64 位"""
+    fp &= _MASK64
+    return fp - (1 << 64) if fp >= (1 << 63) else fp
+
+
+def _to_unsigned(v: int) -> int:
+    return v & _MASK64
+
+
+def band_layout(threshold: int, bits: int = 64) -> List[Tuple[int, int]]:
+    """把 bits 位切成 threshold+1 段，返回 [(shift, width)]"""
+    bands = threshold + 1
+    base, extra = divmod(bits, bands)
+    layout = []
+    shift = 0
+    for i in range(bands):
+        width = base + (1 if i < extra else 0)
+        layout.append((shift, width))
+        shift += width
+    return layout
+
+
+class SimHashIndex:
+    """
+    汉明距离 <= threshold 的近重复查询索引。
+
+    Args:
+        threshold: 汉明距离阈值 k（0~31），切成 k+1 段
+        db_path: SQLite 文件；None 时仅内存（不持久化）
+        retention_days: 保留窗口（天），<=0 表示不过期
+        flush_every: 缓冲多少条新指纹后自动写盘
+        now: 时钟（测试可注入）
+    """
+
+    def __init__(
+        self,
+        threshold: int = 3,
+        db_path: Optional[Path] = None,
+        *,
+        retention_days: float = 30.0,
+        flush_every: int = 500,
+        now: Callable[[], float] = time.time,
+    ) -> None:
+        threshold = int(threshold)
+        if not 0 <= threshold <= 31:
+            raise ValueError(f"threshold must be in [0, 31], got {threshold}")
+        self.threshold = threshold
+        self.db_path = Path(db_path) if db_path else None
+        self.retention_sec = float(retention_days) * 86400 if retention_days and retention_days > 0 else 0.0
+        self.flush_every = max(1, int(flush_every))
+        self._now = now
+        self._layout = band_layout(threshold)
+        self._tables: List[Dict[int, List[int]]] = [dict() for _ in self._layout]
+        self._seen: Dict[int, float] = {}  # 指纹 -> 写入时间
+        self._keys: Dict[int, str] = {}  # 指纹 -> 首次写入的文档键
+        self._pending: List[Tuple[int, str, float]] = []
+        self._lock = threading.RLock()
+        self.stats = {"queries": 0, "duplicates": 0, "candidates": 0}
+        if self.db_path is not None:
+            self._load()
+
+    # -------------------------
+    # 持久化
+    # -------------------------
+    def _connect(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS simhash_fingerprints (
+                fp INTEGER PRIMARY KEY,
+                doc_key TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_simhash_created ON simhash_fingerprints(created_at)")
+        return conn
+
+    def _cutoff(self) -> Optional[float]:
+        return self._now() - self.retention_sec if self.retention_sec else None
+
+    def _load(self) -> None:
+        conn = self._connect()
+        try:
+            cutoff = self._cutoff()
+            if cutoff is not None:
+                conn.execute("DELETE FROM simhash_fingerprints WHERE created_at < ?", (cutoff,))
+                conn.commit()
+            for fp, key, created_at in conn.execute("SELECT fp, doc_key, created_at FROM simhash_fingerprints"):
+                self._insert(_to_unsigned(int(fp)), float(created_at), str(key or ""))
+        finally:
+            conn.close()
+
+    def flush(self) -> int:
+        """把缓冲的新指纹写入 SQLite，并清理过期记录；返回写入条数"""
+        with self._lock:
+            if self.db_path is None:
+                self._pending.clear()
+                return 0
+            rows, self._pending = self._pending, []
+        conn = self._connect()
+        try:
+            if rows:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO simhash_fingerprints(fp, doc_key, created_at) VALUES(?, ?, ?)",
+                    [(_to_signed(fp), key, ts) for fp, key, ts in rows],
+                )
+            cutoff = self._cutoff()
+            if cutoff is not None:
+                conn.execute("DELETE FROM simhash_fingerprints WHERE created_at < ?", (cutoff,))
+            conn.commit()
+        finally:
+            conn.close()
+        return len(rows)
+
+    # -------------------------
+    # 内存表
+    # -------------------------
+    def _bands(self, fp: int):
+        for shift, width in self._layout:
+            yield (fp >> shift) & ((1 << width) - 1)
+
+    def _insert(self, fp: int, created_at: float, key: str) -> None:
+        if fp not in self._seen:
+            for table, band in zip(self._tables, self._bands(fp)):
+                table.setdefault(band, []).append(fp)
+            self._keys[fp] = key
+        self._seen[fp] = created_at
+
+    def prune(self) -> int:
+        """从内存表中移除保留窗口之外的指纹（长驻进程定期调用）"""
+        cutoff = self._cutoff()
+        if cutoff is None:
+            return 0
+        with self._lock:
+            expired = {fp for fp, ts in self._seen.items() if ts < cutoff}
+            if not expired:
+                return 0
+            for fp in expired:
+                del self._seen[fp]
+                self._keys.pop(fp, None)
+            for table in self._tables:
+                for band in list(table.keys()):
+                    kept = [x for x in table[band] if x not in expired]
+                    if kept:
+                        table[band] = kept
+                    else:
+                        del table[band]
+            return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def __contains__(self, fp: object) -> bool:
+        return fp in self._seen
+
+    # -------------------------
+    # 查询
+    # -------------------------
+    def find(self, fp: int) -> Optional[int]:
+        """返回一个与 fp 汉明距离 <= threshold 的已存指纹，没有则 None"""
+        fp &= _MASK64
+        with self._lock:
+            self.stats["queries"] += 1
+            if fp in self._seen:
+                return fp
+            checked = set()
+            for table, band in zip(self._tables, self._bands(fp)):
+                for cand in table.get(band, ()):
+                    if cand in checked:
+                        continue
+                    checked.add(cand)
+                    if bin(fp ^ cand).count("1") <= self.threshold:
+                        self.stats["candidates"] += len(checked)
+                        return cand
+            self.stats["candidates"] += len(checked)
+            return None
+
+    def key_of(self, fp: int) -> str:
+        return self._keys.get(fp & _MASK64, "")
+
+    def add(self, fp: int, key: str = "") -> None:
+        fp &= _MASK64
+        with self._lock:
+            ts = self._now()
+            self._insert(fp, ts, key)
+            if self.db_path is not None:
+                self._pending.append((fp, self._keys[fp], ts))
+                should_flush = len(self._pending) >= self.flush_every
+            else:
+                should_flush = False
+        if should_flush:
+            self.flush()
+
+    def check_and_add(self, fp: int, key: str = "") -> bool:
+        """
+        与其他文档近重复返回 True；否则记录指纹并返回 False（原子操作）。
+        命中的指纹属于同一 key（同一文档再次经过去重）时不算重复。
+        """
+        with self._lock:
+            match = self.find(fp)
+            if match is not None and not (key and self._keys.get(match) == key):
+                self.stats["duplicates"] += 1
+                return True
+            if match is None:
+                self.add(fp, key)
+            return False
+
+
+_indexes: Dict[int, SimHashIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_simhash_index(threshold: int) -> SimHashIndex:
+    """
+    进程内共享的持久化 SimHash 索引（data/cache/simhash_index.sqlite）。
+
+    保留窗口取 agent1_config.simhash_retention_days（默认 30 天）。
+    指纹算法不是默认的 md5 兼容模式时使用独立的文件，避免与旧指纹混比。
+    """
+    threshold = int(threshold)
+    with _indexes_lock:
+        index = _indexes.get(threshold)
+        if index is None:
+            from .paths import ProjectPaths
+            try:
+                from .config import get_config_manager
+                retention = float(get_config_manager().get_config_value("simhash_retention_days", 30, "agent1_config"))
+            except Exception:
+                retention = 30.0
+            from .simhash import get_simhash_engine
+            engine = get_simhash_engine()
+            name = "simhash_index.sqlite" if engine.bit_compatible else f"simhash_index.{engine.signature}.sqlite"
+            index = SimHashIndex(
+                threshold,
+                ProjectPaths.DATA_DIR / "cache" / name,
+                retention_days=retention,
+            )
+            _indexes[threshold] = index
+        return index
@@ -0,0 +1,259 @@
+"""
+有界流式流水线
+
+把“整表抓取 → 整表去重 → 整表抽取 → 最后统一写入”改为逐条流动的阶段链：
+- 阶段之间是有界 asyncio.Queue：下游处理不过来时上游在 put 处等待（背压），内存占用与批量大小无关
+- 每个阶段有独立的并发数（worker 数）；设置了 batch_size 的阶段把条目攒批后一次处理（如批量写库），
+  攒批最多等待 batch_timeout_s
+- 每个阶段记录进出数量、丢弃/错误数、忙碌时间、队列高水位与吞吐
+
+阶段函数：async (item) -> item | None；返回 None 表示丢弃（如去重命中）。
+攒批阶段：async (items) -> Optional[List[item]]，返回值继续向下游传递（None 表示不传递）。
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, List, Optional
+
+_DONE = object()
+
+
+@dataclass
+class StageMetrics:
+    """单个阶段的计数与计时"""
+
+    items_in: int = 0
+    items_out: int = 0
+    dropped: int = 0
+    errors: int = 0
+    batches: int = 0
+    busy_s: float = 0.0
+    queue_peak: int = 0
+    first_at: Optional[float] = None
+    last_at: Optional[float] = None
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = (self.last_at - self.first_at) if self.first_at is not None and self.last_at is not None else 0.0
+        out: Dict[str, Any] = {
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "busy_s": round(self.busy_s, 3),
+            "queue_peak": self.queue_peak,
+            "throughput_per_s": round(self.items_in / elapsed, 2) if elapsed > 0 else None,
+        }
+        if self.batches:
+            out["batches"] = self.batches
+        return out
+
+
+@dataclass
+class Stage:
+    """
+    流水线阶段
+
+    Args:
+        name: 阶段名（指标键）
+        func: 处理函数
+        concurrency: worker 数
+        queue_size: 输入队列容量
+        batch_size: 设置时攒批处理（每批至多 batch_size 条），func 接收列表
+        batch_timeout_s: 攒批最长等待
+    """
+
+    name: str
+    func: Callable[[Any], Awaitable[Any]]
+    concurrency: int = 1
+    queue_size: int = 64
+    batch_size: Optional[int] = None
+    batch_timeout_s: float = 1.0
+    metrics: StageMetrics = field(default_factory=StageMetrics)
+
+
+class StreamPipeline:
+    """
+    把异步数据源依次送过各阶段。
+
+    Args:
+        stages: 阶段列表（按顺序）
+        source_name: 数据源在指标中的键
+        logger: 阶段函数出错时记录日志（可选）
+        clock: 计时（测试可注入）
+    """
+
+    def __init__(
+        self,
+        stages: List[Stage],
+        source_name: str = "source",
+        logger: Any = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        if not stages:
+            raise ValueError("stages must not be empty")
+        self.stages = stages
+        self.source_name = source_name
+        self.logger = logger
+        self._clock = clock
+        self.source_metrics = StageMetrics()
+
+    async def run(self, source: AsyncIterable[Any]) -> Dict[str, Any]:
+        """运行直至数据源耗尽且各阶段排空；返回各阶段指标（数据源记在 source_name 下）"""
+        queues = [asyncio.Queue(maxsize=max(1, s.queue_size)) for s in self.stages]
+        started = self._clock()
+
+        async def feed() -> None:
+            m = self.source_metrics
+            try:
+                async for item in source:
+                    now = self._clock()
+                    if m.first_at is None:
+                        m.first_at = now
+                    m.items_in += 1
+                    m.items_out += 1
+                    m.last_at = now
+                    await self._put(queues[0], item, self.stages[0].metrics)
+            finally:
+                for _ in range(max(1, self.stages[0].concurrency)):
+                    await queues[0].put(_DONE)
+
+        async def finish_stage(index: int, workers: List[asyncio.Task]) -> None:
+            await asyncio.gather(*workers)
+            if index + 1 < len(self.stages):
+                for _ in range(max(1, self.stages[index + 1].concurrency)):
+                    await queues[index + 1].put(_DONE)
+
+        tasks: List[asyncio.Task] = [asyncio.ensure_future(feed())]
+        for i, stage in enumerate(self.stages):
+            out_q = queues[i + 1] if i + 1 < len(self.stages) else None
+            next_metrics = self.stages[i + 1].metrics if out_q is not None else None
+            worker = self._batch_worker if stage.batch_size else self._worker
+            workers = [
+                asyncio.ensure_future(worker(stage, queues[i], out_q, next_metrics))
+                for _ in range(max(1, stage.concurrency))
+            ]
+            tasks.append(asyncio.ensure_future(finish_stage(i, workers)))
+            tasks.extend(workers)
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        metrics: Dict[str, Any] = {self.source_name: self.source_metrics.summary()}
+        for stage in self.stages:
+            metrics[stage.name] = stage.metrics.summary()
+        metrics["elapsed_s"] = round(self._clock() - started, 3)
+        return metrics
+
+    @staticmethod
+    async def _put(queue: asyncio.Queue, item: Any, metrics: StageMetrics) -> None:
+        await queue.put(item)
+        metrics.queue_peak = max(metrics.queue_peak, queue.qsize())
+
+    def _log_error(self, stage: Stage, error: Exception) -> None:
+        if self.logger is not None:
+            self.logger.warning(f"[stream] 阶段 {stage.name} 处理失败: {error}")
+
+    async def _emit(self, results: List[Any], out_q: Optional[asyncio.Queue], next_metrics: Optional[StageMetrics], m: StageMetrics) -> None:
+        for result in results:
+            m.items_out += 1
+            if out_q is not None:
+                await self._put(out_q, result, next_metrics)
+
+    async def _worker(self, stage: Stage, in_q: asyncio.Queue, out_q: Optional[asyncio.Queue], next_metrics: Optional[StageMetrics]) -> None:
+        m = stage.metrics
+        while True:
+            item = await in_q.get()
+            if item is _DONE:
+                return
+            start = self._clock()
+            if m.first_at is None:
+                m.first_at = start
+            m.items_in += 1
+            try:
+                result = await stage.func(item)
+            except Exception as e:
+                m.errors += 1
+                result = None
+                self._log_error(stage, e)
+            end = self._clock()
+            m.busy_s += end - start
+            m.last_at = end
+            if result is None:
+                m.dropped += 1
+                continue
+            await self._emit([result], out_q, next_metrics, m)
+
+    async def _batch_worker(self, stage: Stage, in_q: asyncio.Queue, out_q: Optional[asyncio.Queue], next_metrics: Optional[StageMetrics]) -> None:
+        m = stage.metrics
+        loop = asyncio.get_running_loop()
+        done = False
+        while not done:
+            batch: List[Any] = []
+            item = await in_q.get()
+            if item is _DONE:
+                return
+            batch.append(item)
+            deadline = loop.time() + stage.batch_timeout_s
+            while len(batch) < stage.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(in_q.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                if item is _DONE:
+                    done = True
+                    break
+                batch.append(item)
+
+            start = self._clock()
+            if m.first_at is None:
+                m.first_at = start
+            m.items_in += len(batch)
+            m.batches += 1
+            try:
+                results = await stage.func(batch)
+            except Exception as e:
+                m.errors += 1
+                results = None
+                self._log_error(stage, e)
+            end = self._clock()
+            m.busy_s += end - start
+            m.last_at = end
+            results = list(results or [])
+            m.dropped += max(0, len(batch) - len(results))
+            await self._emit(results, out_q, next_metrics, m)
+
+
+async def merge_async_iterables(iterables: List[AsyncIterable[Any]], queue_size: int = 64) -> AsyncIterable[Any]:
+    """并发消费多个异步迭代器并按到达顺序产出（有界缓冲；某个源出错只结束该源）"""
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size))
+    end = object()
+
+    async def pump(it: AsyncIterable[Any]) -> None:
+        try:
+            async for item in it:
+                await queue.put(item)
+        finally:
+            await queue.put(end)
+
+    tasks = [asyncio.ensure_future(pump(it)) for it in iterables]
+    remaining = len(tasks)
+    try:
+        while remaining:
+            item = await queue.get()
+            if item is end:
+                remaining -= 1
+                continue
+            yield item
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
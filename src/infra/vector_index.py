@@ -0,0 +1,489 @@
+"""
+基础设施层 - 持久化向量索引
+
+- VectorIndex: float16 memmap 存向量 + JSON ID 映射（行 -> 文本/所属 ID），支持追加、墓碑删除、
+  归属迁移（合并）与分块暴力 top-k 检索；内存占用与分块大小相关，而不是 n²。
+- EntityVectorIndex: 在 VectorIndex 之上为实体名称/别名维护嵌入，供合并审查与别名解析使用
+  （nearest_entities）。编码复用 EmbeddingSimilarityEngine 的批量编码与缓存。
+"""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from .file_utils import read_json_sync
+from .serialization import write_json_atomic
+
+SCHEMA_VERSION = "vector_index_v1"
+
+
+class VectorIndex:
+    """
+    float16 memmap + ID 映射的向量索引。
+
+    每一行是一个 (key, owner) 向量：key 为被编码的文本，owner 为所属对象 ID（如实体 ID）。
+    同一 owner 可以有多行（名称 + 别名），检索结果按 owner 去重、取最高分的行。
+
+    Args:
+        index_dir: 索引目录（vectors.f16 + ids.json）
+        block_size: 检索时每块载入的行数
+    """
+
+    VECTORS_FILE = "vectors.f16"
+    IDS_FILE = "ids.json"
+
+    def __init__(self, index_dir: Union[str, Path], *, block_size: int = 16384):
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.block_size = max(1, int(block_size))
+        self._lock = threading.RLock()
+        self.dim: int = 0
+        self.count: int = 0
+        self.capacity: int = 0
+        self.keys: List[str] = []
+        self.owners: List[Optional[str]] = []
+        self.labels: Dict[str, str] = {}
+        self._rows_by_owner: Dict[str, List[int]] = {}
+        self._mm: Optional[np.memmap] = None
+        self._load()
+
+    # -------------------------
+    # 持久化
+    # -------------------------
+    @property
+    def _vectors_path(self) -> Path:
+        return self.index_dir / self.VECTORS_FILE
+
+    @property
+    def _ids_path(self) -> Path:
+        return self.index_dir / self.IDS_FILE
+
+    def _load(self) -> None:
+        try:
+            meta = read_json_sync(self._ids_path)
+        except (OSError, ValueError):
+            return
+        if not isinstance(meta, dict) or meta.get("schema") != SCHEMA_VERSION:
+            return
+        dim = int(meta.get("dim") or 0)
+        capacity = int(meta.get("capacity") or 0)
+        keys = meta.get("keys") or []
+        owners = meta.get("owners") or []
+        if dim <= 0 or capacity <= 0 or len(keys) != len(owners) or len(keys) > capacity:
+            return
+        if not self._vectors_path.exists() or self._vectors_path.stat().st_size < capacity * dim * 2:
+            return
+        self.dim, self.capacity = dim, capacity
+        self.keys, self.owners = list(keys), list(owners)
+        self.count = len(self.keys)
+        self.labels = dict(meta.get("labels") or {})
+        self._mm = np.memmap(self._vectors_path, dtype=np.float16, mode="r+", shape=(capacity, dim))
+        self._reindex_owners()
+
+    def _reindex_owners(self) -> None:
+        self._rows_by_owner = {}
+        for row, owner in enumerate(self.owners):
+            if owner is not None:
+                self._rows_by_owner.setdefault(owner, []).append(row)
+
+    def flush(self) -> None:
+        """落盘：先 flush 向量，再原子写入 ID 映射"""
+        with self._lock:
+            if self._mm is not None:
+                self._mm.flush()
+            write_json_atomic(
+                self._ids_path,
+                {
+                    "schema": SCHEMA_VERSION,
+                    "dim": self.dim,
+                    "capacity": self.capacity,
+                    "keys": self.keys,
+                    "owners": self.owners,
+                    "labels": self.labels,
+                },
+                indent=None,
+                depth=1,
+            )
+
+    def _ensure_capacity(self, rows_needed: int) -> None:
+        if self.count + rows_needed <= self.capacity:
+            return
+        new_capacity = max(1024, self.capacity)
+        while new_capacity < self.count + rows_needed:
+            new_capacity *= 2
+        old = self._mm
+        tmp_path = self._vectors_path.with_suffix(".f16.tmp")
+        mm = np.memmap(tmp_path, dtype=np.float16, mode="w+", shape=(new_capacity, self.dim))
+        if old is not None and self.count:
+            for start in range(0, self.count, self.block_size):
+                end = min(self.count, start + self.block_size)
+                mm[start:end] = old[start:end]
+        mm.flush()
+        del mm
+        self._mm = None
+        del old
+        tmp_path.replace(self._vectors_path)
+        self._mm = np.memmap(self._vectors_path, dtype=np.float16, mode="r+", shape=(new_capacity, self.dim))
+        self.capacity = new_capacity
+
+    # -------------------------
+    # 写操作
+    # -------------------------
+    def add(self, owner: str, keys: List[str], vectors: np.ndarray, *, label: Optional[str] = None) -> int:
+        """追加 owner 的若干行（vectors 需与 keys 等长，内部做 L2 归一化）"""
+        if not keys:
+            return 0
+        vecs = np.asarray(vectors, dtype=np.float32).reshape(len(keys), -1)
+        norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vecs = vecs / norms
+        with self._lock:
+            if self.dim == 0:
+                self.dim = int(vecs.shape[1])
+            elif vecs.shape[1] != self.dim:
+                raise ValueError(f"向量维度不一致: {vecs.shape[1]} != {self.dim}")
+            self._ensure_capacity(len(keys))
+            self._mm[self.count:self.count + len(keys)] = vecs.astype(np.float16)
+            rows = self._rows_by_owner.setdefault(owner, [])
+            for key in keys:
+                self.keys.append(key)
+                self.owners.append(owner)
+                rows.append(self.count)
+                self.count += 1
+            if label:
+                self.labels[owner] = label
+            return len(keys)
+
+    def remove_owner(self, owner: str) -> int:
+        """墓碑删除 owner 的所有行（compact 时回收空间）"""
+        with self._lock:
+            rows = self._rows_by_owner.pop(owner, [])
+            for row in rows:
+                self.owners[row] = None
+            self.labels.pop(owner, None)
+            return len(rows)
+
+    def reassign(self, from_owner: str, to_owner: str) -> int:
+        """把 from_owner 的行归到 to_owner（合并时使用，无需重新编码）"""
+        if from_owner == to_owner:
+            return 0
+        with self._lock:
+            rows = self._rows_by_owner.pop(from_owner, [])
+            if not rows:
+                return 0
+            dst = self._rows_by_owner.setdefault(to_owner, [])
+            existing = {self.keys[r] for r in dst}
+            moved = 0
+            for row in rows:
+                if self.keys[row] in existing:
+                    self.owners[row] = None
+                    continue
+                self.owners[row] = to_owner
+                dst.append(row)
+                existing.add(self.keys[row])
+                moved += 1
+            self.labels.pop(from_owner, None)
+            return moved
+
+    def compact(self) -> int:
+        """重写向量文件以回收墓碑行，返回回收的行数"""
+        with self._lock:
+            live = [r for r in range(self.count) if self.owners[r] is not None]
+            dropped = self.count - len(live)
+            if dropped == 0 or self._mm is None:
+                return 0
+            tmp_path = self._vectors_path.with_suffix(".f16.tmp")
+            capacity = max(1024, len(live))
+            mm = np.memmap(tmp_path, dtype=np.float16, mode="w+", shape=(capacity, self.dim))
+            for start in range(0, len(live), self.block_size):
+                chunk = live[start:start + self.block_size]
+                mm[start:start + len(chunk)] = self._mm[chunk]
+            mm.flush()
+            del mm
+            self._mm = None
+            tmp_path.replace(self._vectors_path)
+            self.keys = [self.keys[r] for r in live]
+            self.owners = [self.owners[r] for r in live]
+            self.count = len(live)
+            self.capacity = capacity
+            self._mm = np.memmap(self._vectors_path, dtype=np.float16, mode="r+", shape=(capacity, self.dim))
+            self._reindex_owners()
+            self.flush()
+            return dropped
+
+    # -------------------------
+    # 读操作
+    # -------------------------
+    def __len__(self) -> int:
+        return len(self._rows_by_owner)
+
+    @property
+    def tombstones(self) -> int:
+        return self.count - sum(len(v) for v in self._rows_by_owner.values())
+
+    def owner_ids(self) -> List[str]:
+        with self._lock:
+            return list(self._rows_by_owner.keys())
+
+    def keys_of(self, owner: str) -> List[str]:
+        with self._lock:
+            return [self.keys[r] for r in self._rows_by_owner.get(owner, [])]
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        *,
+        exclude: Optional[Set[str]] = None,
+    ) -> List[Tuple[str, str, float]]:
+        """
+        分块暴力 top-k（余弦），返回 [(owner, matched_key, cosine)]，按 owner 去重。
+
+        每块只保留前 k*R 行（R 为单个 owner 的最大行数），足以保证按 owner 去重后的 top-k 精确。
+        """
+        with self._lock:
+            if self._mm is None or self.count == 0 or k <= 0:
+                return []
+            q = np.asarray(query, dtype=np.float32).reshape(-1)
+            norm = float(np.linalg.norm(q))
+            if q.shape[0] != self.dim or norm == 0:
+                return []
+            q = q / norm
+            exclude = exclude or set()
+            max_rows = max((len(v) for v in self._rows_by_owner.values()), default=1)
+            keep = max(1, int(k) * max_rows)
+            owners = np.array([o is not None and o not in exclude for o in self.owners], dtype=bool)
+
+            cand_rows: List[np.ndarray] = []
+            cand_scores: List[np.ndarray] = []
+            for start in range(0, self.count, self.block_size):
+                end = min(self.count, start + self.block_size)
+                scores = self._mm[start:end].astype(np.float32) @ q
+                scores[~owners[start:end]] = -np.inf
+                if end - start > keep:
+                    top = np.argpartition(-scores, keep - 1)[:keep]
+                else:
+                    top = np.arange(end - start)
+                top = top[np.isfinite(scores[top])]
+                cand_rows.append(top + start)
+                cand_scores.append(scores[top])
+            if not cand_rows:
+                return []
+            rows = np.concatenate(cand_rows)
+            scores = np.concatenate(cand_scores)
+            order = np.argsort(-scores, kind="stable")
+
+            out: List[Tuple[str, str, float]] = []
+            seen: Set[str] = set()
+            for i in order:
+                row = int(rows[i])
+                owner = self.owners[row]
+                if owner is None or owner in seen:
+                    continue
+                seen.add(owner)
+                out.append((owner, self.keys[row], float(scores[i])))
+                if len(out) >= k:
+                    break
+            return out
+
+
+class EntityVectorIndex:
+    """
+    实体名称/别名的持久化嵌入索引。
+
+    - upsert_entity: 增量追加新出现的名称/别名（已编码过的文本不会重复编码）
+    - merge_entities: 合并时把源实体的行归到目标实体
+    - sync: 与实体库全量对账（新增/变更编码、删除的实体打墓碑）
+    - nearest_entities: 查询名称的 top-k 近邻实体，分数与语义匹配器一致 (0-1)
+
+    Args:
+        index_dir: 索引目录
+        engine: 编码引擎（需提供 embed/is_available/model_name），默认 get_similarity_engine()
+        block_size: 检索分块大小
+    """
+
+    def __init__(self, index_dir: Union[str, Path], *, engine: Any = None, block_size: int = 16384):
+        self.index = VectorIndex(index_dir, block_size=block_size)
+        self._engine = engine
+
+    @property
+    def engine(self) -> Any:
+        if self._engine is None:
+            from .semantic_matcher import get_similarity_engine
+            self._engine = get_similarity_engine()
+        return self._engine
+
+    def is_available(self) -> bool:
+        try:
+            return bool(self.engine.is_available())
+        except Exception:
+            return False
+
+    @staticmethod
+    def _texts(name: str, aliases: Iterable[str]) -> List[str]:
+        out: List[str] = []
+        for t in [name, *aliases]:
+            if isinstance(t, str) and t.strip() and t.strip() not in out:
+                out.append(t.strip())
+        return out
+
+    def upsert_entity(
+        self,
+        entity_id: str,
+        name: str,
+        aliases: Iterable[str] = (),
+        *,
+        replace: bool = False,
+        flush: bool = True,
+    ) -> int:
+        """
+        写入实体的名称与别名；replace=True 时以本次给出的文本为准（删除不再出现的文本）。
+        返回新编码的行数。
+        """
+        texts = self._texts(name, aliases)
+        if not entity_id or not texts:
+            return 0
+        existing = self.index.keys_of(entity_id)
+        if replace and set(existing) - set(texts):
+            self.index.remove_owner(entity_id)
+            existing = []
+        new_texts = [t for t in texts if t not in existing]
+        if not new_texts:
+            if name:
+                self.index.labels[entity_id] = name
+            return 0
+        if not self.is_available():
+            return 0
+        vecs = self.engine.embed(new_texts)
+        if vecs is None:
+            return 0
+        added = self.index.add(entity_id, new_texts, vecs, label=name)
+        if flush:
+            self.index.flush()
+        return added
+
+    def merge_entities(self, from_entity_id: str, to_entity_id: str, *, flush: bool = True) -> int:
+        moved = self.index.reassign(from_entity_id, to_entity_id)
+        if flush:
+            self.index.flush()
+        return moved
+
+    def remove_entity(self, entity_id: str, *, flush: bool = True) -> int:
+        removed = self.index.remove_owner(entity_id)
+        if flush:
+            self.index.flush()
+        return removed
+
+    def sync(self, entities: Mapping[str, Mapping[str, Any]], *, id_key: str = "entity_id") -> Dict[str, int]:
+        """
+        与实体库对账：entities 为 {name: {entity_id, original_forms, ...}}（export_entities_json 的格式）。
+        只为新增/变化的文本编码；库中已不存在的实体打墓碑，墓碑过多时压缩。
+        """
+        stats = {"encoded": 0, "removed": 0, "entities": 0}
+        live: Set[str] = set()
+        pending: List[Tuple[str, str, List[str]]] = []
+        for name, rec in entities.items():
+            rec = rec or {}
+            entity_id = str(rec.get(id_key) or "")
+            if not entity_id:
+                continue
+            live.add(entity_id)
+            texts = self._texts(name, rec.get("original_forms") or [])
+            existing = self.index.keys_of(entity_id)
+            if set(existing) == set(texts):
+                self.index.labels[entity_id] = name
+                continue
+            pending.append((entity_id, name, texts))
+
+        for entity_id in [o for o in self.index.owner_ids() if o not in live]:
+            stats["removed"] += self.index.remove_owner(entity_id)
+
+        if pending and self.is_available():
+            # 先一次性批量编码全部新文本，再逐实体写入（命中引擎缓存）
+            self.engine.embed(list(dict.fromkeys(t for _, _, texts in pending for t in texts)))
+            for entity_id, name, texts in pending:
+                stats["encoded"] += self.upsert_entity(entity_id, name, texts, replace=True, flush=False)
+
+        if self.index.tombstones > self.index.count // 3:
+            self.index.compact()
+        self.index.flush()
+        stats["entities"] = len(self.index)
+        return stats
+
+    def nearest_entities(
+        self,
+        name: str,
+        k: int = 10,
+        *,
+        min_score: float = 0.0,
+        exclude: Optional[Iterable[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        查询与 name 语义最近的 k 个实体：[{entity_id, name, matched, score}]，score 为 0-1。
+        """
+        if not name or not self.is_available():
+            return []
+        vecs = self.engine.embed([name])
+        if vecs is None:
+            return []
+        hits = self.index.search(vecs[0], k, exclude=set(exclude or ()))
+        out: List[Dict[str, Any]] = []
+        for owner, matched, cosine in hits:
+            score = (cosine + 1) / 2
+            if score < float(min_score):
+                continue
+            out.append({
+                "entity_id": owner,
+                "name": self.index.labels.get(owner, ""),
+                "matched": matched,
+                "score": float(score),
+            })
+        return out
+
+
+_entity_vector_index: Optional[EntityVectorIndex] = None
+_entity_vector_index_lock = threading.Lock()
+
+
+def is_entity_vector_index_enabled() -> bool:
+    """配置项 agent3_config.entity_vector_index_enabled（默认关闭：需要语义模型）"""
+    try:
+        from .config import get_config_manager
+        return bool(get_config_manager().get_config_value("entity_vector_index_enabled", False, "agent3_config"))
+    except Exception:
+        return False
+
+
+def get_entity_vector_index() -> EntityVectorIndex:
+    """获取默认实体向量索引（位于 data/cache/entity_index）"""
+    global _entity_vector_index
+    with _entity_vector_index_lock:
+        if _entity_vector_index is None:
+            from .paths import ProjectPaths
+            _entity_vector_index = EntityVectorIndex(ProjectPaths.DATA_DIR / "cache" / "entity_index")
+        return _entity_vector_index
+
+
+def merge_in_entity_vector_index(from_entity_id: str, to_entity_id: str, *, flush: bool = True) -> bool:
+    """开启 entity_vector_index_enabled 时把 from 实体的名称向量改挂到 to 实体；返回是否已更新"""
+    if not is_entity_vector_index_enabled():
+        return False
+    try:
+        get_entity_vector_index().merge_entities(from_entity_id, to_entity_id, flush=flush)
+        return True
+    except Exception:
+        return False
+
+
+def flush_entity_vector_index() -> None:
+    """落盘默认实体向量索引（配合 flush=False 的批量更新使用）"""
+    if _entity_vector_index is None:
+        return
+    try:
+        _entity_vector_index.index.flush()
+    except Exception:
+        pass
@@ -111,6 +111,8 @@ class SnapshotParams:
     max_edges: int = 5000
     days_window: int = 0  # 0 = 全部
     gap_days: int = 30  # EE_EVO 分段阈值
+    evo_max_frames: int = 500  # EE_EVO 帧索引最大帧数
+    evo_keyframe_interval: int = 32  # EE_EVO 帧索引关键帧间隔
 
 
 class SnapshotWriter(ABC):
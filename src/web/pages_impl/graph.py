@@ -31,6 +31,7 @@ from src.interfaces.web.snapshot_protocol import (
     GRAPH_TYPE_LABELS,
     validate_snapshot_dict,
 )
+from src.app.evo_frame_index import EvoFrameIndex, build_deltas, compute_positions
 
 
 class GraphStyle:
@@ -1883,112 +1884,40 @@ class EvolutionGraphRenderer(GraphRenderer):
         frames: List[datetime],
         rel_intervals: Dict[str, Tuple[datetime, Optional[datetime]]],
     ) -> List[Dict[str, Any]]:
-        if not frames:
-            return []
-
-        def to_utc_naive(dt: datetime | None) -> datetime | None:
-            if dt is None:
-                return None
-            if dt.tzinfo:
-                return dt.astimezone(timezone.utc).replace(tzinfo=None)
-            return dt
-
-        frames2 = [to_utc_naive(dt) for dt in frames]
-        frames_utc = [dt for dt in frames2 if dt is not None]
-        if len(frames_utc) != len(frames2):
-            frames_utc = [dt for dt in frames2 if dt is not None]
-        if not frames_utc:
-            return []
+        return build_deltas(frames, rel_intervals)
 
-        enter_at: List[List[str]] = [[] for _ in range(len(frames_utc))]
-        exit_at: List[List[str]] = [[] for _ in range(len(frames_utc))]
-        f0 = frames_utc[0]
-
-        for rid, (start_dt, end_dt) in rel_intervals.items():
-            sdt = to_utc_naive(start_dt)
-            if sdt is None:
-                continue
-            edt = to_utc_naive(end_dt) if end_dt is not None else None
-            if edt is not None and edt < f0:
-                continue
-
-            enter_idx: int | None = None
-            if sdt <= f0 and (edt is None or f0 <= edt):
-                enter_idx = 0
-            else:
-                for i in range(1, len(frames_utc)):
-                    if frames_utc[i - 1] < sdt <= frames_utc[i]:
-                        enter_idx = i
-                        break
-            if enter_idx is not None:
-                enter_at[enter_idx].append(str(rid))
-
-            if edt is None:
-                continue
-            for i in range(len(frames_utc)):
-                if frames_utc[i] > edt and (i == 0 or frames_utc[i - 1] <= edt):
-                    exit_at[i].append(str(rid))
-                    break
+    def _compute_positions(
+        self,
+        entity_ids: List[str],
+        rel_pairs: Dict[str, Tuple[str, str]],
+    ) -> Dict[str, Tuple[float, float]]:
+        return compute_positions(entity_ids, rel_pairs)
 
+    @staticmethod
+    def _filter_evo_deltas(deltas: List[Dict[str, Any]], rel_ids: Set[str]) -> List[Dict[str, Any]]:
         out: List[Dict[str, Any]] = []
-        for i in range(len(frames_utc)):
-            d: Dict[str, Any] = {}
-            if enter_at[i]:
-                d["enter"] = sorted(set(enter_at[i]))
-            if exit_at[i]:
-                d["exit"] = sorted(set(exit_at[i]))
-            out.append(d)
+        for d in deltas:
+            d2: Dict[str, Any] = {}
+            enter = [x for x in (d.get("enter") or []) if x in rel_ids]
+            exit_ = [x for x in (d.get("exit") or []) if x in rel_ids]
+            if enter:
+                d2["enter"] = enter
+            if exit_:
+                d2["exit"] = exit_
+            out.append(d2)
         return out
 
-    def _compute_positions(
+    def _evo_positions(
         self,
+        frame_index: Optional[EvoFrameIndex],
+        base_nodes_by_id: Dict[str, Dict[str, Any]],
         entity_ids: List[str],
         rel_pairs: Dict[str, Tuple[str, str]],
     ) -> Dict[str, Tuple[float, float]]:
-        pos: Dict[str, Tuple[float, float]] = {}
-        ents = sorted([str(x) for x in entity_ids if str(x).strip()])
-        n = len(ents) if ents else 1
-        radius = min(720.0, 260.0 + 6.0 * float(n))
-
-        for i, eid in enumerate(ents):
-            angle = 2.0 * math.pi * (float(i) / float(n))
-            x = radius * math.cos(angle)
-            y = radius * math.sin(angle)
-            pos[eid] = (x, y)
-
-        rel_ids_by_pair: Dict[Tuple[str, str], List[str]] = defaultdict(list)
-        for rel_id, (s, o) in rel_pairs.items():
-            if str(rel_id).strip() and str(s).strip() and str(o).strip():
-                rel_ids_by_pair[(s, o)].append(rel_id)
-
-        for (s, o), rel_ids in rel_ids_by_pair.items():
-            sp = pos.get(s)
-            op = pos.get(o)
-            rel_ids_sorted = sorted(rel_ids)
-            if sp is None or op is None:
-                for rel_id in rel_ids_sorted:
-                    h = int(hashlib.md5(str(rel_id).encode()).hexdigest()[:8], 16)
-                    angle = 2.0 * math.pi * ((h % 3600) / 3600.0)
-                    rr = min(220.0, radius * 0.45)
-                    pos[rel_id] = (rr * math.cos(angle), rr * math.sin(angle))
-                continue
-
-            sx, sy = sp
-            ox, oy = op
-            mx, my = (sx + ox) / 2.0, (sy + oy) / 2.0
-            dx, dy = (ox - sx), (oy - sy)
-            norm = math.hypot(dx, dy) or 1.0
-            px, py = (-dy / norm), (dx / norm)
-
-            hpair = int(hashlib.md5(f"{s}|{o}".encode()).hexdigest()[:8], 16)
-            sign = -1.0 if (hpair % 2) == 0 else 1.0
-            base_off = sign * 26.0
-            step = 18.0
-            center = (float(len(rel_ids_sorted)) - 1.0) / 2.0
-            for i, rel_id in enumerate(rel_ids_sorted):
-                off = base_off + (float(i) - center) * step
-                pos[rel_id] = (mx + px * off, my + py * off)
-        return pos
+        # 预计算坐标基于完整快照；仅在当前节点集合与快照一致时复用，否则布局会出现空洞
+        if frame_index is not None and frame_index.positions and set(base_nodes_by_id.keys()) == set(frame_index.positions.keys()):
+            return frame_index.positions
+        return self._compute_positions(entity_ids, rel_pairs)
 
     def render(self) -> None:
         """渲染动态演化图谱"""
@@ -2027,8 +1956,14 @@ class EvolutionGraphRenderer(GraphRenderer):
         nodes_by_id: Dict[str, Dict[str, Any]] = {
             str(n.get("id")): n for n in nodes if isinstance(n, dict) and str(n.get("id", "")).strip()
         }
-        rel_intervals, min_dt, max_dt = self._collect_relation_state_intervals(nodes_by_id)
-        if not rel_intervals:
+        # 快照自带帧索引时直接复用，避免每次渲染重建区间/帧/增量
+        frame_index = EvoFrameIndex.from_dict(raw.get("frame_index") if isinstance(raw, dict) else None)
+        if frame_index is not None:
+            has_relations = frame_index.relation_count > 0
+        else:
+            rel_intervals, _, _ = self._collect_relation_state_intervals(nodes_by_id)
+            has_relations = bool(rel_intervals)
+        if not has_relations:
             st.warning("EE_EVO 中未找到 relation_state 节点或时间段字段。")
             return
 
@@ -2042,7 +1977,10 @@ class EvolutionGraphRenderer(GraphRenderer):
             max_nodes = st.slider("最大节点数", 300, 1000, 500, 50)
             max_edges = st.slider("最大边数", 600, 5000, 1000, 100)
             display_mode = st.selectbox("显示模式", ["当前激活", "累积至当前"], index=0)
-            frame_mode = st.selectbox("帧生成", ["关键点(valid_from)", "等距"], index=0)
+            frame_mode_options = ["关键点(valid_from)", "等距"]
+            if frame_index is not None:
+                frame_mode_options.insert(0, "快照索引")
+            frame_mode = st.selectbox("帧生成", frame_mode_options, index=0)
             frame_count = st.slider("帧数（等距）", 10, 500, 160, 10, disabled=(frame_mode != "等距"))
             speed_ms = st.slider("播放速度（毫秒）", 150, 2000, 450, 50)
             use_react = st.checkbox("使用新前端渲染（React）", value=True)
@@ -2070,8 +2008,17 @@ class EvolutionGraphRenderer(GraphRenderer):
         base_nodes_by_id = {nid: nodes_by_id[nid] for nid in base_node_ids if nid in nodes_by_id}
         base_edges = [e for e in edges2 if (str(e.get("from")), str(e.get("to"))) in base_edge_pairs]
 
-        base_rel_intervals, base_min_dt, base_max_dt = self._collect_relation_state_intervals(base_nodes_by_id)
-        frames = self._build_frames(base_rel_intervals, base_min_dt, base_max_dt, mode=frame_mode, frame_count=int(frame_count))
+        base_rel_ids: Set[str] = {
+            nid for nid, n in base_nodes_by_id.items() if str(n.get("type") or "").strip() == "relation_state"
+        }
+        use_index = frame_index is not None and frame_mode == "快照索引"
+        base_rel_intervals: Dict[str, Tuple[datetime, Optional[datetime]]] = {}
+        if use_index:
+            frames = frame_index.frame_datetimes()
+        else:
+            base_rel_intervals, base_min_dt, base_max_dt = self._collect_relation_state_intervals(base_nodes_by_id)
+            base_rel_ids = set(base_rel_intervals.keys())
+            frames = self._build_frames(base_rel_intervals, base_min_dt, base_max_dt, mode=frame_mode, frame_count=int(frame_count))
         if not frames:
             st.warning("无法生成时间轴帧。")
             return
@@ -2090,18 +2037,18 @@ class EvolutionGraphRenderer(GraphRenderer):
                 v = str(e.get("to") or "").strip()
                 if not u or not v:
                     continue
-                if u in base_rel_intervals and v in base_nodes_by_id and str(base_nodes_by_id.get(v, {}).get("type")) == "entity":
+                if u in base_rel_ids and v in base_nodes_by_id and str(base_nodes_by_id.get(v, {}).get("type")) == "entity":
                     rel_pairs.setdefault(u, ("", ""))
                     s, o = rel_pairs[u]
                     rel_pairs[u] = (s, v)
-                if v in base_rel_intervals and u in base_nodes_by_id and str(base_nodes_by_id.get(u, {}).get("type")) == "entity":
+                if v in base_rel_ids and u in base_nodes_by_id and str(base_nodes_by_id.get(u, {}).get("type")) == "entity":
                     rel_pairs.setdefault(v, ("", ""))
                     s, o = rel_pairs[v]
                     rel_pairs[v] = (u, o)
 
             rel_pairs = {rid: (s, o) for rid, (s, o) in rel_pairs.items() if s and o}
             entity_ids_base = [nid for nid, n in base_nodes_by_id.items() if str(n.get("type") or "") == "entity"]
-            positions = self._compute_positions(entity_ids_base, rel_pairs)
+            positions = self._evo_positions(frame_index if use_index else None, base_nodes_by_id, entity_ids_base, rel_pairs)
 
             deg: Dict[str, int] = defaultdict(int)
             for e in base_edges:
@@ -2120,7 +2067,10 @@ class EvolutionGraphRenderer(GraphRenderer):
                     dt2 = dt.replace(tzinfo=timezone.utc)
                 frames_iso.append(dt2.isoformat())
 
-            deltas = self._build_evo_deltas(frames, base_rel_intervals)
+            if use_index:
+                deltas = self._filter_evo_deltas(frame_index.deltas, base_rel_ids)
+            else:
+                deltas = self._build_evo_deltas(frames, base_rel_intervals)
 
             payload_nodes: List[Dict[str, Any]] = []
             for nid, n in base_nodes_by_id.items():
@@ -2291,20 +2241,27 @@ class EvolutionGraphRenderer(GraphRenderer):
             v = str(e.get("to") or "").strip()
             if not u or not v:
                 continue
-            if u in base_rel_intervals and v in base_nodes_by_id and str(base_nodes_by_id.get(v, {}).get("type")) == "entity":
+            if u in base_rel_ids and v in base_nodes_by_id and str(base_nodes_by_id.get(v, {}).get("type")) == "entity":
                 rel_pairs.setdefault(u, ("", ""))
                 s, o = rel_pairs[u]
                 rel_pairs[u] = (s, v)
-            if v in base_rel_intervals and u in base_nodes_by_id and str(base_nodes_by_id.get(u, {}).get("type")) == "entity":
+            if v in base_rel_ids and u in base_nodes_by_id and str(base_nodes_by_id.get(u, {}).get("type")) == "entity":
                 rel_pairs.setdefault(v, ("", ""))
                 s, o = rel_pairs[v]
                 rel_pairs[v] = (u, o)
 
         rel_pairs = {rid: (s, o) for rid, (s, o) in rel_pairs.items() if s and o}
         entity_ids_base = [nid for nid, n in base_nodes_by_id.items() if str(n.get("type") or "") == "entity"]
-        positions = self._compute_positions(entity_ids_base, rel_pairs)
+        positions = self._evo_positions(frame_index if use_index else None, base_nodes_by_id, entity_ids_base, rel_pairs)
 
         active_rel_ids: List[str] = []
+        if use_index:
+            active = frame_index.active_at(cur_idx, cumulative=(display_mode == "累积至当前"))
+            active_rel_ids = sorted(active & base_rel_ids)
+            cur_delta = frame_index.deltas[cur_idx] if cur_idx < len(frame_index.deltas) else {}
+            next_delta = frame_index.deltas[cur_idx + 1] if cur_idx + 1 < len(frame_index.deltas) else {}
+            entered_now = set(cur_delta.get("enter") or []) if cur_idx > 0 else set()
+            exiting_next = set(next_delta.get("exit") or [])
         for rid, (start_dt, end_dt) in base_rel_intervals.items():
             sdt = start_dt.astimezone(timezone.utc).replace(tzinfo=None) if start_dt.tzinfo else start_dt
             edt = end_dt.astimezone(timezone.utc).replace(tzinfo=None) if (end_dt and end_dt.tzinfo) else end_dt
@@ -2413,6 +2370,9 @@ class EvolutionGraphRenderer(GraphRenderer):
             start_dt, end_dt = base_rel_intervals.get(rid, (None, None))
             started_now = False
             ending_soon = False
+            if use_index:
+                started_now = rid in entered_now
+                ending_soon = rid in exiting_next
             if start_dt is not None and prev_dt is not None:
                 sdt = start_dt.astimezone(timezone.utc).replace(tzinfo=None) if start_dt.tzinfo else start_dt
                 pdt = prev_dt.astimezone(timezone.utc).replace(tzinfo=None) if prev_dt.tzinfo else prev_dt
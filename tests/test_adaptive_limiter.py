@@ -0,0 +1,121 @@
+import sys
+import asyncio
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import src.infra.adaptive_limiter as limiter_mod
+from src.infra.adaptive_limiter import AdaptiveRateLimiter, create_rate_limiter
+from src.infra.async_utils import RateLimiter
+from src.adapters.news.gdelt_adapter import GDELTAdapter
+
+
+def test_aimd_decrease_increase_and_retry_after():
+    clock = [0.0]
+    lim = AdaptiveRateLimiter(10, cooldown_s=1.0, clock=lambda: clock[0])
+    assert lim.record_failure(status=429)
+    assert lim.get_rate_per_sec() == 5
+    # 冷却期内的同一波错误只降一次
+    lim.record_failure(status=503)
+    assert lim.get_rate_per_sec() == 5
+    clock[0] += 1.0
+    lim.record_failure(timeout=True)
+    assert lim.get_rate_per_sec() == 2.5
+    # 非拥塞错误不调整
+    assert not lim.record_failure(status=400)
+
+    for _ in range(40):
+        lim.record_success()
+    assert 2.5 < lim.get_rate_per_sec() <= lim.max_rate
+
+    # Retry-After：到期前不放行
+    clock[0] += 5.0
+    lim.record_failure(status=429, retry_after=3)
+    assert not lim.try_acquire()
+    clock[0] += 3.0
+    assert lim.try_acquire()
+    assert lim.snapshot()["retry_after_waits"] == 1
+
+
+def test_key_throttle_stays_local_but_server_errors_propagate():
+    clock = [0.0]
+    provider = AdaptiveRateLimiter(8, cooldown_s=0.0, clock=lambda: clock[0])
+    key_a = provider.child("a")
+    key_a.record_failure(status=429)
+    assert key_a.get_rate_per_sec() == 4 and provider.get_rate_per_sec() == 8
+    provider.child("b").record_failure(status=502)
+    assert provider.get_rate_per_sec() == 4
+    assert set(provider.snapshot()["keys"]) == {"a", "b"}
+
+
+class _Config:
+    def __init__(self, mode):
+        self.mode = mode
+
+    def get_config_value(self, key, default=None, agent_config=None):
+        return {"rate_limiter_mode": self.mode, "gdelt_rate_limit_per_sec": 2.0}.get(key, default)
+
+
+def test_create_rate_limiter_follows_config(monkeypatch):
+    import src.infra.config as config_mod
+    monkeypatch.setattr(limiter_mod, "_limiters", {})
+    monkeypatch.setattr(config_mod, "get_config_manager", lambda: _Config("fixed"))
+    assert isinstance(create_rate_limiter(5, "llm"), RateLimiter)
+    assert GDELTAdapter()._rate_limiter is None
+
+    monkeypatch.setattr(config_mod, "get_config_manager", lambda: _Config("adaptive"))
+    shared = create_rate_limiter(5, "llm")
+    assert isinstance(shared, AdaptiveRateLimiter) and create_rate_limiter(50, "llm") is shared
+    assert GDELTAdapter()._rate_limiter is GDELTAdapter(name="GDELT-zh")._rate_limiter
+    assert limiter_mod.get_adaptive_limiter("gdelt").get_rate_per_sec() == 2.0
+
+
+def test_pool_and_gdelt_feed_back_429(monkeypatch):
+    from aiohttp import web
+    from src.adapters.llm.pool import DefaultLLMPool
+    from src.app.business.benchmarks import start_mock_llm_server
+    from src.ports.llm_client import LLMCallConfig
+
+    monkeypatch.setattr(limiter_mod, "_limiters", {})
+    llm = limiter_mod.get_adaptive_limiter("llm", 20)
+    gdelt = AdaptiveRateLimiter(4, cooldown_s=0.0)
+    hits = []
+
+    async def doc(request):
+        hits.append(1)
+        if len(hits) == 1:
+            return web.Response(status=429, text="slow down", headers={"Retry-After": "0.05"})
+        return web.json_response({"articles": [{"url": "https://e.x/1"}]})
+
+    async def scenario():
+        runner, base_url, state = await start_mock_llm_server(latency_ms=0, fail_first=1, retry_after=0)
+        app = web.Application()
+        app.router.add_get("/doc", doc)
+        gdelt_runner = web.AppRunner(app)
+        await gdelt_runner.setup()
+        site = web.TCPSite(gdelt_runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        pool = DefaultLLMPool()
+        for service in pool.list_services():
+            pool.remove_service(service["name"])
+        pool.register_openai_client("mock", "k", base_url, "m")
+        try:
+            response = await pool.call_async("ping", LLMCallConfig(retries=1))
+            assert response.success
+            adapter = GDELTAdapter(rate_limiter=gdelt)
+            data = await adapter._fetch_json(f"http://127.0.0.1:{port}/doc", params={}, timeout=5)
+            assert data["articles"]
+        finally:
+            await pool.clients[0].async_transport.close()
+            await runner.cleanup()
+            await gdelt_runner.cleanup()
+
+    asyncio.run(scenario())
+    key = llm.snapshot()["keys"]["mock"]
+    assert key["decreases"] == 1 and key["successes"] == 1
+    assert llm.snapshot()["successes"] == 1 and llm.get_rate_per_sec() > 20
+    assert len(hits) == 2 and gdelt.snapshot()["decreases"] == 1 and gdelt.snapshot()["successes"] == 1
@@ -0,0 +1,118 @@
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.infra.async_utils import AsyncExecutor
+
+
+def test_as_completed_keeps_a_bounded_window():
+    state = {"pulled": 0, "in_flight": 0, "peak": 0, "lead": 0}
+
+    def items():
+        for i in range(200):
+            state["pulled"] += 1
+            yield i
+
+    async def work(i):
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.001 * (i % 3))
+        state["in_flight"] -= 1
+        return i * i
+
+    async def scenario():
+        seen = {}
+        async for index, result in AsyncExecutor().as_completed(items(), work, concurrency=8):
+            # 生成器按需取用：领先于已完成数量的任务不超过窗口大小
+            state["lead"] = max(state["lead"], state["pulled"] - len(seen))
+            seen[index] = result
+        return seen
+
+    seen = asyncio.run(scenario())
+    assert seen == {i: i * i for i in range(200)}
+    assert state["peak"] == 8 and state["lead"] <= 8
+
+
+def test_as_completed_cancels_pending_on_error_and_early_exit():
+    cancelled = []
+
+    async def work(i):
+        try:
+            if i == 1:
+                raise ValueError("boom")
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(i)
+            raise
+
+    async def failing():
+        async for _ in AsyncExecutor().as_completed(range(10), work, concurrency=4):
+            pass
+
+    with pytest.raises(ValueError):
+        asyncio.run(failing())
+    assert sorted(cancelled) == [0, 2, 3]
+
+    async def fast(i):
+        await asyncio.sleep(0 if i == 0 else 1)
+        return i
+
+    async def first_only():
+        gen = AsyncExecutor().as_completed(range(100), fast, concurrency=5)
+        async for index, result in gen:
+            await gen.aclose()
+            return index, result
+
+    t0 = time.perf_counter()
+    assert asyncio.run(first_only()) == (0, 0)
+    assert time.perf_counter() - t0 < 0.5
+
+
+def test_threaded_tasks_do_not_block_the_event_loop():
+    def blocking(i):
+        time.sleep(0.1)
+        return i * 10
+
+    async def scenario():
+        ticks = 0
+        done = asyncio.Event()
+
+        async def ticker():
+            nonlocal ticks
+            while not done.is_set():
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        tick_task = asyncio.ensure_future(ticker())
+        results = await AsyncExecutor().run_threaded_tasks_async(range(6), blocking, max_workers=3)
+        done.set()
+        await tick_task
+        return results, ticks
+
+    results, ticks = asyncio.run(scenario())
+    assert results == [0, 10, 20, 30, 40, 50]
+    # 约 0.2s 的线程工作期间事件循环持续调度
+    assert ticks >= 10
+
+
+def test_run_concurrent_tasks_preserves_order_with_bounded_coroutines():
+    created = {"n": 0, "peak": 0, "running": 0}
+
+    def make(i):
+        async def task():
+            created["running"] += 1
+            created["peak"] = max(created["peak"], created["running"])
+            await asyncio.sleep(0.002 * ((7 - i) % 4))
+            created["running"] -= 1
+            return i
+        return task
+
+    results = asyncio.run(AsyncExecutor().run_concurrent_tasks([make(i) for i in range(40)], concurrency=3))
+    assert results == list(range(40)) and created["peak"] == 3
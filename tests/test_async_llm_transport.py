@@ -0,0 +1,66 @@
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import src.adapters.llm.async_transport as transport_mod
+from src.adapters.llm.pool import DefaultLLMPool
+from src.app.business.benchmarks import benchmark_async_llm_transport, start_mock_llm_server
+from src.ports.llm_client import LLMCallConfig
+
+
+def _pool(base_url):
+    pool = DefaultLLMPool()
+    for service in pool.list_services():
+        pool.remove_service(service["name"])
+    assert pool.register_openai_client("mock", "k", base_url, "mock-llm")
+    return pool
+
+
+def test_native_transport_scales_past_thread_pool():
+    out = asyncio.run(benchmark_async_llm_transport(n_requests=256, concurrency_levels=[256], latency_ms=300, modes=["native"]))
+    run = out["runs"]["native@256"]
+    assert run["ok"] == 256
+    assert run["peak_in_flight"] >= 256
+
+
+def test_retry_after_is_honoured_and_cancellation_propagates(monkeypatch):
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(seconds):
+        delays.append(seconds)
+        await real_sleep(0)
+
+    async def scenario():
+        runner, base_url, state = await start_mock_llm_server(latency_ms=0, fail_first=2, retry_after=7)
+        pool = _pool(base_url)
+        try:
+            monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+            response = await pool.call_async("ping", LLMCallConfig(retries=3, timeout_seconds=5))
+            monkeypatch.setattr(asyncio, "sleep", real_sleep)
+            assert response.success and response.usage["completion_tokens"] > 0
+            assert state["requests"] == 3 and [d for d in delays if d] == [7.0, 7.0]
+
+            slow_runner, slow_url, slow_state = await start_mock_llm_server(latency_ms=5000)
+            try:
+                task = asyncio.create_task(_pool(slow_url).call_async("ping", LLMCallConfig(retries=0)))
+                while slow_state["in_flight"] == 0:
+                    await asyncio.sleep(0.01)
+                task.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+                assert transport_mod.get_async_transport(slow_url, "k").stats["in_flight"] == 0
+            finally:
+                await transport_mod.get_async_transport(slow_url, "k").close()
+                await slow_runner.cleanup()
+        finally:
+            await pool.clients[0].async_transport.close()
+            await runner.cleanup()
+
+    asyncio.run(scenario())
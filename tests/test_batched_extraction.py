@@ -0,0 +1,70 @@
+import sys
+import json
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.app.business.benchmarks import MockExtractionPool, benchmark_batched_extraction
+from src.app.business.extraction import llm_extract_events_batch
+from src.infra.extraction_cache import ExtractionCache
+
+
+def _event(tag):
+    return {"abstract": f"{tag} 发布公告", "entities": [tag], "entities_original": [tag], "event_summary": f"{tag} 发布公告"}
+
+
+class _FlakyPool:
+    """超过 max_ok 篇的批次返回坏 JSON；drop 中的 id 在响应里缺失"""
+
+    def __init__(self, max_ok=8, drop=()):
+        self.max_ok = max_ok
+        self.drop = set(drop)
+        self.batches = []
+
+    def list_services(self):
+        return [{"name": "fake", "model": "fake"}]
+
+    def call(self, prompt, config=None):
+        from src.ports.llm_client import LLMResponse
+        ids = MockExtractionPool._ID_RE.findall(prompt)
+        self.batches.append(len(ids) or 1)
+        if not ids:
+            title = prompt.rsplit("标题：", 1)[1].split("\n", 1)[0]
+            return LLMResponse(content=json.dumps({"events": [_event(title)]}, ensure_ascii=False))
+        if len(ids) > self.max_ok:
+            return LLMResponse(content='{"articles": [ {"id": "n1", "events": [')
+        titles = dict(zip(ids, [p.split("\n", 3)[2][3:] for p in prompt.split("\n### 新闻 id=")[1:]]))
+        items = [{"id": i, "events": [_event(titles[i])]} for i in ids if titles[i] not in self.drop]
+        return LLMResponse(content=json.dumps({"articles": items}, ensure_ascii=False))
+
+
+def _articles(n):
+    return [{"title": f"公司{i}", "content": "短讯", "reported_at": "2025-01-01"} for i in range(n)]
+
+
+def test_batch_split_retry_and_missing_ids():
+    cache = ExtractionCache()
+    pool = _FlakyPool(max_ok=2, drop={"公司5"})
+    stats = {}
+    out = llm_extract_events_batch(_articles(8), pool, batch_size=8, stats=stats, cache=cache)
+
+    assert [evs[0]["entities"] for evs in out] == [[f"公司{i}"] for i in range(8)]
+    # 8 → 4+4 → 2+2+2+2，其中缺失的“公司5”退回单篇提示
+    assert pool.batches == [8, 4, 2, 2, 4, 2, 1, 2]
+    assert stats["splits"] == 4 and stats["batches"] == 7
+    assert len(cache) == 8
+
+    # 第二次全部命中缓存，不再请求
+    again = llm_extract_events_batch(_articles(8), pool, batch_size=8, stats=stats, cache=cache)
+    assert again == out and len(pool.batches) == 8 and stats["cache_hits"] == 8
+
+
+def test_benchmark_reports_throughput_per_batch_size():
+    out = benchmark_batched_extraction(n_articles=16, content_chars=100, latency_ms=20, ms_per_1k_prompt_tokens=0, ms_per_output_token=0)
+    runs = out["runs"]
+    assert [runs[k]["llm_calls"] for k in ("1", "4", "8")] == [16, 4, 2]
+    assert runs["8"]["tokens_per_article"] < runs["4"]["tokens_per_article"] < runs["1"]["tokens_per_article"]
+    assert runs["8"]["articles_per_sec"] > runs["1"]["articles_per_sec"]
+    assert all(r["articles_with_events"] == 16 for r in runs.values())
@@ -0,0 +1,85 @@
+import sys
+import json
+import time
+import tracemalloc
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.app.compact_graph import CompactEdgeList
+from src.infra.serialization import write_json_atomic
+
+
+EDGES = [
+    {"from": "美联储", "to": "EVT:加息", "type": "involved_in", "roles": ["actor"], "time": "2025-01-01T00:00:00+00:00"},
+    {"from": "欧洲央行", "to": "EVT:加息", "type": "involved_in", "roles": [], "time": "2025-01-01T00:00:00+00:00"},
+    {"from": "美联储", "to": "欧洲央行", "type": "relation", "predicate": "影响", "event": "加息", "time": "2025-01-02"},
+    {
+        "from": "EVT:加息", "to": "EVT:降息", "type": "event_edge", "edge_type": "follows",
+        "time": "2025-02-01", "reported_at": "", "confidence": 0.8, "evidence": ["时间先后"],
+    },
+    {"from": "美联储", "to": "EVT:降息", "type": "custom", "weight": (1, 2)},
+]
+
+
+def test_compact_edges_round_trip_and_serialize(tmp_path):
+    edges = CompactEdgeList(EDGES)
+    assert len(edges) == len(EDGES)
+    assert list(edges) == EDGES
+    assert edges == EDGES
+    assert edges[-1] is EDGES[-1]
+    assert edges[1:3] == EDGES[1:3]
+
+    edges[1] = dict(EDGES[1], roles=["target"])
+    assert edges[1]["roles"] == ["target"]
+    del edges[1]
+    assert list(edges) == [EDGES[0]] + EDGES[2:]
+
+    plain = {"entities": {}, "events": {}, "edges": EDGES[:4]}
+    compact = {"entities": {}, "events": {}, "edges": CompactEdgeList(EDGES[:4])}
+    write_json_atomic(tmp_path / "a.json", plain)
+    write_json_atomic(tmp_path / "b.json", compact)
+    assert (tmp_path / "a.json").read_bytes() == (tmp_path / "b.json").read_bytes()
+    write_json_atomic(tmp_path / "c.json", {"edges": CompactEdgeList()})
+    assert json.loads((tmp_path / "c.json").read_text(encoding="utf-8")) == {"edges": []}
+
+
+def test_compact_edges_csr_adjacency():
+    edges = CompactEdgeList(EDGES)
+    assert [e["to"] for e in edges.edges_of("美联储")] == ["EVT:加息", "欧洲央行", "EVT:降息"]
+    assert edges.degree("EVT:加息", direction="in") == 2
+    assert edges.degree("不存在") == 0
+    edges.append({"from": "欧洲央行", "to": "EVT:降息", "type": "involved_in", "roles": [], "time": "2025-02-01"})
+    assert edges.degree("欧洲央行") == 2
+
+
+def _synthetic_edges(n_events: int):
+    for i in range(n_events):
+        t = f"2025-01-{i % 28 + 1:02d}T00:00:00+00:00"
+        for j in range(4):
+            yield {"from": f"实体{(i * 7 + j) % 5000}", "to": f"EVT:事件{i}", "type": "involved_in", "roles": [], "time": t}
+        yield {"from": f"实体{i % 5000}", "to": f"实体{(i + 1) % 5000}", "type": "relation", "predicate": "会见", "event": f"事件{i}", "time": t}
+
+
+def _measure(factory):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    edges = factory()
+    elapsed = time.perf_counter() - t0
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return edges, retained, elapsed
+
+
+def test_compact_edges_memory_and_build_time():
+    n_events = 20_000
+    plain, plain_bytes, plain_s = _measure(lambda: [dict(e) for e in _synthetic_edges(n_events)])
+    compact, compact_bytes, compact_s = _measure(lambda: CompactEdgeList(_synthetic_edges(n_events)))
+
+    assert len(compact) == len(plain) == n_events * 5
+    assert compact[12345] == plain[12345]
+    # 节点/时间字符串驻留 + 定长列：内存应远小于 list[dict]
+    assert compact_bytes < plain_bytes * 0.4
+    assert compact_s < max(plain_s * 10, 5.0)
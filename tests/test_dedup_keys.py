@@ -0,0 +1,65 @@
+import sys
+import json
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.infra.dedup_keys import DedupKeyIndex
+from src.infra.simhash_index import SimHashIndex
+from src.app.business.extraction import NewsDeduplicator
+
+
+def _write(path, items, mode="w"):
+    with open(path, mode, encoding="utf-8") as f:
+        for x in items:
+            f.write(json.dumps(x, ensure_ascii=False) + "\n")
+
+
+def _news(i, source="s"):
+    return {"source": source, "id": i, "title": f"新闻 {i} " + " ".join(f"t{i}_{j}" for j in range(12)), "content": ""}
+
+
+def test_dedupe_file_uses_key_index_instead_of_rereading_output(tmp_path):
+    db = tmp_path / "keys.sqlite"
+    out = tmp_path / "out_deduped.jsonl"
+    raw1, raw2 = tmp_path / "raw1.jsonl", tmp_path / "raw2.jsonl"
+    _write(raw1, [_news(i) for i in range(50)])
+    _write(raw2, [_news(i) for i in range(40, 60)])
+
+    NewsDeduplicator(3, SimHashIndex(3), key_index=DedupKeyIndex(db)).dedupe_file(raw1, out)
+    assert len(out.read_text(encoding="utf-8").splitlines()) == 50
+
+    # 新进程：重新打开键索引，ID 去重不再解析输出文件
+    keys = DedupKeyIndex(db)
+    NewsDeduplicator(3, SimHashIndex(3), key_index=keys).dedupe_file(raw2, out)
+    lines = out.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(x)["id"] for x in lines[50:]] == list(range(50, 60))
+    assert keys.stats == {"tail_lines": 0, "rebuilds": 0}
+    assert keys.count(keys.scope_of(out)) == 60
+
+
+def test_key_index_follows_external_changes(tmp_path):
+    keys = DedupKeyIndex(tmp_path / "keys.sqlite")
+    out = tmp_path / "out_deduped.jsonl"
+    _write(out, [_news(1), _news(2)])
+    scope = keys.sync(out, NewsDeduplicator._news_key)
+    assert keys.existing(scope, ["s:1", "s:2", "s:3"]) == {"s:1", "s:2"}
+
+    # 外部追加：只读新增尾部
+    _write(out, [_news(3)], mode="a")
+    keys.sync(out, NewsDeduplicator._news_key)
+    assert keys.stats["tail_lines"] == 3
+    assert keys.existing(scope, ["s:3"]) == {"s:3"}
+
+    # 文件被替换：重建
+    _write(out, [_news(9, source="other")])
+    keys.sync(out, NewsDeduplicator._news_key)
+    assert keys.stats["rebuilds"] == 1
+    assert keys.existing(scope, ["s:1", "other:9"]) == {"other:9"}
+
+    # 文件被删除：记录随之清理
+    out.unlink()
+    assert keys.prune_missing() == 1
+    assert keys.count(scope) == 0
@@ -0,0 +1,85 @@
+import sys
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.infra import semantic_matcher
+from src.infra.semantic_matcher import EmbeddingSimilarityEngine
+
+
+class StubEncoder:
+    """确定性哈希编码器：无需下载模型，记录每次编码的批次"""
+
+    def __init__(self, dim: int = 16):
+        self.dim = dim
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        rows = []
+        for t in texts:
+            seed = int.from_bytes(hashlib.md5(t.encode("utf-8")).digest()[:4], "little")
+            rows.append(np.random.RandomState(seed).randn(self.dim))
+        return np.asarray(rows)
+
+
+def test_engine_encodes_each_text_once_and_scores_vectorized(tmp_path):
+    enc = StubEncoder()
+    engine = EmbeddingSimilarityEngine(enc, model_name="stub", cache_path=tmp_path / "emb.sqlite", batch_size=3)
+    pairs = [("美联储", "Federal Reserve"), ("美联储", "Fed"), ("欧洲央行", "Federal Reserve")]
+
+    scores = engine.pair_scores(pairs)
+    assert scores.shape == (3,)
+    assert sum(len(c) for c in enc.calls) == 4
+    assert len(enc.calls) == 2
+
+    vecs = enc([t for p in pairs for t in p])
+    vecs = vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+    expected = [(vecs[2 * i] @ vecs[2 * i + 1] + 1) / 2 for i in range(3)]
+    assert np.allclose(scores, expected, atol=1e-5)
+
+    enc.calls.clear()
+    engine.similarity("美联储", "Fed")
+    assert engine.similarity_matrix(["美联储", "Fed"]).shape == (2, 2)
+    assert enc.calls == []
+    engine.close()
+
+
+def test_engine_disk_cache_is_keyed_by_model(tmp_path):
+    path = tmp_path / "emb.sqlite"
+    with EmbeddingSimilarityEngine(StubEncoder(), model_name="m1", cache_path=path) as first:
+        first.prefetch(["a", "b"])
+
+    enc = StubEncoder()
+    with EmbeddingSimilarityEngine(enc, model_name="m1", cache_path=path) as again:
+        again.embed(["a", "b"])
+        assert enc.calls == []
+        assert again.stats["disk_hits"] == 2
+
+    with EmbeddingSimilarityEngine(enc, model_name="m2", cache_path=path) as other:
+        other.embed(["a"])
+        assert enc.calls == [["a"]]
+
+    # 关闭后只用内存缓存，不再访问磁盘
+    other.embed(["a", "c"])
+    assert enc.calls == [["a"], ["c"]] and other.stats["disk_hits"] == 0
+
+
+def test_batch_string_similarity_matches_pairwise(monkeypatch):
+    from src.app.business.graph_ops import KnowledgeGraph
+
+    enc = StubEncoder()
+    engine = EmbeddingSimilarityEngine(enc, model_name="stub")
+    monkeypatch.setattr(semantic_matcher, "_similarity_engine", engine)
+
+    kg = KnowledgeGraph()
+    pairs = [("纽约时报", "New York Times"), ("Apple Inc", "Apple Inc."), ("苹果公司", "苹果"), ("纽约时报", "NYT")]
+    batch = kg._batch_string_similarity(pairs)
+    assert len(enc.calls) == 1
+    assert batch == [kg._string_similarity(a, b) for a, b in pairs]
+    assert len(enc.calls) == 1
@@ -0,0 +1,114 @@
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.domain.blocking import BlockingCandidateGenerator, bucket_events_sweep
+from src.domain.rules import CandidateReason, compute_name_similarity
+
+
+def test_blocking_finds_forms_and_similar_names():
+    records = {
+        "美国联邦储备委员会": ["Federal Reserve"],
+        "美联储": ["Federal Reserve", "Fed"],
+        "International Monetary Fund": [],
+        "International Monetary Fund (IMF)": [],
+        "布朗大学": ["Brown University"],
+    }
+    gen = BlockingCandidateGenerator()
+    pairs = gen.generate_pairs(records, min_similarity=0.85)
+    by_key = {tuple(sorted([p.entity_a, p.entity_b])): p for p in pairs}
+
+    fed = by_key[tuple(sorted(["美国联邦储备委员会", "美联储"]))]
+    assert fed.similarity == 1.0
+    assert fed.reason == CandidateReason.ORIGINAL_FORMS_MATCH
+
+    imf = by_key[tuple(sorted(["International Monetary Fund", "International Monetary Fund (IMF)"]))]
+    assert imf.reason == CandidateReason.NAME_SIMILARITY
+    assert imf.similarity >= 0.85
+    assert all("布朗大学" not in k for k in by_key)
+
+    groups = gen.group_pairs(list(records.keys()), pairs)
+    assert ["美国联邦储备委员会", "美联储"] in groups
+
+
+def test_blocking_matches_bruteforce_recall_without_all_pairs():
+    names = [f"Company{i:05d} Holdings" for i in range(3000)]
+    names += ["Acme Corporation", "Acme Corporation Ltd", "ACME Corporation"]
+    gen = BlockingCandidateGenerator(max_block_size=50)
+
+    start = time.perf_counter()
+    _, candidates = gen.candidate_index_pairs({n: [] for n in names})
+    elapsed = time.perf_counter() - start
+
+    total = len(names) * (len(names) - 1) // 2
+    assert len(candidates) < total // 50
+    assert elapsed < 10.0
+
+    pairs = gen.generate_pairs({n: [] for n in names}, min_similarity=0.9, scorer=compute_name_similarity)
+    found = {tuple(sorted([p.entity_a, p.entity_b])) for p in pairs}
+    assert tuple(sorted(["Acme Corporation", "ACME Corporation"])) in found
+    assert tuple(sorted(["Acme Corporation", "Acme Corporation Ltd"])) in found
+
+
+def _bucket_events_linear(events, window_sec, min_entity_overlap, max_bucket_size):
+    """原逐桶线性扫描实现（作为语义基准）"""
+    items = sorted(events, key=lambda x: x[1] if x[1] > 0 else float("inf"))
+    buckets = []
+    for key, ts, ents in items:
+        entities = set(ents)
+        placed = False
+        for bucket in buckets:
+            if len(bucket["keys"]) >= max_bucket_size:
+                continue
+            if bucket["min_time"] and ts and ts < bucket["min_time"] - window_sec:
+                continue
+            if bucket["max_time"] and ts and ts > bucket["max_time"] + window_sec:
+                continue
+            if min_entity_overlap > 0:
+                if not entities or len(bucket["entities"].intersection(entities)) < min_entity_overlap:
+                    continue
+            bucket["keys"].append(key)
+            bucket["entities"].update(entities)
+            if ts:
+                bucket["min_time"] = min(bucket["min_time"] or ts, ts)
+                bucket["max_time"] = max(bucket["max_time"] or ts, ts)
+            placed = True
+            break
+        if not placed:
+            buckets.append({"keys": [key], "entities": set(entities), "min_time": ts or None, "max_time": ts or None})
+    return buckets
+
+
+def test_bucket_events_sweep_matches_linear_scan():
+    import random
+
+    rng = random.Random(7)
+    ents = [f"E{i}" for i in range(40)]
+    events = []
+    for i in range(1500):
+        ts = 0 if rng.random() < 0.05 else 1_700_000_000 + rng.randint(0, 120) * 86400 + rng.randint(0, 86399)
+        events.append((f"ev{i}", float(ts), rng.sample(ents, rng.randint(0, 4))))
+
+    for overlap in (0, 1, 2):
+        for max_size in (1, 5, 40):
+            kwargs = dict(window_sec=7 * 86400, min_entity_overlap=overlap, max_bucket_size=max_size)
+            got = bucket_events_sweep(events, **kwargs)
+            want = _bucket_events_linear(events, kwargs["window_sec"], overlap, max_size)
+            assert [b["keys"] for b in got] == [b["keys"] for b in want]
+            assert [(b["min_time"], b["max_time"]) for b in got] == [(b["min_time"], b["max_time"]) for b in want]
+
+
+def test_bucket_events_sweep_scales_with_open_buckets():
+    # 10 万事件、窗口内实体稀疏：线性扫描需要 O(事件 × 桶)，扫描线应在数秒内完成
+    events = [
+        (f"ev{i}", 1_700_000_000 + i * 600.0, [f"E{i // 3}", f"E{i // 3 + 1}"])
+        for i in range(100_000)
+    ]
+    start = time.perf_counter()
+    buckets = bucket_events_sweep(events, window_sec=7 * 86400, min_entity_overlap=1, max_bucket_size=40)
+    assert time.perf_counter() - start < 10.0
+    assert sum(len(b["keys"]) for b in buckets) == len(events)
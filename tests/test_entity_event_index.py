@@ -0,0 +1,83 @@
+import sys
+import time
+import random
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.app.business.graph_ops import KnowledgeGraph
+from src.domain.event_index import EntityEventIndex
+
+
+def _graph(n_events: int, n_entities: int, seed: int = 3) -> KnowledgeGraph:
+    rng = random.Random(seed)
+    kg = KnowledgeGraph()
+    kg.settings = {"entity_evidence_per_entity": 2, "entity_evidence_max_chars": 40}
+    names = [f"E{i}" for i in range(n_entities)]
+    kg.graph["entities"] = {n: {"original_forms": []} for n in names}
+    kg.graph["events"] = {
+        f"事件{i}": {
+            "entities": rng.sample(names, 3),
+            "event_summary": f"摘要{i}",
+            "entity_roles": {},
+            "relations": [],
+        }
+        for i in range(n_events)
+    }
+    return kg
+
+
+def _evidence_by_scan(kg, batch):
+    evidence = {e: [] for e in batch}
+    for abstract, event in kg.graph["events"].items():
+        ents = event.get("entities", [])
+        summary = kg._trim_text(event.get("event_summary", "") or abstract, 40)
+        for e in ents:
+            if e in evidence and len(evidence[e]) < 2:
+                evidence[e].append(f"{abstract} | {', '.join(ents)} | {summary}")
+    return evidence
+
+
+def test_evidence_and_merge_use_index():
+    kg = _graph(2000, 300)
+    batch = [f"E{i}" for i in range(0, 300, 7)]
+    assert kg._collect_entity_evidence(batch) == _evidence_by_scan(kg, batch)
+
+    kg.graph["events"]["事件5"]["entity_roles"] = {"E299": ["actor"]}
+    kg.graph["events"]["事件6"]["relations"] = [{"subject": "E299 ", "predicate": "p", "object": "E1"}]
+    kg._entity_events.add_event("事件5", kg.graph["events"]["事件5"])
+    kg._entity_events.add_event("事件6", kg.graph["events"]["事件6"])
+    touched = set(kg._event_index().events_for("E299"))
+
+    kg._merge_entities("E1", "E299")
+    assert "E299" not in kg.graph["entities"]
+    for abstract, event in kg.graph["events"].items():
+        assert "E299" not in event["entities"]
+        assert "E299" not in event["entity_roles"]
+        assert all(r["subject"] != "E299 " for r in event["relations"])
+    assert touched <= set(kg._event_index().events_for("E1"))
+    assert kg.graph["events"]["事件6"]["relations"][0]["subject"] == "E1"
+    assert kg._collect_entity_evidence(["E1"]) == _evidence_by_scan(kg, ["E1"])
+
+    kg._merge_events("事件0", "事件1")
+    assert "事件1" not in kg._event_index().events_for(kg.graph["events"]["事件0"]["entities"][0])
+
+
+def test_evidence_collection_at_200k_events():
+    kg = _graph(200_000, 20_000)
+    start = time.perf_counter()
+    kg._entity_events = EntityEventIndex.build(kg.graph["events"])
+    build = time.perf_counter() - start
+
+    batches = [[f"E{i}" for i in range(b, b + 80)] for b in range(0, 8000, 80)]
+    start = time.perf_counter()
+    for batch in batches:
+        evidence = kg._collect_entity_evidence(batch)
+    per_batch = (time.perf_counter() - start) / len(batches)
+
+    assert all(len(v) == 2 for v in evidence.values())
+    assert build < 10.0
+    # 全量扫描 20 万事件每批需数百毫秒；倒排索引只触达相关事件
+    assert per_batch < 0.05
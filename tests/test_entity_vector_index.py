@@ -0,0 +1,107 @@
+import sys
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.infra.semantic_matcher import EmbeddingSimilarityEngine
+from src.infra.vector_index import EntityVectorIndex, VectorIndex
+
+
+def _stub_encoder(texts):
+    """确定性哈希编码：按字符 bigram 哈希到 64 维，字面相近的文本向量相近"""
+    rows = np.zeros((len(texts), 64))
+    for i, t in enumerate(texts):
+        s = f"^{t.lower()}$"
+        for j in range(len(s) - 1):
+            h = int.from_bytes(hashlib.md5(s[j:j + 2].encode("utf-8")).digest()[:2], "little")
+            rows[i, h % 64] += 1.0
+    return rows
+
+
+def _engine():
+    return EmbeddingSimilarityEngine(_stub_encoder, model_name="stub")
+
+
+def test_vector_index_blocked_search_matches_bruteforce(tmp_path):
+    rng = np.random.RandomState(0)
+    vecs = rng.randn(300, 16)
+    index = VectorIndex(tmp_path / "idx", block_size=37)
+    for i in range(100):
+        index.add(f"e{i}", [f"e{i}-a", f"e{i}-b", f"e{i}-c"], vecs[3 * i:3 * i + 3])
+
+    q = rng.randn(16)
+    hits = index.search(q, k=5)
+
+    unit = vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+    best = (unit @ (q / np.linalg.norm(q))).reshape(100, 3).max(axis=1)
+    expected = [f"e{i}" for i in np.argsort(-best)[:5]]
+    assert [h[0] for h in hits] == expected
+    assert np.allclose([h[2] for h in hits], np.sort(best)[::-1][:5], atol=1e-2)
+
+
+def test_entity_index_incremental_merge_and_reload(tmp_path):
+    engine = _engine()
+    index = EntityVectorIndex(tmp_path / "idx", engine=engine)
+    stats = index.sync({
+        "International Monetary Fund": {"entity_id": "imf", "original_forms": ["IMF"]},
+        "World Bank": {"entity_id": "wb", "original_forms": []},
+        "Federal Reserve": {"entity_id": "fed", "original_forms": ["Fed"]},
+    })
+    assert stats["encoded"] == 5
+
+    hits = index.nearest_entities("International Monetary Fund (IMF)", k=2)
+    assert hits[0]["entity_id"] == "imf"
+    assert hits[0]["name"] == "International Monetary Fund"
+
+    # 已编码文本不会重复编码
+    encoded = engine.stats["encoded"]
+    assert index.upsert_entity("wb", "World Bank", ["World Bank"]) == 0
+    assert index.upsert_entity("wb", "World Bank", ["世界银行"]) == 1
+    assert engine.stats["encoded"] == encoded + 1
+
+    index.upsert_entity("fed2", "Federal Reserve System", [])
+    assert index.merge_entities("fed2", "fed") == 1
+    hits = index.nearest_entities("Federal Reserve System", k=3)
+    assert [h["entity_id"] for h in hits].count("fed") == 1
+    assert "fed2" not in [h["entity_id"] for h in hits]
+
+    reloaded = EntityVectorIndex(tmp_path / "idx", engine=_engine())
+    assert sorted(reloaded.index.keys_of("fed")) == ["Fed", "Federal Reserve", "Federal Reserve System"]
+    assert reloaded.nearest_entities("Federal Reserve System", k=1)[0]["entity_id"] == "fed"
+
+    stats = reloaded.sync({"World Bank": {"entity_id": "wb", "original_forms": ["世界银行"]}})
+    assert stats["entities"] == 1
+    assert reloaded.index.tombstones == 0
+    assert [h["entity_id"] for h in reloaded.nearest_entities("IMF", k=5)] == ["wb"]
+
+
+def test_kg_merge_updates_enabled_entity_index(monkeypatch, tmp_path):
+    import src.infra.vector_index as vector_index_mod
+    from src.adapters.sqlite.store import canonical_entity_id
+    from src.app.business.graph_ops import KnowledgeGraph
+
+    index = EntityVectorIndex(tmp_path / "idx", engine=_engine())
+    monkeypatch.setattr(vector_index_mod, "_entity_vector_index", index)
+    monkeypatch.setattr(vector_index_mod, "is_entity_vector_index_enabled", lambda: True)
+    fed, fed2 = canonical_entity_id("Federal Reserve"), canonical_entity_id("Federal Reserve System")
+    index.upsert_entity(fed, "Federal Reserve", ["Fed"])
+    index.upsert_entity(fed2, "Federal Reserve System", [])
+
+    kg = KnowledgeGraph()
+    kg.graph["entities"] = {
+        "Federal Reserve": {"sources": [], "original_forms": ["Fed"], "first_seen": "2025-01-02"},
+        "Federal Reserve System": {"sources": [], "original_forms": [], "first_seen": "2025-01-01"},
+    }
+    kg._merge_entities("Federal Reserve", "Federal Reserve System")
+
+    hits = index.nearest_entities("Federal Reserve System", k=3)
+    assert [h["entity_id"] for h in hits] == [fed]
+    assert kg._vector_index_dirty
+    vector_index_mod.flush_entity_vector_index()
+    reloaded = EntityVectorIndex(tmp_path / "idx", engine=_engine())
+    assert sorted(reloaded.index.keys_of(fed)) == ["Fed", "Federal Reserve", "Federal Reserve System"]
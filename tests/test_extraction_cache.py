@@ -0,0 +1,75 @@
+import sys
+import json
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import src.app.business.extraction as extraction_mod
+from src.infra.extraction_cache import ExtractionCache
+
+
+class _Pool:
+    def __init__(self, model="m1"):
+        self.model = model
+
+    def list_services(self):
+        return [{"name": "a", "model": self.model}]
+
+
+def test_llm_extract_events_reuses_cached_result(monkeypatch):
+    cache = ExtractionCache()
+    monkeypatch.setattr(extraction_mod, "get_extraction_cache", lambda: cache)
+    prompts = []
+
+    def fake_call(llm_pool, prompt, **kwargs):
+        prompts.append(prompt)
+        return json.dumps({"events": [{
+            "abstract": "美联储宣布加息",
+            "entities": ["美联储"],
+            "entities_original": ["美联储"],
+            "event_summary": "美联储宣布加息 25 个基点",
+        }]}, ensure_ascii=False)
+
+    monkeypatch.setattr(extraction_mod, "call_llm_with_retry", fake_call)
+    pool = _Pool()
+
+    first = extraction_mod.llm_extract_events("Fed 加息", "美联储宣布加息。", pool, reported_at="2025-03-01T08:00:00Z")
+    # 转载：空白不同、同日不同时刻
+    again = extraction_mod.llm_extract_events(" Fed  加息", "美联储宣布加息。\n", pool, reported_at="2025-03-01T20:00:00Z")
+    assert again == first and first[0]["entities"] == ["美联储"]
+    assert len(prompts) == 1
+
+    # 模型集合变化、正文变化都会重新请求
+    extraction_mod.llm_extract_events("Fed 加息", "美联储宣布加息。", _Pool("m2"), reported_at="2025-03-01")
+    extraction_mod.llm_extract_events("Fed 加息", "美联储宣布降息。", pool, reported_at="2025-03-01")
+    assert len(prompts) == 3
+    assert cache.summary()["hits"] == 1 and cache.summary()["misses"] == 3
+
+    # 调用方先查缓存：命中时无需经过限速器与 LLM
+    key, cached = extraction_mod.lookup_cached_extraction("Fed 加息", "美联储宣布加息。", pool, "2025-03-01", cache)
+    assert cached == first and key
+
+
+def test_eviction_is_lru_and_size_bounded(tmp_path):
+    clock = [0.0]
+
+    def tick():
+        clock[0] += 1
+        return clock[0]
+
+    db = tmp_path / "cache.sqlite"
+    cache = ExtractionCache(db, max_entries=10, now=tick)
+    for i in range(10):
+        cache.put(f"k{i}", [{"abstract": f"e{i}"}])
+    assert cache.get("k0") is not None  # k0 最近被访问，不会先被淘汰
+    cache.put("k10", [{"abstract": "e10"}])
+    assert len(cache) == 9 and cache.summary()["evictions"] == 2
+    assert cache.get("k1") is None and cache.get("k2") is None and cache.get("k0") is not None
+
+    reopened = ExtractionCache(db, max_entries=10, max_bytes=200, now=tick)
+    assert len(reopened) == 9
+    reopened.put("big", [{"abstract": "x" * 150}])
+    assert reopened.total_bytes <= 180
+    assert reopened.get("big") is not None
@@ -0,0 +1,150 @@
+import sys
+import random
+import asyncio
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.infra.gazetteer import AhoCorasick, EntityGazetteer
+from src.infra.extraction_cache import ExtractionCache
+from src.infra.async_utils import create_batch_extraction_prompt, create_extraction_prompt
+from src.adapters.sqlite.store import SQLiteStore, SQLiteStoreConfig
+from src.app.business import relevance as relevance_mod
+from src.app.business.relevance import RelevanceSettings, apply_relevance_filter
+
+
+def test_automaton_matches_naive_search():
+    rng = random.Random(7)
+    patterns = ["he", "she", "his", "hers", "a", "aa", "abab", "bab"]
+    automaton = AhoCorasick(patterns)
+    for _ in range(200):
+        text = "".join(rng.choice("abehirs") for _ in range(rng.randint(0, 40)))
+        expected = sorted((i + len(p) - 1, p) for p in patterns for i in range(len(text)) if text.startswith(p, i))
+        got = sorted((end, automaton.patterns[idx]) for end, idx in automaton.iter_matches(text))
+        assert got == expected
+
+
+def test_gazetteer_scores_with_boundaries_and_canonical_names():
+    gazetteer = EntityGazetteer({
+        "OpenAI": "OpenAI",
+        "AI": "人工智能",
+        "美联储": "美国联邦储备系统",
+        "Federal Reserve": "美国联邦储备系统",
+        "x": "too-short",
+        "2024": "numeric",
+    })
+    match = gazetteer.match("美联储维持利率不变", "The FEDERAL RESERVE said OpenAI's chips are fine. 2024")
+    assert match.entities == {"美国联邦储备系统": 2, "OpenAI": 1}
+    # 标题中出现计 2
+    assert match.score == 3.0
+    assert match.top_entities(1) == ["美国联邦储备系统"]
+    assert gazetteer.match("AI 芯片", "").entities == {"人工智能": 1}
+    assert gazetteer.match("", "said, maintained").entities == {}
+
+
+def test_incremental_update_uses_delta_and_tombstones():
+    base = {f"entity{i:04d}": f"E{i}" for i in range(2000)}
+    gazetteer = EntityGazetteer(base, rebuild_min=50)
+    assert gazetteer.stats["full_builds"] == 1
+
+    changed = dict(base)
+    changed["新实体"] = "New"
+    changed["entity0001"] = "Renamed"
+    del changed["entity0002"]
+    assert gazetteer.update(changed) == {"added": 2, "removed": 1}
+    assert gazetteer.stats == {"full_builds": 1, "delta_builds": 1, "added": 2002, "removed": 1}
+    hit = gazetteer.match("新实体 entity0001 entity0002 entity0003", "").entities
+    assert hit == {"New": 1, "Renamed": 1, "E3": 1}
+
+    # 同一词表不重复编译；变化超过阈值时整体重建
+    gazetteer.update(changed)
+    assert gazetteer.stats["delta_builds"] == 1
+    gazetteer.update({f"other{i}": "O" for i in range(100)})
+    assert gazetteer.stats["full_builds"] == 2 and gazetteer.match("entity0003 other7", "").entities == {"O": 1}
+
+
+def test_filter_modes_and_prompt_hints():
+    gazetteer = EntityGazetteer({"英伟达": "NVIDIA", "NVIDIA": "NVIDIA", "台积电": "TSMC"})
+
+    def news():
+        return [
+            {"id": "1", "title": "天气预报", "content": "明天有雨"},
+            {"id": "2", "title": "英伟达发布新品", "content": "台积电代工"},
+            {"id": "3", "title": "市场综述", "content": "NVIDIA 股价上涨"},
+        ]
+
+    kept, stats = apply_relevance_filter(news(), RelevanceSettings(mode="skip"), gazetteer)
+    assert [n["id"] for n in kept] == ["2", "3"] and stats["skipped"] == 1
+    assert kept[0]["relevance"] == {"score": 3.0, "entities": ["NVIDIA", "TSMC"]}
+
+    kept, _ = apply_relevance_filter(news(), RelevanceSettings(mode="deprioritize", min_score=2), gazetteer)
+    assert [n["id"] for n in kept] == ["2", "1", "3"]
+
+    kept, stats = apply_relevance_filter(news(), RelevanceSettings(mode="skip"), EntityGazetteer())
+    assert len(kept) == 3 and stats["scored"] == 0
+
+    prompt = create_extraction_prompt("t", "c", "defs", entity_hints=["NVIDIA", "TSMC"])
+    assert "【已知实体提示】" in prompt and "NVIDIA、TSMC" in prompt
+    assert "已知实体" not in create_extraction_prompt("t", "c", "defs")
+    batch = create_batch_extraction_prompt(
+        [{"id": "n1", "title": "a", "content": "b", "entity_hints": ["TSMC"]}, {"id": "n2", "title": "c", "content": "d"}],
+        "defs",
+    )
+    assert batch.count("已知实体提示：TSMC") == 1
+
+
+def test_terms_come_from_store_aliases_and_merge_rules(monkeypatch, tmp_path):
+    import src.adapters.sqlite.store as store_mod
+    import src.app.business.data_fetch as data_fetch_mod
+
+    store = SQLiteStore(SQLiteStoreConfig(db_path=tmp_path / "store.sqlite"))
+    store.upsert_entities(["英伟达"], ["NVIDIA Corp"], source="s", reported_at="2025-01-01T00:00:00Z")
+    monkeypatch.setattr(store_mod, "get_store", lambda: store)
+    monkeypatch.setattr(data_fetch_mod, "_load_entity_equivs", lambda: {"英伟达": {"英伟达", "輝達"}})
+
+    terms = relevance_mod.gazetteer_terms(["半导体"])
+    assert terms["英伟达"] == terms["NVIDIA Corp"] == terms["輝達"] == "英伟达"
+    assert terms["半导体"] == "半导体"
+
+
+def test_batch_process_news_skips_irrelevant_and_passes_hints(monkeypatch):
+    from src.app.business import extraction as extraction_mod
+
+    class Config:
+        def get_concurrency_limit(self, _name):
+            return 1
+
+        def get_rate_limit(self, _name):
+            return 100000.0
+
+        def get_config_value(self, key, default=None, agent_config=None):
+            return default
+
+    calls = []
+
+    def fake_llm(title, content, api_pool, max_retries=2, reported_at=None, cache_key=None, entity_hints=None):
+        calls.append((title, entity_hints))
+        return [{"abstract": title, "entities": ["TSMC"], "entities_original": ["台积电"]}]
+
+    gazetteer = EntityGazetteer({"台积电": "TSMC"})
+    monkeypatch.setattr(relevance_mod, "relevance_settings", lambda *a: RelevanceSettings(mode="skip"))
+    monkeypatch.setattr(relevance_mod, "get_entity_gazetteer", lambda *a, **k: gazetteer)
+    monkeypatch.setattr(extraction_mod, "get_config_manager", lambda: Config())
+    monkeypatch.setattr(extraction_mod, "get_llm_pool", lambda: object())
+    monkeypatch.setattr(extraction_mod, "deduplicate_news_batch", lambda news: news)
+    monkeypatch.setattr(extraction_mod, "get_extraction_cache", lambda: ExtractionCache())
+    monkeypatch.setattr(extraction_mod, "lookup_cached_extraction", lambda *a, **k: (None, None))
+    monkeypatch.setattr(extraction_mod, "llm_extract_events", fake_llm)
+    monkeypatch.setattr(extraction_mod, "store_extracted_events", lambda *a: None)
+    monkeypatch.setattr(extraction_mod, "record_processed_ids", lambda ids, tag: len(ids))
+    monkeypatch.setattr(extraction_mod, "export_compat_json", lambda tag: None)
+
+    news = [
+        {"id": "1", "source": "s", "title": "台积电扩产", "content": "..."},
+        {"id": "2", "source": "s", "title": "体育新闻", "content": "比赛结果"},
+    ]
+    events = asyncio.run(extraction_mod.batch_process_news(news))
+    assert calls == [("台积电扩产", ["TSMC"])]
+    assert [e["news_id"] for e in events] == ["1"]
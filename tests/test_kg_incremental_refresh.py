@@ -0,0 +1,94 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.app.business.graph_ops import KnowledgeGraph
+from src.domain.event_index import EntityEventIndex
+
+
+def _event(entities, day, summary=""):
+    return {
+        "entities": list(entities),
+        "event_summary": summary,
+        "entity_roles": {},
+        "relations": [],
+        "first_seen": f"2025-03-{day:02d}T00:00:00+00:00",
+    }
+
+
+class _RecordingGraph(KnowledgeGraph):
+    """替换存储加载与 LLM 调用，只记录送去压缩的实体组与事件桶"""
+
+    def __init__(self, tmp_path, entities, events):
+        super().__init__()
+        self.refresh_watermark_file = tmp_path / "watermark.json"
+        self.merge_rules = {}
+        self.settings = {"event_bucket_days": 7, "event_bucket_entity_overlap": 1, "event_bucket_max_size": 40}
+        self._source = (entities, events)
+        self.entity_groups = []
+        self.event_buckets = []
+
+    def build_graph(self):
+        entities, events = self._source
+        self.graph["entities"] = {k: dict(v) for k, v in entities.items()}
+        self.graph["events"] = {k: dict(v) for k, v in events.items()}
+        self._entity_events = EntityEventIndex.build(self.graph["events"])
+        return True
+
+    def _init_llm_pool(self):
+        self.llm_pool = object()
+
+    def _process_entity_batches(self, entity_batches, limiter):
+        self.entity_groups.extend(sorted(g) for _, g in entity_batches)
+        return []
+
+    def _process_event_buckets(self, buckets, limiter):
+        self.event_buckets.extend(sorted(b["keys"]) for b in buckets)
+        return []
+
+
+def test_incremental_refresh_only_considers_changed_records(tmp_path):
+    entities = {
+        "Acme": {"original_forms": ["Acme Corp"]},
+        "阿克米": {"original_forms": ["Acme Corp"]},
+        "Initech": {"original_forms": ["Initech"]},
+        "Globex": {"original_forms": ["Globex"]},
+    }
+    events = {
+        "Acme 发布财报": _event(["Acme"], 1),
+        "阿克米 公布业绩": _event(["阿克米"], 1),
+        "Globex 收购": _event(["Globex"], 2),
+        "Globex 并购完成": _event(["Globex"], 3),
+    }
+    kg = _RecordingGraph(tmp_path, entities, events)
+
+    # 首次没有水位线：全量
+    stats = kg.refresh_graph(incremental=True)
+    assert stats["mode"] == "full"
+    assert ["Acme", "阿克米"] in kg.entity_groups
+    assert ["Globex 并购完成", "Globex 收购"] in kg.event_buckets
+    assert kg.refresh_watermark_file.exists()
+
+    # 没有变更：增量刷新不送任何候选
+    kg = _RecordingGraph(tmp_path, entities, events)
+    stats = kg.refresh_graph(incremental=True)
+    assert stats["mode"] == "incremental"
+    assert stats["changed_entities"] == stats["changed_events"] == 0
+    assert kg.entity_groups == [] and kg.event_buckets == []
+
+    # 新增实体与事件：只与已有记录中的相关者比较
+    entities = dict(entities, **{"Initech LLC": {"original_forms": ["Initech"]}})
+    events = dict(events, **{"Globex 宣布裁员": _event(["Globex"], 4)})
+    kg = _RecordingGraph(tmp_path, entities, events)
+    stats = kg.refresh_graph(incremental=True)
+    assert stats["changed_entities"] == 1 and stats["changed_events"] == 1
+    assert kg.entity_groups == [["Initech", "Initech LLC"]]
+    assert kg.event_buckets == [sorted(["Globex 收购", "Globex 并购完成", "Globex 宣布裁员"])]
+
+    # 全量模式不受水位线影响
+    kg = _RecordingGraph(tmp_path, entities, events)
+    kg.refresh_graph(incremental=False)
+    assert ["Acme", "阿克米"] in kg.entity_groups
@@ -0,0 +1,114 @@
+import sys
+import asyncio
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.adapters.llm.hedging import HedgePolicy
+from src.adapters.llm.pool import ClientEntry, DefaultLLMPool
+from src.adapters.llm.routing import RoutingPolicy
+from src.app.business.benchmarks import start_mock_llm_server
+from src.infra.async_utils import call_llm_with_retry, call_llm_with_retry_async
+from src.ports.llm_client import LLMProviderType
+
+
+class _Completions:
+    def __init__(self, delay, content):
+        self.delay = delay
+        self.content = content
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        usage = SimpleNamespace(prompt_tokens=100, completion_tokens=20)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self.content))], usage=usage)
+
+
+def _pool(hedge, **clients):
+    pool = DefaultLLMPool()
+    for service in pool.list_services():
+        pool.remove_service(service["name"])
+    pool._routing = RoutingPolicy(explore=0.0)
+    pool.set_hedge_policy(hedge)
+    calls = {}
+    for name, (delay, content) in clients.items():
+        calls[name] = _Completions(delay, content)
+        client = SimpleNamespace(chat=SimpleNamespace(completions=calls[name]))
+        pool.clients.append(ClientEntry(name, client, "m", LLMProviderType.OPENAI, f"llm_{name}"))
+        pool._routing.register(name)
+    # 让 slow 被路由为主请求
+    pool._routing.finish("slow", 10, ok=True)
+    pool._routing.finish("fast", 50, ok=True)
+    return pool, calls
+
+
+def _hedge(**kwargs):
+    params = dict(enabled=True, min_delay_s=0.05, default_delay_s=0.05, max_ratio=1.0, burst=1.0)
+    params.update(kwargs)
+    return HedgePolicy(**params)
+
+
+def test_hedge_takes_first_valid_json_and_counts_waste():
+    pool, calls = _pool(_hedge(), slow=(0.6, '{"events": ["slow"]}'), fast=(0.0, '{"events": ["fast"]}'))
+    t0 = time.perf_counter()
+    text = call_llm_with_retry(pool, "prompt", retries=0)
+    assert text == '{"events": ["fast"]}'
+    assert time.perf_counter() - t0 < 0.4
+
+    time.sleep(0.8)  # 落败的主请求完成后计入浪费
+    stats = pool.hedge_stats()
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1 and stats["primary_wins"] == 0
+    assert stats["wasted_tokens"] == 120
+
+    # 对冲响应不是有效 JSON 时等待主请求
+    pool, calls = _pool(_hedge(), slow=(0.3, '{"events": ["slow"]}'), fast=(0.0, "抱歉，无法处理"))
+    assert call_llm_with_retry(pool, "prompt", retries=0) == '{"events": ["slow"]}'
+    assert pool.hedge_stats()["primary_wins"] == 1 and calls["fast"].calls == 1
+
+
+def test_hedge_rate_is_capped_by_budget():
+    pool, calls = _pool(_hedge(max_ratio=0.0), slow=(0.15, '{"a": 1}'), fast=(0.15, '{"a": 2}'))
+    for _ in range(3):
+        assert call_llm_with_retry(pool, "prompt", retries=0)
+    stats = pool.hedge_stats()
+    assert stats["requests"] == 3 and stats["hedges"] == 1 and stats["budget_denied"] == 2
+
+    # 未启用时不对冲
+    pool, calls = _pool(HedgePolicy(enabled=False), slow=(0.0, '{"a": 1}'), fast=(0.0, '{"a": 2}'))
+    assert call_llm_with_retry(pool, "prompt", retries=0) == '{"a": 1}'
+    assert calls["fast"].calls == 0 and pool.hedge_stats()["requests"] == 0
+
+
+def test_async_hedge_cancels_slow_primary():
+    async def scenario():
+        slow_runner, slow_url, slow = await start_mock_llm_server(latency_ms=2000)
+        fast_runner, fast_url, fast = await start_mock_llm_server(latency_ms=10)
+        pool = DefaultLLMPool()
+        for service in pool.list_services():
+            pool.remove_service(service["name"])
+        pool._routing = RoutingPolicy(explore=0.0)
+        pool.register_openai_client("slow", "k", slow_url, "m")
+        pool.register_openai_client("fast", "k", fast_url, "m")
+        pool._routing.finish("slow", 10, ok=True)
+        pool._routing.finish("fast", 50, ok=True)
+        pool.set_hedge_policy(_hedge(min_delay_s=0.1, default_delay_s=0.1))
+        try:
+            t0 = time.perf_counter()
+            text = await call_llm_with_retry_async(pool, "prompt", retries=0)
+            assert text and time.perf_counter() - t0 < 1.0
+            await asyncio.sleep(0.05)
+            stats = pool.hedge_stats()
+            assert stats["hedge_wins"] == 1 and stats["wasted_tokens"] > 0
+            assert pool.clients[0].async_transport.stats["in_flight"] == 0 and fast["requests"] == 1
+        finally:
+            for entry in pool.clients:
+                await entry.async_transport.close()
+            await slow_runner.cleanup()
+            await fast_runner.cleanup()
+
+    asyncio.run(scenario())
@@ -0,0 +1,135 @@
+import sys
+import asyncio
+import random
+from pathlib import Path
+from types import SimpleNamespace
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import src.adapters.llm.pool as pool_mod
+from src.adapters.llm.pool import ClientEntry, DefaultLLMPool
+from src.adapters.llm.routing import RoutingPolicy
+from src.app.business.benchmarks import start_mock_llm_server
+from src.ports.llm_client import LLMCallConfig, LLMProviderType
+
+
+def _policy(clock):
+    return RoutingPolicy(explore=0.0, clock=lambda: clock[0], rng=random.Random(0))
+
+
+def test_policy_prefers_least_expected_completion_time():
+    clock = [0.0]
+    policy = _policy(clock)
+    policy.register("local", rate_per_sec=0)
+    policy.register("cloud", rate_per_sec=0)
+    for name, ms in (("local", 2000), ("cloud", 200)):
+        policy.start(name)
+        policy.finish(name, ms, ok=True)
+    assert policy.choose(["local", "cloud"]) == "cloud"
+
+    # 在途请求抬高预计完成时间：cloud 排队到一定程度后分流到 local
+    for _ in range(19):
+        policy.start("cloud")
+    assert policy.choose(["local", "cloud"]) == "local"
+    for _ in range(19):
+        policy.finish("cloud", 200, ok=True)
+
+    # 错误率上升后切走；重试时排除已尝试的客户端
+    for _ in range(15):
+        policy.start("cloud")
+        policy.finish("cloud", None, ok=False, error="HTTP 500")
+    assert policy.choose(["local", "cloud"]) == "local"
+    assert policy.choose(["local", "cloud"], exclude=["local"]) == "cloud"
+
+
+def test_policy_accounts_for_rate_budget():
+    clock = [0.0]
+    policy = _policy(clock)
+    policy.register("a", rate_per_sec=1)
+    policy.register("b", rate_per_sec=0)
+    policy.finish("a", 100, ok=True)
+    policy.finish("b", 400, ok=True)
+    # a 的预算用尽：需等待 1s，预计完成时间高于 b
+    assert policy.start("a") == 0.0
+    policy.finish("a", 100, ok=True)
+    assert policy.snapshot("a")["remaining_budget"] == 0.0
+    assert policy.choose(["a", "b"]) == "b"
+    clock[0] += 1.0
+    assert policy.choose(["a", "b"]) == "a"
+
+
+class _FakeCompletions:
+    def __init__(self, fail):
+        self.fail = fail
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("HTTP 500 upstream")
+        message = SimpleNamespace(content=" ok ")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _entry(name, fail):
+    completions = _FakeCompletions(fail)
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return ClientEntry(name, client, "m", LLMProviderType.OPENAI, f"llm_{name}"), completions
+
+
+def test_sync_call_falls_back_without_sleeping(monkeypatch):
+    pool = DefaultLLMPool()
+    for service in pool.list_services():
+        pool.remove_service(service["name"])
+    bad, bad_calls = _entry("bad", fail=True)
+    good, good_calls = _entry("good", fail=False)
+    pool.clients = [bad, good]
+    pool._routing = RoutingPolicy(explore=0.0)
+    pool._routing.register("bad")
+    pool._routing.register("good")
+    # bad 先被观测为更快，首选 bad
+    pool._routing.start("bad")
+    pool._routing.finish("bad", 10, ok=True)
+    sleeps = []
+    monkeypatch.setattr(pool_mod.time, "sleep", sleeps.append)
+
+    response = pool.call("ping", LLMCallConfig(retries=2))
+    assert response.success and response.content == "ok"
+    assert bad_calls.calls == 1 and good_calls.calls == 1 and sleeps == []
+
+    services = {s["name"]: s["routing"] for s in pool.list_services()}
+    assert services["bad"]["failures"] == 1 and services["bad"]["success_rate"] < 1
+    assert services["good"]["requests"] == 1 and services["good"]["ewma_latency_ms"] is not None
+
+
+def test_async_calls_route_to_faster_provider():
+    async def scenario():
+        fast_runner, fast_url, fast = await start_mock_llm_server(latency_ms=10)
+        slow_runner, slow_url, slow = await start_mock_llm_server(latency_ms=150)
+        pool = DefaultLLMPool()
+        for service in pool.list_services():
+            pool.remove_service(service["name"])
+        pool.register_openai_client("slow", "k", slow_url, "m")
+        pool.register_openai_client("fast", "k", fast_url, "m")
+        sem = asyncio.Semaphore(4)
+
+        async def one():
+            async with sem:
+                return await pool.call_async("ping", LLMCallConfig(retries=0))
+
+        try:
+            responses = await asyncio.gather(*(one() for _ in range(60)))
+            assert all(r.success for r in responses)
+            assert fast["requests"] > 3 * slow["requests"]
+            routing = {s["name"]: s["routing"] for s in pool.list_services()}
+            assert routing["fast"]["ewma_latency_ms"] < routing["slow"]["ewma_latency_ms"]
+            assert routing["fast"]["in_flight"] == 0
+        finally:
+            for entry in pool.clients:
+                await entry.async_transport.close()
+            await fast_runner.cleanup()
+            await slow_runner.cleanup()
+
+    asyncio.run(scenario())
@@ -0,0 +1,89 @@
+import sys
+import json
+from datetime import timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.adapters.sqlite.store import SQLiteStore, SQLiteStoreConfig
+from src.app.business.decision_cache import MergeDecisionCache
+from src.app.business.graph_ops import KG_PROMPT_VERSION, KnowledgeGraph
+from src.domain.event_index import EntityEventIndex
+
+
+class _FakeLLMGraph(KnowledgeGraph):
+    def __init__(self, tmp_path, store):
+        super().__init__()
+        self.merge_rules = {}
+        self.merge_rules_file = tmp_path / "rules.json"
+        self.settings = {"entity_max_workers": 2, "event_max_workers": 2, "event_batch_size": 15}
+        self.llm_pool = None  # 校验走本地规则，避免真实 LLM
+        self._decision_cache = MergeDecisionCache(store, prompt_version=KG_PROMPT_VERSION)
+        self.prompts = []
+        self.graph["entities"] = {
+            "Acme": {"original_forms": ["Acme Corp"]},
+            "ACME Inc": {"original_forms": ["Acme Corp"]},
+        }
+        self.graph["events"] = {
+            "Acme 发布财报": {"entities": ["Acme"], "event_summary": "a", "first_seen": "2025-01-01"},
+            "阿克米公司召开季度业绩说明会": {"entities": ["ACME Inc"], "event_summary": "b", "first_seen": "2025-01-01"},
+        }
+        self._entity_events = EntityEventIndex.build(self.graph["events"])
+
+    def _call_llm_limited(self, prompt, timeout, limiter):
+        self.prompts.append(prompt)
+        if "duplicate_events" in prompt:
+            return json.dumps({"duplicate_events": [["Acme 发布财报", "阿克米公司召开季度业绩说明会"]]})
+        return json.dumps({"duplicate_entities": [["Acme", "ACME Inc"]]})
+
+
+def test_compression_reuses_cached_decisions(tmp_path):
+    store = SQLiteStore(SQLiteStoreConfig(db_path=tmp_path / "store.sqlite"))
+    kg = _FakeLLMGraph(tmp_path, store)
+    bucket = [{"keys": ["Acme 发布财报", "阿克米公司召开季度业绩说明会"]}]
+
+    assert kg._process_entity_batches([(0, ["Acme", "ACME Inc"])], None) == [["Acme", "ACME Inc"]]
+    assert kg._process_event_buckets(bucket, None) == [["Acme 发布财报", "阿克米公司召开季度业绩说明会"]]
+    assert len(kg.prompts) == 2
+
+    # 第二次 refresh：同一组（顺序不同）与同一批事件直接命中缓存
+    kg2 = _FakeLLMGraph(tmp_path, store)
+    assert kg2._process_entity_batches([(0, ["ACME Inc", "Acme"])], None) == [["Acme", "ACME Inc"]]
+    assert kg2._process_event_buckets(bucket, None) == [["Acme 发布财报", "阿克米公司召开季度业绩说明会"]]
+    assert kg2.prompts == []
+    assert kg2._decision_cache.summary()["hit_rate"] == 1.0
+
+    # 成员记录变化 → 键变化，重新判断
+    kg2.graph["entities"]["ACME Inc"]["original_forms"].append("ACME Incorporated")
+    kg2._process_entity_batches([(0, ["Acme", "ACME Inc"])], None)
+    assert len(kg2.prompts) == 1
+
+    # prompt 版本变化与 TTL 过期都会失效
+    kg3 = _FakeLLMGraph(tmp_path, store)
+    kg3._decision_cache = MergeDecisionCache(store, prompt_version="kg-compress-v2")
+    kg3._process_event_buckets(bucket, None)
+    assert len(kg3.prompts) == 1
+    kg3._decision_cache.ttl = timedelta(0)
+    kg3._process_event_buckets(bucket, None)
+    assert len(kg3.prompts) == 2
+    assert kg3._decision_cache.summary()["expired"] == 1
+
+
+def test_cached_decisions_not_applied_as_reviews(tmp_path):
+    store = SQLiteStore(SQLiteStoreConfig(db_path=tmp_path / "store.sqlite"))
+    cache = MergeDecisionCache(store, prompt_version="v1")
+    key = cache.key("kg_entity_validate", {"A": "1", "B": "2"})
+    assert key == cache.key("kg_entity_validate", {"B": "2", "A": "1"})
+    cache.put("kg_entity_validate", key, {"can_merge": True})
+    assert cache.get("kg_entity_validate", key) == {"can_merge": True}
+    assert cache.get("kg_entity_compress", key) is None
+    assert store.get_merge_decision_by_hash(key)["type"] == "kg_entity_validate"
+
+    conn = store._connect()
+    try:
+        n = conn.execute("SELECT COUNT(1) FROM merge_decisions WHERE type='entity_merge_review'").fetchone()[0]
+    finally:
+        conn.close()
+    assert n == 0
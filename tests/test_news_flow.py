@@ -14,6 +14,9 @@ from src.adapters.news.gdelt_adapter import GDELTAdapter
 from src.adapters.news.api_manager import GNewsAdapter
 from src.adapters.news.fetch_utils import fetch_from_collector, fetch_from_multiple_sources
 from src.app.business.extraction import batch_process_news
+from src.infra.simhash_index import SimHashIndex
+from src.infra.dedup_keys import DedupKeyIndex
+from src.infra.extraction_cache import ExtractionCache
 from src.ports.extraction import FetchResult, NewsItem
 
 
@@ -220,11 +223,16 @@ def extraction_side_effects_disabled(monkeypatch):
     monkeypatch.setattr(extraction_mod, "update_entities", lambda *args, **kwargs: True)
     monkeypatch.setattr(extraction_mod, "update_abstract_map", lambda *args, **kwargs: True)
     monkeypatch.setattr(store_mod, "get_store", lambda: FakeStore())
+    # 去重与抽取缓存使用内存实现，不写 data/cache 下的持久化文件
+    monkeypatch.setattr(extraction_mod, "get_simhash_index", lambda threshold: SimHashIndex(threshold))
+    monkeypatch.setattr(extraction_mod, "get_dedup_key_index", lambda: DedupKeyIndex())
+    extraction_cache = ExtractionCache()
+    monkeypatch.setattr(extraction_mod, "get_extraction_cache", lambda: extraction_cache)
     return extraction_mod
 
 
 def test_batch_process_news_smoke_print_result(monkeypatch, extraction_side_effects_disabled) -> None:
-    def fake_llm_extract_events(title, content, api_pool, max_retries: int = 2, reported_at=None):
+    def fake_llm_extract_events(title, content, api_pool, max_retries: int = 2, reported_at=None, cache_key=None, entity_hints=None):
         return [
             {
                 "abstract": f"{title} | {content[:50]}",
@@ -260,7 +268,7 @@ def test_batch_process_news_smoke_print_result(monkeypatch, extraction_side_effe
 
 
 def test_fetch_and_extract_multi_sources_smoke_print_result(monkeypatch, extraction_side_effects_disabled) -> None:
-    def fake_llm_extract_events(title, content, api_pool, max_retries: int = 2, reported_at=None):
+    def fake_llm_extract_events(title, content, api_pool, max_retries: int = 2, reported_at=None, cache_key=None, entity_hints=None):
         return [
             {
                 "abstract": f"{title} | {content[:50]}",
@@ -399,6 +407,7 @@ def test_benchmark_gdelt_extraction_only_gdelt(monkeypatch) -> None:
     monkeypatch.setattr(data_fetch_mod, "fetch_from_multiple_sources", fake_fetch_from_multiple_sources)
     monkeypatch.setattr(data_fetch_mod, "get_llm_pool", lambda: object())
     monkeypatch.setattr(data_fetch_mod, "llm_extract_events", fake_llm_extract_events)
+    monkeypatch.setattr(data_fetch_mod, "get_extraction_cache", lambda: ExtractionCache())
 
     out = asyncio.run(
         data_fetch_mod.benchmark_gdelt_extraction(
@@ -416,4 +425,91 @@ def test_benchmark_gdelt_extraction_only_gdelt(monkeypatch) -> None:
     assert out["events_total"] == 4
     assert out["entities_total"] == 6
     assert out["relations_total"] == 2
+    assert out["extraction_cache"]["hits"] == 0
 
+
+def test_batch_process_news_uses_configured_batch_size(monkeypatch, extraction_side_effects_disabled):
+    from src.app.business import extraction as extraction_mod
+    from src.ports.llm_client import LLMResponse
+
+    class BatchPool:
+        def __init__(self):
+            self.batches = []
+
+        def list_services(self):
+            return [{"name": "fake", "model": "fake"}]
+
+        def call(self, prompt, config=None):
+            blocks = prompt.split("\n### 新闻 id=")[1:]
+            self.batches.append(len(blocks))
+            items = []
+            for block in blocks:
+                aid, _, title_line = block.split("\n", 3)[:3]
+                title = title_line[3:]
+                items.append({"id": aid, "events": [{"abstract": f"{title} 发布公告", "entities": [title], "entities_original": [title], "event_summary": "公告"}]})
+            return LLMResponse(content=json.dumps({"articles": items}, ensure_ascii=False))
+
+    pool = BatchPool()
+
+    class BatchConfig:
+        def get_concurrency_limit(self, _name):
+            return 2
+
+        def get_rate_limit(self, _name):
+            return 100000.0
+
+        def get_config_value(self, key, default=None, _section=None):
+            return {"extraction_batch_size": 4}.get(key, default)
+
+    monkeypatch.setattr(extraction_mod, "get_config_manager", lambda: BatchConfig())
+    monkeypatch.setattr(extraction_mod, "get_llm_pool", lambda: pool)
+    monkeypatch.setattr(extraction_mod, "deduplicate_news_batch", lambda news: news)
+    news = [{"id": i, "source": "s", "title": f"公司{i}", "content": "短讯", "datetime": "2025-01-01"} for i in range(10)]
+
+    events = asyncio.run(extraction_mod.batch_process_news(news))
+    assert sorted(ev["news_id"] for ev in events) == list(range(10))
+    assert all(ev["entities"] == [f"公司{ev['news_id']}"] for ev in events)
+    assert sorted(pool.batches) == [2, 4, 4]
+
+
+def test_expand_news_by_recent_entities_reports_cache_stats(monkeypatch, tmp_path) -> None:
+    from types import SimpleNamespace
+    from src.app.business import data_fetch as data_fetch_mod
+    from src.app.business import extraction as extraction_mod
+    from src.app.business.extraction import NewsDeduplicator
+    import src.adapters.sqlite.store as store_mod
+
+    raw_dir, dedup_dir = tmp_path / "raw", tmp_path / "deduped"
+    cache = ExtractionCache()
+    applied = []
+
+    async def fake_expand(entities, limit_per_entity=120, time_window_days=30, full_search=False):
+        assert [e["name"] for e in entities] == ["英伟达"]
+        return [
+            {"id": "n1", "source": "GNews-cn", "title": "英伟达发布新一代芯片", "content": "英伟达周二发布新一代人工智能芯片，性能大幅提升。"},
+            {"id": "n2", "source": "GNews-cn", "title": "国际油价大幅上涨", "content": "受供应担忧影响，布伦特原油期货价格上涨超过百分之三。"},
+        ]
+
+    async def fake_llm(title, content, api_pool, cache_key=None, **kwargs):
+        assert cache_key
+        return [{"abstract": title, "entities": ["英伟达"], "entities_original": ["英伟达"]}]
+
+    monkeypatch.setattr(extraction_mod.tools, "RAW_NEWS_TMP_DIR", raw_dir)
+    monkeypatch.setattr(extraction_mod.tools, "DEDUPED_NEWS_TMP_DIR", dedup_dir)
+    monkeypatch.setattr(NewsDeduplicator, "shared", classmethod(lambda cls, threshold: cls(threshold, SimHashIndex(threshold), key_index=DedupKeyIndex())))
+    monkeypatch.setattr(store_mod, "get_store", lambda: SimpleNamespace(get_processed_ids=lambda: set()))
+    monkeypatch.setattr(data_fetch_mod, "get_recent_entities", lambda **k: [{"name": "英伟达", "original_forms": ["NVIDIA"]}])
+    monkeypatch.setattr(data_fetch_mod, "expand_news_by_entities", fake_expand)
+    monkeypatch.setattr(data_fetch_mod, "get_llm_pool", lambda: SimpleNamespace(list_services=lambda: []))
+    monkeypatch.setattr(data_fetch_mod, "llm_extract_events_async", fake_llm)
+    monkeypatch.setattr(data_fetch_mod, "get_extraction_cache", lambda: cache)
+    monkeypatch.setattr(extraction_mod, "get_extraction_cache", lambda: cache)
+    monkeypatch.setattr(data_fetch_mod, "update_entities", lambda *a, **k: True)
+    monkeypatch.setattr(data_fetch_mod, "update_abstract_map", lambda events, *a, **k: applied.extend(e["abstract"] for e in events))
+
+    out = asyncio.run(data_fetch_mod.expand_news_by_recent_entities(rate_limit=0))
+    assert out["processed_count"] == 2 and out["expanded_news_count"] == 2
+    assert out["extraction_cache"]["misses"] == 2 and out["extraction_cache"]["hits"] == 0
+    assert sorted(applied) == ["国际油价大幅上涨", "英伟达发布新一代芯片"]
+    # 临时文件处理完即删除
+    assert list(raw_dir.iterdir()) == [] and list(dedup_dir.iterdir()) == []
@@ -0,0 +1,102 @@
+import os
+import sys
+import json
+import signal
+import asyncio
+import multiprocessing
+from pathlib import Path
+from types import SimpleNamespace
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.infra.checkpoint import ArticleCheckpoint, CheckpointWriter
+from src.infra.extraction_cache import ExtractionCache
+
+
+def test_writer_group_commits_concurrent_records(tmp_path):
+    checkpoint = ArticleCheckpoint(tmp_path / "checkpoints.sqlite")
+
+    async def scenario():
+        writer = CheckpointWriter(checkpoint, "run-a")
+
+        async def one(i):
+            await asyncio.sleep(0.001 * (i % 4))
+            await writer.record(f"s:{i}", {"events": [i]})
+            # record 返回时结果已提交，另一个连接可见
+            assert f"s:{i}" in ArticleCheckpoint(tmp_path / "checkpoints.sqlite").load("run-a")
+
+        await asyncio.gather(*(one(i) for i in range(40)))
+        await writer.close()
+
+    asyncio.run(scenario())
+    assert checkpoint.stats["writes"] == 40 and checkpoint.stats["commits"] < 40
+    assert checkpoint.load("run-a")["s:7"] == {"events": [7]}
+    assert checkpoint.clear("run-a") == 40 and checkpoint.load("run-a") == {}
+
+
+def _run_pipeline(monkeypatch, kill_at=None):
+    from src.app.business import extraction as extraction_mod
+
+    async def fake_llm(title, content, api_pool, reported_at=None, cache_key=None, entity_hints=None):
+        with open(os.environ["CKPT_CALLS"], "a", encoding="utf-8") as f:
+            f.write(title + "\n")
+        if kill_at is not None and sum(1 for _ in open(os.environ["CKPT_CALLS"], encoding="utf-8")) == kill_at:
+            os.kill(os.getpid(), signal.SIGKILL)
+        await asyncio.sleep(0.01)
+        return [{"abstract": title, "entities": ["E"], "entities_original": ["E"]}]
+
+    monkeypatch.setattr(extraction_mod, "llm_extract_events_async", fake_llm)
+    return asyncio.run(extraction_mod.process_news_pipeline(max_workers=1, rate_limit_per_sec=1000.0))
+
+
+def test_killed_run_resumes_without_repeating_llm_calls(monkeypatch, tmp_path):
+    from src.app.business import extraction as extraction_mod
+    import src.adapters.sqlite.store as store_mod
+
+    raw_dir, dedup_dir = tmp_path / "raw", tmp_path / "deduped"
+    raw_dir.mkdir()
+    dedup_dir.mkdir()
+    lines = [json.dumps({"id": str(i), "source": "s", "title": f"t{i}", "content": f"c{i}"}) for i in range(8)]
+    (raw_dir / "batch.jsonl").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    (dedup_dir / "batch_deduped.jsonl").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    applied, recorded = [], []
+    store = SimpleNamespace(
+        get_processed_ids=lambda: set(),
+        add_processed_ids=lambda ids: recorded.extend(ids) or len(ids),
+        export_compat_json_files=lambda: None,
+    )
+    calls_path = tmp_path / "calls.txt"
+    monkeypatch.setenv("CKPT_CALLS", str(calls_path))
+    monkeypatch.setattr(extraction_mod.tools, "RAW_NEWS_TMP_DIR", raw_dir)
+    monkeypatch.setattr(extraction_mod.tools, "DEDUPED_NEWS_TMP_DIR", dedup_dir)
+    monkeypatch.setattr(store_mod, "get_store", lambda: store)
+    monkeypatch.setattr(extraction_mod, "get_llm_pool", lambda: object())
+    monkeypatch.setattr(extraction_mod, "get_extraction_cache", lambda: ExtractionCache(enabled=False))
+    monkeypatch.setattr(extraction_mod, "get_article_checkpoint", lambda: ArticleCheckpoint(tmp_path / "checkpoints.sqlite"))
+    monkeypatch.setattr(extraction_mod, "update_entities", lambda *a, **k: True)
+    monkeypatch.setattr(extraction_mod, "update_abstract_map", lambda events, *a, **k: applied.extend(e["abstract"] for e in events))
+
+    # 第一次运行在第 5 次 LLM 调用时被 SIGKILL
+    proc = multiprocessing.get_context("fork").Process(target=_run_pipeline, args=(monkeypatch,), kwargs={"kill_at": 5})
+    proc.start()
+    proc.join(timeout=60)
+    assert proc.exitcode == -signal.SIGKILL
+    first = calls_path.read_text(encoding="utf-8").split()
+    assert first == ["t0", "t1", "t2", "t3", "t4"]
+    assert (dedup_dir / "batch_deduped.jsonl").exists()
+
+    calls_path.write_text("", encoding="utf-8")
+    result = _run_pipeline(monkeypatch)
+
+    # 已完成的 4 篇从检查点恢复；被中断的 t4 与剩余文章各调用一次
+    second = calls_path.read_text(encoding="utf-8").split()
+    assert second == ["t4", "t5", "t6", "t7"]
+    assert result["resumed_count"] == 4 and result["processed_count"] == 8
+    assert sorted(applied) == [f"t{i}" for i in range(8)]
+    assert sorted(gid for gid, _, _ in recorded) == [f"s:{i}" for i in range(8)]
+    assert {raw for _, _, raw in recorded} == {str(i) for i in range(8)}
+    assert not (dedup_dir / "batch_deduped.jsonl").exists() and not (raw_dir / "batch.jsonl").exists()
+    assert ArticleCheckpoint(tmp_path / "checkpoints.sqlite").run_keys() == []
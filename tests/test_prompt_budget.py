@@ -0,0 +1,79 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.infra.async_utils import create_extraction_prompt, extraction_prompt_prefix
+from src.infra.prompt_budget import OMISSION_MARK, TokenCounter, build_extraction_prompt, compact_content, split_sentences
+
+
+def test_prefix_is_shared_and_prompt_layout_unchanged():
+    a = build_extraction_prompt("标题一", "正文一。", "defs", reported_at="2025-01-01", entity_hints=["NVIDIA"])
+    b = build_extraction_prompt("标题二", "正文二。", "defs", reported_at="2025-02-02")
+    assert a.prefix is b.prefix == extraction_prompt_prefix("defs")
+    # 报导时间、提示、标题与正文只出现在后缀中
+    assert "2025-01-01" not in a.prefix and "NVIDIA" in a.suffix and a.suffix.endswith("正文一。")
+    assert a.text == create_extraction_prompt("标题一", "正文一。", "defs", "2025-01-01", ["NVIDIA"])
+
+
+def test_split_sentences_keeps_decimals_and_abbreviations():
+    text = "美联储加息25个基点。市场下跌3.5%！The U.S.A economy grew 2.1% last year. 完"
+    sentences = [text[s:e].strip() for s, e in split_sentences(text)]
+    assert sentences == ["美联储加息25个基点。", "市场下跌3.5%！", "The U.S.A economy grew 2.1% last year.", "完"]
+
+
+def test_compaction_respects_budget_and_keeps_informative_sentences():
+    counter = TokenCounter(use_tokenizer=False)
+    filler = "分析人士认为后续走势仍存在较大不确定性。"
+    content = "英伟达周二发布新款芯片。" + filler * 20 + "台积电将为其代工，产能提升30%。" + filler * 20
+
+    short = compact_content("英伟达发布芯片", "很短的正文。", 100, counter)
+    assert short.content == "很短的正文。" and not short.compacted
+
+    result = compact_content("英伟达发布芯片", content, 60, counter, entity_hints=["台积电"])
+    assert result.compacted and result.content_tokens <= 60
+    assert result.content.startswith("英伟达周二发布新款芯片。")
+    assert "台积电将为其代工，产能提升30%。" in result.content
+    assert result.content.endswith(OMISSION_MARK)
+
+    # 单句超出预算时截取首句
+    head = compact_content("t", "这是一句非常非常长的没有任何标点的句子" * 10, 8, counter)
+    assert head.content.endswith(OMISSION_MARK) and head.sentences_kept == 0
+    assert compact_content("t", content, 0, counter).content == content
+
+
+def test_counter_calibrates_from_reported_usage():
+    counter = TokenCounter(use_tokenizer=False, alpha=0.5)
+    text = "hello world " * 50
+    base = counter.count(text)
+    counter.observe(text, base * 2)
+    assert counter.count(text) == base * 2 and counter.samples == 1
+    counter.observe(text, base)
+    assert abs(counter.scale - 1.5) < 1e-9
+    counter.observe(text, 0)
+    assert counter.samples == 2
+
+
+def test_calibration_does_not_change_compaction():
+    counter = TokenCounter(use_tokenizer=False)
+    content = "英伟达周二发布新款芯片。" + "分析人士认为后续走势仍存在较大不确定性。" * 40
+    before = compact_content("英伟达发布芯片", content, 80, counter)
+    counter.observe(content, counter.count(content) * 3)
+    assert counter.scale == 3.0
+    after = compact_content("英伟达发布芯片", content, 80, counter)
+    assert after == before
+
+
+def test_benchmark_reports_fewer_tokens_and_lower_latency():
+    from src.app.business.benchmarks import benchmark_prompt_compaction
+
+    report = benchmark_prompt_compaction(n_articles=4, content_chars=5000, budget_tokens=400, latency_ms=5.0, ms_per_1k_prompt_tokens=40.0)
+    before, after = report["runs"]["truncate"], report["runs"]["budget"]
+    assert before["events"] == after["events"] == 4 and after["compacted_articles"] == 4
+    assert after["prompt_tokens_per_article"] < before["prompt_tokens_per_article"]
+    assert after["uncached_prompt_tokens_per_article"] < before["uncached_prompt_tokens_per_article"]
+    # 模拟 LLM 按 token 计算的耗时，不比较墙钟时间
+    assert after["latency_ms_per_article"] < before["latency_ms_per_article"]
+    assert report["prefix_tokens"] > 0
@@ -0,0 +1,136 @@
+import sys
+import time
+import sqlite3
+import asyncio
+import threading
+import multiprocessing
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import src.infra.shared_limiter as shared_mod
+from src.infra.adaptive_limiter import create_rate_limiter
+from src.infra.shared_limiter import SharedRateLimiter
+
+
+def _worker(db_path, n, out):
+    limiter = SharedRateLimiter("llm", 40, db_path=Path(db_path), burst=4, batch_size=2)
+    stamps = []
+    for _ in range(n):
+        limiter.acquire()
+        stamps.append(time.time())
+    out.put((stamps, limiter.stats["reservations"]))
+
+
+def test_processes_share_one_bucket(tmp_path):
+    db_path = tmp_path / "rate_limits.sqlite"
+    SharedRateLimiter("llm", 40, db_path=db_path, burst=4, batch_size=2).close()
+    ctx = multiprocessing.get_context("fork")
+    out = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(str(db_path), 20, out)) for _ in range(3)]
+    for p in procs:
+        p.start()
+    results = [out.get(timeout=30) for _ in procs]
+    for p in procs:
+        p.join(timeout=30)
+    stamps = sorted(t for s, _ in results for t in s)
+    # 三个进程共 60 个令牌，40/s、容量 4：至少需要 (60 - 4) / 40 = 1.4s（独立限速时约 0.4s）
+    assert stamps[-1] - stamps[0] >= 1.2
+    # 每次 SQLite 预留 2 个令牌
+    assert sum(r for _, r in results) < 60
+
+
+def test_batched_reservation_lease_and_retry_after(tmp_path):
+    clock = [1000.0]
+    db_path = tmp_path / "rate_limits.sqlite"
+    a = SharedRateLimiter("gdelt", 10, db_path=db_path, batch_size=5, lease_s=1.0, clock=lambda: clock[0])
+    b = SharedRateLimiter("gdelt", 10, db_path=db_path, batch_size=5, lease_s=1.0, clock=lambda: clock[0])
+    # 桶容量 10：a、b 各预留一批后配额耗尽
+    assert all(a.try_acquire() for _ in range(5)) and a.stats["reservations"] == 1
+    assert b.try_acquire() and not a.try_acquire()
+    assert b.snapshot()["local_tokens"] == 4
+
+    # 本地租约过期作废，不会超额
+    clock[0] += 2.0
+    assert b.try_acquire() and b.stats["expired"] == 4
+
+    # Retry-After 对所有进程生效（b 已持有的租约到期后）
+    a.record_failure(status=429, retry_after=3)
+    assert not a.try_acquire() and b.try_acquire()
+    clock[0] += 1.5
+    assert not b.try_acquire() and b.snapshot()["blocked_for_s"] == 1.5
+    clock[0] += 1.5
+    assert b.try_acquire()
+
+    # 速率变更写入共享状态
+    a.set_rate_per_sec(20)
+    assert SharedRateLimiter("gdelt", 5, db_path=db_path, clock=lambda: clock[0]).get_rate_per_sec() == 5
+    a.close()
+    b.close()
+
+
+def test_acquire_async_does_not_block_loop_on_locked_db(tmp_path):
+    db_path = tmp_path / "rate_limits.sqlite"
+    limiter = SharedRateLimiter("llm", 100, db_path=db_path, batch_size=2)
+    other = sqlite3.connect(str(db_path), isolation_level=None, check_same_thread=False)
+    other.execute("BEGIN IMMEDIATE")
+    threading.Timer(0.3, lambda: other.execute("COMMIT")).start()
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        t0 = time.perf_counter()
+        await limiter.acquire_async()
+        elapsed = time.perf_counter() - t0
+        # 本地租约内的令牌不再访问 SQLite
+        await limiter.acquire_async()
+        task.cancel()
+        return elapsed, ticks
+
+    elapsed, ticks = asyncio.run(scenario())
+    # 另一连接持有写锁约 0.3s：预留在线程中等待，事件循环照常调度
+    assert elapsed >= 0.25 and ticks >= 10
+    assert limiter.stats["reservations"] == 1 and limiter.stats["acquired"] == 2
+    other.close()
+    limiter.close()
+
+
+class _Config:
+    def get_config_value(self, key, default=None, agent_config=None):
+        return {"rate_limiter_mode": "shared", "gnews_rate_limit_per_sec": 2.0}.get(key, default)
+
+
+def test_shared_mode_is_selectable_in_config(monkeypatch, tmp_path):
+    import src.infra.config as config_mod
+    from src.adapters.llm.pool import DefaultLLMPool
+    from src.adapters.news.api_manager import GNewsAdapter
+
+    monkeypatch.setattr(config_mod, "get_config_manager", lambda: _Config())
+    monkeypatch.setattr(shared_mod, "_limiters", {})
+    monkeypatch.setattr(shared_mod, "shared_limiter_db_path", lambda: tmp_path / "rate_limits.sqlite")
+
+    limiter = create_rate_limiter(50, "llm")
+    assert isinstance(limiter, SharedRateLimiter) and create_rate_limiter(50, "llm") is limiter
+
+    one, two = GNewsAdapter("key-1", name="GNews-cn"), GNewsAdapter("key-1", name="GNews-en")
+    assert one._rate_limiter is two._rate_limiter and one._rate_limiter.get_rate_per_sec() == 2.0
+    assert GNewsAdapter("key-2")._rate_limiter is not one._rate_limiter
+    assert "key-1" not in one._rate_limiter.name
+
+    pool = DefaultLLMPool()
+    for service in pool.list_services():
+        pool.remove_service(service["name"])
+    pool.register_openai_client("a", "sk-same", "http://127.0.0.1:9/v1", "m", rate_per_sec=5)
+    pool.register_openai_client("b", "sk-same", "http://127.0.0.1:9/v1", "m", rate_per_sec=5)
+    pool.register_openai_client("c", "sk-other", "http://127.0.0.1:9/v1", "m")
+    a, b, c = pool.clients
+    assert a.limiter is b.limiter and isinstance(a.limiter, SharedRateLimiter) and c.limiter is None
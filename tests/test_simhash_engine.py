@@ -0,0 +1,53 @@
+import sys
+import time
+import random
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.infra.simhash import SimHashEngine, simhash_reference, tokenize
+
+
+def _docs(n: int, seed: int = 11):
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(4000)] + ["美联储", "加息", "Market", "CPI", "\t", "😀"]
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(0, 250))) for _ in range(n)]
+
+
+def test_md5_mode_is_bit_compatible_and_faster():
+    docs = _docs(1500) + ["", "   ", "Fed  Hikes\nRates", "单独一句中文新闻标题"]
+
+    start = time.perf_counter()
+    want = [simhash_reference(d) for d in docs]
+    legacy = time.perf_counter() - start
+
+    engine = SimHashEngine("md5")
+    assert engine.bit_compatible
+    start = time.perf_counter()
+    got = engine.fingerprints(docs)
+    batched = time.perf_counter() - start
+
+    assert got == want
+    assert engine.fingerprint(docs[-2]) == want[-2]
+    assert batched < legacy / 2
+
+
+def test_cjk_shingling_detects_chinese_near_duplicates():
+    a = "美联储宣布加息二十五个基点市场反应平稳"
+    b = "美联储宣布加息二十五个基点，市场反应总体平稳"
+    assert tokenize(a, 2)[:3] == ["美联", "联储", "储宣"]
+    assert tokenize("Fed加息 25bp", 2) == ["fed", "加息", "25bp"]
+
+    plain = SimHashEngine("md5")
+    shingled = SimHashEngine("blake2b", cjk_ngram=2)
+    assert not shingled.bit_compatible and shingled.signature == "blake2b-cjk2"
+
+    def dist(engine):
+        x, y = engine.fingerprints([a, b])
+        return bin(x ^ y).count("1")
+
+    # 空白切分时整句各为一个 token，指纹几乎无关；字符 bigram 保留了局部相似性
+    assert dist(shingled) < dist(plain)
+    assert dist(shingled) <= 12
@@ -0,0 +1,105 @@
+import sys
+import json
+import random
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.infra.simhash_index import SimHashIndex, band_layout
+from src.app.business.extraction import NewsDeduplicator
+
+
+def _flip(fp, n, rng):
+    for b in rng.sample(range(64), n):
+        fp ^= 1 << b
+    return fp
+
+
+def test_multi_index_matches_bruteforce():
+    rng = random.Random(5)
+    assert sum(w for _, w in band_layout(3)) == 64 and len(band_layout(3)) == 4
+
+    index = SimHashIndex(threshold=3)
+    stored = [rng.getrandbits(64) for _ in range(3000)]
+    for i, fp in enumerate(stored):
+        index.add(fp, f"k{i}")
+
+    queries = [_flip(rng.choice(stored), rng.randint(0, 6), rng) for _ in range(600)]
+    queries += [rng.getrandbits(64) for _ in range(200)]
+    for q in queries:
+        brute = any(bin(q ^ s).count("1") <= 3 for s in stored)
+        got = index.find(q)
+        assert (got is not None) == brute
+        if got is not None:
+            assert bin(q ^ got).count("1") <= 3
+    # 只比较同段候选，远少于全量扫描
+    assert index.stats["candidates"] < len(queries) * len(stored) // 50
+
+
+def test_persistence_retention_and_same_document(tmp_path):
+    clock = [1_000_000.0]
+    db = tmp_path / "simhash.sqlite"
+    index = SimHashIndex(threshold=3, db_path=db, retention_days=1, now=lambda: clock[0])
+    assert index.check_and_add(0b1011, "a:1") is False
+    assert index.check_and_add(0b1010, "b:2") is True   # 距离 1：近重复
+    assert index.check_and_add(0b1011, "a:1") is False  # 同一文档再次经过去重
+    clock[0] += 3600
+    index.add(1 << 40, "c:3")
+    index.flush()
+
+    reopened = SimHashIndex(threshold=3, db_path=db, retention_days=1, now=lambda: clock[0])
+    assert len(reopened) == 2
+    assert reopened.key_of(0b1011) == "a:1"
+    assert reopened.check_and_add(0b1111, "d:4") is True
+
+    clock[0] += 86400 - 1800  # 第一条超出 1 天窗口
+    assert reopened.prune() == 1
+    expired = SimHashIndex(threshold=3, db_path=db, retention_days=1, now=lambda: clock[0])
+    assert 0b1011 not in expired and (1 << 40) in expired
+
+
+def test_dedupe_file_shares_index_across_runs(tmp_path):
+    index = SimHashIndex(threshold=3, db_path=tmp_path / "simhash.sqlite")
+    text = "美联储 宣布 加息 25 个 基点 市场 反应 平稳"
+    raw1 = tmp_path / "raw1.jsonl"
+    raw1.write_text(
+        "\n".join(json.dumps(x, ensure_ascii=False) for x in [
+            {"source": "s", "id": 1, "title": text, "content": ""},
+            {"source": "s", "id": 2, "title": text + " ", "content": ""},
+        ]) + "\n",
+        encoding="utf-8",
+    )
+    raw2 = tmp_path / "raw2.jsonl"
+    raw2.write_text(json.dumps({"source": "t", "id": 9, "title": text, "content": ""}, ensure_ascii=False) + "\n", encoding="utf-8")
+
+    NewsDeduplicator(3, index).dedupe_file(raw1, tmp_path / "out1.jsonl")
+    assert len((tmp_path / "out1.jsonl").read_text(encoding="utf-8").splitlines()) == 1
+
+    # 新进程（重新打开索引）处理下一批：跨运行的近重复仍被过滤
+    again = SimHashIndex(threshold=3, db_path=tmp_path / "simhash.sqlite")
+    NewsDeduplicator(3, again).dedupe_file(raw2, tmp_path / "out2.jsonl")
+    assert (tmp_path / "out2.jsonl").read_text(encoding="utf-8") == ""
+
+
+def test_news_without_id_are_deduplicated_by_content(tmp_path):
+    from src.app.business.extraction import deduplicate_news_batch
+    from src.infra.dedup_keys import DedupKeyIndex
+
+    x = {"source": "gnews", "title": "央行宣布下调存款准备金率", "content": "央行宣布下调存款准备金率零点五个百分点，释放长期资金。"}
+    assert NewsDeduplicator._news_key(x) == "" and NewsDeduplicator._news_key({"source": "s", "id": 7}) == "s:7"
+    assert len(deduplicate_news_batch([dict(x), dict(x)], persistent=False)) == 1
+
+    deduper = NewsDeduplicator(3, SimHashIndex(3), key_index=DedupKeyIndex())
+    text = x["title"] + " " + x["content"]
+    assert deduper.is_duplicate(text, NewsDeduplicator._news_key(x)) is False
+    assert deduper.is_duplicate(text, NewsDeduplicator._news_key(x)) is True
+
+    # 文件去重：无 id 的不同新闻不会因 ID 相同被误删，相同内容仍按相似度去掉
+    other = {"source": "gnews", "title": "国际油价大幅上涨", "content": "受供应担忧影响，布伦特原油期货价格上涨超过百分之三。"}
+    raw = tmp_path / "raw.jsonl"
+    raw.write_text("\n".join(json.dumps(n, ensure_ascii=False) for n in (x, other, x)) + "\n", encoding="utf-8")
+    out = tmp_path / "out.jsonl"
+    NewsDeduplicator(3, SimHashIndex(3), key_index=DedupKeyIndex()).dedupe_file(raw, out)
+    assert [json.loads(line)["title"] for line in out.read_text(encoding="utf-8").splitlines()] == [x["title"], other["title"]]
@@ -169,3 +169,60 @@ def test_evo_timeline_deltas_indexing() -> None:
 
     assert set(deltas[2].get("enter") or []) == {"r3"}
     assert set(deltas[2].get("exit") or []) == {"r1"}
+
+
+def test_build_ee_evo_emits_frame_index_and_seek_matches_intervals() -> None:
+    from datetime import datetime, timezone
+
+    from src.app.evo_frame_index import EvoFrameIndex, collect_relation_state_intervals, to_utc_naive
+
+    rows_entities = [
+        {"entity_id": f"E{i}", "name": f"Ent{i}", "first_seen": "2025-01-01T00:00:00Z"} for i in range(6)
+    ]
+    rows_relation_states = []
+    for i in range(40):
+        start = datetime(2025, 1, 1 + (i % 28), i % 24, tzinfo=timezone.utc)
+        end = "" if i % 5 == 0 else datetime(2025, 2, 1 + (i % 20), tzinfo=timezone.utc).isoformat()
+        rows_relation_states.append(
+            {
+                "relation_state_id": f"rs{i}",
+                "subject_entity_id": f"E{i % 6}",
+                "predicate": "p",
+                "object_entity_id": f"E{(i + 1) % 6}",
+                "valid_from": start.isoformat(),
+                "valid_to": end,
+            }
+        )
+    params = SnapshotParams(top_entities=20, top_events=0, max_edges=500, days_window=0, evo_keyframe_interval=4)
+    snap = SnapshotService(store=object()).build_ee_evo(rows_entities, rows_relation_states, [], params)
+
+    idx = EvoFrameIndex.from_dict(json.loads(json.dumps(snap["frame_index"])))
+    assert idx is not None
+    assert idx.relation_count == 40
+    assert snap["meta"]["frame_count"] == len(idx.frames)
+
+    intervals = collect_relation_state_intervals(snap["nodes"])
+    for i, frame in enumerate(idx.frame_datetimes()):
+        f = to_utc_naive(frame)
+        expected = {
+            rid for rid, (s, e) in intervals.items() if to_utc_naive(s) <= f and (e is None or f <= to_utc_naive(e))
+        }
+        assert idx.active_at(i) == expected
+        assert idx.active_at(i, cumulative=True) == {rid for rid, (s, _) in intervals.items() if to_utc_naive(s) <= f}
+
+    rel_ids = {n["id"] for n in snap["nodes"] if n["type"] == "relation_state"}
+    assert rel_ids <= set(idx.positions.keys())
+
+
+def test_frame_index_buckets_when_too_many_keypoints() -> None:
+    from datetime import datetime, timedelta, timezone
+
+    from src.app.evo_frame_index import bucket_frames
+
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    intervals = {f"r{i}": (base + timedelta(minutes=17 * i), None) for i in range(2000)}
+    frames, bucket_seconds = bucket_frames(intervals, max_frames=100)
+    assert 0 < len(frames) <= 100
+    assert bucket_seconds > 0
+    assert frames == sorted(frames)
+    assert frames[-1] >= max(s for s, _ in intervals.values())
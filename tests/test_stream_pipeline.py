@@ -0,0 +1,122 @@
+import sys
+import time
+import asyncio
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.infra.stream_pipeline import Stage, StreamPipeline
+from src.infra.extraction_cache import ExtractionCache
+from src.ports.extraction import NewsItem
+
+
+def test_bounded_queues_apply_backpressure_and_batch():
+    produced, consumed, dropped, ahead = [0], [0], [0], []
+
+    async def source():
+        for i in range(60):
+            produced[0] += 1
+            ahead.append(produced[0] - consumed[0] - dropped[0])
+            yield i
+
+    async def double(x):
+        if x == 7:
+            dropped[0] += 1
+            raise ValueError("bad item")
+        if x % 10 == 0:
+            dropped[0] += 1
+            return None
+        return x * 2
+
+    async def sink(batch):
+        await asyncio.sleep(0.005)
+        consumed[0] += len(batch)
+        return batch
+
+    pipeline = StreamPipeline([
+        Stage("double", double, concurrency=2, queue_size=4),
+        Stage("sink", sink, queue_size=4, batch_size=5, batch_timeout_s=0.05),
+    ])
+    metrics = asyncio.run(pipeline.run(source()))
+
+    # 在途条目受队列容量与 worker 数约束，而不是随数据源长度增长
+    assert max(ahead) <= 4 + 2 + 4 + 5 + 1
+    assert metrics["source"]["items_out"] == 60
+    assert metrics["double"]["errors"] == 1 and metrics["double"]["dropped"] == 7
+    assert metrics["sink"]["items_in"] == consumed[0] == 53
+    assert metrics["sink"]["batches"] >= 11 and metrics["sink"]["throughput_per_s"] > 0
+
+
+class _Source:
+    def __init__(self, name, items, delay=0.0):
+        self.name, self.items, self.delay = name, items, delay
+        self.finished_at = None
+
+    async def fetch_stream(self, config):
+        assert config.max_items == (18 if self.name.startswith("GDELT") else 2)
+        for item in self.items:
+            await asyncio.sleep(self.delay)
+            yield item
+        self.finished_at = time.perf_counter()
+
+
+def _item(source, i, text):
+    return NewsItem(id=f"n{i}", title=f"title {i}", content=text, source_name=source, source_url=f"https://e.x/{i}")
+
+
+def test_stream_process_news_runs_stages_end_to_end(monkeypatch):
+    import src.app.business.stream_ingest as ingest
+
+    distinct = [
+        "央行宣布下调存款准备金率零点五个百分点",
+        "某科技公司发布新一代人工智能芯片",
+        "国际油价因供应担忧大幅上涨",
+        "欧洲央行维持利率不变并暗示年内降息",
+        "新能源车企公布季度交付量创新高",
+    ]
+    gdelt = _Source("GDELT", [_item("GDELT", i, distinct[i % 5] + f" 第{i}期报道全文" * (i // 5 + 1)) for i in range(12)], delay=0.01)
+    # 与 GDELT 第 0 条内容相同：应被去重
+    gnews = _Source("GNews-cn", [NewsItem(id="g0", title="title 0", content=gdelt.items[0].content, source_name="GNews-cn")])
+    sources = {"GDELT": gdelt, "GNews-cn": gnews}
+    manager = SimpleNamespace(list_available_sources=lambda: list(sources), get_collector=sources.get)
+    config = SimpleNamespace(get_concurrency_limit=lambda _: 4, get_rate_limit=lambda _: 1000.0)
+    stored, llm_calls, lookup_threads = [], [], []
+
+    def fake_lookup(*args, **kwargs):
+        lookup_threads.append(threading.current_thread())
+        return None, None
+
+    async def fake_extract(title, content, api_pool, reported_at=None, cache_key=None, entity_hints=None):
+        llm_calls.append(title)
+        await asyncio.sleep(0.005)
+        return [{"abstract": title, "entities": [], "entities_original": []}]
+
+    def fake_store(events, tag):
+        stored.append((time.perf_counter(), len(events)))
+
+    monkeypatch.setattr(ingest.NewsAPIManager, "get_instance", classmethod(lambda cls: manager))
+    monkeypatch.setattr(ingest, "get_config_manager", lambda: config)
+    monkeypatch.setattr(ingest, "get_llm_pool", lambda: SimpleNamespace(list_services=lambda: []))
+    monkeypatch.setattr(ingest, "get_extraction_cache", lambda: ExtractionCache(None))
+    monkeypatch.setattr(ingest, "lookup_cached_extraction", fake_lookup)
+    monkeypatch.setattr(ingest, "llm_extract_events_async", fake_extract)
+    monkeypatch.setattr(ingest, "store_extracted_events", fake_store)
+    monkeypatch.setattr(ingest, "record_processed_ids", lambda ids, tag: len(ids))
+    monkeypatch.setattr(ingest, "export_compat_json", lambda tag: None)
+
+    result = asyncio.run(ingest.stream_process_news(limit=2, store_batch_size=4, store_batch_timeout_s=0.05, persistent_dedup=False))
+
+    stages = result["stages"]
+    assert stages["fetch"]["items_out"] == 13
+    assert stages["dedup"]["dropped"] == 1 and len(llm_calls) == 12
+    assert result["news"] == 12 and result["events"] == 12 and sum(n for _, n in stored) == 12
+    assert stages["store"]["batches"] == len(stored) >= 3
+    # 流式：第一批在抓取结束前就已写入
+    assert stored[0][0] < gdelt.finished_at
+    assert set(stages) >= {"fetch", "enrich", "dedup", "extract", "store", "elapsed_s"}
+    # 抽取缓存查询（同步 SQLite）不在事件循环线程中执行
+    assert len(lookup_threads) == 12 and threading.main_thread() not in lookup_threads
@@ -0,0 +1,67 @@
+import sys
+import json
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.infra.serialization import StreamingJsonWriter, write_json_atomic, write_jsonl_atomic
+
+
+DOC = {
+    "meta": {"graph_type": "GE", "params": {"top": 1}, "empty": []},
+    "nodes": [{"id": "实体", "attrs": [1, 2, {"k": None}]}, {}],
+    "edges": [],
+    "by_id": {1: "x", "k": {"z": [1.5, True]}},
+}
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+@pytest.mark.parametrize("indent", [2, None])
+def test_streaming_writer_matches_json_dumps(tmp_path: Path, use_orjson: bool, indent) -> None:
+    out = tmp_path / "doc.json"
+    with StreamingJsonWriter(out, indent=indent, use_orjson=use_orjson) as w:
+        w.stream(DOC, depth=3)
+    assert out.read_text(encoding="utf-8") == json.dumps(DOC, ensure_ascii=False, indent=indent)
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_streaming_writer_floats_match_json_dumps(tmp_path: Path, use_orjson: bool) -> None:
+    doc = {
+        "a": [1e16, 1e-7, float("nan"), float("inf"), -float("inf"), 0.1, -0.0, 1e-4, 9999999999999998.0],
+        "nested": {"score": [{"w": 2.5e-8}], "ok": 1.5},
+        1e20: "float key",
+    }
+    out = tmp_path / "floats.json"
+    with StreamingJsonWriter(out, use_orjson=use_orjson) as w:
+        w.stream(doc, depth=2)
+    assert out.read_text(encoding="utf-8") == json.dumps(doc, ensure_ascii=False, indent=2)
+
+    lines = tmp_path / "floats.jsonl"
+    write_jsonl_atomic(lines, [doc["a"], {"x": float("nan")}])
+    assert lines.read_text(encoding="utf-8").splitlines() == [json.dumps(doc["a"]), json.dumps({"x": float("nan")})]
+
+
+def test_write_json_atomic_keeps_old_file_on_failure(tmp_path: Path) -> None:
+    out = tmp_path / "entities.json"
+    write_json_atomic(out, {"a": 1})
+
+    with pytest.raises(RuntimeError):
+        with StreamingJsonWriter(out) as w:
+            w.begin_object()
+            w.value({"partial": True}, key="b")
+            raise RuntimeError("boom")
+
+    assert json.loads(out.read_text(encoding="utf-8")) == {"a": 1}
+    assert [p.name for p in tmp_path.iterdir()] == ["entities.json"]
+
+
+def test_write_jsonl_atomic(tmp_path: Path) -> None:
+    out = tmp_path / "rows.jsonl"
+    n = write_jsonl_atomic(out, ({"i": i, "name": f"新闻{i}"} for i in range(3)))
+    assert n == 3
+    rows = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert rows == [{"i": i, "name": f"新闻{i}"} for i in range(3)]